@@ -1,15 +1,32 @@
 import pandas as pd
 import random
 from datetime import datetime, time, timedelta
-from openpyxl import Workbook
-from openpyxl.styles import PatternFill, Border, Side, Alignment, Font
-from openpyxl.utils import get_column_letter
-from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 import csv
 import json
 import os
+import sys
 import traceback
 
+# Make the shared packages under src/ importable when run as a script
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scheduling.basket_blocks import collect_basket_blocks, plan_basket_blocks
+from scheduling.conflict_graph import build_course_ranks, get_course_students, get_session_room_type
+from scheduling.coverage import AUDIT_FILE, SUMMARY_FILE as COVERAGE_SUMMARY_FILE, audit_coverage
+from scheduling.decomposition import find_components
+from scheduling.diagnostics import DiagnosticsEngine, FailureRecord
+from scheduling.section_batching import SectionBatch
+from scheduling.faculty_assignment import SectionTask, assign_instructors, instructor_loads, instructor_options
+from scheduling.feasibility import build_demands, check_feasibility
+from scheduling.placement import course_gap_ok, daily_limit_ok, lecture_spacing_ok
+from scheduling.solution import SOLUTION_FILE, Session, Solution, basket_group, grid_sessions, split_rooms
+from optimization.lns import OUTPUT_TIME_SHARE, apply_to_grids, improve_solution
+from optimization.scoring import ScoreEngine
+from utils.faculty_render import render_faculty_workbook
+from utils.faculty_workbooks import faculty_file_path, render_faculty_file, render_faculty_files
+from utils.solution_render import render_workbook
+from scheduling.warm_start import course_spec, load_prior_solution, preplace_sessions, prior_sessions_by_section
+
 # Constants
 DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
 START_TIME = time(9, 0)
@@ -20,6 +37,36 @@ TUTORIAL_DURATION = 2  # 1 hour = 2 slots (30 mins each)
 SELF_STUDY_DURATION = 2  # 1 hour = 2 slots (30 mins each)
 BREAK_DURATION = 1    # 30 mins = 1 slot
 
+# Order courses by conflict-graph saturation (DSatur) instead of labs-first priority
+USE_CONFLICT_GRAPH_ORDERING = True
+
+# Solve independent components (no shared faculty, rooms or baskets) in worker processes
+PARALLEL_COMPONENTS = True
+
+# Assign sections of multi-instructor courses by min-cost flow over faculty load,
+# instead of taking the first listed instructor not used yet
+BALANCE_FACULTY_LOAD = True
+
+# Sibling sections scan one shared shuffled candidate order from staggered offsets
+# instead of up to 1000 random draws per lecture or tutorial
+SECTION_BATCHING = True
+
+# Compare weekly demand with room, faculty and section supply before solving
+FEASIBILITY_CHECK = True
+
+# Excel writer for all workbooks: 'xlsxwriter' (constant memory, much faster),
+# 'openpyxl', or 'auto' for xlsxwriter when it is installed
+EXCEL_BACKEND = 'auto'
+
+# Only rewrite the workbook sheets whose sections or faculty changed since the
+# last run, reusing the rest from the previous files (utils/workbook_cache.py)
+INCREMENTAL_OUTPUT = True
+
+# Also write faculty_timetables/timetable_<name>.xlsx per instructor, rendered in
+# worker processes when PARALLEL_FACULTY_FILES is on
+INDIVIDUAL_FACULTY_FILES = False
+PARALLEL_FACULTY_FILES = True
+
 # Lunch break parameters
 LUNCH_WINDOW_START = time(12, 30)  # Lunch breaks can start from 12:30
 LUNCH_WINDOW_END = time(14, 0)    # Last lunch break must end by 14:00 
@@ -228,1481 +275,784 @@ def check_professor_constraint(professor_schedule, faculty, day, start_slot, dur
     
     return True
 
-def generate_all_timetables():
-    """Generate a single timetable for all departments and semesters with basket course support"""
-    global TIME_SLOTS
-    initialize_time_slots()  # Initialize time slots before using
-    
-    # Load configuration and required data
-    rooms = load_rooms()
-    batch_info = load_batch_data()
-    
-    # Create a single workbook for all timetables
-    wb = Workbook()
-    wb.remove(wb.active)  # Remove default sheet
-    
-    # Create an overview sheet
-    overview_sheet = wb.create_sheet(title="Overview")
-    overview_sheet.append(["Combined Timetable for All Departments and Semesters"])
-    overview_sheet.append(["Generated on:", datetime.now().strftime("%Y-%m-%d %H:%M:%S")])
-    overview_sheet.append([])
-    overview_sheet.append(["Department", "Semester", "Sheet Name"])
-    
-    # Track professor assignments and unscheduled components
-    professor_schedule = {}
-    unscheduled_components = set()
-    
-    # Color palette for subjects (vibrant colors)
-    subject_colors = [
-        "FF6B6B", "4ECDC4", "FF9F1C", "5D5FEF", "45B7D1", 
-        "F72585", "7209B7", "3A0CA3", "4361EE", "4CC9F0",
-        "06D6A0", "FFD166", "EF476F", "118AB2", "073B4C"
-    ]
-
-    # Add specific colors for basket groups
-    basket_group_colors = {
-        'B1': "FFA07A",  # Light salmon
-        'B2': "98FB98",  # Pale green  
-        'B3': "87CEFA",  # Light sky blue
-        'B4': "FFD700",  # Gold
-        'B5': "DA70D6",  # Orchid
-        'B6': "20B2AA",  # Light sea green
-        'B7': "FF6347",  # Tomato
-        'B8': "8A2BE2",  # Blue violet
-        'B9': "32CD32"   # Lime green
-    }
-    
-    # Add a list to track self-study only courses
-    self_study_courses = []
-    
-    # Get all unique semester numbers for lunch breaks
-    all_semesters = sorted(set(int(str(sem)[0]) for sem in df['Semester'].unique()))
-    
-    # Calculate lunch breaks dynamically
-    lunch_breaks = calculate_lunch_breaks(all_semesters)
-
-    # Process each department
-    row_index = 5  # Starting row for overview links
-    
-    for department in df['Department'].unique():
-        # Track assigned faculty for courses
-        course_faculty_assignments = {}
-        
-        # Process all semesters for this department
-        for semester in df[df['Department'] == department]['Semester'].unique():
-            # Filter out courses marked as not to be scheduled
-            courses = df[(df['Department'] == department) & 
-                        (df['Semester'] == semester) &
-                        ((df['Schedule'].fillna('Yes').str.upper() == 'YES') | 
-                         (df['Schedule'].isna()))].copy()
-            
-            if courses.empty:
+def get_semester_courses(department, semester, course_rank):
+    """Courses of a department-semester that should be scheduled, in placement order"""
+    # Filter out courses marked as not to be scheduled
+    courses = df[(df['Department'] == department) & 
+                (df['Semester'] == semester) &
+                ((df['Schedule'].fillna('Yes').str.upper() == 'YES') | 
+                 (df['Schedule'].isna()))].copy()
+    
+    if courses.empty:
+        return courses
+
+    if course_rank:
+        # Follow DSatur order, static priority only breaks ties
+        courses['priority'] = courses.apply(get_course_priority, axis=1)
+        courses['rank'] = [course_rank.get((department, semester, str(code)), len(course_rank))
+                           for code in courses['Course Code']]
+        courses = courses.sort_values(['rank', 'priority'], ascending=[True, False], kind='stable')
+    else:
+        # First handle lab scheduling as a separate pass
+        lab_courses = courses[courses['P'] > 0].copy()
+        lab_courses['priority'] = lab_courses.apply(get_course_priority, axis=1)
+        lab_courses = lab_courses.sort_values('priority', ascending=False)
+
+        # Handle remaining courses after labs
+        non_lab_courses = courses[courses['P'] == 0].copy()
+        non_lab_courses['priority'] = non_lab_courses.apply(get_course_priority, axis=1)
+        non_lab_courses = non_lab_courses.sort_values('priority', ascending=False)
+
+        # Combine sorted courses with labs first
+        courses = pd.concat([lab_courses, non_lab_courses])
+
+    return courses
+
+def rooms_have_campus(rooms):
+    """True when rooms.csv gives rooms a campus, otherwise every course shares one room pool"""
+    return any(room.get('campus') for room in (rooms or {}).values())
+
+def get_unit_resources(department, courses, by_campus=True):
+    """Faculty, room pools and basket groups a department-semester can compete for"""
+    resources = set()
+    for _, course in courses.iterrows():
+        code = str(course['Course Code'])
+        faculty = str(course['Faculty'])
+        campus = str(course['Campus']) if by_campus and 'Campus' in course and pd.notna(course['Campus']) else ''
+
+        # Any of the listed instructors may be picked, self-study uses the raw string
+        resources.add(('faculty', faculty))
+        for name in faculty.split('/'):
+            resources.add(('faculty', name.strip()))
+
+        # Lectures share lecture and seater rooms, labs only their own lab type
+        resources.add(('rooms', campus, 'LECTURE'))
+        if pd.notna(course['P']) and course['P'] > 0:
+            resources.add(('rooms', campus, get_required_room_type(course)))
+
+        if is_basket_course(code):
+            resources.add(('basket', get_basket_group(code)))
+
+        # Faculty choices for a code are tracked per department
+        resources.add(('course', department, code))
+    return resources
+
+def get_component_rooms(rooms, component):
+    """Rooms on the campuses a component uses"""
+    if not rooms_have_campus(rooms):
+        return rooms
+    campuses = {resource[1] for resource in component.resources if resource[0] == 'rooms'}
+    return {room_id: room for room_id, room in rooms.items() if room.get('campus', '') in campuses}
+
+def get_course_specs(courses, batch_info, department, semester):
+    """Sessions and rooms each course currently needs, used to validate warm-start sessions"""
+    specs = {}
+    for _, course in courses.iterrows():
+        lecture_sessions, tutorial_sessions, lab_sessions, self_study_sessions = calculate_required_slots(course)
+        specs[(str(course['Course Code']), str(course['Faculty']))] = course_spec(
+            str(course['Course Name']), str(course['Faculty']),
+            {'LEC': lecture_sessions, 'TUT': tutorial_sessions, 'LAB': lab_sessions, 'SS': self_study_sessions},
+            get_required_room_type(course) if lab_sessions else None,
+            get_course_students(course, batch_info))
+    return specs
+
+def plan_faculty_assignment(semester_courses, batch_info):
+    """Instructor per (department, semester, section, code, faculty cell) for multi-instructor courses"""
+    tasks, base_load = [], {}
+    for (department, semester), courses in semester_courses.items():
+        dept_info = batch_info.get((department, semester))
+        num_sections = dept_info['num_sections'] if dept_info else 1
+        for _, course in courses.iterrows():
+            code, faculty = str(course['Course Code']), str(course['Faculty'])
+            lectures, tutorials, labs, _ = calculate_required_slots(course)
+            load = lectures * LECTURE_DURATION + tutorials * TUTORIAL_DURATION + labs * LAB_DURATION
+            options = instructor_options(faculty)
+            if is_basket_course(code) or len(options) < 2:
+                # Single instructor (or basket first choice) load is fixed
+                name = select_faculty(faculty)
+                base_load[name] = base_load.get(name, 0) + load * num_sections
                 continue
-
-            # First handle lab scheduling as a separate pass
-            lab_courses = courses[courses['P'] > 0].copy()
-            lab_courses['priority'] = lab_courses.apply(get_course_priority, axis=1)
-            lab_courses = lab_courses.sort_values('priority', ascending=False)
-
-            # Handle remaining courses after labs
-            non_lab_courses = courses[courses['P'] == 0].copy()
-            non_lab_courses['priority'] = non_lab_courses.apply(get_course_priority, axis=1)
-            non_lab_courses = non_lab_courses.sort_values('priority', ascending=False)
-
-            # Combine sorted courses with labs first
-            courses = pd.concat([lab_courses, non_lab_courses])
-
-            # Get section info
-            dept_info = batch_info.get((department, semester))
-            num_sections = dept_info['num_sections'] if dept_info else 1
-
-            # First identify self-study only courses
-            for _, course in courses.iterrows():
-                l = int(course['L']) if pd.notna(course['L']) else 0
-                t = int(course['T']) if pd.notna(course['T']) else 0
-                p = int(course['P']) if pd.notna(course['P']) else 0
-                s = int(course['S']) if pd.notna(course['S']) else 0
-                
-                if s > 0 and l == 0 and t == 0 and p == 0:
-                    self_study_courses.append({
-                        'code': str(course['Course Code']),
-                        'name': str(course['Course Name']),
-                        'faculty': str(course['Faculty']),
-                        'department': department,
-                        'semester': semester
-                    })
-
-            # Process each section
             for section in range(num_sections):
-                section_title = f"{department}_{semester}" if num_sections == 1 else f"{department}_{semester}_{chr(65+section)}"
-                ws = wb.create_sheet(title=section_title)
-                
-                # Add to overview sheet
-                overview_sheet.cell(row=row_index, column=1, value=department)
-                overview_sheet.cell(row=row_index, column=2, value=str(semester))
-                overview_sheet.cell(row=row_index, column=3, value=section_title)
-                row_index += 1
-                
-                # Initialize timetable structure
-                timetable = {day: {slot: {'type': None, 'code': '', 'name': '', 'faculty': '', 'classroom': ''} 
-                         for slot in range(len(TIME_SLOTS))} for day in range(len(DAYS))}
-                
-                # Create a mapping for subject colors
-                subject_color_map = {}
-                course_faculty_map = {}  # For legend
-                color_idx = 0
-                
-                # Assign colors to each unique subject
-                for _, course in courses.iterrows():
-                    code = str(course['Course Code'])
-                    if code not in subject_color_map and code and code != 'nan':
-                        if is_basket_course(code):
-                            basket_group = get_basket_group(code)
-                            # Use predefined basket group color
-                            subject_color_map[code] = basket_group_colors.get(basket_group, subject_colors[color_idx % len(subject_colors)])
-                        else:
-                            subject_color_map[code] = subject_colors[color_idx % len(subject_colors)]
-                        course_faculty_map[code] = {
-                            'name': str(course['Course Name']),
-                            'faculty': str(course['Faculty'])
-                        }
-                        color_idx += 1
-
-                # Process all courses - both lab and non-lab
-                for _, course in courses.iterrows():
-                    code = str(course['Course Code'])
-                    name = str(course['Course Name'])
-                    faculty = str(course['Faculty'])
-                    
-                    # Skip basket courses (B1, B2, etc)
-                    if not any(code.startswith(f'B{i}') for i in range(1, 10)):
-                        # For same course in different sections, try to use different faculty
-                        if code in course_faculty_assignments:
-                            # If multiple faculty available, try to pick a different one
-                            if '/' in faculty:
-                                faculty_options = [f.strip() for f in faculty.split('/')] 
-                                # Remove already assigned faculty
-                                available_faculty = [f for f in faculty_options 
-                                                     if f not in course_faculty_assignments[code]]
-                                if available_faculty:
-                                    faculty = available_faculty[0]
-                                else:
-                                    faculty = select_faculty(faculty)
+                tasks.append(SectionTask((str(department), str(semester), section, code, faculty), options, load))
+
+    assignment = assign_instructors(tasks, base_load)
+    if tasks:
+        loads = instructor_loads(assignment, tasks, base_load)
+        busiest = max((loads[name] for name in set(assignment.values())), default=0)
+        print(f"Assigned {len(assignment)} multi-instructor sections, busiest of their instructors "
+              f"has {busiest / 2:.1f} hours a week")
+    return assignment
+
+def solve_semester(department, semester, courses, rooms, batch_info, professor_schedule,
+                   unscheduled_components, course_faculty_assignments, prior=None, grids=None,
+                   faculty_assignment=None):
+    """Place every session for all sections of a department-semester
+
+    grids holds section grids with the basket blocks already reserved.
+    faculty_assignment holds the instructor chosen per section for
+    multi-instructor courses (see plan_faculty_assignment).
+    """
+    # Get section info
+    dept_info = batch_info.get((department, semester))
+    num_sections = dept_info['num_sections'] if dept_info else 1
+    specs = get_course_specs(courses, batch_info, department, semester) if prior else {}
+    # Lectures of basket electives come from the shared blocks
+    for (code, _), spec in specs.items():
+        if is_block_elective(code, spec['counts']['LEC']):
+            spec['counts']['LEC'] = 0
+    durations = {'LEC': LECTURE_DURATION, 'TUT': TUTORIAL_DURATION, 'LAB': LAB_DURATION, 'SS': SELF_STUDY_DURATION}
+    batch = None
+    if SECTION_BATCHING and num_sections > 1:
+        batch = SectionBatch(num_sections, len(DAYS), len(TIME_SLOTS),
+                             lambda slot: is_break_time(TIME_SLOTS[slot], semester))
+    
+    timetables = []
+    for section in range(num_sections):
+        # Initialize timetable structure
+        timetable = grids.get((department, semester, section)) if grids else None
+        if timetable is None:
+            timetable = empty_grid()
+
+        # Keep prior sessions that are still valid, only search for the rest
+        warm_counts, warm_faculty = {}, {}
+        if prior:
+            warm_counts, warm_faculty = preplace_sessions(
+                prior.get((str(department), str(semester), section), []), timetable, professor_schedule,
+                rooms, specs, lambda slot: is_break_time(TIME_SLOTS[slot], semester), durations)
+
+        # Process all courses - both lab and non-lab
+        for _, course in courses.iterrows():
+            code = str(course['Course Code'])
+            name = str(course['Course Name'])
+            faculty = str(course['Faculty'])
+            
+            assigned = (faculty_assignment or {}).get((str(department), str(semester), section, code, faculty))
+            # Skip basket courses (B1, B2, etc)
+            if not is_basket_course(code):
+                if assigned:
+                    # Load-balanced choice made before placement started
+                    faculty = assigned
+                    course_faculty_assignments.setdefault(code, []).append(faculty)
+                # For same course in different sections, try to use different faculty
+                elif code in course_faculty_assignments:
+                    # If multiple faculty available, try to pick a different one
+                    if '/' in faculty:
+                        faculty_options = [f.strip() for f in faculty.split('/')] 
+                        # Remove already assigned faculty
+                        available_faculty = [f for f in faculty_options 
+                                             if f not in course_faculty_assignments[code]]
+                        if available_faculty:
+                            faculty = available_faculty[0]
                         else:
                             faculty = select_faculty(faculty)
-                            course_faculty_assignments[code] = [faculty]
+                else:
+                    faculty = select_faculty(faculty)
+                    course_faculty_assignments[code] = [faculty]
+            else:
+                faculty = select_faculty(faculty)
+
+            # Stay with the instructor of the warm-started sessions
+            warm_key = (code, str(course['Faculty']))
+            if warm_key in warm_faculty:
+                faculty = warm_faculty[warm_key]
+                course_faculty_assignments.setdefault(code, []).append(faculty)
+            
+            # Calculate required slots, minus sessions already placed from the prior solution
+            lecture_sessions, tutorial_sessions, lab_sessions, self_study_sessions = calculate_required_slots(course)
+            lecture_sessions -= warm_counts.get(warm_key + ('LEC',), 0)
+            tutorial_sessions -= warm_counts.get(warm_key + ('TUT',), 0)
+            lab_sessions -= warm_counts.get(warm_key + ('LAB',), 0)
+            if grids and is_block_elective(code, lecture_sessions):
+                lecture_sessions = 0
+            students = get_course_students(course, batch_info)
+            
+            if faculty not in professor_schedule:
+                professor_schedule[faculty] = {day: set() for day in range(len(DAYS))}
+
+            # Schedule lectures
+            for _ in range(lecture_sessions):
+                scheduled = False
+                attempts = 0
+                failure = FailureRecord(department, semester, section, code, name, faculty, 'LEC',
+                                        get_session_room_type(course, batch_info, 'LEC'), students)
+                order = batch.order(code, 'LEC', LECTURE_DURATION, section) if batch else None
+                while not scheduled and attempts < (len(order) if order is not None else 1000):
+                    if order is not None:
+                        day, start_slot = order[attempts]
                     else:
-                        faculty = select_faculty(faculty)
+                        day = random.randint(0, len(DAYS)-1)
+                        start_slot = random.randint(0, len(TIME_SLOTS)-LECTURE_DURATION)
                     
-                    # Calculate required slots
-                    lecture_sessions, tutorial_sessions, lab_sessions, self_study_sessions = calculate_required_slots(course)
+                    # Add check for faculty-course gap
+                    if not check_faculty_course_gap(professor_schedule, timetable, faculty, code, day, start_slot):
+                        failure.reject('faculty_gap')
+                        attempts += 1
+                        continue
                     
-                    if faculty not in professor_schedule:
-                        professor_schedule[faculty] = {day: set() for day in range(len(DAYS))}
-
-                    # Schedule lectures
-                    for _ in range(lecture_sessions):
-                        scheduled = False
-                        attempts = 0
-                        while not scheduled and attempts < 1000:
-                            day = random.randint(0, len(DAYS)-1)
-                            start_slot = random.randint(0, len(TIME_SLOTS)-LECTURE_DURATION)
-                            
-                            # Add check for faculty-course gap
-                            if not check_faculty_course_gap(professor_schedule, timetable, faculty, code, day, start_slot):
-                                attempts += 1
-                                continue
+                    # Check faculty daily component limit and lecture constraints
+                    if not check_faculty_daily_components(professor_schedule, faculty, day, 
+                                                       department, semester, section, timetable,
+                                                       code, 'LEC'):
+                        failure.reject('daily_limit')
+                        attempts += 1
+                        continue
+                        
+                    # Check availability and ensure breaks between lectures
+                    slots_free = True
+                    for i in range(LECTURE_DURATION):
+                        rejection = slot_rejection(professor_schedule, timetable, faculty, day, start_slot+i, semester)
+                        if rejection:
+                            failure.reject(rejection)
+                            slots_free = False
+                            break
+                    if slots_free and not lecture_spacing_ok(section_day(timetable, day), start_slot,
+                                                             LECTURE_DURATION, BREAK_DURATION):
+                        failure.reject('lecture_spacing')
+                        slots_free = False
+                    
+                    if slots_free:
+                        room_id = find_suitable_room('LECTURE_ROOM', department, semester, 
+                                                  day, start_slot, LECTURE_DURATION, 
+                                                  rooms, batch_info, timetable, code)
+                        if not room_id:
+                            failure.reject('no_room')
+                        
+                        if room_id:
+                            classroom = room_id
                             
-                            # Check faculty daily component limit and lecture constraints
-                            if not check_faculty_daily_components(professor_schedule, faculty, day, 
-                                                               department, semester, section, timetable,
-                                                               code, 'LEC'):
-                                attempts += 1
-                                continue
-                                
-                            # Check availability and ensure breaks between lectures
-                            slots_free = True
+                            # Mark slots as used
                             for i in range(LECTURE_DURATION):
-                                current_slot = start_slot + i
-                                if (current_slot in professor_schedule[faculty][day] or 
-                                    timetable[day][current_slot]['type'] is not None or
-                                    is_break_time(TIME_SLOTS[current_slot], semester)):
-                                    slots_free = False
-                                    break
-                                
-                                # Check for lectures before this slot
-                                if current_slot > 0:
-                                    if is_lecture_scheduled(timetable, day, 
-                                                         max(0, current_slot - BREAK_DURATION), 
-                                                         current_slot):
-                                        slots_free = False
-                                        break
-                                
-                                # Check for lectures after this slot
-                                if current_slot < len(TIME_SLOTS) - 1:
-                                    if is_lecture_scheduled(timetable, day,
-                                                         current_slot + 1,
-                                                         min(len(TIME_SLOTS), 
-                                                             current_slot + BREAK_DURATION + 1)):
-                                        slots_free = False
-                                        break
-                            
-                            if slots_free:
-                                room_id = find_suitable_room('LECTURE_ROOM', department, semester, 
-                                                          day, start_slot, LECTURE_DURATION, 
-                                                          rooms, batch_info, timetable, code)
-                                
-                                if room_id:
-                                    classroom = room_id
-                                    
-                                    # Mark slots as used
-                                    for i in range(LECTURE_DURATION):
-                                        professor_schedule[faculty][day].add(start_slot+i)
-                                        timetable[day][start_slot+i]['type'] = 'LEC'
-                                        timetable[day][start_slot+i]['code'] = code if i == 0 else ''
-                                        timetable[day][start_slot+i]['name'] = name if i == 0 else ''
-                                        timetable[day][start_slot+i]['faculty'] = faculty if i == 0 else ''
-                                        timetable[day][start_slot+i]['classroom'] = classroom if i == 0 else ''
-                                    scheduled = True
-                            attempts += 1
-                        if not scheduled:
-                                # Generate detailed reason for why this component couldn't be scheduled
-                                detailed_reason = unscheduled_reason(course, department, semester, 
-                                                                  professor_schedule, rooms, 'LEC', attempts)
-                                
-                                unscheduled_components.add(
-                                    UnscheduledComponent(department, semester, code, name, 
-                                                       faculty, 'LEC', 1, section, detailed_reason)
-                                )
-
-                    # Schedule tutorials
-                    for _ in range(tutorial_sessions):
-                        scheduled = False
-                        attempts = 0
-                        while not scheduled and attempts < 1000:
-                            day = random.randint(0, len(DAYS)-1)
-                            
-                            # Add check for faculty-course gap
-                            if not check_faculty_course_gap(professor_schedule, timetable, faculty, code, day, start_slot):
-                                attempts += 1
-                                continue
-                            
-                            # Check faculty daily component limit for tutorials
-                            if not check_faculty_daily_components(professor_schedule, faculty, day,
-                                                               department, semester, section, timetable,
-                                                               code, 'TUT'):
-                                attempts += 1
-                                continue
-                                
-                            start_slot = random.randint(0, len(TIME_SLOTS)-TUTORIAL_DURATION)
-                            
-                            # Check availability
-                            slots_free = True
-                            for i in range(TUTORIAL_DURATION):
-                                if (start_slot+i in professor_schedule[faculty][day] or 
-                                    timetable[day][start_slot+i]['type'] is not None or
-                                    is_break_time(TIME_SLOTS[start_slot+i], semester)):
-                                    slots_free = False
-                                    break
-                            
-                            if slots_free:
-                                room_id = find_suitable_room('LECTURE_ROOM', department, semester, 
-                                                          day, start_slot, TUTORIAL_DURATION, 
-                                                          rooms, batch_info, timetable, code)
-                                
-                                if room_id:
-                                    classroom = room_id
-                                    
-                                    # Mark slots as used
-                                    for i in range(TUTORIAL_DURATION):
-                                        professor_schedule[faculty][day].add(start_slot+i)
-                                        timetable[day][start_slot+i]['type'] = 'TUT'
-                                        timetable[day][start_slot+i]['code'] = code if i == 0 else ''
-                                        timetable[day][start_slot+i]['name'] = name if i == 0 else ''
-                                        timetable[day][start_slot+i]['faculty'] = faculty if i == 0 else ''
-                                        timetable[day][start_slot+i]['classroom'] = classroom if i == 0 else ''
-                                    scheduled = True
-                            attempts += 1
-                        if not scheduled:
-                            # Generate detailed reason for why this tutorial couldn't be scheduled
-                            detailed_reason = unscheduled_reason(course, department, semester, 
-                                                              professor_schedule, rooms, 'TUT', attempts)
-                            
-                            unscheduled_components.add(
-                                UnscheduledComponent(department, semester, code, name,
-                                                   faculty, 'TUT', 1, section, detailed_reason)
-                            )
-
-                    # Schedule labs with tracking
-                    if lab_sessions > 0:
-                        room_type = get_required_room_type(course)
-                        for _ in range(lab_sessions):
-                            scheduled = False
-                            attempts = 0
-                            scheduling_reason = ""
-                            
-                            # Try each day in random order
-                            days = list(range(len(DAYS)))
-                            random.shuffle(days)
-                            
-                            for day in days:
-                                # Get all possible slots for this day
-                                possible_slots = get_best_slots(timetable, professor_schedule, 
-                                                              faculty, day, LAB_DURATION, 
-                                                              semester, department)
-                                
-                                for start_slot in possible_slots:
-                                    room_id = find_suitable_room(room_type, department, semester,
-                                                               day, start_slot, LAB_DURATION,
-                                                               rooms, batch_info, timetable, code)
-                                    
-                                    if room_id:
-                                        classroom = room_id if ',' not in str(room_id) else f"{room_id.split(',')[0]}+{room_id.split(',')[1]}"
-                                        
-                                        # Mark slots as used
-                                        for i in range(LAB_DURATION):
-                                            professor_schedule[faculty][day].add(start_slot+i)
-                                            timetable[day][start_slot+i]['type'] = 'LAB'
-                                            timetable[day][start_slot+i]['code'] = code if i == 0 else ''
-                                            timetable[day][start_slot+i]['name'] = name if i == 0 else ''
-                                            timetable[day][start_slot+i]['faculty'] = faculty if i == 0 else ''
-                                            timetable[day][start_slot+i]['classroom'] = classroom if i == 0 else ''
-                                        scheduled = True
-                                        break
-                                
-                                if scheduled:
-                                    break
-                                
-                            if not scheduled:
-                                # Generate detailed reason for why this lab component couldn't be scheduled
-                                detailed_reason = unscheduled_reason(course, department, semester, 
-                                                                  professor_schedule, rooms, 'LAB', attempts)
-                                
-                                unscheduled_components.add(
-                                    UnscheduledComponent(department, semester, code, name,
-                                                       faculty, 'LAB', 1, section, detailed_reason)
-                                )
-
-                # Schedule self-study sessions
-                for _, course in courses.iterrows():
-                    code = str(course['Course Code'])
-                    name = str(course['Course Name'])
-                    faculty = str(course['Faculty'])
-                    _, _, _, self_study_sessions = calculate_required_slots(course)
+                                professor_schedule[faculty][day].add(start_slot+i)
+                                timetable[day][start_slot+i]['type'] = 'LEC'
+                                timetable[day][start_slot+i]['code'] = code if i == 0 else ''
+                                timetable[day][start_slot+i]['name'] = name if i == 0 else ''
+                                timetable[day][start_slot+i]['faculty'] = faculty if i == 0 else ''
+                                timetable[day][start_slot+i]['classroom'] = classroom if i == 0 else ''
+                            scheduled = True
+                    attempts += 1
+                if not scheduled:
+                        # Reasons are worked out from the failure record when the report is written
+                        unscheduled_components.append(
+                            UnscheduledComponent(department, semester, code, name, 
+                                               faculty, 'LEC', 1, section, failure=failure)
+                        )
+
+            # Schedule tutorials
+            for _ in range(tutorial_sessions):
+                scheduled = False
+                attempts = 0
+                failure = FailureRecord(department, semester, section, code, name, faculty, 'TUT',
+                                        get_session_room_type(course, batch_info, 'TUT'), students)
+                order = batch.order(code, 'TUT', TUTORIAL_DURATION, section) if batch else None
+                while not scheduled and attempts < (len(order) if order is not None else 1000):
+                    if order is not None:
+                        day, start_slot = order[attempts]
+                    else:
+                        day = random.randint(0, len(DAYS)-1)
+                        start_slot = random.randint(0, len(TIME_SLOTS)-TUTORIAL_DURATION)
                     
-                    if self_study_sessions > 0:
-                        if faculty not in professor_schedule:
-                            professor_schedule[faculty] = {day: set() for day in range(len(DAYS))}
-                        
-                        # Schedule each self-study session (1 hour each)
-                        for _ in range(self_study_sessions):
-                            scheduled = False
-                            attempts = 0
-                            while not scheduled and attempts < 1000:
-                                day = random.randint(0, len(DAYS)-1)
-                                start_slot = random.randint(0, len(TIME_SLOTS)-SELF_STUDY_DURATION)
-                                
-                                # Check availability
-                                slots_free = True
-                                for i in range(SELF_STUDY_DURATION):
-                                    if (start_slot+i in professor_schedule[faculty][day] or 
-                                        timetable[day][start_slot+i]['type'] is not None or
-                                        is_break_time(TIME_SLOTS[start_slot+i], semester)):
-                                        slots_free = False
-                                        break
-                                
-                                if slots_free:
-                                    room_id = find_suitable_room('LECTURE_ROOM', department, semester, 
-                                                              day, start_slot, SELF_STUDY_DURATION, 
-                                                              rooms, batch_info, timetable, code)
-                                    
-                                    if room_id:
-                                        classroom = room_id
-                                        
-                                        # Mark slots as used
-                                        for i in range(SELF_STUDY_DURATION):
-                                            professor_schedule[faculty][day].add(start_slot+i)
-                                            timetable[day][start_slot+i]['type'] = 'SS'  # SS for Self Study
-                                            timetable[day][start_slot+i]['code'] = code if i == 0 else ''
-                                            timetable[day][start_slot+i]['name'] = name if i == 0 else ''
-                                            timetable[day][start_slot+i]['faculty'] = faculty if i == 0 else ''
-                                            timetable[day][start_slot+i]['classroom'] = classroom if i == 0 else ''
-                                        scheduled = True
-                                attempts += 1
-
-                # Write timetable to worksheet
-                header = ['Day'] + [f"{slot[0].strftime('%H:%M')}-{slot[1].strftime('%H:%M')}" for slot in TIME_SLOTS]
-                ws.append(header)
-                
-                header_fill = PatternFill(start_color="374785", end_color="374785", fill_type="solid")
-                header_font = Font(bold=True, color="FFFFFF", name="Calibri", size=12)
-                header_alignment = Alignment(horizontal='center', vertical='center')
-                
-                for cell in ws[1]:
-                    cell.fill = header_fill
-                    cell.font = header_font
-                    cell.alignment = header_alignment
-                
-                # Modern fills for activities
-                lec_fill = PatternFill(start_color="4F8A8B", end_color="4F8A8B", fill_type="solid")
-                lab_fill = PatternFill(start_color="A1E887", end_color="A1E887", fill_type="solid")
-                tut_fill = PatternFill(start_color="FBD46D", end_color="FBD46D", fill_type="solid")
-                ss_fill = PatternFill(start_color="A8D8EA", end_color="A8D8EA", fill_type="solid")
-                break_fill = PatternFill(start_color="F8E9A1", end_color="F8E9A1", fill_type="solid")
-                border = Border(left=Side(style='thin', color="B0B0B0"), right=Side(style='thin', color="B0B0B0"),
-                                top=Side(style='thin', color="B0B0B0"), bottom=Side(style='thin', color="B0B0B0"))
-                
-                for day_idx, day in enumerate(DAYS):
-                    row_num = day_idx + 2
-                    ws.append([day])
+                    # Add check for faculty-course gap
+                    if not check_faculty_course_gap(professor_schedule, timetable, faculty, code, day, start_slot):
+                        failure.reject('faculty_gap')
+                        attempts += 1
+                        continue
+                    
+                    # Check faculty daily component limit for tutorials
+                    if not check_faculty_daily_components(professor_schedule, faculty, day,
+                                                       department, semester, section, timetable,
+                                                       code, 'TUT'):
+                        failure.reject('daily_limit')
+                        attempts += 1
+                        continue
                     
-                    merge_ranges = []  # Track merge ranges for this row
+                    # Check availability
+                    slots_free = True
+                    for i in range(TUTORIAL_DURATION):
+                        rejection = slot_rejection(professor_schedule, timetable, faculty, day, start_slot+i, semester)
+                        if rejection:
+                            failure.reject(rejection)
+                            slots_free = False
+                            break
                     
-                    for slot_idx in range(len(TIME_SLOTS)):
-                        cell_value = ''
-                        cell_fill = None
+                    if slots_free:
+                        room_id = find_suitable_room('LECTURE_ROOM', department, semester, 
+                                                  day, start_slot, TUTORIAL_DURATION, 
+                                                  rooms, batch_info, timetable, code)
+                        if not room_id:
+                            failure.reject('no_room')
                         
-                        if is_break_time(TIME_SLOTS[slot_idx], semester):
-                            cell_value = "BREAK"
-                            cell_fill = break_fill
-                        elif timetable[day_idx][slot_idx]['type']:
-                            activity_type = timetable[day_idx][slot_idx]['type']
-                            code = timetable[day_idx][slot_idx]['code']
-                            classroom = timetable[day_idx][slot_idx]['classroom']
-                            faculty = timetable[day_idx][slot_idx]['faculty']
+                        if room_id:
+                            classroom = room_id
                             
-                            # Only create content for start of activity
-                            if code:
-                                # Get duration based on activity type
-                                duration = {
-                                    'LEC': LECTURE_DURATION,
-                                    'LAB': LAB_DURATION,
-                                    'TUT': TUTORIAL_DURATION,
-                                    'SS': SELF_STUDY_DURATION
-                                }.get(activity_type, 1)
-                                
-                                # Use subject-specific color
-                                if code in subject_color_map:
-                                    cell_fill = PatternFill(start_color=subject_color_map[code],
-                                                          end_color=subject_color_map[code],
-                                                          fill_type="solid")
-                                else:
-                                    cell_fill = {
-                                        'LAB': lab_fill,
-                                        'TUT': tut_fill,
-                                        'SS': ss_fill,
-                                        'LEC': lec_fill
-                                    }.get(activity_type, lec_fill)
-                                
-                                if code and is_basket_course(code):
-                                    basket_group = get_basket_group(code)
-                                    # Get all courses from same basket in this slot
-                                    basket_codes = set()  # Use set to avoid duplicates
-                                    basket_details = {}
-                                    
-                                    # First collect all courses in this basket group
-                                    for slot_id, slot_data in timetable[day_idx].items():
-                                        slot_code = slot_data.get('code', '')
-                                        if (slot_data.get('type') == activity_type and 
-                                            get_basket_group(slot_code) == basket_group):
-                                            basket_codes.add(slot_code)  # Add to set instead of list
-                                            # Only store details if not already present
-                                            if slot_code not in basket_details:
-                                                basket_details[slot_code] = {
-                                                    'faculty': slot_data['faculty'],
-                                                    'room': slot_data['classroom']
-                                                }
-                                    
-                                    if basket_codes:
-                                        # Group header
-                                        basket_header = f"{basket_group} Courses\n"
-                                        # List of all unique course codes
-                                        codes_str = ', '.join(sorted(basket_codes))
-                                        # Course details with rooms (unique entries)
-                                        course_details = [
-                                            f"{code}: {details['faculty']} ({details['room']})"
-                                            for code, details in sorted(basket_details.items())
-                                            if code and details['faculty'] and details['room']
-                                        ]
-                                        
-                                        cell_value = f"{basket_header}{codes_str}\n" + "\n".join(course_details)
-                                else:
-                                    cell_value = f"{code} {activity_type}\nroom no. :{classroom}\n{faculty}"
-                                
-                                # Create merge range
-                                if duration > 1:
-                                    start_col = get_column_letter(slot_idx + 2)
-                                    end_col = get_column_letter(slot_idx + duration + 1)
-                                    merge_range = f"{start_col}{row_num}:{end_col}{row_num}"
-                                    merge_ranges.append((merge_range, cell_fill))
-                        
-                        cell = ws.cell(row=row_num, column=slot_idx+2, value=cell_value)
-                        if cell_fill:
-                            cell.fill = cell_fill
-                        cell.border = border
-                        cell.alignment = Alignment(wrap_text=True, vertical='center', horizontal='center', indent=1)
+                            # Mark slots as used
+                            for i in range(TUTORIAL_DURATION):
+                                professor_schedule[faculty][day].add(start_slot+i)
+                                timetable[day][start_slot+i]['type'] = 'TUT'
+                                timetable[day][start_slot+i]['code'] = code if i == 0 else ''
+                                timetable[day][start_slot+i]['name'] = name if i == 0 else ''
+                                timetable[day][start_slot+i]['faculty'] = faculty if i == 0 else ''
+                                timetable[day][start_slot+i]['classroom'] = classroom if i == 0 else ''
+                            scheduled = True
+                    attempts += 1
+                if not scheduled:
+                    unscheduled_components.append(
+                        UnscheduledComponent(department, semester, code, name,
+                                           faculty, 'TUT', 1, section, failure=failure)
+                    )
+
+            # Schedule labs with tracking
+            if lab_sessions > 0:
+                room_type = get_required_room_type(course)
+                for _ in range(lab_sessions):
+                    scheduled = False
+                    failure = FailureRecord(department, semester, section, code, name, faculty, 'LAB',
+                                            room_type, students)
                     
-                    # Apply merges after creating all cells in the row
-                    for merge_range, fill in merge_ranges:
-                        ws.merge_cells(merge_range)
-                        # Ensure merged cell has consistent formatting
-                        merged_cell = ws[merge_range.split(':')[0]]
-                        merged_cell.fill = fill
-                        merged_cell.alignment = Alignment(wrap_text=True, vertical='center', horizontal='center', indent=2)
-
-                for col_idx in range(1, len(TIME_SLOTS)+2):
-                    col_letter = get_column_letter(col_idx)
-                    ws.column_dimensions[col_letter].width = 15
-                
-                for row in ws.iter_rows(min_row=2, max_row=len(DAYS)+1):
-                    ws.row_dimensions[row[0].row].height = 40
-
-                # Add Self-Study Only Courses section
-                current_row = len(DAYS) + 4  # Initialize current_row here, before any sections
-
-                if self_study_courses:
-                    ss_courses_for_this_section = [c for c in self_study_courses 
-                                               if c['department'] == department and 
-                                               c['semester'] == semester]
+                    # Try each day in random order
+                    days = list(range(len(DAYS)))
+                    random.shuffle(days)
                     
-                    if ss_courses_for_this_section:
-                        ws.cell(row=current_row, column=1, value="Self-Study Only Courses")
-                        ws.cell(row=current_row, column=1).font = Font(bold=True)
-                        current_row += 1
-                        
-                        headers = ['Course Code', 'Course Name', 'Faculty']
-                        for col, header in enumerate(headers, 1):
-                            ws.cell(row=current_row, column=col, value=header)
-                            ws.cell(row=current_row, column=col).font = Font(bold=True)
-                        current_row += 1
+                    for day in days:
+                        # Get all possible slots for this day
+                        possible_slots = get_best_slots(timetable, professor_schedule, 
+                                                      faculty, day, LAB_DURATION, 
+                                                      semester, department)
+                        if not possible_slots:
+                            failure.reject('no_free_slot')
                         
-                        for course in ss_courses_for_this_section:
-                            ws.cell(row=current_row, column=1, value=course['code'])
-                            ws.cell(row=current_row, column=2, value=course['name'])
-                            ws.cell(row=current_row, column=3, value=course['faculty'])
-                            current_row += 1
+                        for start_slot in possible_slots:
+                            room_id = find_suitable_room(room_type, department, semester,
+                                                       day, start_slot, LAB_DURATION,
+                                                       rooms, batch_info, timetable, code)
+                            if not room_id:
+                                failure.reject('no_room')
+                            
+                            if room_id:
+                                classroom = room_id if ',' not in str(room_id) else f"{room_id.split(',')[0]}+{room_id.split(',')[1]}"
+                                
+                                # Mark slots as used
+                                for i in range(LAB_DURATION):
+                                    professor_schedule[faculty][day].add(start_slot+i)
+                                    timetable[day][start_slot+i]['type'] = 'LAB'
+                                    timetable[day][start_slot+i]['code'] = code if i == 0 else ''
+                                    timetable[day][start_slot+i]['name'] = name if i == 0 else ''
+                                    timetable[day][start_slot+i]['faculty'] = faculty if i == 0 else ''
+                                    timetable[day][start_slot+i]['classroom'] = classroom if i == 0 else ''
+                                scheduled = True
+                                break
                         
-                        current_row += 2  # Add extra spacing after self-study courses
-
-                # Handle unscheduled components section
-                dept_unscheduled = [c for c in unscheduled_components 
-                                    if c.department == department and 
-                                    c.semester == semester and
-                                    (c.section == section if num_sections > 1 else True)]
-
-                if dept_unscheduled:
-                    current_row += 2  # Add spacing after previous section
-                    unsch_title = ws.cell(row=current_row, column=1, value="Unscheduled Components")
-                    unsch_title.font = Font(bold=True, size=12, color="FF0000")
-                    current_row += 2
-
-                    headers = ['Course Code', 'Course Name', 'Faculty', 'Component', 'Sessions', 'Reason']
-                    for col, header in enumerate(headers, 1):
-                        cell = ws.cell(row=current_row, column=col, value=header)
-                        cell.font = Font(bold=True)
-                        cell.border = border
-                        cell.fill = PatternFill(start_color="FFE0E0", end_color="FFE0E0", fill_type="solid")
-                        cell.alignment = Alignment(horizontal='center', vertical='center')
-                        # Set column widths for better readability
-                        ws.column_dimensions[get_column_letter(col)].width = 20
-                    current_row += 1
-
-                    for comp in dept_unscheduled:
-                        cells = [
-                            (comp.code, None),
-                            (comp.name, None),
-                            (comp.faculty, None),
-                            (comp.component_type, None),
-                            (comp.sessions, None),
-                            (comp.reason or "Could not find suitable slot", None)
-                        ]
+                        if scheduled:
+                            break
                         
-                        for col, (value, fill) in enumerate(cells, 1):
-                            cell = ws.cell(row=current_row, column=col, value=value)
-                            cell.border = border
-                            cell.alignment = Alignment(horizontal='left', vertical='center', wrap_text=True)
-                        current_row += 1
-                    
-                    current_row += 2  # Add spacing before legend
-
-                # Improved legend formatting
-                legend_title = ws.cell(row=current_row, column=1, value="Legend")
-                legend_title.font = Font(bold=True, size=12)
-                current_row += 2
-
-                # Wider columns for legend
-                ws.column_dimensions['A'].width = 20  # Subject Code
-                ws.column_dimensions['B'].width = 10  # Color (moved next to code)
-                ws.column_dimensions['C'].width = 40  # Subject Name
-                ws.column_dimensions['D'].width = 30  # Faculty
-                ws.column_dimensions['E'].width = 15  # LTPS
-
-                # Add legend headers with better formatting
-                legend_headers = ['Subject Code', 'Color', 'Subject Name', 'Faculty', 'LTPS']
-                for col, header in enumerate(legend_headers, 1):
-                    cell = ws.cell(row=current_row, column=col, value=header)
-                    cell.font = Font(bold=True)
-                    cell.border = border
-                    cell.fill = PatternFill(start_color="F0F0F0", end_color="F0F0F0", fill_type="solid")
-                    cell.alignment = Alignment(horizontal='center', vertical='center')
-                    # Add padding to header cells
-                    cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-                current_row += 1
-
-                # Add subject entries with improved spacing and color next to code
-                for code, color in subject_color_map.items():
-                    if code in course_faculty_map:
-                        # Add more spacing between rows
-                        ws.row_dimensions[current_row].height = 30
+                    if not scheduled:
+                        unscheduled_components.append(
+                            UnscheduledComponent(department, semester, code, name,
+                                               faculty, 'LAB', 1, section, failure=failure)
+                        )
+
+        # Schedule self-study sessions
+        for _, course in courses.iterrows():
+            code = str(course['Course Code'])
+            name = str(course['Course Name'])
+            faculty = str(course['Faculty'])
+            _, _, _, self_study_sessions = calculate_required_slots(course)
+            self_study_sessions -= warm_counts.get((code, faculty, 'SS'), 0)
+            
+            if self_study_sessions > 0:
+                if faculty not in professor_schedule:
+                    professor_schedule[faculty] = {day: set() for day in range(len(DAYS))}
+                
+                # Schedule each self-study session (1 hour each)
+                for _ in range(self_study_sessions):
+                    scheduled = False
+                    attempts = 0
+                    failure = FailureRecord(department, semester, section, code, name, faculty, 'SS',
+                                            get_session_room_type(course, batch_info, 'SS'),
+                                            get_course_students(course, batch_info))
+                    while not scheduled and attempts < 1000:
+                        day = random.randint(0, len(DAYS)-1)
+                        start_slot = random.randint(0, len(TIME_SLOTS)-SELF_STUDY_DURATION)
                         
-                        # Get LTPS values for this course
-                        ltps_value = ""
-                        for _, course_row in courses.iterrows():
-                            if str(course_row['Course Code']) == code:
-                                l = str(int(course_row['L'])) if pd.notna(course_row['L']) else "0"
-                                t = str(int(course_row['T'])) if pd.notna(course_row['T']) else "0"
-                                p = str(int(course_row['P'])) if pd.notna(course_row['P']) else "0"
-                                s = str(int(course_row['S'])) if pd.notna(course_row['S']) and 'S' in course_row else "0"
-                                ltps_value = f"{l}-{t}-{p}-{s}"
+                        # Check availability
+                        slots_free = True
+                        for i in range(SELF_STUDY_DURATION):
+                            rejection = slot_rejection(professor_schedule, timetable, faculty, day, start_slot+i, semester)
+                            if rejection:
+                                failure.reject(rejection)
+                                slots_free = False
                                 break
                         
-                        # Create cells with padding and color next to code
-                        cells = [
-                            (code, None),
-                            ('', PatternFill(start_color=color, end_color=color, fill_type="solid")),
-                            (course_faculty_map[code]['name'], None),
-                            (course_faculty_map[code]['faculty'], None),
-                            (ltps_value, None)
-                        ]
-                        
-                        for col, (value, fill) in enumerate(cells, 1):
-                            cell = ws.cell(row=current_row, column=col, value=value)
-                            cell.border = border
-                            if fill:
-                                cell.fill = fill
-                            # Add padding with increased wrap_text and adjusted alignment
-                            cell.alignment = Alignment(horizontal='left', vertical='center', wrap_text=True, indent=2)
-                        
-                        current_row += 1
+                        if slots_free:
+                            room_id = find_suitable_room('LECTURE_ROOM', department, semester, 
+                                                      day, start_slot, SELF_STUDY_DURATION, 
+                                                      rooms, batch_info, timetable, code)
+                            if not room_id:
+                                failure.reject('no_room')
+                            
+                            if room_id:
+                                classroom = room_id
+                                
+                                # Mark slots as used
+                                for i in range(SELF_STUDY_DURATION):
+                                    professor_schedule[faculty][day].add(start_slot+i)
+                                    timetable[day][start_slot+i]['type'] = 'SS'  # SS for Self Study
+                                    timetable[day][start_slot+i]['code'] = code if i == 0 else ''
+                                    timetable[day][start_slot+i]['name'] = name if i == 0 else ''
+                                    timetable[day][start_slot+i]['faculty'] = faculty if i == 0 else ''
+                                    timetable[day][start_slot+i]['classroom'] = classroom if i == 0 else ''
+                                scheduled = True
+                        attempts += 1
+                    if not scheduled:
+                        unscheduled_components.append(
+                            UnscheduledComponent(department, semester, code, name,
+                                               faculty, 'SS', 1, section, failure=failure)
+                        )
+        timetables.append(timetable)
+
+    return timetables
+
+def empty_grid():
+    return {day: {slot: {'type': None, 'code': '', 'name': '', 'faculty': '', 'classroom': ''}
+                  for slot in range(len(TIME_SLOTS))} for day in range(len(DAYS))}
+
+def is_block_elective(code, lecture_sessions):
+    """True if a course's lectures are placed by a shared basket block"""
+    return is_basket_course(code) and get_basket_group(code) in BASKET_SLOTS and lecture_sessions > 0
+
+def plan_basket_electives(units, rooms, batch_info, professor_schedule, unscheduled_components):
+    """Reserve the basket blocks of a component up front, returns the section grids"""
+    grids, rows = {}, []
+    for (department, semester), courses in units:
+        dept_info = batch_info.get((department, semester))
+        num_sections = dept_info['num_sections'] if dept_info else 1
+        for section in range(num_sections):
+            grids[(department, semester, section)] = empty_grid()
+        for _, course in courses.iterrows():
+            code = str(course['Course Code'])
+            lecture_sessions = calculate_required_slots(course)[0]
+            if is_block_elective(code, lecture_sessions):
+                rows.append({'department': department, 'semester': semester, 'sections': num_sections,
+                             'group': get_basket_group(code), 'code': code, 'name': str(course['Course Name']),
+                             'faculty': select_faculty(str(course['Faculty'])),
+                             'students': get_course_students(course, batch_info), 'sessions': lecture_sessions})
+    if not rows:
+        return grids
+
+    blocks = collect_basket_blocks(rows, BASKET_SLOTS, LECTURE_DURATION)
+    plan_basket_blocks(blocks, grids, professor_schedule, rooms,
+                       lambda section_key, slot: is_break_time(TIME_SLOTS[slot], section_key[1]),
+                       len(DAYS), len(TIME_SLOTS))
+
+    # Every section offering an elective the blocks could not fully seat reports it
+    for block in blocks:
+        for elective in block.electives:
+            if not elective.missing:
+                continue
+            for department, code, name, faculty in elective.courses:
+                for section_department, semester, section in block.sections:
+                    if section_department != department:
+                        continue
+                    failure = FailureRecord(department, semester, section, code, name, faculty, 'LEC',
+                                            'LECTURE_ROOM', elective.students)
+                    failure.rejections = dict(elective.rejections)
+                    unscheduled_components.append(UnscheduledComponent(
+                        department, semester, code, name, faculty, 'LEC', elective.missing, section,
+                        failure=failure))
+    return grids
+
+def solve_component(units, rooms, batch_info, prior=None, faculty_assignment=None):
+    """Solve a list of ((department, semester), courses) units that share resources"""
+    professor_schedule = {}
+    unscheduled_components = []  # Two sessions of a course failing alike are two entries
+    course_faculty_assignments = {}  # Tracked per department
+    timetables = {}
+
+    # Basket groups are shared blocks, planned once before any section is solved
+    grids = plan_basket_electives(units, rooms, batch_info, professor_schedule, unscheduled_components)
+
+    for (department, semester), courses in units:
+        timetables[(department, semester)] = solve_semester(
+            department, semester, courses, rooms, batch_info, professor_schedule,
+            unscheduled_components, course_faculty_assignments.setdefault(department, {}), prior, grids,
+            faculty_assignment)
+
+    return {
+        'timetables': timetables,
+        'professor_schedule': professor_schedule,
+        'unscheduled_components': unscheduled_components
+    }
 
-    # Format the overview sheet
-    for col in range(1, 4):
-        overview_sheet.column_dimensions[get_column_letter(col)].width = 20
-    
-    for row in overview_sheet.iter_rows(min_row=1, max_row=4):
-        for cell in row:
-            cell.font = Font(bold=True)
+def _solve_component_worker(units, rooms, batch_info, all_semesters, prior, faculty_assignment):
+    """Worker process entry point, solves one component against its own copy of the rooms"""
+    random.seed()
+    initialize_time_slots()
+    calculate_lunch_breaks(all_semesters)
+    result = solve_component(units, rooms, batch_info, prior, faculty_assignment)
+    result['room_schedules'] = {room_id: room['schedule'] for room_id, room in (rooms or {}).items()}
+    return result
+
+def solve_all_components(components, semester_courses, rooms, batch_info, all_semesters, prior=None,
+                         faculty_assignment=None):
+    """Solve independent components, in parallel worker processes when there are several"""
+    component_units = [[(key, semester_courses[key]) for key in component.keys] for component in components]
+    component_rooms = [get_component_rooms(rooms, component) for component in components]
+
+    if PARALLEL_COMPONENTS and len(components) > 1:
+        max_workers = min(len(components), os.cpu_count() or 1)
+        print(f"Solving {len(components)} independent components with {max_workers} worker processes")
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_solve_component_worker, units, unit_rooms, batch_info, all_semesters,
+                                       prior, faculty_assignment)
+                       for units, unit_rooms in zip(component_units, component_rooms)]
+            results = [future.result() for future in futures]
+    else:
+        results = [solve_component(units, unit_rooms, batch_info, prior, faculty_assignment)
+                   for units, unit_rooms in zip(component_units, component_rooms)]
+
+    # Merge component solutions into one global faculty and room calendar
+    timetables = {}
+    professor_schedule = {}
+    unscheduled_components = []
+    for result in results:
+        timetables.update(result['timetables'])
+        unscheduled_components.extend(result['unscheduled_components'])
+        for faculty, days in result['professor_schedule'].items():
+            merged = professor_schedule.setdefault(faculty, {day: set() for day in range(len(DAYS))})
+            for day, slots in days.items():
+                merged[day] |= slots
+        for room_id, schedule in result.get('room_schedules', {}).items():
+            for day, slots in schedule.items():
+                rooms[room_id]['schedule'][day] |= slots
+
+    return timetables, professor_schedule, unscheduled_components
+
+def build_solution(timetables, semester_courses, rooms, batch_info, all_semesters, unscheduled_components):
+    """Collect the solved section grids into a saveable Solution"""
+    meta = {
+        'days': list(DAYS),
+        'slots': [f"{start.strftime('%H:%M')}-{end.strftime('%H:%M')}" for start, end in TIME_SLOTS],
+        'breaks': {str(semester): [slot for slot in range(len(TIME_SLOTS))
+                                   if is_break_time(TIME_SLOTS[slot], semester)]
+                   for semester in all_semesters},
+        'durations': {'LEC': LECTURE_DURATION, 'TUT': TUTORIAL_DURATION,
+                      'LAB': LAB_DURATION, 'SS': SELF_STUDY_DURATION},
+        'rooms': {room_id: {'type': room['type'], 'capacity': room['capacity'],
+                            'roomNumber': room['roomNumber'], 'campus': room.get('campus', '')}
+                  for room_id, room in (rooms or {}).items()},
+        'sections': [],
+        'courses': [],
+        'unscheduled': [{'department': str(c.department), 'semester': c.semester, 'section': c.section,
+                         'code': c.code, 'name': c.name, 'faculty': c.faculty,
+                         'component_type': c.component_type, 'sessions': c.sessions, 'reason': c.reason}
+                        for c in unscheduled_components],
+    }
+    sessions = []
+
+    for (department, semester), courses in semester_courses.items():
+        dept_info = batch_info.get((department, semester))
+        section_size = dept_info['section_size'] if dept_info else 0
+        course_rows = {}
+        for _, course in courses.iterrows():
+            code = str(course['Course Code'])
+            course_rows[code] = course
+            meta['courses'].append({
+                'department': str(department), 'semester': semester, 'code': code,
+                'name': str(course['Course Name']), 'faculty': str(course['Faculty']),
+                'L': course['L'], 'T': course['T'], 'P': course['P'], 'S': course['S'], 'C': course['C'],
+                'students': str(course.get('total_students', '')),
+                'schedule': str(course['Schedule']) if pd.notna(course['Schedule']) else 'Yes'
+            })
+
+        section_timetables = timetables[(department, semester)]
+        for section, timetable in enumerate(section_timetables):
+            title = f"{department}_{semester}" if len(section_timetables) == 1 else f"{department}_{semester}_{chr(65+section)}"
+            meta['sections'].append({'department': str(department), 'semester': semester,
+                                     'section': section, 'title': title, 'students': section_size})
+
+            for day, start, duration, cell in grid_sessions(timetable):
+                # A shared basket block is recorded as one lecture per elective
+                for member in cell.get('basket', ()):
+                    course = course_rows.get(member['code'])
+                    students = get_course_students(course, batch_info) if course is not None else section_size
+                    sessions.append(Session(department, semester, section, member['code'], member['name'],
+                                            member['faculty'], 'LEC', day, start, duration,
+                                            split_rooms(member['room']), students))
+                if 'basket' in cell:
+                    continue
+                course = course_rows.get(cell['code'])
+                students = str(course.get('total_students', '')) if course is not None else ''
+                students = int(students) if students.isdigit() else section_size
+                if course is None:
+                    room_type = 'LECTURE_ROOM'
+                elif cell['type'] == 'LAB':
+                    room_type = get_required_room_type(course)
+                else:
+                    room_type = get_session_room_type(course, batch_info, cell['type'])
+                sessions.append(Session(department, semester, section, cell['code'], cell['name'],
+                                        cell['faculty'], cell['type'], day, start, duration,
+                                        split_rooms(cell['classroom']), students, room_type))
+
+    return Solution(sessions, meta)
+
+def generate_all_timetables(prior_solution=None, improve_seconds=0, time_limit=None):
+    """Generate a single timetable for all departments and semesters with basket course support
+
+    prior_solution can be a solution JSON, a timetable workbook or a Solution
+    to warm-start from. improve_seconds > 0 runs the ruin-and-recreate
+    search on what is left unscheduled before the workbook is written.
+    With a time_limit in seconds, that search keeps improving the first
+    solution until the deadline, leaving OUTPUT_TIME_SHARE of the limit
+    for writing the workbooks.
+
+    Returns the Solution. The audit and faculty workbooks are built from it,
+    not from the saved copy, which may be a previous run's if saving failed.
+    """
+    global TIME_SLOTS
+    deadline = datetime.now() + timedelta(seconds=time_limit) if time_limit else None
+    initialize_time_slots()  # Initialize time slots before using
     
-    # Apply formatting to the overview table headers
-    for cell in overview_sheet[4]:
-        cell.fill = PatternFill(start_color="FFD700", end_color="FFD700", fill_type="solid")
-        cell.font = Font(bold=True)
-        cell.border = Border(left=Side(style='thin'), right=Side(style='thin'),
-                           top=Side(style='thin'), bottom=Side(style='thin'))
+    # Load configuration and required data
+    rooms = load_rooms()
+    batch_info = load_batch_data()
     
-    # Apply borders to the overview data
-    for row in overview_sheet.iter_rows(min_row=5, max_row=row_index-1):
-        for cell in row:
-            cell.border = Border(left=Side(style='thin'), right=Side(style='thin'),
-                               top=Side(style='thin'), bottom=Side(style='thin'))
-
-    # Save the workbook
-    wb.save("timetable_all_departments.xlsx")
-    print("Combined timetable for all departments and semesters saved as timetable_all_departments.xlsx")
+    # Get all unique semester numbers for lunch breaks
+    all_semesters = sorted(set(int(str(sem)[0]) for sem in df['Semester'].unique()))
     
-    return ["timetable_all_departments.xlsx"]
+    # Calculate lunch breaks dynamically
+    calculate_lunch_breaks(all_semesters)
 
-def check_unscheduled_courses():
-    """Check and print courses that are not scheduled according to their L-T-P-S requirements"""
-    try:
-        df = pd.read_csv('combined.csv')
-        
-        # Check if timetable file exists first
-        if not os.path.exists('timetable_all_departments.xlsx'):
-            print("Warning: timetable_all_departments.xlsx not found. Run generate_all_timetables() first.")
-            return
+    if FEASIBILITY_CHECK:
+        run_feasibility_check(rooms)
 
-        # Load the generated timetable
-        wb = pd.ExcelFile('timetable_all_departments.xlsx')
-        
-        # Dictionary to track scheduled hours for each course
-        scheduled_hours = defaultdict(lambda: {'L': 0, 'T': 0, 'P': 0, 'S': 0})
-        
-        # Process each sheet in the timetable workbook to extract all scheduled courses
-        found_courses = []
-        
-        print("\nExamining timetable for scheduled courses...")
-        
-        for sheet_name in wb.sheet_names:
-            timetable_df = pd.read_excel(wb, sheet_name=sheet_name)
-            
-            # Skip if this is not a valid timetable sheet (should have at least 'Day' column)
-            if 'Day' not in timetable_df.columns:
+    # Rank courses so the most contended sessions are placed first
+    durations = {'LEC': LECTURE_DURATION, 'TUT': TUTORIAL_DURATION, 'LAB': LAB_DURATION}
+    course_rank = build_course_ranks(df, rooms, batch_info, durations) if USE_CONFLICT_GRAPH_ORDERING else {}
+
+    # Collect department-semester workloads in generation order
+    semester_courses = {}
+    for department in df['Department'].unique():
+        for semester in df[df['Department'] == department]['Semester'].unique():
+            courses = get_semester_courses(department, semester, course_rank)
+            if courses.empty:
                 continue
-            
-            print(f"Processing sheet: {sheet_name}")
-            
-            # Process each row (day) in the timetable
-            for _, row in timetable_df.iterrows():
-                day = row['Day']
-                if day not in DAYS:  # Skip header or legend rows
-                    continue
-                
-                # Process each time slot in the day
-                for col in timetable_df.columns[1:]:  # Skip the 'Day' column
-                    cell_value = row[col]
-                    
-                    # Skip empty cells or break cells
-                    if pd.isna(cell_value) or cell_value == '' or cell_value == 'BREAK':
-                        continue
-                    
-                    # Process cell content to extract course information
-                    # Format example: "CS101 LEC room no. :A101"
-                    if isinstance(cell_value, str) and 'room no.' in cell_value:
-                        # Split the cell value to extract components
-                        parts = cell_value.split('room no.')
-                        course_info = parts[0].strip()
-                        
-                        # Extract course code and class type
-                        if ' ' in course_info:
-                            course_parts = course_info.split()
-                            if len(course_parts) >= 2:
-                                course_code = course_parts[0].strip()
-                                class_type = course_parts[1].strip()
-                                
-                                # Debug output for problematic courses
-                                if 'HS204' in course_code or 'HS153' in course_code:
-                                    print(f"Found in timetable: {course_code}, Type: {class_type}, Day: {day}, Slot: {col}")
-                                
-                                found_courses.append(course_code)  # Track all courses found in timetable
-                                
-                                # Update scheduled hours based on class type
-                                if class_type == 'LEC':
-                                    scheduled_hours[course_code]['L'] += 1.5  # Lecture is 1.5 hours
-                                    print(f"Added 1.5 lecture hours for {course_code}")
-                                elif class_type == 'TUT':
-                                    scheduled_hours[course_code]['T'] += 1    # Tutorial is 1 hour
-                                    print(f"Added 1 tutorial hour for {course_code}")
-                                elif class_type == 'LAB':
-                                    scheduled_hours[course_code]['P'] += 2    # Lab is 2 hours
-                                    print(f"Added 2 practical hours for {course_code}")
-        
-        # Create mappings for course codes with aliases or variations
-        all_found_courses = set(found_courses)
-        course_primary_codes = {}  # Maps each course code variant to its primary code
-        
-        # Build a mapping of all course code variations
-        for _, course in df.iterrows():
-            original_code = str(course['Course Code']).strip()
-            
-            # For courses with slashes (e.g., "HS204 / HS153")
-            if '/' in original_code:
-                variants = [c.strip() for c in original_code.split('/')]
-                primary = variants[0]
-                
-                # Map all variants to the primary code
-                for variant in variants:
-                    course_primary_codes[variant] = primary
-                
-                # Also map the complete original code
-                course_primary_codes[original_code] = primary
-                
-                # Debug output for specific courses
-                if 'HS204' in original_code or 'HS153' in original_code:
-                    print(f"Mapping variants for {original_code}: {variants}")
-            
-            # For courses with parentheses (e.g., "B1(ASD151/HS151/New/New/New/New)")
-            elif '(' in original_code and ')' in original_code:
-                base = original_code.split('(')[0].strip()
-                inner_part = original_code.split('(')[1].split(')')[0]
-                
-                if '/' in inner_part:
-                    inner_variants = [c.strip() for c in inner_part.split('/')]
-                    for variant in inner_variants:
-                        if variant.lower() != 'new':
-                            # Create combined codes like "B1_ASD151"
-                            combined = f"{base}_{variant}"
-                            course_primary_codes[combined] = original_code
-                            course_primary_codes[variant] = original_code
-                
-                # Map the original code to itself
-                course_primary_codes[original_code] = original_code
-            
-            # Regular codes just map to themselves
-            else:
-                course_primary_codes[original_code] = original_code
-        
-        # Print courses found in timetable for debugging
-        print("\nUnique courses found in timetable:", len(all_found_courses))
-        print("First 10 courses found:", list(all_found_courses)[:10])
-        
-        # Merge scheduled hours for course variants
-        merged_hours = defaultdict(lambda: {'L': 0, 'T': 0, 'P': 0, 'S': 0})
-        
-        for code, hours in scheduled_hours.items():
-            # Find the primary code (or use the code itself if not a variant)
-            primary_code = course_primary_codes.get(code, code)
-            
-            # Debug output for problematic courses
-            if 'HS204' in code or 'HS153' in code or 'HS204' in primary_code or 'HS153' in primary_code:
-                print(f"Merging hours for {code} -> {primary_code}: {hours}")
-            
-            # Accumulate hours by primary code
-            merged_hours[primary_code]['L'] += hours['L']
-            merged_hours[primary_code]['T'] += hours['T']
-            merged_hours[primary_code]['P'] += hours['P']
-            merged_hours[primary_code]['S'] += hours['S']
-        
-        # Compare with required hours to find unscheduled courses
-        unscheduled_courses = []
-        
-        for _, course in df.iterrows():
-            original_code = str(course['Course Code']).strip()
-            name = str(course['Course Name'])
-            faculty = str(course['Faculty'])
-            department = str(course['Department'])
-            semester = str(course['Semester'])
-            
-            # Get the primary code for looking up scheduled hours
-            primary_code = course_primary_codes.get(original_code, original_code)
-            
-            # Extract LTPS requirements
-            required_l = int(course['L']) if pd.notna(course['L']) else 0
-            required_t = int(course['T']) if pd.notna(course['T']) else 0
-            required_p = int(course['P']) if pd.notna(course['P']) else 0
-            required_s = int(course['S']) if pd.notna(course['S']) and 'S' in course else 0
-            
-            # Get scheduled hours for this course using the primary code
-            scheduled_l = merged_hours[primary_code]['L']
-            scheduled_t = merged_hours[primary_code]['T']
-            scheduled_p = merged_hours[primary_code]['P']
-            scheduled_s = merged_hours[primary_code]['S']
-            
-            # Debug output for specific courses
-            if 'HS204' in original_code or 'HS153' in original_code:
-                print(f"\nCourse: {original_code} (Primary: {primary_code})")
-                print(f"  Required L-T-P-S: {required_l}-{required_t}-{required_p}-{required_s}")
-                print(f"  Merged Scheduled L-T-P-S: {scheduled_l}-{scheduled_t}-{scheduled_p}-{scheduled_s}")
-            
-            # Use a tolerance for floating-point comparisons
-            tolerance = 0.01
-            
-            # Check if any component is under-scheduled
-            missing_l = max(0, required_l - scheduled_l)
-            missing_t = max(0, required_t - scheduled_t)
-            missing_p = max(0, required_p - scheduled_p)
-            missing_s = max(0, required_s - scheduled_s)
-            
-            if (missing_l > tolerance or missing_t > tolerance or 
-                missing_p > tolerance or missing_s > tolerance):
-                
-                # Determine possible reasons for unscheduled components
-                reasons = []
-                
-                # Check if any variant of this course was found in the timetable
-                variants_found = False
-                found_variants = []
-                
-                # Check all variants
-                if primary_code in course_primary_codes.values():
-                    for code, primary in course_primary_codes.items():
-                        if primary == primary_code and code in all_found_courses:
-                            variants_found = True
-                            found_variants.append(code)
-                else:
-                    # Check the primary code itself
-                    if primary_code in all_found_courses:
-                        variants_found = True
-                        found_variants.append(primary_code)
-                
-                if variants_found:
-                    reasons.append(f"Course found in timetable as {', '.join(found_variants)} but not all required hours are scheduled")
-                else:
-                    reasons.append("Course not found in any timetable")
-                
-                # Check for faculty conflicts
-                faculty_courses = df[df['Faculty'] == faculty]['Course Code'].tolist()
-                if len(faculty_courses) > 1:
-                    reasons.append("Faculty teaching multiple courses may have scheduling constraints")
-                
-                # Check for room availability
-                section_key = (department, semester)
-                if len(lecture_rooms) < 1 and required_l > 0:
-                    reasons.append("Insufficient lecture rooms available")
-                if len(computer_lab_rooms) < 1 and required_p > 0:
-                    reasons.append("Insufficient lab rooms available")
-                
-                # Check for semester course load
-                semester_courses = df[(df['Department'] == department) & (df['Semester'] == semester)].shape[0]
-                if semester_courses > 6:
-                    reasons.append("High number of courses in same semester may cause conflicts")
-                
-                # Add course to unscheduled list
-                unscheduled_courses.append({
-                    'Code': original_code,
-                    'Name': name,
-                    'Faculty': faculty,
-                    'Department': department,
-                    'Semester': semester,
-                    'Required L-T-P-S': f"{required_l}-{required_t}-{required_p}-{required_s}",
-                    'Scheduled L-T-P-S': f"{scheduled_l}-{scheduled_t}-{scheduled_p}-{scheduled_s}",
-                    'Missing L': round(missing_l, 2),
-                    'Missing T': round(missing_t, 2),
-                    'Missing P': round(missing_p, 2),
-                    'Missing S': round(missing_s, 2),
-                    'Variant Found': variants_found,
-                    'Found As': ', '.join(found_variants) if found_variants else "Not found",
-                    'Reasons': "; ".join(reasons)
-                })
-        
-        # Print results
-        if unscheduled_courses:
-            print("\n=== COURSES WITH UNSCHEDULED HOURS ===")
-            print(f"Found {len(unscheduled_courses)} courses with scheduling issues:\n")
-            
-            for course in unscheduled_courses:
-                print(f"Course: {course['Code']} - {course['Name']}")
-                print(f"  Department: {course['Department']}, Semester: {course['Semester']}")
-                print(f"  Faculty: {course['Faculty']}")
-                print(f"  Required L-T-P-S: {course['Required L-T-P-S']}")
-                print(f"  Scheduled L-T-P-S: {course['Scheduled L-T-P-S']}")
-                
-                missing = []
-                if course['Missing L'] > 0:
-                    missing.append(f"{course['Missing L']} lecture hours")
-                if course['Missing T'] > 0:
-                    missing.append(f"{course['Missing T']} tutorial hours")
-                if course['Missing P'] > 0:
-                    missing.append(f"{course['Missing P']} practical hours")
-                if course['Missing S'] > 0:
-                    missing.append(f"{course['Missing S']} self-study hours")
-                    
-                print(f"  Missing: {', '.join(missing)}")
-                print(f"  Found in Timetable: {'Yes' if course['Variant Found'] else 'No'}")
-                if course['Variant Found']:
-                    print(f"  Found as: {course['Found As']}")
-                print(f"  Possible Reasons: {course['Reasons']}\n")
-            
-            # Create Excel file with unscheduled courses
-            unscheduled_df = pd.DataFrame(unscheduled_courses)
-            unscheduled_df.to_excel('unscheduled_courses.xlsx', index=False)
-            print("Details saved to 'unscheduled_courses.xlsx'")
-        else:
-            print("\n=== ALL COURSES FULLY SCHEDULED ===")
-            print("All courses have been scheduled according to their L-T-P-S requirements.")
-            
+            semester_courses[(department, semester)] = courses
+
+    # Workloads that share no faculty, room pool or basket group are solved independently
+    by_campus = rooms_have_campus(rooms)
+    components = find_components(
+        (key, get_unit_resources(key[0], courses, by_campus)) for key, courses in semester_courses.items()
+    )
+    # Sessions from a previous run that are still valid are placed first
+    prior = prior_sessions_by_section(load_prior_solution(prior_solution))
+    if prior:
+        print(f"Warm-starting from {sum(len(sessions) for sessions in prior.values())} prior sessions")
+
+    # Spread sections of multi-instructor courses over their instructors before placing anything
+    faculty_assignment = plan_faculty_assignment(semester_courses, batch_info) if BALANCE_FACULTY_LOAD else None
+
+    timetables, professor_schedule, unscheduled_components = solve_all_components(
+        components, semester_courses, rooms, batch_info, all_semesters, prior, faculty_assignment)
+
+    # Explain failures from the final calendars, utilisation is computed once for all of them
+    DiagnosticsEngine(professor_schedule, rooms, len(DAYS), len(TIME_SLOTS)).annotate(unscheduled_components)
+
+    # Anytime mode: local search gets whatever is left of the time limit
+    scoring = None
+    if deadline is not None:
+        improve_seconds = ((deadline - datetime.now()).total_seconds()
+                           - time_limit * OUTPUT_TIME_SHARE)
+        print(f"First solution ready, improving for {max(0.0, improve_seconds):.1f} s until the time limit")
+
+    # Optional post-pass: retry unscheduled sessions by ruining and recreating neighbourhoods
+    if improve_seconds > 0 and (unscheduled_components or deadline is not None):
+        solution = build_solution(timetables, semester_courses, rooms, batch_info,
+                                  all_semesters, unscheduled_components)
+        if deadline is not None:
+            # Nothing left to place still leaves gaps and room waste to improve
+            scoring = ScoreEngine(len(TIME_SLOTS), breaks=solution.meta['breaks'])
+        result = improve_solution(solution, improve_seconds, scoring=scoring)
+        print(f"Large-neighbourhood search: {result.summary()}")
+        apply_to_grids(result, {(department, semester, section): timetable
+                                for (department, semester), section_timetables in timetables.items()
+                                for section, timetable in enumerate(section_timetables)})
+        # Components keep as many sessions as the search left unplaced
+        remaining = {}
+        for e in result.solution.meta['unscheduled']:
+            key = (e['department'], str(e['semester']), e['section'], e['code'], e['component_type'])
+            remaining[key] = remaining.get(key, 0) + e.get('sessions', 1)
+        still_unscheduled = []
+        for c in unscheduled_components:
+            key = (str(c.department), str(c.semester), c.section, c.code, c.component_type)
+            left = min(c.sessions, remaining.get(key, 0))
+            if left:
+                remaining[key] -= left
+                c.sessions = left
+                still_unscheduled.append(c)
+        unscheduled_components = still_unscheduled
+        # Load and room use in the reasons refer to the calendars the search left behind
+        DiagnosticsEngine.from_solution(result.solution).annotate(unscheduled_components)
+
+    solution = build_solution(timetables, semester_courses, rooms, batch_info,
+                              all_semesters, unscheduled_components)
+    # Keep a machine-readable copy of the solution for incremental re-solves and re-rendering
+    try:
+        solution.save(SOLUTION_FILE)
+        print(f"Solution saved as {SOLUTION_FILE}")
+    except Exception as e:
+        print(f"Warning: Could not save solution file: {e}")
+
+    render_workbook(solution, "timetable_all_departments.xlsx", incremental=INCREMENTAL_OUTPUT,
+                    backend=EXCEL_BACKEND)
+    print("Combined timetable for all departments and semesters saved as timetable_all_departments.xlsx")
+    return solution
+
+def check_unscheduled_courses(solution):
+    """Report courses whose placed sessions fall short of their L-T-P-S requirements
+
+    Audits the solution and writes unscheduled_courses.xlsx plus a JSON summary.
+    """
+    try:
+        report = audit_coverage(solution)
+        report.save(AUDIT_FILE, COVERAGE_SUMMARY_FILE)
+        print(f"\n{report.summary()}")
+        for line in report.lines():
+            print(f"  {line}")
+        print(f"Details saved to '{AUDIT_FILE}' and '{COVERAGE_SUMMARY_FILE}'")
     except Exception as e:
         print(f"Error checking unscheduled courses: {e}")
-        import traceback
         traceback.print_exc()
 
-def generate_faculty_timetables():
-    """Generate timetables for all faculty members in a single Excel file"""
+def generate_faculty_timetables(solution):
+    """Generate timetables for all faculty members in a single Excel file
+
+    Built from the solution's faculty index, never by reading the section
+    workbook back.
+    """
     try:
-        # Load the generated timetable
-        wb = pd.ExcelFile('timetable_all_departments.xlsx')
-        
-        # Dictionary to track faculty schedules
-        faculty_schedules = {}
-        
-        print("Processing timetable sheets to extract faculty schedules...")
-        
-        # Load courses data for reference
-        try:
-            courses_data = pd.read_csv('combined.csv')
-        except Exception as e:
-            print(f"Warning: Could not load combined.csv for reference: {e}")
-            courses_data = None
-        
-        # Process each sheet in the timetable workbook
-        for sheet_name in wb.sheet_names:
-            timetable_df = pd.read_excel(wb, sheet_name=sheet_name)
-            
-            # Skip if this is not a valid timetable sheet (should have at least 'Day' column)
-            if 'Day' not in timetable_df.columns:
-                continue
-                
-            print(f"Processing sheet: {sheet_name}")
-            
-            # Extract department and semester from sheet name
-            dept_sem = sheet_name
-                
-            # Process each row (day) in the timetable
-            for _, row in timetable_df.iterrows():
-                day = row['Day']
-                if day not in DAYS:  # Skip header or legend rows
-                    continue
-                    
-                # Process each time slot in the day
-                for col in timetable_df.columns[1:]:  # Skip the 'Day' column
-                    cell_value = row[col]
-                    
-                    # Skip empty cells or break cells
-                    if pd.isna(cell_value) or cell_value == '' or cell_value == 'BREAK':
-                        continue
-                    
-                    # Debug print for cell content inspection
-                    # print(f"Cell content: {cell_value}")
-                    
-                    # First pattern: "COURSE_CODE CLASS_TYPE\nroom no. :ROOM\nFACULTY_NAME"
-                    if isinstance(cell_value, str) and "room no." in cell_value:
-                        try:
-                            lines = cell_value.strip().split('\n')
-                            
-                            # First line contains course code and class type
-                            first_line_parts = lines[0].split()
-                            if len(first_line_parts) >= 2:
-                                course_code = first_line_parts[0]
-                                class_type = first_line_parts[1]
-                                
-                                # Room information is in the second line
-                                room_info = lines[1].replace('room no. :', '').strip() if len(lines) > 1 else "Unknown"
-                                
-                                # Faculty is in the third line
-                                faculty_name = lines[2].strip() if len(lines) > 2 else ""
-                                
-                                # If faculty name is empty or too short, try to get it from courses_data
-                                if not faculty_name or len(faculty_name) < 2:
-                                    if courses_data is not None:
-                                        course_row = courses_data[courses_data['Course Code'] == course_code]
-                                        if not course_row.empty:
-                                            faculty_name = str(course_row['Faculty'].iloc[0])
-                                
-                                # Get course name from courses_data
-                                course_name = ""
-                                if courses_data is not None:
-                                    course_row = courses_data[courses_data['Course Code'] == course_code]
-                                    if not course_row.empty:
-                                        course_name = str(course_row['Course Name'].iloc[0])
-                                
-                                # Process each faculty
-                                if faculty_name:
-                                    faculty_list = extract_faculty_names(faculty_name)
-                                    
-                                    for faculty in faculty_list:
-                                        if faculty.strip():  # Only process non-empty faculty names
-                                            # Initialize faculty entry if not already exists
-                                            if faculty not in faculty_schedules:
-                                                faculty_schedules[faculty] = {d: {} for d in DAYS}
-                                            
-                                            # Add this class to faculty schedule
-                                            time_slot_str = col
-                                            faculty_schedules[faculty][day][time_slot_str] = {
-                                                'Course Code': course_code,
-                                                'Course Name': course_name,
-                                                'Class Type': class_type,
-                                                'Room': room_info,
-                                                'Department-Semester': dept_sem
-                                            }
-                        except Exception as e:
-                            print(f"Error processing cell: {cell_value}")
-                            print(f"Error details: {e}")
-                            traceback.print_exc()
-                    
-                    # Second pattern: Handle basket course format
-                    elif isinstance(cell_value, str) and "Courses" in cell_value:
-                        try:
-                            lines = cell_value.strip().split('\n')
-                            
-                            # Skip the header line
-                            basket_courses = []
-                            basket_details = []
-                            
-                            # Process each line to extract course details
-                            for line in lines[1:]:
-                                if ':' in line:  # This is a detail line with faculty and room
-                                    parts = line.split(':')
-                                    if len(parts) >= 2:
-                                        code = parts[0].strip()
-                                        details = parts[1].strip()
-                                        
-                                        # Extract faculty and room
-                                        if '(' in details and ')' in details:
-                                            faculty_part = details.split('(')[0].strip()
-                                            room_part = details.split('(')[1].split(')')[0].strip()
-                                            
-                                            basket_details.append({
-                                                'code': code,
-                                                'faculty': faculty_part,
-                                                'room': room_part
-                                            })
-                                elif ',' in line and not any(x in line for x in ['Courses', 'room no.']):
-                                    # This might be the course codes line
-                                    basket_courses = [code.strip() for code in line.split(',')]
-                            
-                            # Process each basket course
-                            for detail in basket_details:
-                                code = detail['code']
-                                faculty_name = detail['faculty']
-                                room_info = detail['room']
-                                
-                                # Get course name from courses_data
-                                course_name = ""
-                                if courses_data is not None:
-                                    course_row = courses_data[courses_data['Course Code'] == code]
-                                    if not course_row.empty:
-                                        course_name = str(course_row['Course Name'].iloc[0])
-                                
-                                # Determine class type from the original cell
-                                class_type = "LEC"  # Default
-                                if "LAB" in cell_value:
-                                    class_type = "LAB"
-                                elif "TUT" in cell_value:
-                                    class_type = "TUT"
-                                
-                                # Process faculty names
-                                faculty_list = extract_faculty_names(faculty_name)
-                                
-                                for faculty in faculty_list:
-                                    if faculty.strip():  # Only process non-empty faculty names
-                                        # Initialize faculty entry if not already exists
-                                        if faculty not in faculty_schedules:
-                                            faculty_schedules[faculty] = {d: {} for d in DAYS}
-                                        
-                                        # Add this class to faculty schedule
-                                        time_slot_str = col
-                                        faculty_schedules[faculty][day][time_slot_str] = {
-                                            'Course Code': code,
-                                            'Course Name': course_name,
-                                            'Class Type': class_type,
-                                            'Room': room_info,
-                                            'Department-Semester': dept_sem
-                                        }
-                        except Exception as e:
-                            print(f"Error processing basket cell: {cell_value}")
-                            print(f"Error details: {e}")
-        
-        # Create a single Excel workbook for all faculty timetables
-        print(f"Creating a consolidated Excel file with {len(faculty_schedules)} faculty timetables...")
-        faculty_wb = Workbook()
-        
-        # Remove the default sheet
-        if "Sheet" in faculty_wb.sheetnames:
-            faculty_wb.remove(faculty_wb["Sheet"])
-        
-        # Create an overview/index sheet
-        overview = faculty_wb.create_sheet("Overview", 0)
-        overview.column_dimensions['A'].width = 40
-        overview.column_dimensions['B'].width = 15
-        
-        # Add title and headers
-        overview.append(["Faculty Timetable - All Faculty"])
-        overview.append(["Generated on:", datetime.now().strftime("%Y-%m-%d %H:%M:%S")])
-        overview.append([])
-        overview.append(["Faculty Name", "Total Classes"])
-        
-        # Apply formatting to headers
-        for row in range(1, 5):
-            for cell in overview[row]:
-                cell.font = Font(bold=True)
-        
-        # Style the header row
-        for cell in overview[4]:
-            cell.fill = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
-            cell.font = Font(bold=True, color="FFFFFF")
-            cell.border = Border(left=Side(style='thin'), right=Side(style='thin'),
-                                top=Side(style='thin'), bottom=Side(style='thin'))
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-        
-        # Add faculty list to overview with hyperlinks to their sheets
-        row_idx = 5
-        for faculty in sorted(faculty_schedules.keys()):
-            total_classes = len(sum([list(slots.keys()) for slots in faculty_schedules[faculty].values()], []))
-            
-            # Add to overview sheet
-            overview.cell(row=row_idx, column=1, value=faculty)
-            overview.cell(row=row_idx, column=2, value=total_classes)
-            
-            # Add hyperlink to the faculty's sheet
-            safe_name = sanitize_sheet_name(faculty)
-            overview.cell(row=row_idx, column=1).hyperlink = f"#{safe_name}!A1"
-            overview.cell(row=row_idx, column=1).style = "Hyperlink"
-            
-            # Add border to cells
-            for col in range(1, 3):
-                overview.cell(row=row_idx, column=col).border = Border(
-                    left=Side(style='thin'), right=Side(style='thin'),
-                    top=Side(style='thin'), bottom=Side(style='thin')
-                )
-            
-            row_idx += 1
-        
-        # Generate worksheets for each faculty
-        for i, faculty in enumerate(sorted(faculty_schedules.keys())):
-            # Create a sanitized sheet name (Excel has a 31 character limit for sheet names)
-            sheet_name = sanitize_sheet_name(faculty)
-            
-            # Create a new worksheet for this faculty
-            ws = faculty_wb.create_sheet(title=sheet_name)
-            
-            # Generate the faculty's timetable in this worksheet
-            create_faculty_worksheet(ws, faculty, faculty_schedules[faculty])
-            
-            if i % 10 == 0:  # Print progress every 10 faculty
-                print(f"Generated {i+1}/{len(faculty_schedules)} faculty worksheets")
-        
-        # Save the workbook
-        faculty_wb.save("all_faculty_timetables.xlsx")
-        print(f"All {len(faculty_schedules)} faculty timetables saved in 'all_faculty_timetables.xlsx'")
-        
+        count = render_faculty_workbook(solution, "all_faculty_timetables.xlsx", incremental=INCREMENTAL_OUTPUT,
+                                        backend=EXCEL_BACKEND)
+        print(f"All {count} faculty timetables saved in 'all_faculty_timetables.xlsx'")
     except Exception as e:
         print(f"Error generating faculty timetables: {e}")
         traceback.print_exc()
 
-def sanitize_sheet_name(name):
-    """Create a valid Excel sheet name from a faculty name"""
-    # Replace invalid sheet name characters
-    invalid_chars = ['/', '\\', '?', '*', ':', '[', ']', "'", '"']
-    sanitized = name
-    for char in invalid_chars:
-        sanitized = sanitized.replace(char, '_')
-    
-    # Excel has 31 character limit for sheet names
-    if len(sanitized) > 31:
-        sanitized = sanitized[:28] + "..."
-    
-    return sanitized
-
-def create_faculty_worksheet(ws, faculty, schedule):
-    """Create a worksheet for a faculty member's timetable"""
-    # Add faculty name as title
-    ws.merge_cells('A1:G1')
-    title_cell = ws['A1']
-    title_cell.value = f"Schedule for: {faculty}"
-    title_cell.font = Font(bold=True, size=14)
-    title_cell.alignment = Alignment(horizontal='center', vertical='center')
-    title_cell.fill = PatternFill(start_color="E0E0E0", end_color="E0E0E0", fill_type="solid")
-    
-    # Create header (starting from row 2)
-    header = ['Day', 'Time Slot', 'Course Code', 'Course Name', 'Class Type', 'Room', 'Department-Semester']
-    ws.append(header)
-    
-    # Apply header formatting
-    header_fill = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF")
-    header_alignment = Alignment(horizontal='center', vertical='center')
-    
-    for cell in ws[2]:
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = header_alignment
-    
-    # Add each scheduled class for this faculty
-    row_idx = 3
-    for day in DAYS:
-        # Sort time slots chronologically
-        time_slots = sorted(schedule[day].keys())
-        
-        if not time_slots:  # No classes on this day
-            ws.append([day, "No classes scheduled", "", "", "", "", ""])
-            row_idx += 1
-            continue
-            
-        for time_slot in time_slots:
-            class_info = schedule[day][time_slot]
-            
-            # Add this class to the worksheet
-            ws.append([
-                day,
-                time_slot,
-                class_info['Course Code'],
-                class_info['Course Name'],
-                class_info['Class Type'],
-                class_info['Room'],
-                class_info['Department-Semester']
-            ])
-            
-            # Apply formatting
-            for cell in ws[row_idx]:
-                cell.alignment = Alignment(horizontal='center', vertical='center')
-                cell.border = Border(left=Side(style='thin'), right=Side(style='thin'),
-                                   top=Side(style='thin'), bottom=Side(style='thin'))
-            
-            # Highlight each class type differently
-            class_type = class_info['Class Type']
-            if class_type == 'LEC':
-                fill_color = "B8CCE4"  # Light blue
-            elif class_type == 'TUT':
-                fill_color = "E4B8CC"  # Pink
-            elif class_type == 'LAB':
-                fill_color = "CCE4B8"  # Light green
-            else:
-                fill_color = "F2F2F2"  # Light gray
-                
-            # Apply fill color
-            for cell in ws[row_idx]:
-                cell.fill = PatternFill(start_color=fill_color, end_color=fill_color, fill_type="solid")
-            
-            row_idx += 1
-    
-    # Set column widths
-    column_widths = {
-        'A': 15,  # Day
-        'B': 20,  # Time Slot
-        'C': 15,  # Course Code
-        'D': 40,  # Course Name
-        'E': 12,  # Class Type
-        'F': 25,  # Room
-        'G': 30,  # Department-Semester
-    }
-    
-    # Apply the predefined widths
-    for col_letter, width in column_widths.items():
-        ws.column_dimensions[col_letter].width = width
-
-# Enhance extract_faculty_names function to handle more patterns
-def extract_faculty_names(faculty_string):
-    """Extract individual faculty names from a combined string"""
-    if not faculty_string or pd.isna(faculty_string):
-        return []
-        
-    faculty_string = str(faculty_string).strip()
-    if faculty_string.lower() in ['nan', 'none', '']:
-        return []
-        
-    faculty_names = []
-    
-    # Split by common separators and handle various formats
-    if '&' in faculty_string:
-        parts = faculty_string.split('&')
-        for part in parts:
-            faculty_names.append(part.strip())
-    elif ' and ' in faculty_string.lower():
-        # Split by "and" but be careful with words that might contain "and"
-        parts = faculty_string.lower().split(' and ')
-        for i, part in enumerate(parts):
-            # Reconstruct the original case
-            start_idx = faculty_string.lower().find(part)
-            if start_idx >= 0:
-                end_idx = start_idx + len(part)
-                faculty_names.append(faculty_string[start_idx:end_idx].strip())
-    elif ',' in faculty_string and faculty_string.count(',') > 1:
-        # Multiple commas likely indicate a list of names
-        parts = faculty_string.split(',')
-        for part in parts:
-            if part.strip():  # Skip empty parts
-                faculty_names.append(part.strip())
-    elif '/' in faculty_string:
-        parts = faculty_string.split('/')
-        for part in parts:
-            faculty_names.append(part.strip())
-    elif ';' in faculty_string:
-        parts = faculty_string.split(';')
-        for part in parts:
-            faculty_names.append(part.strip())
-    else:
-        faculty_names.append(faculty_string)  # Single faculty
-    
-    # Remove any empty strings and normalize
-    return [name.strip() for name in faculty_names if name.strip()]
-
 def generate_individual_faculty_timetable(faculty, schedule):
     """Generate a timetable for a single faculty member"""
-    # Sanitize faculty name for file name
-    filename = sanitize_filename(faculty)
-    file_path = os.path.join('faculty_timetables', f"timetable_{filename}.xlsx")
-    
-    # Create a new workbook
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Schedule"
-    
-    # Add faculty name as title
-    ws.merge_cells('A1:G1')
-    title_cell = ws['A1']
-    title_cell.value = f"Schedule for: {faculty}"
-    title_cell.font = Font(bold=True, size=14)
-    title_cell.alignment = Alignment(horizontal='center', vertical='center')
-    title_cell.fill = PatternFill(start_color="E0E0E0", end_color="E0E0E0", fill_type="solid")
-    
-    # Create header (starting from row 2)
-    header = ['Day', 'Time Slot', 'Course Code', 'Course Name', 'Class Type', 'Room', 'Department-Semester']
-    ws.append(header)
-    
-    # Apply header formatting
-    header_fill = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF")
-    header_alignment = Alignment(horizontal='center', vertical='center')
-    
-    for cell in ws[2]:
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = header_alignment
-    
-    # Add each scheduled class for this faculty
-    row_idx = 3
-    for day in DAYS:
-        # Sort time slots chronologically
-        time_slots = sorted(schedule[day].keys())
-        
-        if not time_slots:  # No classes on this day
-            ws.append([day, "No classes scheduled", "", "", "", "", ""])
-            row_idx += 1
-            continue
-            
-        for time_slot in time_slots:
-            class_info = schedule[day][time_slot]
-            
-            for cell in ws[row_idx]:
-                cell.alignment = Alignment(horizontal='center', vertical='center')
-                cell.border = Border(left=Side(style='thin'), right=Side(style='thin'),
-                                   top=Side(style='thin'), bottom=Side(style='thin'))
-            
-            # Highlight each class type differently
-            class_type = class_info['Class Type']
-            if class_type == 'LEC':
-                fill_color = "B8CCE4"  # Light blue
-            elif class_type == 'TUT':
-                fill_color = "E4B8CC"  # Pink
-            elif class_type == 'LAB':
-                fill_color = "CCE4B8"  # Light green
-            else:
-                fill_color = "F2F2F2"  # Light gray
-                
-            # Apply fill color
-            for cell in ws[row_idx]:
-                cell.fill = PatternFill(start_color=fill_color, end_color=fill_color, fill_type="solid")
-            
-            row_idx += 1
-    
-    # Set column widths
-    column_widths = {
-        'A': 15,  # Day
-        'B': 20,  # Time Slot
-        'C': 15,  # Course Code
-        'D': 40,  # Course Name
-        'E': 12,  # Class Type
-        'F': 25,  # Room
-        'G': 30,  # Department-Semester
-    }
-    
-    # Apply the predefined widths
-    for col_letter, width in column_widths.items():
-        ws.column_dimensions[col_letter].width = width
-    
-    # Save the workbook
-    wb.save(file_path)
-
-def sanitize_filename(name):
-    """Create a valid file name from a faculty name"""
-    # Replace invalid filename characters
-    invalid_chars = ['/', '\\', '?', '*', ':', '[', ']', "'", '"', '<', '>', '|', ' ']
-    sanitized = name
-    for char in invalid_chars:
-        sanitized = sanitized.replace(char, '_')
-    
-    # Remove consecutive underscores
-    while '__' in sanitized:
-        sanitized = sanitized.replace('__', '_')
-    
-    # Limit length to avoid overly long filenames
-    if len(sanitized) > 50:
-        sanitized = sanitized[:50]
-        
-    # Remove trailing underscores
-    sanitized = sanitized.rstrip('_')
-    
-    return sanitized
+    os.makedirs('faculty_timetables', exist_ok=True)
+    return render_faculty_file(faculty, schedule, DAYS, faculty_file_path('faculty_timetables', faculty),
+                               EXCEL_BACKEND)
+
+def generate_individual_faculty_timetables(solution, zip_path=None):
+    """Write one workbook per faculty member into faculty_timetables/, in parallel batches"""
+    try:
+        paths = render_faculty_files(solution, 'faculty_timetables', zip_path, parallel=PARALLEL_FACULTY_FILES,
+                                     backend=EXCEL_BACKEND)
+        print(f"{len(paths)} individual faculty timetables saved in 'faculty_timetables'"
+              + (f", packed into '{zip_path}'" if zip_path else ""))
+        return paths
+    except Exception as e:
+        print(f"Error generating individual faculty timetables: {e}")
+        traceback.print_exc()
 
 # Initialize global variables
 TIME_SLOTS = []
@@ -1788,6 +1138,23 @@ def is_break_time(slot, semester=None):
     
     return morning_break or lunch_break
 
+def run_feasibility_check(rooms=None):
+    """Print the supply/demand pre-check of combined.csv against the rooms, returns the report"""
+    if not TIME_SLOTS:
+        initialize_time_slots()
+        calculate_lunch_breaks(sorted(set(int(str(sem)[0]) for sem in df['Semester'].unique())))
+    if rooms is None:
+        rooms = load_rooms() or {}
+
+    def break_slots(semester):
+        return [slot for slot, time_slot in enumerate(TIME_SLOTS) if is_break_time(time_slot, semester)]
+
+    report = check_feasibility(build_demands(df.to_dict('records')), rooms, len(DAYS), len(TIME_SLOTS), break_slots)
+    print(report.summary())
+    for line in report.lines():
+        print(f"  Infeasible: {line}")
+    return report
+
 def load_rooms():
     """Load room information from CSV file"""
     rooms = {}
@@ -1799,6 +1166,7 @@ def load_rooms():
                     'capacity': int(row['capacity']),
                     'type': row['type'],
                     'roomNumber': row['roomNumber'],
+                    'campus': (row.get('campus') or '').strip(),  # Optional column
                     'schedule': {day: set() for day in range(len(DAYS))}
                 }
     except FileNotFoundError:
@@ -1882,22 +1250,11 @@ def load_batch_data():
 
 def is_basket_course(code):
     """Check if course is part of a basket based on code prefix"""
-    return code.startswith('B') and '-' in code
+    return basket_group(code) is not None
 
 def get_basket_group(code):
     """Get the basket group (B1, B2 etc) from course code"""
-    if is_basket_course(code):
-        return code.split('-')[0]
-    return None
-
-def get_basket_group_slots(timetable, day, basket_group):
-    """Find existing slots with courses from same basket group"""
-    basket_slots = []
-    for slot_idx, slot in timetable[day].items():
-        code = slot.get('code', '')
-        if code and get_basket_group(code) == basket_group:
-            basket_slots.append(slot_idx)
-    return basket_slots
+    return basket_group(code)
 
 def find_adjacent_lab_room(room_id, rooms):
     """Find an adjacent lab room based on room numbering"""
@@ -2145,55 +1502,18 @@ def find_suitable_room(course_type, department, semester, day, start_slot, durat
     return try_room_allocation(rooms, course_type, required_capacity,
                              day, start_slot, duration, used_room_ids)
 
+def section_day(timetable, day):
+    """The section's busy slots on a day as (kind, code, faculty) for the shared placement rules"""
+    return {slot: [(entry['type'], entry.get('code', ''), entry.get('faculty', ''))]
+            for slot, entry in timetable[day].items() if entry['type']}
+
 def check_faculty_daily_components(professor_schedule, faculty, day, department, semester, section, timetable, course_code=None, activity_type=None):
     """Check faculty/course scheduling constraints for the day"""
-    component_count = 0
-    faculty_courses = set()  # Track faculty's courses 
-    
-    # Check all slots for this day
-    for slot in timetable[day].values():
-        if slot['faculty'] == faculty and slot['type'] in ['LEC', 'LAB', 'TUT']:
-            slot_code = slot.get('code', '')
-            if slot_code:
-                # For non-basket courses
-                if not is_basket_course(slot_code):
-                    component_count += 1
-                # For basket courses, only count if not already counted
-                elif slot_code not in faculty_courses:
-                    component_count += 1
-                    faculty_courses.add(slot_code)
-                    
-    # Special handling for basket courses - allow parallel scheduling
-    if course_code and is_basket_course(course_code):
-        basket_group = get_basket_group(course_code)
-        existing_slots = get_basket_group_slots(timetable, day, basket_group)
-        if existing_slots:
-            # For basket courses, check only non-basket components
-            return component_count < 3  # Allow more flexibility for basket courses
-    
-    return component_count < 2  # Keep max 2 components per day limit for regular courses
+    return daily_limit_ok(section_day(timetable, day), faculty, course_code)
 
 def check_faculty_course_gap(professor_schedule, timetable, faculty, course_code, day, start_slot):
     """Check if there is sufficient gap (3 hours) between sessions of same course"""
-    min_gap_hours = 3
-    slots_per_hour = 2  # Assuming 30-min slots
-    required_gap = min_gap_hours * slots_per_hour
-    
-    # Check previous slots
-    for i in range(max(0, start_slot - required_gap), start_slot):
-        if i in professor_schedule[faculty][day]:
-            slot_data = timetable[day][i]
-            if slot_data['code'] == course_code and slot_data['type'] in ['LEC', 'TUT']:
-                return False
-                
-    # Check next slots  
-    for i in range(start_slot + 1, min(len(TIME_SLOTS), start_slot + required_gap)):
-        if i in professor_schedule[faculty][day]:
-            slot_data = timetable[day][i]
-            if slot_data['code'] == course_code and slot_data['type'] in ['LEC', 'TUT']:
-                return False
-    
-    return True
+    return course_gap_ok(section_day(timetable, day), faculty, course_code, start_slot)
 
 def is_preferred_slot(faculty, day, time_slot, faculty_preferences):
     """Check if a time slot is within faculty's preferences"""
@@ -2216,14 +1536,15 @@ def is_preferred_slot(faculty, day, time_slot, faculty_preferences):
         
     return True  # No time preferences specified
 
-def is_lecture_scheduled(timetable, day, start_slot, end_slot):
-    """Check if there's a lecture scheduled in the given time range"""
-    for slot in range(start_slot, end_slot):
-        if (slot < len(timetable[day]) and 
-            timetable[day][slot]['type'] and 
-            timetable[day][slot]['type'] in ['LEC', 'LAB', 'TUT']):
-            return True
-    return False
+def slot_rejection(professor_schedule, timetable, faculty, day, slot, semester):
+    """Why a single slot cannot be used, or None if it is free"""
+    if slot in professor_schedule[faculty][day]:
+        return 'faculty_busy'
+    if timetable[day][slot]['type'] is not None:
+        return 'section_busy'
+    if is_break_time(TIME_SLOTS[slot], semester):
+        return 'break'
+    return None
 
 def get_best_slots(timetable, professor_schedule, faculty, day, duration, semester, department):
     """Find best available consecutive slots in a day"""
@@ -2338,7 +1659,7 @@ def select_faculty(faculty_str):
     return faculty_str
 
 class UnscheduledComponent:
-    def __init__(self, department, semester, code, name, faculty, component_type, sessions, section='', reason=''):
+    def __init__(self, department, semester, code, name, faculty, component_type, sessions, section='', reason='', failure=None):
         self.department = department
         self.semester = semester
         self.code = code
@@ -2348,6 +1669,7 @@ class UnscheduledComponent:
         self.sessions = sessions
         self.section = section
         self.reason = reason
+        self.failure = failure  # FailureRecord, turned into a reason by DiagnosticsEngine
         
     def __eq__(self, other):
         if not isinstance(other, UnscheduledComponent):
@@ -2361,74 +1683,28 @@ class UnscheduledComponent:
     def __hash__(self):
         return hash((self.department, self.semester, self.code, self.component_type, self.section))
 
-def unscheduled_reason(course, department, semester, professor_schedule, rooms, component_type, check_attempts):
-    """Generate detailed reason why a course component couldn't be scheduled"""
-    faculty = course['Faculty']
-    code = str(course['Course Code'])
-    
-    # Check faculty availability
-    faculty_slots_used = 0
-    for day in range(len(DAYS)):
-        if faculty in professor_schedule and day in professor_schedule[faculty]:
-            faculty_slots_used += len(professor_schedule[faculty][day])
-    
-    # If faculty is heavily scheduled
-    if faculty_slots_used > 20:  # Threshold: 10 hours of teaching per week
-        return f"Faculty '{faculty}' already has {faculty_slots_used/2:.1f} hours of teaching scheduled"
-    
-    # Check room availability issues
-    if component_type == 'LAB':
-        lab_rooms_available = False
-        for _, room in rooms.items():
-            if 'LAB' in room['type'].upper() or 'COMPUTER' in room['type'].upper():
-                lab_rooms_available = True
-                break
-        
-        if not lab_rooms_available:
-            return "No suitable lab rooms available in the system"
-        
-        # Check if room is overbooked
-        lab_rooms_free_slots = 0
-        for rid, room in rooms.items():
-            if 'LAB' in room['type'].upper() or 'COMPUTER' in room['type'].upper():
-                total_slots = len(DAYS) * (len(TIME_SLOTS) - LAB_DURATION)
-                used_slots = sum(len(room['schedule'].get(day, [])) for day in range(len(DAYS)))
-                lab_rooms_free_slots += (total_slots - used_slots)
-        
-        if lab_rooms_free_slots < 5:  # Very few lab slots left
-            return f"Lab rooms almost fully booked ({lab_rooms_free_slots} slots left)"
-    
-    # Check for large classes with insufficient large rooms
-    if 'total_students' in course and pd.notna(course['total_students']):
-        try:
-            total_students = int(course['total_students'])
-            if total_students > 100:
-                large_rooms_available = False
-                for _, room in rooms.items():
-                    if room['type'].upper() == 'SEATER_120' or room['type'].upper() == 'SEATER_240':
-                        large_rooms_available = True
-                        break
-                
-                if not large_rooms_available:
-                    return f"No rooms available with capacity for {total_students} students"
-        except (ValueError, TypeError):
-            pass
-    
-    # Check timeslot conflicts with other courses in same department/semester
-    if check_attempts > 800:  # If we made many attempts but still couldn't find a slot
-        return f"No suitable timeslot found after {check_attempts} attempts - heavy scheduling conflicts"
-        
-    # Default reason
-    duration_map = {
-        'LEC': f"{LECTURE_DURATION/2} hour",
-        'LAB': f"{LAB_DURATION/2} hour",
-        'TUT': f"{TUTORIAL_DURATION/2} hour"
-    }
-    duration_str = duration_map.get(component_type, "")
-    
-    return f"Could not find compatible {duration_str} timeslot for {code} {component_type} with faculty {faculty}"
-
 if __name__ == "__main__":
-    generate_all_timetables()
-    check_unscheduled_courses()
-    generate_faculty_timetables()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="Generate timetables for all departments")
+    parser.add_argument('--warm-start', metavar='PATH',
+                        help="prior solution JSON or timetable workbook to start from")
+    parser.add_argument('--improve', type=float, default=0, metavar='SECONDS',
+                        help="time budget for the ruin-and-recreate post-pass on unscheduled sessions")
+    parser.add_argument('--time-limit', type=float, metavar='SECONDS',
+                        help="wall-clock limit: keep improving the first solution until it runs out")
+    parser.add_argument('--check-only', action='store_true',
+                        help="only run the supply/demand pre-check, exit 1 if the inputs cannot fit")
+    parser.add_argument('--faculty-files', action='store_true',
+                        help="also write one workbook per faculty member into faculty_timetables/")
+    parser.add_argument('--faculty-zip', metavar='PATH',
+                        help="with --faculty-files, also pack them into this zip archive")
+    args = parser.parse_args()
+
+    if args.check_only:
+        sys.exit(0 if run_feasibility_check().ok else 1)
+
+    solution = generate_all_timetables(args.warm_start, args.improve, args.time_limit)
+    check_unscheduled_courses(solution)
+    generate_faculty_timetables(solution)
+    if INDIVIDUAL_FACULTY_FILES or args.faculty_files:
+        generate_individual_faculty_timetables(solution, zip_path=args.faculty_zip)
\ No newline at end of file
@@ -1,13 +1,23 @@
 import pandas as pd
 import random
 from datetime import datetime, time, timedelta
-from openpyxl import Workbook, load_workbook
-from openpyxl.styles import PatternFill, Border, Side, Alignment, Font
+from openpyxl import load_workbook
 from openpyxl.utils import get_column_letter
 import csv
 import glob
 import os
+import sys
 import json
+from concurrent.futures import ProcessPoolExecutor
+
+# Make the shared packages under src/ importable when run as a script
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scheduling.conflict_graph import build_course_ranks, get_session_room_type
+from scheduling.diagnostics import DiagnosticsEngine, FailureRecord
+from scheduling.solution import SOLUTION_FILE, Session, Solution, basket_group, grid_sessions, split_rooms
+from scheduling.warm_start import course_spec, load_prior_solution, preplace_sessions, prior_sessions_by_section
+from utils.excel_styles import alignment, font, solid_fill, thin_border
+from utils.workbook_writer import create_workbook
 
 # Load duration constants from config
 def load_config():
@@ -40,6 +50,16 @@ DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
 START_TIME = time(9, 0)
 END_TIME = time(18, 30)
 
+# Order courses by conflict-graph saturation (DSatur) instead of labs-first priority
+USE_CONFLICT_GRAPH_ORDERING = True
+
+# Render the department workbooks in worker processes once solving is done
+PARALLEL_RENDERING = True
+
+# Excel writer for the department workbooks: 'xlsxwriter' (constant memory,
+# much faster), 'openpyxl', or 'auto' for xlsxwriter when it is installed
+EXCEL_BACKEND = 'auto'
+
 # Lunch break parameters
 LUNCH_WINDOW_START = time(12, 30)  # Lunch breaks can start from 12:30
 LUNCH_WINDOW_END = time(14, 0)    # Last lunch break must end by 14:00 
@@ -466,13 +486,11 @@ def get_required_room_type(course):
 # Add this function to help identify basket courses
 def is_basket_course(code):
     """Check if course is part of a basket based on code prefix"""
-    return code.startswith('B') and '-' in code
+    return basket_group(code) is not None
 
 def get_basket_group(code):
     """Get the basket group (B1, B2 etc) from course code"""
-    if is_basket_course(code):
-        return code.split('-')[0]
-    return None
+    return basket_group(code)
 
 def get_basket_group_slots(timetable, day, basket_group):
     """Find existing slots with courses from same basket group"""
@@ -753,6 +771,21 @@ def get_course_priority(course):
         priority += 2  # Tutorial priority
     return priority
 
+def get_course_specs(courses, batch_info, department, semester):
+    """Sessions and rooms each course currently needs, used to validate warm-start sessions"""
+    dept_info = batch_info.get((department, semester))
+    section_size = dept_info['section_size'] if dept_info else 0
+    specs = {}
+    for _, course in courses.iterrows():
+        lecture_sessions, tutorial_sessions, lab_sessions, self_study_sessions = calculate_required_slots(course)
+        students = str(course.get('total_students', ''))
+        specs[(str(course['Course Code']), str(course['Faculty']))] = course_spec(
+            str(course['Course Name']), str(course['Faculty']),
+            {'LEC': lecture_sessions, 'TUT': tutorial_sessions, 'LAB': lab_sessions, 'SS': self_study_sessions},
+            get_required_room_type(course) if lab_sessions else None,
+            int(students) if students.isdigit() else section_size)
+    return specs
+
 def get_best_slots(timetable, professor_schedule, faculty, day, duration, reserved_slots, semester, department, faculty_preferences):
     """Find best available consecutive slots in a day considering faculty preferences"""
     best_slots = []
@@ -801,7 +834,7 @@ def get_best_slots(timetable, professor_schedule, faculty, day, duration, reserv
     return preferred_slots + best_slots
 
 class UnscheduledComponent:
-    def __init__(self, department, semester, code, name, faculty, component_type, sessions, section='', reason=''):
+    def __init__(self, department, semester, code, name, faculty, component_type, sessions, section='', reason='', failure=None):
         self.department = department
         self.semester = semester
         self.code = code
@@ -811,6 +844,7 @@ class UnscheduledComponent:
         self.sessions = sessions
         self.section = section
         self.reason = reason
+        self.failure = failure  # FailureRecord, turned into a reason by DiagnosticsEngine
         
     def __eq__(self, other):
         if not isinstance(other, UnscheduledComponent):
@@ -824,79 +858,13 @@ class UnscheduledComponent:
     def __hash__(self):
         return hash((self.department, self.semester, self.code, self.component_type, self.section))
 
-def unscheduled_reason(course, department, semester, professor_schedule, rooms, component_type, check_attempts):
-    """Generate detailed reason why a course component couldn't be scheduled"""
-    faculty = course['Faculty']
-    code = str(course['Course Code'])
-    
-    # Check faculty availability
-    faculty_slots_used = 0
-    for day in range(len(DAYS)):
-        if faculty in professor_schedule and day in professor_schedule[faculty]:
-            faculty_slots_used += len(professor_schedule[faculty][day])
-    
-    # If faculty is heavily scheduled
-    if faculty_slots_used > 20:  # Threshold: 10 hours of teaching per week
-        return f"Faculty '{faculty}' already has {faculty_slots_used/2:.1f} hours of teaching scheduled"
-    
-    # Check room availability issues
-    if component_type == 'LAB':
-        lab_rooms_available = False
-        for _, room in rooms.items():
-            if 'LAB' in room['type'].upper() or 'COMPUTER' in room['type'].upper():
-                lab_rooms_available = True
-                break
-        
-        if not lab_rooms_available:
-            return "No suitable lab rooms available in the system"
-        
-        # Check if room is overbooked
-        lab_rooms_free_slots = 0
-        for rid, room in rooms.items():
-            if 'LAB' in room['type'].upper() or 'COMPUTER' in room['type'].upper():
-                total_slots = len(DAYS) * (len(TIME_SLOTS) - LAB_DURATION)
-                used_slots = sum(len(room['schedule'].get(day, [])) for day in range(len(DAYS)))
-                lab_rooms_free_slots += (total_slots - used_slots)
-        
-        if lab_rooms_free_slots < 5:  # Very few lab slots left
-            return f"Lab rooms almost fully booked ({lab_rooms_free_slots} slots left)"
-    
-    # Check for large classes with insufficient large rooms
-    if 'total_students' in course and pd.notna(course['total_students']):
-        try:
-            total_students = int(course['total_students'])
-            if total_students > 100:
-                large_rooms_available = False
-                for _, room in rooms.items():
-                    if room['type'].upper() == 'SEATER_120' or room['type'].upper() == 'SEATER_240':
-                        large_rooms_available = True
-                        break
-                
-                if not large_rooms_available:
-                    return f"No rooms available with capacity for {total_students} students"
-        except (ValueError, TypeError):
-            pass
-    
-    # Check timeslot conflicts with other courses in same department/semester
-    if check_attempts > 800:  # If we made many attempts but still couldn't find a slot
-        return f"No suitable timeslot found after {check_attempts} attempts - heavy scheduling conflicts"
-        
-    # Default reason
-    duration_map = {
-        'LEC': f"{LECTURE_DURATION/2} hour",
-        'LAB': f"{LAB_DURATION/2} hour",
-        'TUT': f"{TUTORIAL_DURATION/2} hour"
-    }
-    duration_str = duration_map.get(component_type, "")
-    
-    return f"Could not find compatible {duration_str} timeslot for {code} {component_type} with faculty {faculty}"
-
-def generate_all_timetables():
+def generate_all_timetables(prior_solution=None):
+    """Generate one workbook per department, optionally warm-started from a prior solution"""
     global lunch_breaks
     initialize_time_slots()  # Initialize time slots before using
     reserved_slots = load_reserved_slots()
     faculty_preferences = load_faculty_preferences()
-    workbooks = {}  # Dictionary to store workbook for each department
+    department_sheets = {}  # Solved section grids per department, rendered once solving is done
     professor_schedule = {}   # Track professor assignments
     rooms = load_rooms()
     batch_info = load_batch_data()
@@ -932,11 +900,17 @@ def generate_all_timetables():
     # Calculate lunch breaks dynamically
     lunch_breaks = calculate_lunch_breaks(all_semesters)
 
+    # Rank courses so the most contended sessions are placed first
+    durations = {'LEC': LECTURE_DURATION, 'TUT': TUTORIAL_DURATION, 'LAB': LAB_DURATION, 'SS': SELF_STUDY_DURATION}
+    course_rank = build_course_ranks(df, rooms, batch_info, durations) if USE_CONFLICT_GRAPH_ORDERING else {}
+
+    # Sessions from a previous run that are still valid are placed first
+    prior = prior_sessions_by_section(load_prior_solution(prior_solution))
+    if prior:
+        print(f"Warm-starting from {sum(len(sessions) for sessions in prior.values())} prior sessions")
+
     for department in df['Department'].unique():
-        # Create new workbook for each department
-        wb = Workbook()
-        wb.remove(wb.active)  # Remove default sheet
-        workbooks[department] = wb
+        department_sheets[department] = []
         
         # Track assigned faculty for courses
         course_faculty_assignments = {}
@@ -952,22 +926,30 @@ def generate_all_timetables():
             if courses.empty:
                 continue
 
-            # First handle lab scheduling as a separate pass
-            lab_courses = courses[courses['P'] > 0].copy()
-            lab_courses['priority'] = lab_courses.apply(get_course_priority, axis=1)
-            lab_courses = lab_courses.sort_values('priority', ascending=False)
+            if course_rank:
+                # Follow DSatur order, static priority only breaks ties
+                courses['priority'] = courses.apply(get_course_priority, axis=1)
+                courses['rank'] = [course_rank.get((department, semester, str(code)), len(course_rank))
+                                   for code in courses['Course Code']]
+                courses = courses.sort_values(['rank', 'priority'], ascending=[True, False], kind='stable')
+            else:
+                # First handle lab scheduling as a separate pass
+                lab_courses = courses[courses['P'] > 0].copy()
+                lab_courses['priority'] = lab_courses.apply(get_course_priority, axis=1)
+                lab_courses = lab_courses.sort_values('priority', ascending=False)
 
-            # Handle remaining courses after labs
-            non_lab_courses = courses[courses['P'] == 0].copy()
-            non_lab_courses['priority'] = non_lab_courses.apply(get_course_priority, axis=1)
-            non_lab_courses = non_lab_courses.sort_values('priority', ascending=False)
+                # Handle remaining courses after labs
+                non_lab_courses = courses[courses['P'] == 0].copy()
+                non_lab_courses['priority'] = non_lab_courses.apply(get_course_priority, axis=1)
+                non_lab_courses = non_lab_courses.sort_values('priority', ascending=False)
 
-            # Combine sorted courses with labs first
-            courses = pd.concat([lab_courses, non_lab_courses])
+                # Combine sorted courses with labs first
+                courses = pd.concat([lab_courses, non_lab_courses])
 
             # Get section info
             dept_info = batch_info.get((department, semester))
             num_sections = dept_info['num_sections'] if dept_info else 1
+            specs = get_course_specs(courses, batch_info, department, semester) if prior else {}
 
             # First identify self-study only courses
             for _, course in courses.iterrows():
@@ -987,11 +969,17 @@ def generate_all_timetables():
 
             for section in range(num_sections):
                 section_title = f"{department}_{semester}" if num_sections == 1 else f"{department}_{semester}_{chr(65+section)}"
-                ws = wb.create_sheet(title=section_title)
                 
                 # Initialize timetable structure
                 timetable = {day: {slot: {'type': None, 'code': '', 'name': '', 'faculty': '', 'classroom': ''} 
                          for slot in range(len(TIME_SLOTS))} for day in range(len(DAYS))}
+
+                # Keep prior sessions that are still valid, only search for the rest
+                warm_counts, warm_faculty = {}, {}
+                if prior:
+                    warm_counts, warm_faculty = preplace_sessions(
+                        prior.get((str(department), str(semester), section), []), timetable, professor_schedule,
+                        rooms, specs, lambda slot: is_break_time(TIME_SLOTS[slot], semester), durations)
                 
                 # Create a mapping for subject colors
                 subject_color_map = {}
@@ -1014,9 +1002,10 @@ def generate_all_timetables():
                         }
                         color_idx += 1
 
-                # Sort courses by priority
-                courses['priority'] = courses.apply(get_course_priority, axis=1)
-                courses = courses.sort_values('priority', ascending=False)
+                # Sort courses by priority unless the conflict-graph order is in use
+                if not course_rank:
+                    courses['priority'] = courses.apply(get_course_priority, axis=1)
+                    courses = courses.sort_values('priority', ascending=False)
 
                 # Process all courses - both lab and non-lab
                 for _, course in courses.iterrows():
@@ -1043,9 +1032,21 @@ def generate_all_timetables():
                             course_faculty_assignments[code] = [faculty]
                     else:
                         faculty = select_faculty(faculty)
+
+                    # Stay with the instructor of the warm-started sessions
+                    warm_key = (code, str(course['Faculty']))
+                    if warm_key in warm_faculty:
+                        faculty = warm_faculty[warm_key]
+                        course_faculty_assignments.setdefault(code, []).append(faculty)
                     
+                    # Sessions still needed after the warm start
                     lecture_sessions, tutorial_sessions, lab_sessions, _ = calculate_required_slots(course)
+                    lecture_sessions -= warm_counts.get(warm_key + ('LEC',), 0)
+                    tutorial_sessions -= warm_counts.get(warm_key + ('TUT',), 0)
+                    lab_sessions -= warm_counts.get(warm_key + ('LAB',), 0)
                     
+                    students = str(course.get('total_students', ''))
+                    students = int(students) if students.isdigit() else 0
                     if faculty not in professor_schedule:
                         professor_schedule[faculty] = {day: set() for day in range(len(DAYS))}
 
@@ -1053,12 +1054,15 @@ def generate_all_timetables():
                     for _ in range(lecture_sessions):
                         scheduled = False
                         attempts = 0
+                        failure = FailureRecord(department, semester, section, code, name, faculty, 'LEC',
+                                                get_session_room_type(course, batch_info, 'LEC'), students)
                         while not scheduled and attempts < 1000:
                             day = random.randint(0, len(DAYS)-1)
                             start_slot = random.randint(0, len(TIME_SLOTS)-LECTURE_DURATION)
                             
                             # Add check for faculty-course gap
                             if not check_faculty_course_gap(professor_schedule, timetable, faculty, code, day, start_slot):
+                                failure.reject('faculty_gap')
                                 attempts += 1
                                 continue
                             
@@ -1071,6 +1075,7 @@ def generate_all_timetables():
                                                for i in range(LECTURE_DURATION))
                             
                             if slots_reserved:
+                                failure.reject('reserved')
                                 attempts += 1
                                 continue
                             
@@ -1078,6 +1083,7 @@ def generate_all_timetables():
                             if not check_faculty_daily_components(professor_schedule, faculty, day, 
                                                                department, semester, section, timetable,
                                                                code, 'LEC'):
+                                failure.reject('daily_limit')
                                 attempts += 1
                                 continue
                                 
@@ -1085,9 +1091,16 @@ def generate_all_timetables():
                             slots_free = True
                             for i in range(LECTURE_DURATION):
                                 current_slot = start_slot + i
-                                if (current_slot in professor_schedule[faculty][day] or 
-                                    timetable[day][current_slot]['type'] is not None or
-                                    is_break_time(TIME_SLOTS[current_slot], semester)):
+                                if current_slot in professor_schedule[faculty][day]:
+                                    failure.reject('faculty_busy')
+                                    slots_free = False
+                                    break
+                                if timetable[day][current_slot]['type'] is not None:
+                                    failure.reject('section_busy')
+                                    slots_free = False
+                                    break
+                                if is_break_time(TIME_SLOTS[current_slot], semester):
+                                    failure.reject('break')
                                     slots_free = False
                                     break
                                 
@@ -1096,6 +1109,7 @@ def generate_all_timetables():
                                     if is_lecture_scheduled(timetable, day, 
                                                          max(0, current_slot - BREAK_DURATION), 
                                                          current_slot):
+                                        failure.reject('lecture_spacing')
                                         slots_free = False
                                         break
                                 
@@ -1105,6 +1119,7 @@ def generate_all_timetables():
                                                          current_slot + 1,
                                                          min(len(TIME_SLOTS), 
                                                              current_slot + BREAK_DURATION + 1)):
+                                        failure.reject('lecture_spacing')
                                         slots_free = False
                                         break
                             
@@ -1112,6 +1127,8 @@ def generate_all_timetables():
                                 room_id = find_suitable_room('LECTURE_ROOM', department, semester, 
                                                           day, start_slot, LECTURE_DURATION, 
                                                           rooms, batch_info, timetable, code)
+                                if not room_id:
+                                    failure.reject('no_room')
                                 
                                 if room_id:
                                     classroom = room_id
@@ -1129,18 +1146,22 @@ def generate_all_timetables():
                         if not scheduled:
                             unscheduled_components.add(
                                 UnscheduledComponent(department, semester, code, name, 
-                                                   faculty, 'LEC', 1, section)
+                                                   faculty, 'LEC', 1, section, failure=failure)
                             )
 
                     # Schedule tutorials with tracking
                     for _ in range(tutorial_sessions):
                         scheduled = False
                         attempts = 0
+                        failure = FailureRecord(department, semester, section, code, name, faculty, 'TUT',
+                                                get_session_room_type(course, batch_info, 'TUT'), students)
                         while not scheduled and attempts < 1000:
                             day = random.randint(0, len(DAYS)-1)
+                            start_slot = random.randint(0, len(TIME_SLOTS)-TUTORIAL_DURATION)
                             
                             # Add check for faculty-course gap
                             if not check_faculty_course_gap(professor_schedule, timetable, faculty, code, day, start_slot):
+                                failure.reject('faculty_gap')
                                 attempts += 1
                                 continue
                             
@@ -1148,10 +1169,9 @@ def generate_all_timetables():
                             if not check_faculty_daily_components(professor_schedule, faculty, day,
                                                                department, semester, section, timetable,
                                                                code, 'TUT'):
+                                failure.reject('daily_limit')
                                 attempts += 1
                                 continue
-                                
-                            start_slot = random.randint(0, len(TIME_SLOTS)-TUTORIAL_DURATION)
                             
                             # Check if any slot in the range is reserved
                             slots_reserved = any(is_slot_reserved(TIME_SLOTS[start_slot + i], 
@@ -1162,15 +1182,23 @@ def generate_all_timetables():
                                                for i in range(TUTORIAL_DURATION))
                             
                             if slots_reserved:
+                                failure.reject('reserved')
                                 attempts += 1
                                 continue
                             
                             # Check availability
                             slots_free = True
                             for i in range(TUTORIAL_DURATION):
-                                if (start_slot+i in professor_schedule[faculty][day] or 
-                                    timetable[day][start_slot+i]['type'] is not None or
-                                    is_break_time(TIME_SLOTS[start_slot+i], semester)):
+                                if start_slot+i in professor_schedule[faculty][day]:
+                                    failure.reject('faculty_busy')
+                                    slots_free = False
+                                    break
+                                if timetable[day][start_slot+i]['type'] is not None:
+                                    failure.reject('section_busy')
+                                    slots_free = False
+                                    break
+                                if is_break_time(TIME_SLOTS[start_slot+i], semester):
+                                    failure.reject('break')
                                     slots_free = False
                                     break
                             
@@ -1178,6 +1206,8 @@ def generate_all_timetables():
                                 room_id = find_suitable_room('LECTURE_ROOM', department, semester, 
                                                           day, start_slot, TUTORIAL_DURATION, 
                                                           rooms, batch_info, timetable, code)
+                                if not room_id:
+                                    failure.reject('no_room')
                                 
                                 if room_id:
                                     classroom = room_id
@@ -1195,7 +1225,7 @@ def generate_all_timetables():
                         if not scheduled:
                             unscheduled_components.add(
                                 UnscheduledComponent(department, semester, code, name,
-                                                   faculty, 'TUT', 1, section)
+                                                   faculty, 'TUT', 1, section, failure=failure)
                             )
 
                     # Schedule labs with tracking
@@ -1203,8 +1233,8 @@ def generate_all_timetables():
                         room_type = get_required_room_type(course)
                         for _ in range(lab_sessions):
                             scheduled = False
-                            attempts = 0
-                            scheduling_reason = ""
+                            failure = FailureRecord(department, semester, section, code, name, faculty, 'LAB',
+                                                    room_type, students)
                             
                             # Try each day in random order
                             days = list(range(len(DAYS)))
@@ -1215,11 +1245,15 @@ def generate_all_timetables():
                                 possible_slots = get_best_slots(timetable, professor_schedule, 
                                                               faculty, day, LAB_DURATION, 
                                                               reserved_slots, semester, department, faculty_preferences)
+                                if not possible_slots:
+                                    failure.reject('no_free_slot')
                                 
                                 for start_slot in possible_slots:
                                     room_id = find_suitable_room(room_type, department, semester,
                                                                day, start_slot, LAB_DURATION,
                                                                rooms, batch_info, timetable, code)
+                                    if not room_id:
+                                        failure.reject('no_room')
                                     
                                     if room_id:
                                         classroom = room_id if ',' not in str(room_id) else f"{room_id.split(',')[0]}+{room_id.split(',')[1]}"
@@ -1241,8 +1275,7 @@ def generate_all_timetables():
                             if not scheduled:
                                 unscheduled_components.add(
                                     UnscheduledComponent(department, semester, code, name,
-                                                       faculty, 'LAB', 1, section,
-                                                       "Could not find suitable room and time slot combination")
+                                                       faculty, 'LAB', 1, section, failure=failure)
                                 )
 
                 # Schedule self-study sessions
@@ -1251,6 +1284,7 @@ def generate_all_timetables():
                     name = str(course['Course Name'])
                     faculty = str(course['Faculty'])
                     _, _, _, self_study_sessions = calculate_required_slots(course)
+                    self_study_sessions -= warm_counts.get((code, faculty, 'SS'), 0)
                     
                     if self_study_sessions > 0:
                         if faculty not in professor_schedule:
@@ -1260,6 +1294,8 @@ def generate_all_timetables():
                         for _ in range(self_study_sessions):
                             scheduled = False
                             attempts = 0
+                            failure = FailureRecord(department, semester, section, code, name, faculty, 'SS',
+                                                    get_session_room_type(course, batch_info, 'SS'))
                             while not scheduled and attempts < 1000:
                                 day = random.randint(0, len(DAYS)-1)
                                 start_slot = random.randint(0, len(TIME_SLOTS)-SELF_STUDY_DURATION)
@@ -1273,15 +1309,23 @@ def generate_all_timetables():
                                                    for i in range(SELF_STUDY_DURATION))
                                 
                                 if slots_reserved:
+                                    failure.reject('reserved')
                                     attempts += 1
                                     continue
                                 
                                 # Check availability
                                 slots_free = True
                                 for i in range(SELF_STUDY_DURATION):
-                                    if (start_slot+i in professor_schedule[faculty][day] or 
-                                        timetable[day][start_slot+i]['type'] is not None or
-                                        is_break_time(TIME_SLOTS[start_slot+i], semester)):
+                                    if start_slot+i in professor_schedule[faculty][day]:
+                                        failure.reject('faculty_busy')
+                                        slots_free = False
+                                        break
+                                    if timetable[day][start_slot+i]['type'] is not None:
+                                        failure.reject('section_busy')
+                                        slots_free = False
+                                        break
+                                    if is_break_time(TIME_SLOTS[start_slot+i], semester):
+                                        failure.reject('break')
                                         slots_free = False
                                         break
                                 
@@ -1289,6 +1333,8 @@ def generate_all_timetables():
                                     room_id = find_suitable_room('LECTURE_ROOM', department, semester, 
                                                               day, start_slot, SELF_STUDY_DURATION, 
                                                               rooms, batch_info, timetable, code)
+                                    if not room_id:
+                                        failure.reject('no_room')
                                     
                                     if room_id:
                                         classroom = room_id
@@ -1303,247 +1349,387 @@ def generate_all_timetables():
                                             timetable[day][start_slot+i]['classroom'] = classroom if i == 0 else ''
                                         scheduled = True
                                 attempts += 1
+                            if not scheduled:
+                                unscheduled_components.add(
+                                    UnscheduledComponent(department, semester, code, name,
+                                                       faculty, 'SS', 1, section, failure=failure)
+                                )
 
-                # Write timetable to worksheet
-                header = ['Day'] + [f"{slot[0].strftime('%H:%M')}-{slot[1].strftime('%H:%M')}" for slot in TIME_SLOTS]
-                ws.append(header)
-                
-                header_fill = PatternFill(start_color="FFD700", end_color="FFD700", fill_type="solid")
-                header_font = Font(bold=True)
-                header_alignment = Alignment(horizontal='center', vertical='center')
-                
-                for cell in ws[1]:
-                    cell.fill = header_fill
-                    cell.font = header_font
-                    cell.alignment = header_alignment
-                
-                lec_fill = PatternFill(start_color="E6E6FA", end_color="E6E6FA", fill_type="solid")
-                lab_fill = PatternFill(start_color="98FB98", end_color="98FB98", fill_type="solid")
-                tut_fill = PatternFill(start_color="FFE4E1", end_color="FFE4E1", fill_type="solid")
-                ss_fill = PatternFill(start_color="ADD8E6", end_color="ADD8E6", fill_type="solid")
-                break_fill = PatternFill(start_color="D3D3D3", end_color="D3D3D3", fill_type="solid")
-                border = Border(left=Side(style='thin'), right=Side(style='thin'),
-                              top=Side(style='thin'), bottom=Side(style='thin'))
-                
-                for day_idx, day in enumerate(DAYS):
-                    row_num = day_idx + 2
-                    ws.append([day])
-                    
-                    merge_ranges = []  # Track merge ranges for this row
-                    
-                    for slot_idx in range(len(TIME_SLOTS)):
-                        cell_value = ''
-                        cell_fill = None
-                        
-                        if is_break_time(TIME_SLOTS[slot_idx], semester):
-                            cell_value = "BREAK"
-                            cell_fill = break_fill
-                        elif timetable[day_idx][slot_idx]['type']:
-                            activity_type = timetable[day_idx][slot_idx]['type']
-                            code = timetable[day_idx][slot_idx]['code']
-                            classroom = timetable[day_idx][slot_idx]['classroom']
-                            faculty = timetable[day_idx][slot_idx]['faculty']
-                            
-                            # Only create content for start of activity
-                            if code:
-                                # Get duration based on activity type
-                                duration = {
-                                    'LEC': LECTURE_DURATION,
-                                    'LAB': LAB_DURATION,
-                                    'TUT': TUTORIAL_DURATION,
-                                    'SS': SELF_STUDY_DURATION
-                                }.get(activity_type, 1)
-                                
-                                # Use subject-specific color
-                                if code in subject_color_map:
-                                    cell_fill = PatternFill(start_color=subject_color_map[code],
-                                                          end_color=subject_color_map[code],
-                                                          fill_type="solid")
-                                else:
-                                    cell_fill = {
-                                        'LAB': lab_fill,
-                                        'TUT': tut_fill,
-                                        'SS': ss_fill,
-                                        'LEC': lec_fill
-                                    }.get(activity_type, lec_fill)
-                                
-                                if code and is_basket_course(code):
-                                    basket_group = get_basket_group(code)
-                                    # Get all courses from same basket in this slot
-                                    basket_codes = set()  # Use set to avoid duplicates
-                                    basket_details = {}
-                                    
-                                    # First collect all courses in this basket group
-                                    for slot_id, slot_data in timetable[day_idx].items():
-                                        slot_code = slot_data.get('code', '')
-                                        if (slot_data.get('type') == activity_type and 
-                                            get_basket_group(slot_code) == basket_group):
-                                            basket_codes.add(slot_code)  # Add to set instead of list
-                                            # Only store details if not already present
-                                            if slot_code not in basket_details:
-                                                basket_details[slot_code] = {
-                                                    'faculty': slot_data['faculty'],
-                                                    'room': slot_data['classroom']
-                                                }
-                                    
-                                    if basket_codes:
-                                        # Group header
-                                        basket_header = f"{basket_group} Courses\n"
-                                        # List of all unique course codes
-                                        codes_str = ', '.join(sorted(basket_codes))
-                                        # Course details with rooms (unique entries)
-                                        course_details = [
-                                            f"{code}: {details['faculty']} ({details['room']})"
-                                            for code, details in sorted(basket_details.items())
-                                            if code and details['faculty'] and details['room']
-                                        ]
-                                        
-                                        cell_value = f"{basket_header}{codes_str}\n" + "\n".join(course_details)
-                                else:
-                                    cell_value = f"{code} {activity_type}\n{classroom}\n{faculty}"
-                                
-                                # Create merge range
-                                if duration > 1:
-                                    start_col = get_column_letter(slot_idx + 2)
-                                    end_col = get_column_letter(slot_idx + duration + 1)
-                                    merge_range = f"{start_col}{row_num}:{end_col}{row_num}"
-                                    merge_ranges.append((merge_range, cell_fill))
-                        
-                        cell = ws.cell(row=row_num, column=slot_idx+2, value=cell_value)
-                        if cell_fill:
-                            cell.fill = cell_fill
-                        cell.border = border
-                        cell.alignment = Alignment(wrap_text=True, vertical='center', horizontal='center')
-                    
-                    # Apply merges after creating all cells in the row
-                    for merge_range, fill in merge_ranges:
-                        ws.merge_cells(merge_range)
-                        # Ensure merged cell has consistent formatting
-                        merged_cell = ws[merge_range.split(':')[0]]
-                        merged_cell.fill = fill
-                        merged_cell.alignment = Alignment(wrap_text=True, vertical='center', horizontal='center')
-
-                for col_idx in range(1, len(TIME_SLOTS)+2):
-                    col_letter = get_column_letter(col_idx)
-                    ws.column_dimensions[col_letter].width = 15
-                
-                for row in ws.iter_rows(min_row=2, max_row=len(DAYS)+1):
-                    ws.row_dimensions[row[0].row].height = 40
+                department_sheets[department].append({
+                    'title': section_title,
+                    'semester': semester,
+                    'section': section,
+                    'num_sections': num_sections,
+                    'timetable': timetable,
+                    'subject_color_map': subject_color_map,
+                    'course_faculty_map': course_faculty_map,
+                })
 
-                # Add Self-Study Only Courses section
-                current_row = len(DAYS) + 4  # Initialize current_row here, before any sections
+    # Explain failures from the final calendars, utilisation is computed once for all of them
+    DiagnosticsEngine(professor_schedule, rooms, len(DAYS), len(TIME_SLOTS)).annotate(unscheduled_components)
 
-                if self_study_courses:
-                    ws.cell(row=current_row, column=1, value="Self-Study Only Courses")
-                    ws.cell(row=current_row, column=1).font = Font(bold=True)
-                    current_row += 1
-                    
-                    headers = ['Course Code', 'Course Name', 'Faculty']
-                    for col, header in enumerate(headers, 1):
-                        ws.cell(row=current_row, column=col, value=header)
-                        ws.cell(row=current_row, column=col).font = Font(bold=True)
-                    current_row += 1
-                    
-                    for course in self_study_courses:
-                        if course['department'] == department and course['semester'] == semester:
-                            ws.cell(row=current_row, column=1, value=course['code'])
-                            ws.cell(row=current_row, column=2, value=course['name'])
-                            ws.cell(row=current_row, column=3, value=course['faculty'])
-                            current_row += 1
-                    
-                    current_row += 2  # Add extra spacing after self-study courses
-
-                # Handle unscheduled components section
-                dept_unscheduled = [c for c in unscheduled_components 
-                                    if c.department == department and 
-                                    c.semester == semester and
-                                    (c.section == section if num_sections > 1 else True)]
-
-                if dept_unscheduled:  # Changed from unscheduled_components to dept_unscheduled
-                    current_row += 2  # Add spacing after previous section
-                    unsch_title = ws.cell(row=current_row, column=1, value="Unscheduled Components")
-                    unsch_title.font = Font(bold=True, size=12, color="FF0000")
-                    current_row += 2
-
-                    headers = ['Course Code', 'Course Name', 'Faculty', 'Component', 'Sessions', 'Reason']
-                    for col, header in enumerate(headers, 1):
-                        cell = ws.cell(row=current_row, column=col, value=header)
-                        cell.font = Font(bold=True)
-                        cell.border = border
-                        cell.fill = PatternFill(start_color="FFE0E0", end_color="FFE0E0", fill_type="solid")
-                        cell.alignment = Alignment(horizontal='center', vertical='center')
-                        # Set column widths for better readability
-                        ws.column_dimensions[get_column_letter(col)].width = 20
-                    current_row += 1
-
-                    for comp in dept_unscheduled:
-                        cells = [
-                            (comp.code, None),
-                            (comp.name, None),
-                            (comp.faculty, None),
-                            (comp.component_type, None),
-                            (comp.sessions, None),
-                            (comp.reason or "Could not find suitable slot", None)
-                        ]
-                        
-                        for col, (value, fill) in enumerate(cells, 1):
-                            cell = ws.cell(row=current_row, column=col, value=value)
-                            cell.border = border
-                            cell.alignment = Alignment(horizontal='left', vertical='center', wrap_text=True)
-                        current_row += 1
-                    
-                    current_row += 2  # Add spacing before legend
-
-                # Improved legend formatting
-                legend_title = ws.cell(row=current_row, column=1, value="Legend")
-                legend_title.font = Font(bold=True, size=12)
-                current_row += 2
-
-                # Wider columns for legend
-                ws.column_dimensions['A'].width = 20  # Subject Code
-                ws.column_dimensions['B'].width = 40  # Subject Name
-                ws.column_dimensions['C'].width = 30  # Faculty
-                ws.column_dimensions['D'].width = 15  # Color
-
-                # Add legend headers with better formatting
-                legend_headers = ['Subject Code', 'Subject Name', 'Faculty', 'Color']
-                for col, header in enumerate(legend_headers, 1):
-                    cell = ws.cell(row=current_row, column=col, value=header)
-                    cell.font = Font(bold=True)
-                    cell.border = border
-                    cell.fill = PatternFill(start_color="F0F0F0", end_color="F0F0F0", fill_type="solid")
-                    cell.alignment = Alignment(horizontal='center', vertical='center')
-                current_row += 1
-
-                # Add subject entries with improved spacing
-                for code, color in subject_color_map.items():
-                    if code in course_faculty_map:
-                        # Add spacing between rows
-                        ws.row_dimensions[current_row].height = 25
-                        
-                        cells = [
-                            (code, None),
-                            (course_faculty_map[code]['name'], None),
-                            (course_faculty_map[code]['faculty'], None),
-                            ('', PatternFill(start_color=color, end_color=color, fill_type="solid"))
-                        ]
-                        
-                        for col, (value, fill) in enumerate(cells, 1):
-                            cell = ws.cell(row=current_row, column=col, value=value)
-                            cell.border = border
-                            if fill:
-                                cell.fill = fill
-                            cell.alignment = Alignment(horizontal='left', vertical='center', wrap_text=True)
-                        
-                        current_row += 1
+    # Keep a machine-readable copy of the solution for warm starts and re-rendering
+    try:
+        build_solution(department_sheets, rooms, batch_info, all_semesters, unscheduled_components).save(SOLUTION_FILE)
+        print(f"Solution saved as {SOLUTION_FILE}")
+    except Exception as e:
+        print(f"Warning: Could not save solution file: {e}")
+
+    # The solution is final, render every department workbook from it
+    return render_department_workbooks(department_sheets, self_study_courses, unscheduled_components)
+
+def build_solution(department_sheets, rooms, batch_info, all_semesters, unscheduled_components):
+    """Collect the solved section grids into a saveable Solution"""
+    meta = {
+        'days': list(DAYS),
+        'slots': [f"{start.strftime('%H:%M')}-{end.strftime('%H:%M')}" for start, end in TIME_SLOTS],
+        'breaks': {str(semester): [slot for slot in range(len(TIME_SLOTS))
+                                   if is_break_time(TIME_SLOTS[slot], semester)]
+                   for semester in all_semesters},
+        'durations': {'LEC': LECTURE_DURATION, 'TUT': TUTORIAL_DURATION,
+                      'LAB': LAB_DURATION, 'SS': SELF_STUDY_DURATION},
+        'rooms': {room_id: {'type': room['type'], 'capacity': room['capacity'],
+                            'roomNumber': room['roomNumber'], 'campus': room.get('campus', '')}
+                  for room_id, room in (rooms or {}).items()},
+        'sections': [],
+        'courses': [],
+        'unscheduled': [{'department': str(c.department), 'semester': c.semester, 'section': c.section,
+                         'code': c.code, 'name': c.name, 'faculty': c.faculty,
+                         'component_type': c.component_type, 'sessions': c.sessions, 'reason': c.reason}
+                        for c in unscheduled_components],
+    }
+    sessions = []
+
+    for department, sheets in department_sheets.items():
+        for semester in dict.fromkeys(sheet['semester'] for sheet in sheets):
+            courses = df[(df['Department'] == department) & (df['Semester'] == semester)]
+            course_rows = {}
+            for _, course in courses.iterrows():
+                code = str(course['Course Code'])
+                course_rows.setdefault(code, course)
+                meta['courses'].append({
+                    'department': str(department), 'semester': semester, 'code': code,
+                    'name': str(course['Course Name']), 'faculty': str(course['Faculty']),
+                    'L': course['L'], 'T': course['T'], 'P': course['P'], 'S': course['S'], 'C': course['C'],
+                    'students': str(course.get('total_students', '')),
+                    'schedule': str(course['Schedule']) if pd.notna(course['Schedule']) else 'Yes'
+                })
 
-    # Save separate workbook for each department
-    for department, wb in workbooks.items():
-        filename = f"timetable_{department}.xlsx"
-        wb.save(filename)
-        print(f"Timetable for {department} saved as {filename}")
+            dept_info = batch_info.get((department, semester))
+            section_size = dept_info['section_size'] if dept_info else 0
+            for sheet in sheets:
+                if sheet['semester'] != semester:
+                    continue
+                section = sheet['section']
+                meta['sections'].append({'department': str(department), 'semester': semester,
+                                         'section': section, 'title': sheet['title'], 'students': section_size})
+                for day, start, duration, cell in grid_sessions(sheet['timetable']):
+                    course = course_rows.get(cell['code'])
+                    students = str(course.get('total_students', '')) if course is not None else ''
+                    students = int(students) if students.isdigit() else section_size
+                    room_type = (get_session_room_type(course, batch_info, cell['type'])
+                                 if course is not None else 'LECTURE_ROOM')
+                    sessions.append(Session(department, semester, section, cell['code'], cell['name'],
+                                            cell['faculty'], cell['type'], day, start, duration,
+                                            split_rooms(cell['classroom']), students, room_type))
+
+    return Solution(sessions, meta)
+
+def write_section_sheet(ws, department, semester, section, num_sections, timetable,
+                        subject_color_map, course_faculty_map, self_study_courses, unscheduled):
+    """Render one solved section: grid, self-study list, unscheduled components and legend"""
+    # Write timetable to worksheet
+    header = ['Day'] + [f"{slot[0].strftime('%H:%M')}-{slot[1].strftime('%H:%M')}" for slot in TIME_SLOTS]
+    ws.append(header)
+
+    header_fill = solid_fill("FFD700")
+    header_font = font(bold=True)
+    header_alignment = alignment(horizontal='center', vertical='center')
+
+    for cell in ws[1]:
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = header_alignment
+
+    lec_fill = solid_fill("E6E6FA")
+    lab_fill = solid_fill("98FB98")
+    tut_fill = solid_fill("FFE4E1")
+    ss_fill = solid_fill("ADD8E6")
+    break_fill = solid_fill("D3D3D3")
+    border = thin_border()
+
+    for day_idx, day in enumerate(DAYS):
+        row_num = day_idx + 2
+        ws.append([day])
+
+        merge_ranges = []  # Track merge ranges for this row
+
+        for slot_idx in range(len(TIME_SLOTS)):
+            cell_value = ''
+            cell_fill = None
+
+            if is_break_time(TIME_SLOTS[slot_idx], semester):
+                cell_value = "BREAK"
+                cell_fill = break_fill
+            elif timetable[day_idx][slot_idx]['type']:
+                activity_type = timetable[day_idx][slot_idx]['type']
+                code = timetable[day_idx][slot_idx]['code']
+                classroom = timetable[day_idx][slot_idx]['classroom']
+                faculty = timetable[day_idx][slot_idx]['faculty']
+
+                # Only create content for start of activity
+                if code:
+                    # Get duration based on activity type
+                    duration = {
+                        'LEC': LECTURE_DURATION,
+                        'LAB': LAB_DURATION,
+                        'TUT': TUTORIAL_DURATION,
+                        'SS': SELF_STUDY_DURATION
+                    }.get(activity_type, 1)
+
+                    # Use subject-specific color
+                    if code in subject_color_map:
+                        cell_fill = solid_fill(subject_color_map[code])
+                    else:
+                        cell_fill = {
+                            'LAB': lab_fill,
+                            'TUT': tut_fill,
+                            'SS': ss_fill,
+                            'LEC': lec_fill
+                        }.get(activity_type, lec_fill)
+
+                    if code and is_basket_course(code):
+                        basket_group = get_basket_group(code)
+                        # Get all courses from same basket in this slot
+                        basket_codes = set()  # Use set to avoid duplicates
+                        basket_details = {}
+
+                        # First collect all courses in this basket group
+                        for slot_id, slot_data in timetable[day_idx].items():
+                            slot_code = slot_data.get('code', '')
+                            if (slot_data.get('type') == activity_type and 
+                                get_basket_group(slot_code) == basket_group):
+                                basket_codes.add(slot_code)  # Add to set instead of list
+                                # Only store details if not already present
+                                if slot_code not in basket_details:
+                                    basket_details[slot_code] = {
+                                        'faculty': slot_data['faculty'],
+                                        'room': slot_data['classroom']
+                                    }
+
+                        if basket_codes:
+                            # Group header
+                            basket_header = f"{basket_group} Courses\n"
+                            # List of all unique course codes
+                            codes_str = ', '.join(sorted(basket_codes))
+                            # Course details with rooms (unique entries)
+                            course_details = [
+                                f"{code}: {details['faculty']} ({details['room']})"
+                                for code, details in sorted(basket_details.items())
+                                if code and details['faculty'] and details['room']
+                            ]
+
+                            cell_value = f"{basket_header}{codes_str}\n" + "\n".join(course_details)
+                    else:
+                        cell_value = f"{code} {activity_type}\n{classroom}\n{faculty}"
+
+                    # Create merge range
+                    if duration > 1:
+                        start_col = get_column_letter(slot_idx + 2)
+                        end_col = get_column_letter(slot_idx + duration + 1)
+                        merge_range = f"{start_col}{row_num}:{end_col}{row_num}"
+                        merge_ranges.append((merge_range, cell_fill))
+
+            cell = ws.cell(row=row_num, column=slot_idx+2, value=cell_value)
+            if cell_fill:
+                cell.fill = cell_fill
+            cell.border = border
+            cell.alignment = alignment(wrap_text=True, vertical='center', horizontal='center')
+
+        # Apply merges after creating all cells in the row
+        for merge_range, fill in merge_ranges:
+            ws.merge_cells(merge_range)
+            # Ensure merged cell has consistent formatting
+            merged_cell = ws[merge_range.split(':')[0]]
+            merged_cell.fill = fill
+            merged_cell.alignment = alignment(wrap_text=True, vertical='center', horizontal='center')
+
+    for col_idx in range(1, len(TIME_SLOTS)+2):
+        col_letter = get_column_letter(col_idx)
+        ws.column_dimensions[col_letter].width = 15
+
+    for row in ws.iter_rows(min_row=2, max_row=len(DAYS)+1):
+        ws.row_dimensions[row[0].row].height = 40
+
+    # Add Self-Study Only Courses section
+    current_row = len(DAYS) + 4  # Initialize current_row here, before any sections
+
+    # Rendered after solving, so only list this semester's courses, not every one seen so far
+    ss_courses_for_this_section = [c for c in self_study_courses
+                                   if c['department'] == department and c['semester'] == semester]
+
+    if ss_courses_for_this_section:
+        ws.cell(row=current_row, column=1, value="Self-Study Only Courses")
+        ws.cell(row=current_row, column=1).font = font(bold=True)
+        current_row += 1
+
+        headers = ['Course Code', 'Course Name', 'Faculty']
+        for col, header in enumerate(headers, 1):
+            ws.cell(row=current_row, column=col, value=header)
+            ws.cell(row=current_row, column=col).font = font(bold=True)
+        current_row += 1
+
+        for course in ss_courses_for_this_section:
+            ws.cell(row=current_row, column=1, value=course['code'])
+            ws.cell(row=current_row, column=2, value=course['name'])
+            ws.cell(row=current_row, column=3, value=course['faculty'])
+            current_row += 1
+
+        current_row += 2  # Add extra spacing after self-study courses
+
+    # Handle unscheduled components section
+    dept_unscheduled = [c for c in unscheduled
+                        if c['department'] == department and
+                        c['semester'] == semester and
+                        (c['section'] == section if num_sections > 1 else True)]
+
+    if dept_unscheduled:  # Changed from unscheduled_components to dept_unscheduled
+        current_row += 2  # Add spacing after previous section
+        unsch_title = ws.cell(row=current_row, column=1, value="Unscheduled Components")
+        unsch_title.font = font(bold=True, size=12, color="FF0000")
+        current_row += 2
+
+        headers = ['Course Code', 'Course Name', 'Faculty', 'Component', 'Sessions', 'Reason']
+        for col, header in enumerate(headers, 1):
+            cell = ws.cell(row=current_row, column=col, value=header)
+            cell.font = font(bold=True)
+            cell.border = border
+            cell.fill = solid_fill("FFE0E0")
+            cell.alignment = alignment(horizontal='center', vertical='center')
+            # Set column widths for better readability
+            ws.column_dimensions[get_column_letter(col)].width = 20
+        current_row += 1
+
+        for comp in dept_unscheduled:
+            cells = [
+                (comp['code'], None),
+                (comp['name'], None),
+                (comp['faculty'], None),
+                (comp['component_type'], None),
+                (comp['sessions'], None),
+                (comp['reason'] or "Could not find suitable slot", None)
+            ]
+
+            for col, (value, fill) in enumerate(cells, 1):
+                cell = ws.cell(row=current_row, column=col, value=value)
+                cell.border = border
+                cell.alignment = alignment(horizontal='left', vertical='center', wrap_text=True)
+            current_row += 1
+
+        current_row += 2  # Add spacing before legend
+
+    # Improved legend formatting
+    legend_title = ws.cell(row=current_row, column=1, value="Legend")
+    legend_title.font = font(bold=True, size=12)
+    current_row += 2
+
+    # Wider columns for legend
+    ws.column_dimensions['A'].width = 20  # Subject Code
+    ws.column_dimensions['B'].width = 40  # Subject Name
+    ws.column_dimensions['C'].width = 30  # Faculty
+    ws.column_dimensions['D'].width = 15  # Color
+
+    # Add legend headers with better formatting
+    legend_headers = ['Subject Code', 'Subject Name', 'Faculty', 'Color']
+    for col, header in enumerate(legend_headers, 1):
+        cell = ws.cell(row=current_row, column=col, value=header)
+        cell.font = font(bold=True)
+        cell.border = border
+        cell.fill = solid_fill("F0F0F0")
+        cell.alignment = alignment(horizontal='center', vertical='center')
+    current_row += 1
+
+    # Add subject entries with improved spacing
+    for code, color in subject_color_map.items():
+        if code in course_faculty_map:
+            # Add spacing between rows
+            ws.row_dimensions[current_row].height = 25
+
+            cells = [
+                (code, None),
+                (course_faculty_map[code]['name'], None),
+                (course_faculty_map[code]['faculty'], None),
+                ('', solid_fill(color))
+            ]
+
+            for col, (value, fill) in enumerate(cells, 1):
+                cell = ws.cell(row=current_row, column=col, value=value)
+                cell.border = border
+                if fill:
+                    cell.fill = fill
+                cell.alignment = alignment(horizontal='left', vertical='center', wrap_text=True)
+
+            current_row += 1
+
+def render_payloads(department_sheets, self_study_courses, unscheduled_components):
+    """Plain-data render input per department, picklable for worker processes"""
+    unscheduled = [{'department': c.department, 'semester': c.semester, 'section': c.section,
+                    'code': c.code, 'name': c.name, 'faculty': c.faculty,
+                    'component_type': c.component_type, 'sessions': c.sessions, 'reason': c.reason}
+                   for c in unscheduled_components]
+    return [{'department': department,
+             'sheets': sheets,
+             'self_study_courses': [c for c in self_study_courses if c['department'] == department],
+             'unscheduled': [c for c in unscheduled if c['department'] == department],
+             'lunch_breaks': dict(lunch_breaks)}
+            for department, sheets in department_sheets.items()]
+
+def render_department_workbook(payload):
+    """Write and save timetable_<department>.xlsx from a render payload, returns the filename"""
+    wb = create_workbook(EXCEL_BACKEND)
+    department = payload['department']
+    for sheet in payload['sheets']:
+        ws = wb.create_sheet(sheet['title'])
+        write_section_sheet(ws, department, sheet['semester'], sheet['section'], sheet['num_sections'],
+                            sheet['timetable'], sheet['subject_color_map'], sheet['course_faculty_map'],
+                            payload['self_study_courses'], payload['unscheduled'])
+        wb.flush(ws)
+    filename = f"timetable_{department}.xlsx"
+    wb.save(filename)
+    return filename
+
+def _render_department_worker(payload):
+    """Worker process entry point, renders one department with the parent's breaks"""
+    global lunch_breaks
+    initialize_time_slots()
+    lunch_breaks = payload['lunch_breaks']
+    return render_department_workbook(payload)
+
+def render_department_workbooks(department_sheets, self_study_courses, unscheduled_components):
+    """Render and save one workbook per department, in parallel worker processes when there are several"""
+    payloads = render_payloads(department_sheets, self_study_courses, unscheduled_components)
+    filenames = None
+    if PARALLEL_RENDERING and len(payloads) > 1 and (os.cpu_count() or 1) > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=min(len(payloads), os.cpu_count())) as executor:
+                filenames = list(executor.map(_render_department_worker, payloads))
+        except Exception as e:
+            print(f"Warning: Parallel rendering failed ({e}), rendering sequentially")
+    if filenames is None:
+        filenames = [render_department_workbook(payload) for payload in payloads]
 
-    return [f"timetable_{dept}.xlsx" for dept in workbooks.keys()]
+    for payload, filename in zip(payloads, filenames):
+        print(f"Timetable for {payload['department']} saved as {filename}")
+    return filenames
 
 if __name__ == "__main__":
-    generate_all_timetables()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="Generate one timetable workbook per department")
+    parser.add_argument('--warm-start', metavar='PATH', nargs='+',
+                        help="prior solution JSON or timetable workbook(s) to start from")
+    args = parser.parse_args()
+
+    warm_start = args.warm_start
+    if warm_start and len(warm_start) == 1:
+        warm_start = warm_start[0]
+    generate_all_timetables(warm_start)
\ No newline at end of file
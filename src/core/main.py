@@ -2,11 +2,18 @@ import pandas as pd
 import random
 from datetime import datetime, time, timedelta
 from openpyxl import Workbook
-from openpyxl.styles import PatternFill, Border, Side, Alignment, Font
 from openpyxl.utils import get_column_letter
 from collections import defaultdict
 import csv
 import os
+import sys
+
+# Make the shared packages under src/ importable when run as a script
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scheduling.basket_blocks import collect_basket_blocks, plan_basket_blocks
+from scheduling.conflict_graph import get_course_students, get_session_room_type
+from scheduling.solution import SOLUTION_FILE, Session, Solution, basket_group, grid_sessions, split_rooms
+from utils.excel_styles import alignment, font, solid_fill, thin_border
 
 # Constants
 DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
@@ -169,12 +176,10 @@ def load_batch_data(df):
     return batch_info
 
 def is_basket_course(code):
-    return str(code).startswith('B') and '-' in str(code)
+    return basket_group(code) is not None
 
 def get_basket_group(code):
-    if is_basket_course(code):
-        return str(code).split('-')[0]
-    return None
+    return basket_group(code)
 
 def find_suitable_room(course_type, department, semester, day, start_slot, duration, rooms, batch_info, timetable, course_code="", used_rooms=None):
     if not rooms:
@@ -289,6 +294,91 @@ def is_break_time(slot, semester):
     lunch_start, lunch_end = lunch_breaks[semester]
     return lunch_start <= start < lunch_end
 
+def plan_basket_electives(df, batch_info, rooms, professor_schedule):
+    """Reserve every basket group as one block shared by all sections that offer it"""
+    grids, department_breaks, rows = {}, {}, []
+    for department in df['Department'].unique():
+        semesters = df[df['Department'] == department]['Semester'].unique()
+        calculate_lunch_breaks(semesters)
+        department_breaks[department] = dict(lunch_breaks)
+        for semester in semesters:
+            num_sections = batch_info.get((department, semester), {'num_sections': 1})['num_sections']
+            for section in range(num_sections):
+                grids[(department, semester, section)] = {day: {slot: {'type': None, 'code': '', 'name': '', 'faculty': '', 'classroom': ''} for slot in range(len(TIME_SLOTS))} for day in range(len(DAYS))}
+            courses = df[(df['Department'] == department) & (df['Semester'] == semester)]
+            basket_courses = courses[courses['Course Code'].astype(str).str.contains('^B[0-9]')]
+            for _, course in basket_courses.iterrows():
+                code = str(course['Course Code'])
+                students = str(course['total_students']).split('.')[0]
+                rows.append({'department': department, 'semester': semester, 'sections': num_sections,
+                             'group': code[:2], 'code': code, 'name': str(course['Course Name']),
+                             'faculty': str(course['Faculty']), 'students': int(students) if students.isdigit() else 35,
+                             'sessions': calculate_required_slots(course)[0]})
+
+    def section_break(section_key, slot):
+        breaks = department_breaks[section_key[0]]
+        if section_key[1] not in breaks:
+            return False
+        lunch_start, lunch_end = breaks[section_key[1]]
+        return lunch_start <= TIME_SLOTS[slot][0] < lunch_end
+
+    blocks = collect_basket_blocks(rows, BASKET_SLOTS, LECTURE_DURATION)
+    plan_basket_blocks(blocks, grids, professor_schedule, rooms, section_break, len(DAYS), len(TIME_SLOTS), 'ROOM')
+    return grids, blocks
+
+def build_solution(grids, rooms, batch_info, unscheduled_components):
+    """Collect the solved section grids into a saveable Solution"""
+    semesters = sorted({semester for _, semester, _ in grids}, key=str)
+    meta = {
+        'days': list(DAYS),
+        'slots': [f"{start.strftime('%H:%M')}-{end.strftime('%H:%M')}" for start, end in TIME_SLOTS],
+        'breaks': {str(semester): [slot for slot in range(len(TIME_SLOTS)) if is_break_time(TIME_SLOTS[slot], semester)]
+                   for semester in semesters},
+        'durations': {'LEC': LECTURE_DURATION, 'TUT': TUTORIAL_DURATION,
+                      'LAB': LAB_DURATION, 'SS': SELF_STUDY_DURATION},
+        'rooms': {room_id: {'type': room['type'], 'capacity': room['capacity'], 'roomNumber': room['roomNumber']}
+                  for room_id, room in (rooms or {}).items()},
+        'sections': [],
+        'courses': [],
+        'unscheduled': [{'department': str(c.department), 'semester': c.semester, 'section': c.section,
+                         'code': c.code, 'name': c.name, 'faculty': c.faculty,
+                         'component_type': c.component_type, 'sessions': c.sessions, 'reason': c.reason}
+                        for c in unscheduled_components],
+    }
+    sessions = []
+    course_rows = {}
+    for _, course in df.iterrows():
+        code = str(course['Course Code'])
+        course_rows.setdefault((course['Department'], course['Semester'], code), course)
+        meta['courses'].append({
+            'department': str(course['Department']), 'semester': course['Semester'], 'code': code,
+            'name': str(course['Course Name']), 'faculty': str(course['Faculty']),
+            'L': course['L'], 'T': course['T'], 'P': course['P'], 'S': course['S'], 'C': course.get('C', 0),
+            'students': str(course.get('total_students', '')),
+            'schedule': str(course['Schedule']) if pd.notna(course.get('Schedule')) else 'Yes'
+        })
+
+    for (department, semester, section), timetable in grids.items():
+        dept_info = batch_info.get((department, semester), {'num_sections': 1, 'section_size': 0})
+        title = f"{department}_{semester}" if dept_info['num_sections'] == 1 else f"{department}_{semester}_{chr(65+section)}"
+        meta['sections'].append({'department': str(department), 'semester': semester, 'section': section,
+                                 'title': title, 'students': dept_info.get('section_size', 0)})
+        for day, start, duration, cell in grid_sessions(timetable):
+            # A shared basket block is recorded as one lecture per elective
+            entries = cell.get('basket') or [{'code': cell['code'], 'name': cell['name'],
+                                              'faculty': cell['faculty'], 'room': cell['classroom']}]
+            for entry in entries:
+                course = course_rows.get((department, semester, entry['code']))
+                if course is None:
+                    students, room_type = dept_info.get('section_size', 0), 'LECTURE_ROOM'
+                else:
+                    students = get_course_students(course, batch_info)
+                    room_type = get_session_room_type(course, batch_info, cell['type'])
+                sessions.append(Session(department, semester, section, entry['code'], entry['name'],
+                                        entry['faculty'], cell['type'], day, start, duration,
+                                        split_rooms(entry['room']), students, room_type))
+    return Solution(sessions, meta)
+
 def generate_timetable():
     global TIME_SLOTS, df
     TIME_SLOTS = generate_time_slots()
@@ -316,6 +406,8 @@ def generate_timetable():
     professor_schedule = defaultdict(lambda: {day: set() for day in range(len(DAYS))})
     unscheduled_components = set()
     self_study_courses = []
+    # Basket electives are planned once for all departments before any section
+    grids, basket_blocks = plan_basket_electives(df, batch_info, rooms, professor_schedule)
     departments = df['Department'].unique()
     for department in departments:
         semesters = df[df['Department'] == department]['Semester'].unique()
@@ -327,7 +419,7 @@ def generate_timetable():
             for section in range(num_sections):
                 section_title = f"{department}_{semester}" if num_sections == 1 else f"{department}_{semester}_{chr(65+section)}"
                 ws = wb.create_sheet(title=section_title)
-                timetable = {day: {slot: {'type': None, 'code': '', 'name': '', 'faculty': '', 'classroom': ''} for slot in range(len(TIME_SLOTS))} for day in range(len(DAYS))}
+                timetable = grids[(department, semester, section)]
                 subject_color_map = {}
                 course_faculty_map = {}
                 color_idx = 0
@@ -341,71 +433,15 @@ def generate_timetable():
                             subject_color_map[code] = COLOR_PALETTE[color_idx % len(COLOR_PALETTE)]
                         course_faculty_map[code] = {'name': str(course['Course Name']), 'faculty': str(course['Faculty'])}
                         color_idx += 1
-                # Schedule basket electives first
-                basket_courses = courses[courses['Course Code'].astype(str).str.contains('^B[0-9]')]
-                for basket_group in ['B1', 'B2', 'B3', 'B4', 'B5', 'B6', 'B7', 'B8', 'B9']:
-                    basket_group_courses = basket_courses[basket_courses['Course Code'].astype(str).str.startswith(basket_group)]
-                    if basket_group_courses.empty:
+                # Basket electives the shared blocks could not seat
+                for block in basket_blocks:
+                    if (department, semester, section) not in block.sections:
                         continue
-                    start_slot = BASKET_SLOTS[basket_group]
-                    duration = LECTURE_DURATION
-                    for day in range(len(DAYS)):
-                        if any(is_break_time(TIME_SLOTS[start_slot + i], semester) for i in range(duration)):
-                            continue
-                        if any(timetable[day][start_slot + i]['type'] for i in range(duration)):
-                            continue
-                        
-                        # Collect all courses in this basket for display
-                        basket_course_list = []
-                        all_faculty_conflicts = False
-                        used_rooms = set()
-                        
-                        for _, course in basket_group_courses.iterrows():
-                            code = str(course['Course Code'])
-                            name = str(course['Course Name'])
-                            faculty = str(course['Faculty'])
-                            l, t, p, s = calculate_required_slots(course)
-                            if l == 0:
-                                continue
-                            
-                            # Check for faculty conflicts
-                            if any(start_slot + i in professor_schedule[faculty][day] for i in range(duration)):
-                                unscheduled_components.add(UnscheduledComponent(department, semester, code, name, faculty, 'LEC', 1, section, "Faculty conflict in basket slot"))
-                                all_faculty_conflicts = True
-                                continue
-                            
-                            # Check for room availability
-                            room_id = find_suitable_room('LECTURE_ROOM', department, semester, day, start_slot, duration, rooms, batch_info, timetable, code, used_rooms)
-                            if not room_id:
-                                unscheduled_components.add(UnscheduledComponent(department, semester, code, name, faculty, 'LEC', 1, section, "No suitable room for basket elective"))
-                                continue
-                            
-                            used_rooms.add(room_id)
-                            basket_course_list.append(f"{code}: {name} ({faculty})")
-                        
-                        # If we have courses to schedule and no conflicts, schedule the basket slot
-                        if basket_course_list and not all_faculty_conflicts:
-                            # Update professor schedules for all faculty in the basket
-                            for _, course in basket_group_courses.iterrows():
-                                faculty = str(course['Faculty'])
-                                l, t, p, s = calculate_required_slots(course)
-                                if l > 0:
-                                    for i in range(duration):
-                                        professor_schedule[faculty][day].add(start_slot + i)
-                            
-                            # Set the basket slot display
-                            for i in range(duration):
-                                timetable[day][start_slot + i]['type'] = 'LEC'
-                                if i == 0:
-                                    timetable[day][start_slot + i]['code'] = basket_group
-                                    timetable[day][start_slot + i]['name'] = '\n'.join(basket_course_list)
-                                    timetable[day][start_slot + i]['faculty'] = ''
-                                    timetable[day][start_slot + i]['classroom'] = ''
-                                else:
-                                    timetable[day][start_slot + i]['code'] = ''
-                                    timetable[day][start_slot + i]['name'] = ''
-                                    timetable[day][start_slot + i]['faculty'] = ''
-                                    timetable[day][start_slot + i]['classroom'] = ''
+                    for elective in block.electives:
+                        for row_department, code, name, faculty in elective.courses:
+                            if row_department == department and elective.missing:
+                                reason = "Faculty conflict in basket slot" if 'faculty_busy' in elective.rejections else "No suitable room for basket elective"
+                                unscheduled_components.add(UnscheduledComponent(department, semester, code, name, faculty, 'LEC', elective.missing, section, reason))
                 # Schedule non-basket courses
                 non_basket_courses = courses[~courses['Course Code'].astype(str).str.contains('^B[0-9]')]
                 for _, course in non_basket_courses.iterrows():
@@ -444,20 +480,19 @@ def generate_timetable():
                 # Write timetable to worksheet
                 header = ['Day'] + [f"{slot[0].strftime('%H:%M')}-{slot[1].strftime('%H:%M')}" for slot in TIME_SLOTS]
                 ws.append(header)
-                header_fill = PatternFill(start_color="FFD700", end_color="FFD700", fill_type="solid")
-                header_font = Font(bold=True)
-                header_alignment = Alignment(horizontal='center', vertical='center')
+                header_fill = solid_fill("FFD700")
+                header_font = font(bold=True)
+                header_alignment = alignment(horizontal='center', vertical='center')
                 for cell in ws[1]:
                     cell.fill = header_fill
                     cell.font = header_font
                     cell.alignment = header_alignment
-                lec_fill = PatternFill(start_color="E6E6FA", end_color="E6E6FA", fill_type="solid")
-                lab_fill = PatternFill(start_color="98FB98", end_color="98FB98", fill_type="solid")
-                tut_fill = PatternFill(start_color="FFE4E1", end_color="FFE4E1", fill_type="solid")
-                ss_fill = PatternFill(start_color="ADD8E6", end_color="ADD8E6", fill_type="solid")
-                break_fill = PatternFill(start_color="D3D3D3", end_color="D3D3D3", fill_type="solid")
-                border = Border(left=Side(style='thin'), right=Side(style='thin'),
-                               top=Side(style='thin'), bottom=Side(style='thin'))
+                lec_fill = solid_fill("E6E6FA")
+                lab_fill = solid_fill("98FB98")
+                tut_fill = solid_fill("FFE4E1")
+                ss_fill = solid_fill("ADD8E6")
+                break_fill = solid_fill("D3D3D3")
+                border = thin_border()
                 for day_idx, day in enumerate(DAYS):
                     row_num = day_idx + 2
                     ws.append([day])
@@ -482,8 +517,10 @@ def generate_timetable():
                                 elif is_basket_course(code):
                                     grp = get_basket_group(code)
                                     fill_color = basket_group_colors.get(grp, fill_color)
-                                cell_fill = PatternFill(start_color=fill_color, end_color=fill_color, fill_type="solid")
+                                cell_fill = solid_fill(fill_color)
                                 cell_value = f"{code} {activity_type}\n{classroom}\n{faculty}"
+                                if 'basket' in timetable[day_idx][slot_idx]:
+                                    cell_value = f"{code} Courses\n" + '\n'.join(f"{m['code']}: {m['faculty']} ({m['room']})" for m in timetable[day_idx][slot_idx]['basket'])
                                 if duration > 1:
                                     start_col = get_column_letter(slot_idx + 2)
                                     end_col = get_column_letter(slot_idx + duration + 1)
@@ -493,14 +530,14 @@ def generate_timetable():
                         if cell_fill:
                             cell.fill = cell_fill
                         cell.border = border
-                        cell.alignment = Alignment(wrap_text=True, vertical='center', horizontal='center')
+                        cell.alignment = alignment(wrap_text=True, vertical='center', horizontal='center')
                     for merge_range, fill in merge_ranges:
                         ws.merge_cells(merge_range)
                         merged_cell = ws[merge_range.split(':')[0]]
                         merged_cell.fill = fill
-                        merged_cell.alignment = Alignment(wrap_text=True, vertical='center', horizontal='center')
+                        merged_cell.alignment = alignment(wrap_text=True, vertical='center', horizontal='center')
                     ws.cell(row=row_num, column=1).border = border
-                    ws.cell(row=row_num, column=1).alignment = Alignment(horizontal='center', vertical='center')
+                    ws.cell(row=row_num, column=1).alignment = alignment(horizontal='center', vertical='center')
                 for col_idx in range(1, len(TIME_SLOTS)+2):
                     col_letter = get_column_letter(col_idx)
                     ws.column_dimensions[col_letter].width = 15
@@ -508,11 +545,11 @@ def generate_timetable():
                     ws.row_dimensions[row[0].row].height = 40
                 current_row = len(DAYS) + 4
                 if self_study_courses:
-                    ws.cell(row=current_row, column=1, value="Self-Study Only Courses").font = Font(bold=True)
+                    ws.cell(row=current_row, column=1, value="Self-Study Only Courses").font = font(bold=True)
                     current_row += 1
                     headers = ['Course Code', 'Course Name', 'Faculty']
                     for col, header in enumerate(headers, 1):
-                        ws.cell(row=current_row, column=col, value=header).font = Font(bold=True)
+                        ws.cell(row=current_row, column=col, value=header).font = font(bold=True)
                     current_row += 1
                     for course in self_study_courses:
                         if course['department'] == department and course['semester'] == semester:
@@ -523,15 +560,15 @@ def generate_timetable():
                     current_row += 2
                 dept_unscheduled = [c for c in unscheduled_components if c.department == department and c.semester == semester and (c.section == section if num_sections > 1 else True)]
                 if dept_unscheduled:
-                    ws.cell(row=current_row, column=1, value="Unscheduled Components").font = Font(bold=True, size=12, color="FF0000")
+                    ws.cell(row=current_row, column=1, value="Unscheduled Components").font = font(bold=True, size=12, color="FF0000")
                     current_row += 2
                     headers = ['Course Code', 'Course Name', 'Faculty', 'Component', 'Sessions', 'Reason']
                     for col, header in enumerate(headers, 1):
                         cell = ws.cell(row=current_row, column=col, value=header)
-                        cell.font = Font(bold=True)
+                        cell.font = font(bold=True)
                         cell.border = border
-                        cell.fill = PatternFill(start_color="FFE0E0", end_color="FFE0E0", fill_type="solid")
-                        cell.alignment = Alignment(horizontal='center', vertical='center')
+                        cell.fill = solid_fill("FFE0E0")
+                        cell.alignment = alignment(horizontal='center', vertical='center')
                         ws.column_dimensions[get_column_letter(col)].width = 20
                     current_row += 1
                     for comp in dept_unscheduled:
@@ -546,10 +583,10 @@ def generate_timetable():
                         for col, (value, fill) in enumerate(cells, 1):
                             cell = ws.cell(row=current_row, column=col, value=value)
                             cell.border = border
-                            cell.alignment = Alignment(horizontal='left', vertical='center', wrap_text=True)
+                            cell.alignment = alignment(horizontal='left', vertical='center', wrap_text=True)
                         current_row += 1
                     current_row += 2
-                ws.cell(row=current_row, column=1, value="Legend").font = Font(bold=True, size=12)
+                ws.cell(row=current_row, column=1, value="Legend").font = font(bold=True, size=12)
                 current_row += 2
                 ws.column_dimensions['A'].width = 20
                 ws.column_dimensions['B'].width = 40
@@ -558,10 +595,10 @@ def generate_timetable():
                 legend_headers = ['Subject Code', 'Subject Name', 'Faculty', 'Color']
                 for col, header in enumerate(legend_headers, 1):
                     cell = ws.cell(row=current_row, column=col, value=header)
-                    cell.font = Font(bold=True)
+                    cell.font = font(bold=True)
                     cell.border = border
-                    cell.fill = PatternFill(start_color="F0F0F0", end_color="F0F0F0", fill_type="solid")
-                    cell.alignment = Alignment(horizontal='center', vertical='center')
+                    cell.fill = solid_fill("F0F0F0")
+                    cell.alignment = alignment(horizontal='center', vertical='center')
                 current_row += 1
                 for code, color in subject_color_map.items():
                     if code in course_faculty_map:
@@ -570,17 +607,22 @@ def generate_timetable():
                             (code, None),
                             (course_faculty_map[code]['name'], None),
                             (course_faculty_map[code]['faculty'], None),
-                            ('', PatternFill(start_color=color, end_color=color, fill_type="solid"))
+                            ('', solid_fill(color))
                         ]
                         for col, (value, fill) in enumerate(cells, 1):
                             cell = ws.cell(row=current_row, column=col, value=value)
                             cell.border = border
                             if fill:
                                 cell.fill = fill
-                            cell.alignment = Alignment(horizontal='left', vertical='center', wrap_text=True)
+                            cell.alignment = alignment(horizontal='left', vertical='center', wrap_text=True)
                         current_row += 1
+    # Keep a machine-readable copy of the solution for warm starts, re-solves and re-rendering
+    try:
+        build_solution(grids, rooms, batch_info, unscheduled_components).save(SOLUTION_FILE)
+        print(f"Solution saved as {SOLUTION_FILE}")
+    except Exception as e:
+        print(f"Warning: Could not save solution file: {e}")
     # Save to output directory if it exists, otherwise current directory
-    import os
     output_path = 'output/timetable.xlsx' if os.path.exists('output') else 'timetable.xlsx'
     wb.save(output_path)
     print(f"Generated {output_path}")
@@ -8,8 +8,19 @@ from datetime import time, timedelta
 from typing import Dict, List, Tuple, Optional, Set
 from collections import defaultdict
 
+import numpy as np
+
+from optimization.scoring import ScoreEngine
+
 class AlternativeSlotFinder:
-    """Finds alternative time slots for unscheduled courses"""
+    """Finds alternative time slots for unscheduled courses
+
+    The time grid is built once. Availability of every (day, start) is
+    evaluated at once from boolean (day, slot) masks of the section, faculty
+    and room schedules, and priority scores are cached per faculty member,
+    session type and duration, so ranking the suggestions for a component
+    does not loop over the grid.
+    """
     
     def __init__(self, config: dict):
         self.config = config
@@ -17,6 +28,12 @@ class AlternativeSlotFinder:
         self.start_time = time(*map(int, config['timetable_settings']['start_time'].split(':')))
         self.end_time = time(*map(int, config['timetable_settings']['end_time'].split(':')))
         self.slot_duration = config['timetable_settings']['slot_duration_minutes']
+        self.time_slots = self.generate_time_slots()
+        self.slot_count = len(self.time_slots)
+        self._start_labels = [start.strftime('%H:%M') for start, _ in self.time_slots]
+        self._end_labels = [end.strftime('%H:%M') for _, end in self.time_slots]
+        self.scoring = ScoreEngine.from_config(config, self.slot_count)
+        self._scores = {}  # (faculty, kind, duration) -> priority of every (day, start)
         
     def generate_time_slots(self) -> List[Tuple[time, time]]:
         """Generate all available time slots"""
@@ -32,62 +49,96 @@ class AlternativeSlotFinder:
             slots.append((current_time, next_time))
             current_time = next_time
         return slots
+
+    def busy_mask(self, schedule, rooms: bool = False) -> np.ndarray:
+        """(day, slot) grid of the slots taken in a {day: slots} schedule
+
+        Slots are the keys (or members) of each day's entry; with rooms=True
+        the entry maps a slot to its availability and False marks it taken.
+        A boolean array of the grid's shape is returned as it is, so masks
+        built once can be shared between components.
+        """
+        if isinstance(schedule, np.ndarray):
+            return schedule.astype(bool, copy=False)
+        mask = np.zeros((len(self.days), self.slot_count), dtype=bool)
+        days, slots = range(len(self.days)), range(self.slot_count)
+        for day, entry in (schedule or {}).items():
+            if day not in days:
+                continue
+            taken = [slot for slot, free in entry.items() if not free] if rooms else entry
+            mask[day, [slot for slot in taken if slot in slots]] = True
+        return mask
+
+    def start_mask(self, busy: np.ndarray, duration: int) -> np.ndarray:
+        """(day, start) grid of the starts whose duration slots are all free"""
+        starts = self.slot_count - duration + 1
+        if duration < 0 or starts < 1:
+            return np.zeros((len(self.days), 0), dtype=bool)
+        return self._window_sum(busy.astype(np.int32), duration) == 0
+
+    def _window_sum(self, grid: np.ndarray, duration: int) -> np.ndarray:
+        """Sum of grid over every window of duration slots, one column per start"""
+        totals = np.zeros((grid.shape[0], grid.shape[1] + 1), dtype=grid.dtype)
+        np.cumsum(grid, axis=1, out=totals[:, 1:])
+        return totals[:, duration:] - totals[:, :totals.shape[1] - duration]
+
+    def available_starts(self, timetable, course_duration: int,
+                         faculty_schedule, room_availability) -> np.ndarray:
+        busy = (self.busy_mask(timetable) | self.busy_mask(faculty_schedule)
+                | self.busy_mask(room_availability, rooms=True))
+        return self.start_mask(busy, course_duration)
     
     def find_available_slots(self, timetable: Dict, course_duration: int, 
                            faculty_schedule: Dict, room_availability: Dict) -> List[Tuple[int, int]]:
-        """Find available slots for a course"""
-        available_slots = []
-        total_slots = len(self.generate_time_slots())
-        
-        for day in range(len(self.days)):
-            for start_slot in range(total_slots - course_duration + 1):
-                # Check if all required slots are free
-                if self._is_slot_available(day, start_slot, course_duration, 
-                                         timetable, faculty_schedule, room_availability):
-                    available_slots.append((day, start_slot))
-        
-        return available_slots
-    
-    def _is_slot_available(self, day: int, start_slot: int, duration: int,
-                          timetable: Dict, faculty_schedule: Dict, room_availability: Dict) -> bool:
-        """Check if a slot is available"""
-        for i in range(duration):
-            slot_idx = start_slot + i
-            if slot_idx in timetable.get(day, {}):
-                return False
-            if slot_idx in faculty_schedule.get(day, set()):
-                return False
-            if not room_availability.get(day, {}).get(slot_idx, True):
-                return False
-        return True
+        """Find available slots for a course, in day and start order"""
+        available = self.available_starts(timetable, course_duration, faculty_schedule, room_availability)
+        return [(int(day), int(start)) for day, start in zip(*np.nonzero(available))]
+
+    def score_grid(self, faculty: str, kind: str, duration: int) -> np.ndarray:
+        """Priority of every (day, start) from the shared soft-constraint weights (higher is better)
+
+        Same value as -scoring.delta_place for a lone session: only the
+        faculty preference and morning lab terms depend on its time.
+        """
+        key = (faculty, kind, duration)
+        if key not in self._scores:
+            penalty = np.zeros((len(self.days), self.slot_count))
+            days, slots = range(len(self.days)), range(self.slot_count)
+            for day, slot in self.scoring.avoid.get(faculty, ()):
+                if day in days and slot in slots:
+                    penalty[day, slot] += self.scoring.weights['faculty_preferences']
+            if kind == 'LAB':
+                penalty[:, :max(self.scoring.morning_end, 0)] += self.scoring.weights['morning_labs']
+            self._scores[key] = -self._window_sum(penalty, duration)
+        return self._scores[key]
     
     def suggest_alternative_times(self, course_info: dict, timetable: Dict, 
                                 faculty_schedule: Dict, room_availability: Dict) -> List[dict]:
-        """Suggest alternative time slots for a course"""
+        """Best ranked available time slots for a course"""
         course_duration = self._get_course_duration(course_info)
-        available_slots = self.find_available_slots(timetable, course_duration, 
-                                                  faculty_schedule, room_availability)
-        
-        suggestions = []
+        available = self.available_starts(timetable, course_duration, faculty_schedule, room_availability)
+        days, starts = np.nonzero(available)
+        if not len(days):
+            return []
+
         max_suggestions = self.config['scheduling']['conflict_resolution']['max_alternative_suggestions']
-        
-        for day, start_slot in available_slots[:max_suggestions]:
-            time_slots = self.generate_time_slots()
-            start_time = time_slots[start_slot][0]
-            end_time = time_slots[start_slot + course_duration - 1][1]
-            
+        scores = self.score_grid(course_info.get('faculty', ''), course_info.get('type', 'LEC'),
+                                 course_duration)[days, starts]
+        # Stable, so equal scores keep day and start order
+        best = np.argsort(-scores, kind='stable')[:max_suggestions]
+
+        suggestions = []
+        for index in best:
+            day, start_slot = int(days[index]), int(starts[index])
             suggestions.append({
                 'day': self.days[day],
-                'start_time': start_time.strftime('%H:%M'),
-                'end_time': end_time.strftime('%H:%M'),
+                'start_time': self._start_labels[start_slot],
+                'end_time': self._end_labels[start_slot + course_duration - 1],
                 'day_index': day,
                 'slot_index': start_slot,
                 'duration_slots': course_duration,
-                'priority_score': self._calculate_priority_score(day, start_slot, course_duration)
+                'priority_score': float(scores[index])
             })
-        
-        # Sort by priority score (higher is better)
-        suggestions.sort(key=lambda x: x['priority_score'], reverse=True)
         return suggestions
     
     def _get_course_duration(self, course_info: dict) -> int:
@@ -102,28 +153,6 @@ class AlternativeSlotFinder:
             return durations['tutorial_duration_slots']
         else:
             return durations['lecture_duration_slots']  # Default
-    
-    def _calculate_priority_score(self, day: int, start_slot: int, duration: int) -> int:
-        """Calculate priority score for a time slot"""
-        score = 0
-        
-        # Prefer morning slots (9-12)
-        if 0 <= start_slot <= 6:
-            score += 10
-        
-        # Prefer afternoon slots (2-5)
-        elif 10 <= start_slot <= 16:
-            score += 8
-        
-        # Avoid lunch time slots
-        if 7 <= start_slot <= 9:
-            score -= 5
-        
-        # Prefer consecutive days
-        if day in [0, 1, 2, 3]:  # Monday-Thursday
-            score += 5
-        
-        return score
 
 class ConflictAnalyzer:
     """Analyzes and categorizes scheduling conflicts"""
@@ -1,3 +1,4 @@
+import argparse
 import pandas as pd
 import random
 import json
@@ -7,19 +8,41 @@ from datetime import datetime, time as dt_time, timedelta
 from openpyxl import Workbook
 from openpyxl.styles import PatternFill, Border, Side, Alignment, Font
 from openpyxl.utils import get_column_letter
-from collections import defaultdict
+import copy
+from collections import Counter
 import csv
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, List, Tuple, Optional, Set
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, NamedTuple, Tuple, Optional, Set
 import multiprocessing as mp
 
+from optimization.lns import OUTPUT_TIME_SHARE, apply_to_grids, improve_solution
+from optimization.scoring import HARD_CONSTRAINT_WEIGHT, ScoreEngine, score_grids
+from scheduling.feasibility import FeasibilityReport, build_demands, check_feasibility
+from scheduling.solution import (SOLUTION_FILE, Session, Solution, basket_group, catalog_row, grid_sessions,
+                                 lab_room_type, lecture_room_type, split_rooms)
+from utils.solution_render import render_workbook
+from utils.workbook_writer import DEFAULT_BACKEND
+
+DEFAULT_PRIORITY_ORDER = [
+    "core_courses", "basket_electives", "regular_electives",
+    "tutorials", "labs", "self_study"
+]
+
 class TimetableConfig:
     """Configuration manager for timetable settings"""
     
     def __init__(self, config_file: str = 'config.json'):
         self.config = self.load_config(config_file)
         self.setup_logging()
+
+    @classmethod
+    def from_dict(cls, config: dict) -> 'TimetableConfig':
+        """Wrap an already loaded configuration without touching files or logging"""
+        instance = cls.__new__(cls)
+        instance.config = config
+        return instance
         
     def load_config(self, config_file: str) -> dict:
         """Load configuration from JSON file"""
@@ -50,11 +73,16 @@ class TimetableConfig:
             },
             "scheduling": {
                 "max_retry_attempts": 10,
-                "retry_with_different_seeds": True
+                "retry_with_different_seeds": True,
+                "time_limit_seconds": 0
             },
             "optimization": {
                 "enable_parallel_processing": True,
-                "max_workers": 4
+                "max_workers": 4,
+                "lns_time_budget_seconds": 0
+            },
+            "scoring": {
+                "hard_constraint_weight": 1000
             }
         }
     
@@ -73,6 +101,28 @@ class TimetableConfig:
         else:
             logging.disable(logging.CRITICAL)
 
+class UnscheduledComponent(NamedTuple):
+    """A course component that could not be placed in an attempt"""
+    department: str
+    semester: str
+    code: str
+    name: str
+    faculty: str
+    component_type: str
+    reason: str
+
+    def to_conflict(self) -> dict:
+        """Describe this component in the format ConflictResolver expects"""
+        conflict_type = 'room_conflict' if self.reason == 'no_room' else 'faculty_conflict'
+        return {
+            'type': conflict_type,
+            'course': f"{self.code} {self.component_type}",
+            'faculty': self.faculty,
+            'room': '',
+            'department': self.department,
+            'semester': self.semester
+        }
+
 class ConflictResolver:
     """Handles conflict resolution and alternative slot suggestions"""
     
@@ -136,83 +186,180 @@ class OptimizedScheduler:
             'courses_unscheduled': 0
         }
     
-    def generate_timetable_optimized(self, df: pd.DataFrame, rooms: dict) -> dict:
-        """Generate timetable with optimization and conflict resolution"""
+    def generate_timetable_optimized(self, df: pd.DataFrame, rooms: dict,
+                                     deadline: Optional[float] = None) -> dict:
+        """Generate timetable with optimization and conflict resolution
+        
+        With a deadline (a time.time() value) retries stop once it has passed,
+        and the best attempt so far is returned. The first attempt always runs.
+        """
         start_time = time.time()
+        self.deadline = deadline
         
         # Extract settings from config
         settings = self.config.config
-        days = settings['timetable_settings']['days']
         max_retries = settings['scheduling']['max_retry_attempts']
         enable_parallel = settings['optimization']['enable_parallel_processing']
+        max_workers = settings['optimization'].get('max_workers', 1)
+        
+        # Use a different random seed for each attempt
+        if settings['scheduling'].get('retry_with_different_seeds', True):
+            seeds = [42 + attempt for attempt in range(max_retries)]
+        else:
+            seeds = [42]
+        
+        if enable_parallel and max_workers > 1 and len(seeds) > 1:
+            best_result = self._run_seed_portfolio(df, rooms, seeds, max_workers)
+        else:
+            best_result = self._run_seeds_sequential(df, rooms, seeds)
         
+        self.performance_stats['generation_time'] = time.time() - start_time
+        if best_result:
+            self.performance_stats['courses_unscheduled'] = len(best_result['unscheduled_components'])
+        logging.info(f"Generation completed in {self.performance_stats['generation_time']:.2f} seconds")
+        
+        return best_result or {}
+    
+    def _run_seeds_sequential(self, df: pd.DataFrame, rooms: dict, seeds: List[int]) -> Optional[dict]:
+        """Run one attempt per seed in this process, stopping at the first perfect schedule"""
         best_result = None
-        best_score = float('inf')
+        best_key = None
         
-        for attempt in range(max_retries):
-            logging.info(f"Timetable generation attempt {attempt + 1}/{max_retries}")
-            
-            # Use different random seed for each attempt
-            random.seed(42 + attempt)
+        for attempt, seed in enumerate(seeds):
+            logging.info(f"Timetable generation attempt {attempt + 1}/{len(seeds)}")
             
             try:
-                result = self._generate_single_attempt(df, rooms, days, enable_parallel)
-                score = self._calculate_schedule_score(result)
-                
-                if score < best_score:
-                    best_result = result
-                    best_score = score
-                
-                self.performance_stats['retry_attempts'] = attempt + 1
-                
-                # If we have a good enough schedule, break early
-                if score == 0:  # No conflicts
-                    break
-                    
+                result = self.run_attempt(df, rooms, seed)
             except Exception as e:
                 logging.error(f"Attempt {attempt + 1} failed: {e}")
                 continue
+            
+            self.performance_stats['retry_attempts'] = attempt + 1
+            key = (result['score'], seed)
+            if best_key is None or key < best_key:
+                best_result, best_key = result, key
+            
+            # If we have a good enough schedule, break early
+            if not result['unscheduled_components']:
+                break
+            if self._past_deadline():
+                logging.info(f"Time limit reached after {attempt + 1} attempts, keeping the best so far")
+                break
         
-        self.performance_stats['generation_time'] = time.time() - start_time
-        logging.info(f"Generation completed in {self.performance_stats['generation_time']:.2f} seconds")
+        return best_result
+    
+    def _run_seed_portfolio(self, df: pd.DataFrame, rooms: dict, seeds: List[int],
+                            max_workers: int) -> Optional[dict]:
+        """Run independent seeds in worker processes and keep the best schedule
+
+        Without a time limit the pick is the sequential run's: a seed with
+        no unscheduled components stops only the higher seeds, and the
+        lower ones still finish and compete.
+        """
+        context = mp.get_context()
+        stop_seed = context.Value('q', max(seeds) + 1)  # seeds from this one on are not needed
+        results = {}
+        timed_out = False
         
-        return best_result or {}
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(seeds)), mp_context=context,
+                                 initializer=_init_portfolio_worker, initargs=(stop_seed,)) as executor:
+            futures = {executor.submit(_run_portfolio_attempt, self.config.config, df, rooms, seed): seed
+                       for seed in seeds}
+            
+            # Stream scores back as attempts finish
+            for future in as_completed(futures):
+                seed = futures[future]
+                if future.cancelled():
+                    continue
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logging.error(f"Attempt with seed {seed} failed: {e}")
+                    continue
+                if result is None:  # Worker stopped early after a lower seed succeeded
+                    continue
+                
+                results[seed] = result
+                unscheduled = len(result['unscheduled_components'])
+                logging.info(f"Seed {seed} finished: score {result['score']}, {unscheduled} unscheduled "
+                             f"({len(results)}/{len(seeds)})")
+                
+                # A zero-unscheduled schedule cannot be beaten on coverage by a later seed:
+                # stop those. The time limit stops everything once there is something to return
+                if unscheduled == 0 and seed < stop_seed.value:
+                    stop_seed.value = seed + 1
+                    for pending, pending_seed in futures.items():
+                        if pending_seed > seed:
+                            pending.cancel()
+                if self._past_deadline():
+                    timed_out = True
+                    stop_seed.value = min(seeds)
+                    for pending in futures:
+                        pending.cancel()
+                    break
+        
+        self.performance_stats['retry_attempts'] = len(results)
+        # Higher seeds that finished before the stop are not counted, the sequential run never reaches them
+        eligible = [seed for seed in results if timed_out or seed < stop_seed.value]
+        if not eligible:
+            return None
+        best_seed = min(eligible, key=lambda seed: (results[seed]['score'], seed))
+        return results[best_seed]
     
-    def _generate_single_attempt(self, df: pd.DataFrame, rooms: dict, 
-                               days: List[str], enable_parallel: bool) -> dict:
+    def run_attempt(self, df: pd.DataFrame, rooms: dict, seed: int) -> dict:
+        """Generate and score a single timetable attempt for one seed"""
+        random.seed(seed)
+        days = self.config.config['timetable_settings']['days']
+        result = self._generate_single_attempt(df, rooms, days)
+        result['seed'] = seed
+        result['score'] = self._calculate_schedule_score(result, rooms)
+        return result
+    
+    def _generate_single_attempt(self, df: pd.DataFrame, rooms: dict, days: List[str]) -> dict:
         """Generate a single timetable attempt"""
-        # Initialize data structures
-        timetable = {day: {slot: {'type': None, 'code': '', 'name': '', 'faculty': '', 'classroom': ''} 
-                         for slot in range(19)} for day in range(len(days))}
-        professor_schedule = defaultdict(lambda: {day: set() for day in range(len(days))})
-        unscheduled_components = set()
+        # Every attempt starts from a clean copy of the room calendars
+        rooms = copy.deepcopy(rooms)
+        
+        # Initialize data structures, one grid per department-semester
+        timetable = {}
+        professor_schedule = {}
+        # A list: two sessions of one course failing alike are two components
+        unscheduled_components = []
         
         # Priority-based scheduling
         courses_by_priority = self._categorize_courses_by_priority(df)
         
+        complete = True
         for priority, courses in courses_by_priority.items():
-            if enable_parallel and len(courses) > 10:
-                self._schedule_courses_parallel(courses, timetable, professor_schedule, 
-                                              unscheduled_components, rooms)
-            else:
-                self._schedule_courses_sequential(courses, timetable, professor_schedule, 
-                                                unscheduled_components, rooms)
+            if not self._schedule_courses_sequential(courses, timetable, professor_schedule,
+                                                     unscheduled_components, rooms):
+                complete = False
+                break
+        
+        # Group sizes per grid and course, for the room-waste term of the score
+        students = {}
+        for _, course in df.iterrows():
+            size = str(course.get('total_students', ''))
+            key = ((str(course.get('Department', '')), str(course.get('Semester', ''))), str(course['Course Code']))
+            students[key] = int(size) if size.isdigit() else 0
         
         return {
             'timetable': timetable,
             'professor_schedule': professor_schedule,
-            'unscheduled_components': unscheduled_components
+            'unscheduled_components': unscheduled_components,
+            'students': students,
+            'complete': complete
         }
     
     def _categorize_courses_by_priority(self, df: pd.DataFrame) -> dict:
         """Categorize courses by scheduling priority"""
-        priority_order = self.config.config['scheduling']['priority_order']
+        priority_order = self.config.config['scheduling'].get('priority_order', DEFAULT_PRIORITY_ORDER)
         courses_by_priority = {priority: [] for priority in priority_order}
         
         for _, course in df.iterrows():
             code = str(course['Course Code'])
             
-            if code.startswith('B') and '-' in code:
+            if basket_group(code) is not None:
                 courses_by_priority['basket_electives'].append(course)
             elif any(dept in code for dept in ['CS', 'EC', 'MA', 'PH']):
                 courses_by_priority['core_courses'].append(course)
@@ -227,58 +374,182 @@ class OptimizedScheduler:
         
         return courses_by_priority
     
-    def _schedule_courses_parallel(self, courses: List[pd.Series], timetable: dict, 
-                                 professor_schedule: dict, unscheduled_components: set, 
-                                 rooms: dict):
-        """Schedule courses in parallel"""
-        max_workers = self.config.config['optimization']['max_workers']
-        
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = []
-            for course in courses:
-                future = executor.submit(self._schedule_single_course, course, 
-                                       timetable, professor_schedule, rooms)
-                futures.append(future)
-            
-            for future in as_completed(futures):
-                try:
-                    result = future.result()
-                    if result:
-                        unscheduled_components.add(result)
-                except Exception as e:
-                    logging.error(f"Error scheduling course in parallel: {e}")
-    
     def _schedule_courses_sequential(self, courses: List[pd.Series], timetable: dict,
-                                   professor_schedule: dict, unscheduled_components: set,
-                                   rooms: dict):
-        """Schedule courses sequentially"""
+                                   professor_schedule: dict, unscheduled_components: list,
+                                   rooms: dict) -> bool:
+        """Schedule courses sequentially, returns False if the attempt was stopped"""
         for course in courses:
-            result = self._schedule_single_course(course, timetable, professor_schedule, rooms)
-            if result:
-                unscheduled_components.add(result)
+            if _portfolio_stopped():
+                return False
+            unscheduled_components.extend(
+                self._schedule_single_course(course, timetable, professor_schedule, rooms)
+            )
+        return True
     
     def _schedule_single_course(self, course: pd.Series, timetable: dict, 
-                              professor_schedule: dict, rooms: dict) -> Optional[object]:
-        """Schedule a single course (placeholder implementation)"""
-        # This would contain the actual scheduling logic
-        # For now, return None (scheduled successfully)
+                              professor_schedule: dict, rooms: dict) -> List[UnscheduledComponent]:
+        """Place every session of a course, returning the components that did not fit"""
+        settings = self.config.config
+        durations = settings['course_durations']
+        num_days = len(settings['timetable_settings']['days'])
+        num_slots = self._slot_count()
+        
+        department = str(course.get('Department', ''))
+        semester = str(course.get('Semester', ''))
+        code = str(course['Course Code'])
+        name = str(course.get('Course Name', ''))
+        faculty = str(course.get('Faculty', '')).split('/')[0].strip()
+        students = str(course.get('total_students', ''))
+        students = int(students) if students.isdigit() else 0
+        
+        grid = timetable.setdefault((department, semester), {
+            day: {slot: {'type': None, 'code': '', 'name': '', 'faculty': '', 'classroom': ''}
+                  for slot in range(num_slots)} for day in range(num_days)})
+        faculty_days = professor_schedule.setdefault(faculty, {day: set() for day in range(num_days)})
+        
+        lectures, tutorials, labs = self._required_sessions(course)
+        components = [
+            ('LEC', lectures, durations['lecture_duration_slots'], 'LECTURE_ROOM'),
+            ('TUT', tutorials, durations['tutorial_duration_slots'], 'LECTURE_ROOM'),
+            ('LAB', labs, durations['lab_duration_slots'], lab_room_type(code))
+        ]
+        
+        unscheduled = []
+        for component_type, sessions, duration, room_type in components:
+            for _ in range(sessions):
+                reason = self._place_session(grid, faculty_days, rooms, code, name, faculty,
+                                             component_type, duration, room_type, students)
+                if reason:
+                    unscheduled.append(UnscheduledComponent(department, semester, code, name,
+                                                            faculty, component_type, reason))
+        return unscheduled
+    
+    def _place_session(self, grid: dict, faculty_days: dict, rooms: dict, code: str, name: str,
+                       faculty: str, component_type: str, duration: int, room_type: str,
+                       students: int) -> Optional[str]:
+        """Try every (day, start) in random order, returns None on success or a failure reason"""
+        candidates = [(day, start) for day in grid for start in range(len(grid[day]) - duration + 1)]
+        random.shuffle(candidates)
+        saw_free_time = False
+        
+        for day, start in candidates:
+            span = range(start, start + duration)
+            if any(grid[day][slot]['type'] is not None or slot in faculty_days[day] for slot in span):
+                continue
+            saw_free_time = True
+            
+            room_id = self._find_room(rooms, room_type, students, day, span)
+            if room_id is None:
+                continue
+            
+            for i, slot in enumerate(span):
+                faculty_days[day].add(slot)
+                rooms[room_id]['schedule'][day].add(slot)
+                grid[day][slot] = {
+                    'type': component_type,
+                    'code': code if i == 0 else '',
+                    'name': name if i == 0 else '',
+                    'faculty': faculty if i == 0 else '',
+                    'classroom': room_id if i == 0 else ''
+                }
+            return None
+        
+        return 'no_room' if saw_free_time else 'no_common_free_slot'
+    
+    def _find_room(self, rooms: dict, room_type: str, students: int, day: int, span: range) -> Optional[str]:
+        """Return the first free room of the required type and capacity"""
+        for room_id, room in rooms.items():
+            current_type = room['type'].upper()
+            if room_type == 'LECTURE_ROOM':
+                if not ('LECTURE_ROOM' in current_type or 'SEATER' in current_type):
+                    continue
+                if room['capacity'] < students:
+                    continue
+            elif current_type != room_type:
+                continue
+            
+            if not any(slot in room['schedule'][day] for slot in span):
+                return room_id
         return None
     
-    def _calculate_schedule_score(self, result: dict) -> int:
-        """Calculate a score for the schedule quality (lower is better)"""
+    def _required_sessions(self, course: pd.Series) -> Tuple[int, int, int]:
+        """Number of lecture, tutorial and lab sessions a course needs"""
+        def value(column):
+            raw = course.get(column, 0)
+            return float(raw) if pd.notna(raw) else 0
+        
+        l, t, p = value('L'), value('T'), value('P')
+        lectures = max(1, round(l * 2/3)) if l > 0 else 0
+        return lectures, int(t), int(p) // 2
+    
+    def _slot_count(self) -> int:
+        """Number of slots per day from the configured start/end times"""
+        settings = self.config.config['timetable_settings']
+        start = datetime.strptime(settings['start_time'], '%H:%M')
+        end = datetime.strptime(settings['end_time'], '%H:%M')
+        return int((end - start).total_seconds() // 60) // settings.get('slot_duration_minutes', 30)
+    
+    def _past_deadline(self) -> bool:
+        deadline = getattr(self, 'deadline', None)
+        return deadline is not None and time.time() >= deadline
+    
+    def scoring_engine(self) -> ScoreEngine:
+        """Empty soft-constraint engine with the configured weights"""
+        return ScoreEngine.from_config(self.config.config, self._slot_count())
+    
+    def _calculate_schedule_score(self, result: dict, rooms: Optional[dict] = None) -> float:
+        """Calculate a score for the schedule quality (lower is better)
+        
+        Unscheduled components and clashes dominate, the weighted soft
+        constraints of the scoring engine break ties between attempts.
+        """
         if not result:
             return float('inf')
         
         unscheduled_count = len(result.get('unscheduled_components', []))
         conflicts = self._count_conflicts(result.get('timetable', {}))
+        hard_weight = self.config.config.get('scoring', {}).get('hard_constraint_weight', HARD_CONSTRAINT_WEIGHT)
         
-        return unscheduled_count + conflicts
+        quality = score_grids(self.scoring_engine(), result.get('timetable', {}), rooms or {},
+                              result.get('students'))
+        return (unscheduled_count + conflicts) * hard_weight + round(quality, 2)
     
     def _count_conflicts(self, timetable: dict) -> int:
-        """Count conflicts in the timetable"""
-        conflicts = 0
-        # Implementation would check for overlapping schedules, etc.
-        return conflicts
+        """Count double-booked faculty and room slots across all grids"""
+        faculty_slots, room_slots = {}, {}
+        for grid in timetable.values():
+            for day, start, duration, cell in grid_sessions(grid):
+                for slot in range(start, start + duration):
+                    if cell['faculty']:
+                        faculty_slots.setdefault((cell['faculty'], day, slot), set()).add(cell['code'])
+                    for room in split_rooms(cell['classroom']):
+                        room_slots.setdefault((room, day, slot), set()).add(cell['code'])
+        
+        # The same course in two grids at once is a combined class, not a clash
+        return sum(len(codes) - 1 for calendar in (faculty_slots, room_slots) for codes in calendar.values())
+
+# Set in portfolio worker processes: seeds from _portfolio_stop_seed on stop early
+_portfolio_stop_seed = None
+_portfolio_seed = None
+
+def _init_portfolio_worker(stop_seed):
+    """Process pool initializer for the seed portfolio"""
+    global _portfolio_stop_seed
+    _portfolio_stop_seed = stop_seed
+
+def _portfolio_stopped() -> bool:
+    return (_portfolio_stop_seed is not None and _portfolio_seed is not None
+            and _portfolio_seed >= _portfolio_stop_seed.value)
+
+def _run_portfolio_attempt(config: dict, df: pd.DataFrame, rooms: dict, seed: int) -> Optional[dict]:
+    """Run one seed in a worker process, returns None if stopped early"""
+    global _portfolio_seed
+    _portfolio_seed = seed
+    if _portfolio_stopped():
+        return None
+    scheduler = OptimizedScheduler(TimetableConfig.from_dict(config))
+    result = scheduler.run_attempt(df, rooms, seed)
+    return result if result['complete'] else None
 
 class EnhancedTimetableGenerator:
     """Main timetable generator with enhanced features"""
@@ -371,19 +642,50 @@ class EnhancedTimetableGenerator:
                    'schedule': {day: set() for day in range(len(self.DAYS))}}
         }
     
-    def generate_timetable(self):
-        """Main timetable generation function"""
+    def check_feasibility(self, df: pd.DataFrame, rooms: dict) -> FeasibilityReport:
+        """Supply/demand pre-check of the inputs, cheap enough to run before every generation"""
+        durations = self.config.config['course_durations']
+        demands = build_demands(df.to_dict('records'),
+                                {'LEC': durations['lecture_duration_slots'],
+                                 'TUT': durations['tutorial_duration_slots'],
+                                 'LAB': durations['lab_duration_slots'],
+                                 'SS': durations['self_study_duration_slots']},
+                                max_batch_size=None)
+        return check_feasibility(demands, rooms, len(self.DAYS), self.scheduler._slot_count())
+    
+    def generate_timetable(self, time_limit: Optional[float] = None):
+        """Main timetable generation function
+        
+        time_limit (seconds, default scheduling.time_limit_seconds) makes the
+        run anytime: retries stop at the deadline and the large-neighbourhood
+        search improves the best attempt with whatever time is left.
+        """
         logging.info("Starting enhanced timetable generation")
+        started = time.time()
+        if time_limit is None:
+            time_limit = self.config.config['scheduling'].get('time_limit_seconds', 0)
+        deadline = started + time_limit * (1 - OUTPUT_TIME_SHARE) if time_limit else None
         
         # Load data
         df, rooms = self.load_data()
+        report = self.check_feasibility(df, rooms)
+        logging.info(report.summary())
+        for line in report.lines():
+            logging.warning(f"Infeasible: {line}")
         
         # Generate timetable with optimization
-        result = self.scheduler.generate_timetable_optimized(df, rooms)
+        result = self.scheduler.generate_timetable_optimized(df, rooms, deadline)
         
         if result:
+            # Optional ruin-and-recreate post-pass, until the deadline when there is one
+            time_budget = self.config.config.get('optimization', {}).get('lns_time_budget_seconds', 0)
+            if deadline is not None:
+                time_budget = deadline - time.time()
+            if time_budget > 0 and (result.get('unscheduled_components') or deadline is not None):
+                self._improve_result(result, df, rooms, time_budget)
+            
             # Generate Excel output
-            self._create_excel_output(result, df)
+            self._create_excel_output(result, df, rooms)
             
             # Log performance statistics
             self._log_performance_stats()
@@ -391,18 +693,87 @@ class EnhancedTimetableGenerator:
             # Generate conflict resolution suggestions
             if result.get('unscheduled_components'):
                 suggestions = self.scheduler.conflict_resolver.suggest_conflict_resolution(
-                    list(result['unscheduled_components'])
+                    [component.to_conflict() for component in result['unscheduled_components']]
                 )
                 self._save_conflict_suggestions(suggestions)
         
         logging.info("Timetable generation completed")
     
-    def _create_excel_output(self, result: dict, df: pd.DataFrame):
-        """Create Excel output file"""
-        # Implementation would create the Excel file
-        output_file = self.config.config['files']['output_file']
-        logging.info(f"Creating Excel output: {output_file}")
-        # Placeholder - would contain the actual Excel generation logic
+    def _result_solution(self, result: dict, df: pd.DataFrame, rooms: dict) -> Solution:
+        """Convert an attempt's grids and unscheduled components into a Solution"""
+        durations = self.config.config['course_durations']
+        meta = {
+            'days': list(self.DAYS),
+            'slots': [self._slot_label(slot) for slot in range(self.scheduler._slot_count())],
+            'durations': {'LEC': durations['lecture_duration_slots'], 'TUT': durations['tutorial_duration_slots'],
+                          'LAB': durations['lab_duration_slots'], 'SS': durations['self_study_duration_slots']},
+            'rooms': {room_id: {'type': room['type'], 'capacity': room['capacity'],
+                                'roomNumber': room.get('roomNumber', '')} for room_id, room in rooms.items()},
+            'courses': [catalog_row(row.get('Department', ''), str(row.get('Semester', '')), row)
+                        for _, row in df.iterrows()],
+            'sections': [{'department': department, 'semester': semester, 'section': 0,
+                          'title': f"{department}_{semester}", 'students': 0}
+                         for department, semester in result['timetable']],
+            'unscheduled': [{'department': c.department, 'semester': c.semester, 'section': 0, 'code': c.code,
+                             'name': c.name, 'faculty': c.faculty, 'component_type': c.component_type,
+                             'reason': c.reason} for c in result['unscheduled_components']],
+        }
+        solution = Solution([], meta)
+        
+        for (department, semester), grid in result['timetable'].items():
+            for day, start, duration, cell in grid_sessions(grid):
+                course = solution.course(department, semester, cell['code']) or {}
+                students = str(course.get('students', '')).split('.')[0]
+                students = int(students) if students.isdigit() else 0
+                room_type = lab_room_type(cell['code']) if cell['type'] == 'LAB' else lecture_room_type(students)
+                solution.sessions.append(Session(department, semester, 0, cell['code'], cell['name'],
+                                                 cell['faculty'], cell['type'], day, start, duration,
+                                                 split_rooms(cell['classroom']), students, room_type))
+        return solution
+    
+    def _improve_result(self, result: dict, df: pd.DataFrame, rooms: dict, time_budget: float):
+        """Retry unscheduled components with the large-neighbourhood search, updating the grids"""
+        lns_result = improve_solution(self._result_solution(result, df, rooms), time_budget, result.get('seed'),
+                                      scoring=self.scheduler.scoring_engine())
+        logging.info(f"Large-neighbourhood search: {lns_result.summary()}")
+        
+        apply_to_grids(lns_result, {(department, semester, 0): grid
+                                    for (department, semester), grid in result['timetable'].items()})
+        remaining = Counter((entry['department'], str(entry['semester']), entry['code'], entry['component_type'])
+                            for entry in lns_result.solution.meta['unscheduled'])
+        still_unscheduled = []
+        for c in result['unscheduled_components']:
+            key = (c.department, str(c.semester), c.code, c.component_type)
+            if remaining[key] > 0:
+                remaining[key] -= 1
+                still_unscheduled.append(c)
+        result['unscheduled_components'] = still_unscheduled
+        result['score'] = self.scheduler._calculate_schedule_score(result, rooms)
+        self.scheduler.performance_stats['courses_unscheduled'] = len(result['unscheduled_components'])
+    
+    def _slot_label(self, slot: int) -> str:
+        """'09:00-09:30' style label of a slot index"""
+        minutes = self.config.config['timetable_settings'].get('slot_duration_minutes', 30)
+        start = datetime.combine(datetime.today(), self.START_TIME) + timedelta(minutes=slot * minutes)
+        return f"{start.strftime('%H:%M')}-{(start + timedelta(minutes=minutes)).strftime('%H:%M')}"
+    
+    def _create_excel_output(self, result: dict, df: pd.DataFrame, rooms: dict):
+        """Save the solution, then render the Excel output from it"""
+        files = self.config.config['files']
+        output_file = files['output_file']
+        solution_file = files.get('solution_file',
+                                  os.path.join(os.path.dirname(output_file), SOLUTION_FILE))
+        solution = self._result_solution(result, df, rooms)
+        os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+        try:
+            solution.save(solution_file)
+            logging.info(f"Solution saved as {solution_file}")
+        except Exception as e:
+            logging.warning(f"Could not save solution file: {e}")
+        
+        backend = self.config.config.get('output', {}).get('excel_backend', DEFAULT_BACKEND)
+        logging.info(f"Creating Excel output: {output_file} ({backend} backend)")
+        render_workbook(solution, output_file, backend=backend)
     
     def _log_performance_stats(self):
         """Log performance statistics"""
@@ -418,6 +789,25 @@ class EnhancedTimetableGenerator:
             json.dump(suggestions, f, indent=2)
         logging.info("Conflict suggestions saved to conflict_suggestions.json")
 
-if __name__ == "__main__":
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='run.py enhanced',
+                                     description='Generate timetables with retries, optimization and '
+                                                 'conflict resolution')
+    parser.add_argument('--time-limit', type=float, metavar='SECONDS',
+                        help='return the best timetable found within this many seconds '
+                             '(default: scheduling.time_limit_seconds in config.json)')
+    parser.add_argument('--check-only', action='store_true',
+                        help='only check that rooms, faculty and sections can fit, exit 1 if they cannot')
+    args = parser.parse_args(argv)
+
     generator = EnhancedTimetableGenerator()
-    generator.generate_timetable()
+    if args.check_only:
+        report = generator.check_feasibility(*generator.load_data())
+        print(report.summary())
+        for line in report.lines():
+            print(f"  Infeasible: {line}")
+        sys.exit(0 if report.ok else 1)
+    generator.generate_timetable(args.time_limit)
+
+if __name__ == "__main__":
+    main()
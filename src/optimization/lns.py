@@ -0,0 +1,326 @@
+"""
+Ruin-and-recreate large-neighbourhood search over a saved solution.
+
+Labs are the components most likely to stay unscheduled: they are long,
+need a lab of the right type and sometimes two adjacent labs. The first
+pass of a generator never revisits them. This post-pass does:
+
+1. turn the solution's unscheduled entries back into unplaced sessions
+2. pick a neighbourhood: every session on one day in the sections that
+   still have pending work, or every session in a small cluster of
+   neighbouring rooms of one type
+3. remove those sessions and re-insert them together with the pending
+   ones, labs and large groups first, using the candidate-enumeration
+   placer with a shuffled day order
+4. keep the result only if every removed session is back, and fewer
+   sessions are unplaced or as many with a better score; otherwise
+   restore the previous placements
+
+It repeats until the time budget runs out or nothing is left to place.
+"""
+
+import argparse
+import random
+import time
+
+from optimization.scoring import score_solution, session_placement
+from scheduling.placement import Placer, is_block_lecture
+from scheduling.solution import Session, Solution, int_value, lab_room_type, lecture_room_type
+
+DEFAULT_TIME_BUDGET = 10.0
+
+# Share of a generator's time limit kept for writing the workbooks after the search stops
+OUTPUT_TIME_SHARE = 0.2
+
+# Neighbouring rooms of one type that are ruined together
+CLUSTER_SIZE = 4
+
+class _ShuffledPlacer(Placer):
+    """Placer that tries days in a random order, so every recreate explores differently"""
+
+    def __init__(self, solution, rng, scoring=None, **kwargs):
+        super().__init__(solution, **kwargs)
+        self.rng = rng
+        self.scoring = scoring
+        # Generators may put two sessions of a course on one day, those days stay allowed
+        self.home_days = {idx: session.day for idx, session in enumerate(solution.sessions) if session.placed}
+
+    def _same_course_on_day(self, idx, session, day):
+        return self.home_days.get(idx) != day and super()._same_course_on_day(idx, session, day)
+
+    def candidates(self, idx, session, preferred=None):
+        if preferred is not None:
+            yield preferred
+        days = list(range(len(self.solution.days)))
+        self.rng.shuffle(days)
+        for day in days:
+            for start in range(self.solution.slot_count - session.duration + 1):
+                if (day, start) != preferred:
+                    yield day, start
+
+    def place(self, idx, preferred=None):
+        """First feasible candidate, or the best scoring one when a score engine is attached"""
+        if self.scoring is None:
+            return super().place(idx, preferred)
+        session = self.solution.sessions[idx]
+        best = None
+        for day, start in self.candidates(idx, session, preferred):
+            if not self.fits(idx, session, day, start):
+                continue
+            rooms = self.find_rooms(session, day, start)
+            if rooms is None:
+                continue
+            delta = self.scoring.delta_place(session_placement(session, self.rooms, day, start, rooms))
+            if best is None or delta < best[0]:
+                best = (delta, day, start, rooms)
+        if best is None:
+            return False
+        self.assign(idx, *best[1:])
+        return True
+
+    # Keep the score engine in step with every placement
+
+    def assign(self, idx, day, start, rooms):
+        super().assign(idx, day, start, rooms)
+        if self.scoring is not None:
+            self.scoring.place(idx, session_placement(self.solution.sessions[idx], self.rooms))
+
+    def unplace(self, idx):
+        super().unplace(idx)
+        if self.scoring is not None:
+            self.scoring.remove(idx)
+
+
+class LNSResult:
+    """Outcome of a large-neighbourhood search run"""
+
+    def __init__(self, solution, changes, iterations, accepted, unplaced_before, unplaced_after, elapsed):
+        self.solution = solution
+        self.changes = changes  # (session, previous (day, start, rooms) or None) per moved or new session
+        self.iterations = iterations
+        self.accepted = accepted
+        self.unplaced_before = unplaced_before
+        self.unplaced_after = unplaced_after
+        self.elapsed = elapsed
+
+    def summary(self):
+        return (f"{self.unplaced_before - self.unplaced_after} of {self.unplaced_before} unscheduled sessions "
+                f"placed, {len(self.changes)} sessions changed, {self.accepted}/{self.iterations} "
+                f"neighbourhoods accepted in {self.elapsed:.1f} s")
+
+
+def pending_sessions(solution):
+    """Unplaced sessions for the solution's unscheduled entries, as (entry index, session)"""
+    section_students = {(entry['department'], str(entry['semester']), entry['section']): entry.get('students', 0)
+                        for entry in solution.meta['sections']}
+    pending = []
+    for pos, entry in enumerate(solution.meta['unscheduled']):
+        kind, code = entry.get('component_type'), str(entry.get('code', ''))
+        if kind not in solution.meta['durations'] or is_block_lecture(kind, code):
+            continue
+        section = int_value(entry.get('section'))
+        course = solution.course(entry['department'], entry['semester'], code) or {}
+        students = (int_value(course.get('students'))
+                    or int_value(section_students.get((str(entry['department']), str(entry['semester']), section))))
+        room_type = lab_room_type(code) if kind == 'LAB' else lecture_room_type(students)
+        for _ in range(max(1, int_value(entry.get('sessions', 1)))):
+            pending.append((pos, Session(entry['department'], entry['semester'], section, code,
+                                         entry.get('name', ''), entry.get('faculty', ''), kind, None, None,
+                                         solution.duration(kind), students=students, room_type=room_type)))
+    return pending
+
+
+def room_clusters(rooms):
+    """Groups of up to CLUSTER_SIZE neighbouring room ids of the same type"""
+    by_type = {}
+    for room_id, room in sorted(rooms.items()):
+        if room['type'].upper() != 'LIBRARY':
+            by_type.setdefault(room['type'].upper(), []).append(room_id)
+    clusters = []
+    for room_type, room_ids in sorted(by_type.items()):
+        for i in range(0, len(room_ids), CLUSTER_SIZE):
+            clusters.append((room_type, set(room_ids[i:i + CLUSTER_SIZE])))
+    return clusters
+
+
+def _neighbourhood(solution, movable, pending_idx, clusters, rng):
+    """Indexes of placed sessions to ruin: one day of the busy sections, or one room cluster"""
+    sessions = solution.sessions
+    targets = [sessions[idx] for idx in pending_idx if not sessions[idx].placed]
+    wanted = {s.room_type for s in targets}
+
+    if clusters and rng.random() < 0.5:
+        # Prefer clusters of the room types pending sessions are waiting for
+        preferred = [cluster for cluster in clusters if cluster[0] in wanted] or clusters
+        _, room_ids = rng.choice(preferred)
+        return [idx for idx in movable if set(sessions[idx].rooms) & room_ids]
+
+    day = rng.randrange(len(solution.days))
+    sections = {s.section_key for s in targets}
+    return [idx for idx in movable if sessions[idx].day == day
+            and (not sections or sessions[idx].section_key in sections)]
+
+
+def _insertion_order(sessions, indexes, rng):
+    """Labs first, then longer and larger sessions, random among equals"""
+    keyed = [(sessions[idx].kind != 'LAB', -sessions[idx].duration, -sessions[idx].students, rng.random(), idx)
+             for idx in indexes]
+    return [item[-1] for item in sorted(keyed)]
+
+
+def improve_solution(solution, time_budget=DEFAULT_TIME_BUDGET, seed=None, scoring=None, max_iterations=None):
+    """Run ruin-and-recreate on a copy of the solution within time_budget seconds
+
+    scoring is an optional empty optimization.scoring.ScoreEngine. It is
+    updated with every placement and its total breaks ties between
+    neighbourhoods that leave the same number of sessions unplaced.
+    """
+    started = time.perf_counter()
+    deadline = started + max(0.0, time_budget)
+    rng = random.Random(seed)
+
+    original = solution
+    solution = Solution([s.copy() for s in original.sessions], dict(original.meta))
+    solution.meta['unscheduled'] = list(original.meta['unscheduled'])
+    first_pending = len(solution.sessions)
+    pending = pending_sessions(solution)
+    solution.sessions.extend(session for _, session in pending)
+    pending_idx = list(range(first_pending, len(solution.sessions)))
+
+    if scoring is not None:
+        score_solution(scoring, solution)
+    placer = _ShuffledPlacer(solution, rng, scoring,
+                             blocked_faculty_days={tuple(entry) for entry in solution.meta['unavailable']})
+    # Shared basket blocks and sessions without a faculty stay where they are
+    movable = [idx for idx, s in enumerate(solution.sessions[:first_pending])
+               if s.placed and s.faculty and not is_block_lecture(s.kind, s.code)]
+    clusters = room_clusters(placer.rooms)
+
+    def evaluate():
+        unplaced = sum(1 for idx in pending_idx if not solution.sessions[idx].placed)
+        return unplaced, (round(scoring.total, 6) if scoring is not None else 0)
+
+    # Greedy insertion first, then ruin and recreate
+    for idx in _insertion_order(solution.sessions, pending_idx, rng):
+        placer.place(idx)
+    best = evaluate()
+    unplaced_before = len(pending_idx)
+
+    iterations = accepted = 0
+    while time.perf_counter() < deadline and (best[0] or scoring is not None):
+        if max_iterations is not None and iterations >= max_iterations:
+            break
+        iterations += 1
+
+        ruined = _neighbourhood(solution, movable, pending_idx, clusters, rng)
+        touched = ruined + [idx for idx in pending_idx if not solution.sessions[idx].placed]
+        snapshot = {idx: (solution.sessions[idx].day, solution.sessions[idx].start, solution.sessions[idx].rooms)
+                    for idx in touched}
+        for idx in ruined:
+            placer.unplace(idx)
+        for idx in _insertion_order(solution.sessions, touched, rng):
+            placer.place(idx, preferred=snapshot[idx][:2] if snapshot[idx][0] is not None else None)
+
+        # Pending sessions that took the only place of a ruined one give way and try again after it
+        if not all(solution.sessions[idx].placed for idx in ruined):
+            newcomers = [idx for idx in touched if snapshot[idx][0] is None and solution.sessions[idx].placed]
+            for idx in newcomers:
+                placer.unplace(idx)
+            for idx in ruined:
+                if not solution.sessions[idx].placed:
+                    placer.place(idx, preferred=snapshot[idx][:2])
+            for idx in newcomers:
+                placer.place(idx)
+
+        # Every ruined session has to find a place again, pending ones may stay out
+        current = evaluate()
+        if current < best and all(solution.sessions[idx].placed for idx in ruined):
+            best = current
+            accepted += 1
+            continue
+
+        # Restore the previous placements
+        for idx in touched:
+            placer.unplace(idx)
+        for idx, (day, start, rooms) in snapshot.items():
+            if day is not None:
+                placer.assign(idx, day, start, rooms)
+
+    # Sessions that moved or were newly placed, in input order
+    changes = []
+    for idx, session in enumerate(solution.sessions[:first_pending]):
+        before = original.sessions[idx]
+        if (session.day, session.start, session.rooms) != (before.day, before.start, before.rooms):
+            changes.append((session, (before.day, before.start, before.rooms) if before.placed else None))
+
+    # Placed pending sessions join the solution, the rest stay unscheduled entries
+    still_pending = {}
+    placed_pending = []
+    for (pos, _), idx in zip(pending, pending_idx):
+        session = solution.sessions[idx]
+        if session.placed:
+            placed_pending.append(session)
+            changes.append((session, None))
+        else:
+            still_pending[pos] = still_pending.get(pos, 0) + 1
+    pending_positions = {pos for pos, _ in pending}
+    unscheduled = []
+    for pos, entry in enumerate(solution.meta['unscheduled']):
+        if pos not in pending_positions:
+            unscheduled.append(entry)
+        elif pos in still_pending:
+            unscheduled.append(dict(entry, sessions=still_pending[pos]))
+    solution.sessions = solution.sessions[:first_pending] + placed_pending
+    solution.meta['unscheduled'] = unscheduled
+
+    return LNSResult(solution, changes, iterations, accepted, unplaced_before, best[0],
+                     time.perf_counter() - started)
+
+
+def apply_to_grids(result, grids):
+    """Copy LNS moves into generator section grids keyed by (department, semester, section)"""
+    def grid_for(session):
+        for key, grid in grids.items():
+            if (str(key[0]), str(key[1]), key[2]) == (session.department, str(session.semester), session.section):
+                return grid
+        return None
+
+    # Clear every old position first so moves into freed slots are not overwritten
+    for session, previous in result.changes:
+        grid = grid_for(session)
+        if grid is None or previous is None:
+            continue
+        day, start, _ = previous
+        for slot in range(start, start + session.duration):
+            grid[day][slot] = {'type': None, 'code': '', 'name': '', 'faculty': '', 'classroom': ''}
+
+    for session, _ in result.changes:
+        grid = grid_for(session)
+        if grid is None or not session.placed:
+            continue
+        for i, slot in enumerate(session.slots):
+            grid[session.day][slot] = {
+                'type': session.kind,
+                'code': session.code if i == 0 else '',
+                'name': session.name if i == 0 else '',
+                'faculty': session.faculty if i == 0 else '',
+                'classroom': '+'.join(session.rooms) if i == 0 else '',
+            }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='run.py improve',
+                                     description='Place unscheduled sessions of a saved solution by '
+                                                 'ruin-and-recreate search')
+    parser.add_argument('solution', help='solution JSON written by a generator')
+    parser.add_argument('--time-budget', type=float, default=DEFAULT_TIME_BUDGET, metavar='SECONDS',
+                        help=f'search time in seconds (default: {DEFAULT_TIME_BUDGET:g})')
+    parser.add_argument('--seed', type=int, help='random seed for reproducible runs')
+    parser.add_argument('--output', help='where to write the improved solution (default: overwrite)')
+    args = parser.parse_args(argv)
+
+    result = improve_solution(Solution.load(args.solution), args.time_budget, args.seed)
+    print(result.summary())
+    path = result.solution.save(args.output or args.solution)
+    print(f"Improved solution saved as {path}")
+    return result
@@ -0,0 +1,285 @@
+"""
+Weighted soft-constraint scoring of a timetable.
+
+Hard constraints (clashes, unscheduled sessions) are counted by the
+generators. This engine scores how good a valid timetable is, lower is
+better. Its terms are:
+
+- faculty_preferences: slots falling in times a faculty member asked to keep free
+- morning_labs: lab slots before the end of the morning block
+- idle_gaps: free slots between a section's first and last session of a day
+- faculty_spread: free slots between a faculty member's first and last session of a day
+- room_waste: empty seats in the rooms a session uses
+
+The engine keeps the occupancy of every section-day and faculty-day. The
+delta of placing, moving or swapping sessions therefore only looks at the
+one or two days involved and does not grow with the size of the timetable.
+"""
+
+from datetime import datetime
+
+from scheduling.solution import grid_sessions, split_rooms
+
+DEFAULT_WEIGHTS = {
+    'faculty_preferences': 5.0,
+    'morning_labs': 1.0,
+    'idle_gaps': 2.0,
+    'faculty_spread': 0.5,
+    'room_waste': 0.02,
+}
+
+TERMS = tuple(DEFAULT_WEIGHTS)
+
+# Unscheduled sessions and clashes always outweigh soft terms
+HARD_CONSTRAINT_WEIGHT = 1000
+
+
+class Placement:
+    """What the engine needs to know about one placed session"""
+
+    __slots__ = ('section', 'faculty', 'kind', 'day', 'start', 'duration', 'students', 'seats')
+
+    def __init__(self, section, faculty, kind, day, start, duration, students=0, seats=0):
+        self.section = section    # any hashable section key, None to skip the gap term
+        self.faculty = faculty
+        self.kind = kind
+        self.day = day
+        self.start = start
+        self.duration = duration
+        self.students = students
+        self.seats = seats        # total capacity of the rooms used, 0 if unknown
+
+    @property
+    def slots(self):
+        return range(self.start, self.start + self.duration)
+
+    def moved(self, day, start, seats=None):
+        return Placement(self.section, self.faculty, self.kind, day, start, self.duration, self.students,
+                         self.seats if seats is None else seats)
+
+    def __repr__(self):
+        return f"Placement({self.section}, {self.kind}, day {self.day}, slot {self.start})"
+
+
+def _slot_index(value, start_time, slot_minutes):
+    minutes = (datetime.strptime(value, '%H:%M') - datetime.strptime(start_time, '%H:%M')).total_seconds() // 60
+    return int(minutes // slot_minutes)
+
+
+class ScoreEngine:
+    """Incremental weighted score of a set of placements keyed by any hashable id"""
+
+    def __init__(self, slot_count, weights=None, morning_end=7, breaks=None, avoid=None):
+        self.slot_count = slot_count
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.morning_end = morning_end
+        self.breaks = {str(semester): set(slots) for semester, slots in (breaks or {}).items()}
+        self.avoid = {faculty: set(slots) for faculty, slots in (avoid or {}).items()}  # faculty -> {(day, slot)}
+        self.placements = {}
+        self.terms = dict.fromkeys(TERMS, 0.0)  # unweighted totals
+        self._sections = {}  # (section, day) -> sessions per slot
+        self._faculty = {}   # (faculty, day) -> sessions per slot
+
+    @classmethod
+    def from_config(cls, config, slot_count, breaks=None):
+        """Engine with weights and faculty preferences from the 'scoring' config section
+
+        Preferences map a faculty name to avoid_days (day names) and
+        avoid_before / avoid_after times, e.g. {"avoid_days": ["Friday"],
+        "avoid_before": "10:00"}.
+        """
+        settings = config.get('timetable_settings', {})
+        scoring = config.get('scoring', {})
+        days = settings.get('days', [])
+        start_time = settings.get('start_time', '09:00')
+        slot_minutes = settings.get('slot_duration_minutes', 30)
+
+        avoid = {}
+        for faculty, preference in scoring.get('faculty_preferences', {}).items():
+            slots = set()
+            for day_name in preference.get('avoid_days', []):
+                if day_name in days:
+                    slots.update((days.index(day_name), slot) for slot in range(slot_count))
+            if preference.get('avoid_before'):
+                before = _slot_index(preference['avoid_before'], start_time, slot_minutes)
+                slots.update((day, slot) for day in range(len(days)) for slot in range(min(before, slot_count)))
+            if preference.get('avoid_after'):
+                after = _slot_index(preference['avoid_after'], start_time, slot_minutes)
+                slots.update((day, slot) for day in range(len(days)) for slot in range(max(after, 0), slot_count))
+            avoid[faculty] = slots
+
+        morning_end = _slot_index(scoring.get('morning_end', '12:30'), start_time, slot_minutes)
+        return cls(slot_count, scoring.get('weights'), morning_end, breaks, avoid)
+
+    # Term evaluation
+
+    def _local(self, p):
+        """Terms that only depend on the session itself"""
+        terms = dict.fromkeys(TERMS, 0)
+        avoid = self.avoid.get(p.faculty)
+        if avoid:
+            terms['faculty_preferences'] = sum(1 for slot in p.slots if (p.day, slot) in avoid)
+        if p.kind == 'LAB':
+            terms['morning_labs'] = sum(1 for slot in p.slots if slot < self.morning_end)
+        if p.seats and p.students:
+            terms['room_waste'] = max(0, p.seats - p.students)
+        return terms
+
+    def _gaps(self, counts, skip=()):
+        """Free slots between the first and last occupied slot"""
+        occupied = [slot for slot, count in enumerate(counts) if count]
+        if not occupied:
+            return 0
+        return sum(1 for slot in range(occupied[0], occupied[-1] + 1) if not counts[slot] and slot not in skip)
+
+    def _section_skip(self, section):
+        try:
+            semester = str(section[1])
+            return self.breaks.get(semester, self.breaks.get(semester[:1], ()))
+        except (TypeError, IndexError):
+            return ()
+
+    def _day_keys(self, placements):
+        sections = {(p.section, p.day) for p in placements if p.section is not None}
+        faculty = {(p.faculty, p.day) for p in placements if p.faculty}
+        return sections, faculty
+
+    def _day_terms(self, sections, faculty):
+        gaps = sum(self._gaps(self._sections.get(key, ()), self._section_skip(key[0])) for key in sections)
+        spread = sum(self._gaps(self._faculty.get(key, ())) for key in faculty)
+        return gaps, spread
+
+    def _count(self, p, step):
+        keys = []
+        if p.section is not None:
+            keys.append(self._sections.setdefault((p.section, p.day), [0] * self.slot_count))
+        if p.faculty:
+            keys.append(self._faculty.setdefault((p.faculty, p.day), [0] * self.slot_count))
+        for counts in keys:
+            for slot in p.slots:
+                if 0 <= slot < self.slot_count:
+                    counts[slot] += step
+
+    def _term_deltas(self, changes, apply=False):
+        """Unweighted term changes for [(old placement or None, new placement or None)]"""
+        touched = [p for change in changes for p in change if p is not None]
+        sections, faculty = self._day_keys(touched)
+        gaps_before, spread_before = self._day_terms(sections, faculty)
+
+        for old, new in changes:
+            if old is not None:
+                self._count(old, -1)
+            if new is not None:
+                self._count(new, 1)
+        gaps_after, spread_after = self._day_terms(sections, faculty)
+        if not apply:
+            for old, new in changes:
+                if new is not None:
+                    self._count(new, -1)
+                if old is not None:
+                    self._count(old, 1)
+
+        deltas = dict.fromkeys(TERMS, 0)
+        deltas['idle_gaps'] = gaps_after - gaps_before
+        deltas['faculty_spread'] = spread_after - spread_before
+        for old, new in changes:
+            for term, value in (self._local(new).items() if new is not None else ()):
+                deltas[term] += value
+            for term, value in (self._local(old).items() if old is not None else ()):
+                deltas[term] -= value
+        return deltas
+
+    def _weighted(self, deltas):
+        return sum(self.weights[term] * value for term, value in deltas.items())
+
+    def _commit(self, changes, keyed):
+        deltas = self._term_deltas(changes, apply=True)
+        for term, value in deltas.items():
+            self.terms[term] += value
+        for key, new in keyed:
+            if new is None:
+                self.placements.pop(key, None)
+            else:
+                self.placements[key] = new
+        return self._weighted(deltas)
+
+    # Deltas, nothing is changed
+
+    def delta_place(self, placement):
+        return self._weighted(self._term_deltas([(None, placement)]))
+
+    def delta_remove(self, key):
+        return self._weighted(self._term_deltas([(self.placements[key], None)]))
+
+    def delta_move(self, key, day, start, seats=None):
+        old = self.placements[key]
+        return self._weighted(self._term_deltas([(old, old.moved(day, start, seats))]))
+
+    def delta_swap(self, key_a, key_b):
+        """Delta of exchanging the days and start slots of two sessions, rooms stay"""
+        a, b = self.placements[key_a], self.placements[key_b]
+        return self._weighted(self._term_deltas([(a, a.moved(b.day, b.start)), (b, b.moved(a.day, a.start))]))
+
+    # Updates, each returns the weighted delta it applied
+
+    def place(self, key, placement):
+        changes = [(self.placements.get(key), placement)]
+        return self._commit(changes, [(key, placement)])
+
+    def remove(self, key):
+        if key not in self.placements:
+            return 0.0
+        return self._commit([(self.placements[key], None)], [(key, None)])
+
+    def move(self, key, day, start, seats=None):
+        old = self.placements[key]
+        new = old.moved(day, start, seats)
+        return self._commit([(old, new)], [(key, new)])
+
+    def swap(self, key_a, key_b):
+        a, b = self.placements[key_a], self.placements[key_b]
+        new_a, new_b = a.moved(b.day, b.start), b.moved(a.day, a.start)
+        return self._commit([(a, new_a), (b, new_b)], [(key_a, new_a), (key_b, new_b)])
+
+    @property
+    def total(self):
+        return self._weighted(self.terms)
+
+    def breakdown(self):
+        """Weighted value of every term"""
+        return {term: self.weights[term] * value for term, value in self.terms.items()}
+
+
+def _seats(room_ids, rooms):
+    return sum(rooms[room_id]['capacity'] for room_id in room_ids if room_id in rooms)
+
+
+def session_placement(session, rooms, day=None, start=None, room_ids=None):
+    """Placement for a scheduling.solution.Session, at its own slot unless day/start/room_ids are given"""
+    return Placement(session.section_key, session.faculty, session.kind,
+                     session.day if day is None else day, session.start if start is None else start,
+                     session.duration, session.students,
+                     _seats(session.rooms if room_ids is None else room_ids, rooms))
+
+
+def score_solution(engine, solution):
+    """Load every placed session of a Solution into an empty engine, returns its total"""
+    for idx, session in enumerate(solution.sessions):
+        if session.placed:
+            engine.place(idx, session_placement(session, solution.meta['rooms']))
+    return engine.total
+
+
+def score_grids(engine, grids, rooms, students=None):
+    """Load generator grids {section key: timetable[day][slot]} into an empty engine
+
+    students maps (section key, code) to a group size for the room-waste term.
+    """
+    students = students or {}
+    for key, grid in grids.items():
+        for day, start, duration, cell in grid_sessions(grid):
+            room_ids = split_rooms(cell.get('classroom'))
+            engine.place((key, day, start), Placement(key, cell.get('faculty', ''), cell['type'], day, start,
+                                                      duration, students.get((key, cell['code']), 0),
+                                                      _seats(room_ids, rooms)))
+    return engine.total
@@ -12,9 +12,8 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 def main():
     if len(sys.argv) > 1:
         if sys.argv[1] == 'enhanced':
-            from optimization.enhanced_main import EnhancedTimetableGenerator
-            generator = EnhancedTimetableGenerator()
-            generator.generate_timetable()
+            from optimization.enhanced_main import main as enhanced_main
+            enhanced_main(sys.argv[2:])
         elif sys.argv[1] == 'config':
             from utils.config_integration import update_main_with_config
             update_main_with_config()
@@ -25,13 +24,31 @@ def main():
         elif sys.argv[1] == 'original':
             from core.main import generate_timetable
             generate_timetable()
+        elif sys.argv[1] == 'resolve':
+            from scheduling.incremental import main as resolve_main
+            resolve_main(sys.argv[2:])
+        elif sys.argv[1] == 'improve':
+            from optimization.lns import main as improve_main
+            improve_main(sys.argv[2:])
+        elif sys.argv[1] == 'render':
+            from utils.solution_render import main as render_main
+            render_main(sys.argv[2:])
+        elif sys.argv[1] == 'faculty':
+            from utils.faculty_render import main as faculty_main
+            faculty_main(sys.argv[2:])
+        elif sys.argv[1] == 'audit':
+            from scheduling.coverage import main as audit_main
+            audit_main(sys.argv[2:])
+        elif sys.argv[1] == 'export':
+            from utils.exporters import main as export_main
+            export_main(sys.argv[2:])
         elif sys.argv[1] == 'help':
             print_help()
         else:
             print("Invalid option. Use 'python run.py help' for usage information.")
     else:
         print("Enhanced Timetable Generator")
-        print("Usage: python run.py [enhanced|config|conflict|original|help]")
+        print("Usage: python run.py [enhanced|config|conflict|original|resolve|improve|render|faculty|audit|export|help]")
         print("Use 'python run.py help' for detailed usage information.")
 
 def print_help():
@@ -42,12 +59,27 @@ def print_help():
     print("  config      - Update main.py with configuration integration")
     print("  conflict    - Test conflict resolution tools")
     print("  original    - Run the original timetable generator")
+    print("  resolve     - Apply a course, room or faculty change to a saved solution")
+    print("  improve     - Place unscheduled sessions of a saved solution by local search")
+    print("  render      - Write the timetable workbook of a saved solution without solving again")
+    print("  faculty     - Write the faculty timetables of a saved solution")
+    print("  audit       - List courses of a saved solution short of their L-T-P-S sessions")
+    print("  export      - Write a saved solution as CSV, JSON and per faculty/section/room .ics feeds")
     print("  help        - Show this help message")
     print()
     print("Examples:")
     print("  python run.py enhanced    # Run with auto-retry, optimization, and conflict resolution")
+    print("  python run.py enhanced --time-limit 600   # Return the best timetable found within 10 minutes")
+    print("  python run.py enhanced --check-only        # Only check that rooms, faculty and sections can fit")
     print("  python run.py original    # Run the basic version")
     print("  python run.py conflict    # Test conflict resolution features")
+    print("  python run.py resolve timetable_solution.json --faculty-unavailable \"Dr. X\" Monday")
+    print("  python run.py improve timetable_solution.json --time-budget 30")
+    print("  python run.py render timetable_solution.json --output timetable_all_departments.xlsx")
+    print("  python run.py resolve timetable_solution.json --course-change changed.csv --render")
+    print("  python run.py faculty timetable_solution.json")
+    print("  python run.py audit timetable_solution.json")
+    print("  python run.py export timetable_solution.json --format ics --term-start 2025-01-06")
     print()
     print("Configuration:")
     print("  Edit src/config/config.json to customize settings")
@@ -0,0 +1,266 @@
+"""
+Cross-department basket-elective blocks.
+
+All electives of a basket group (B1, B2, ...) in a semester run at the same
+time, so every section that offers the group sees one shared block. The
+blocks are planned in a single pass before any section is solved:
+
+- electives taught by the same faculty member are merged into one class
+- a block needs as many weekly meetings as its longest elective
+- each meeting takes a day on which every participating section and every
+  faculty member is free, at the group's fixed start slot when possible
+- rooms for all electives of a meeting are assigned together by bipartite
+  matching, so one large elective cannot take the only room another needs
+
+The meeting is then reserved in every participating section grid, in the
+faculty calendars and in the room calendars. Generators skip the lectures
+of basket courses afterwards and only report what the blocks left out.
+"""
+
+
+def _faculty_key(faculty):
+    return ' '.join(str(faculty).split())
+
+
+def _is_lecture_room(room):
+    room_type = room['type'].upper()
+    return 'LECTURE_ROOM' in room_type or 'SEATER' in room_type
+
+
+class BasketElective:
+    """One class of a basket block, possibly listed under several departments"""
+
+    __slots__ = ('faculty', 'students', 'sessions', 'courses', 'placed', 'rejections')
+
+    def __init__(self, faculty):
+        self.faculty = faculty.strip()
+        self.students = 0
+        self.sessions = 0
+        self.courses = []  # (department, code, name, raw faculty) rows merged into this class
+        self.placed = 0
+        self.rejections = {}
+
+    def reject(self, kind):
+        self.rejections[kind] = self.rejections.get(kind, 0) + 1
+
+    @property
+    def calendars(self):
+        """Faculty calendar keys, one per spelling the course rows use"""
+        return {row[3] for row in self.courses}
+
+    @property
+    def missing(self):
+        return max(0, self.sessions - self.placed)
+
+    def __repr__(self):
+        return f"BasketElective({self.faculty}, {[row[1] for row in self.courses]})"
+
+
+class BasketBlock:
+    """All electives of one basket group in one semester"""
+
+    __slots__ = ('group', 'semester', 'start', 'duration', 'sections', 'electives', 'meetings')
+
+    def __init__(self, group, semester, start, duration):
+        self.group = group
+        self.semester = semester
+        self.start = start
+        self.duration = duration
+        self.sections = []   # (department, semester, section) keys sharing the block
+        self.electives = []
+        self.meetings = []   # (day, start, {elective index: room id})
+
+    @property
+    def sessions(self):
+        return max((elective.sessions for elective in self.electives), default=0)
+
+    def __repr__(self):
+        return f"BasketBlock({self.group}, sem {self.semester}, {len(self.electives)} electives)"
+
+
+def collect_basket_blocks(rows, start_slots, duration):
+    """Group basket course rows into blocks keyed by (group, semester)
+
+    rows are dicts with department, semester, sections (section count),
+    group, code, name, faculty, students and sessions. Rows with no
+    sessions or a group without a start slot are left out.
+    """
+    blocks, by_faculty = {}, {}
+    for row in rows:
+        if row['sessions'] <= 0 or row['group'] not in start_slots:
+            continue
+        key = (row['group'], row['semester'])
+        block = blocks.get(key)
+        if block is None:
+            block = blocks[key] = BasketBlock(row['group'], row['semester'], start_slots[row['group']], duration)
+
+        for section in range(row['sections']):
+            section_key = (row['department'], row['semester'], section)
+            if section_key not in block.sections:
+                block.sections.append(section_key)
+
+        # The same faculty member teaches one combined class per block
+        faculty = _faculty_key(row['faculty'])
+        elective = by_faculty.get(key + (faculty,))
+        if elective is None:
+            elective = by_faculty[key + (faculty,)] = BasketElective(faculty)
+            block.electives.append(elective)
+        elective.students += row['students']
+        elective.sessions = max(elective.sessions, row['sessions'])
+        elective.courses.append((row['department'], row['code'], row['name'], row['faculty']))
+
+    return sorted(blocks.values(), key=lambda block: (block.group, str(block.semester)))
+
+
+def match_rooms(electives, rooms, day, start, duration):
+    """Assign a free room to as many electives as possible, {elective index: room id}
+
+    Simple augmenting-path bipartite matching. Larger electives are tried
+    first and each elective lists its fitting rooms smallest first, so the
+    big rooms stay free for the classes that need them.
+    """
+    slots = range(start, start + duration)
+    free = [(room['capacity'], room_id) for room_id, room in rooms.items()
+            if _is_lecture_room(room) and not any(slot in room['schedule'][day] for slot in slots)]
+    free.sort()
+
+    options = {idx: [room_id for capacity, room_id in free if capacity >= elective.students]
+               for idx, elective in electives}
+    room_of, elective_of = {}, {}
+
+    def augment(idx, seen):
+        for room_id in options[idx]:
+            if room_id in seen:
+                continue
+            seen.add(room_id)
+            if room_id not in elective_of or augment(elective_of[room_id], seen):
+                elective_of[room_id] = idx
+                room_of[idx] = room_id
+                return True
+        return False
+
+    for idx, _ in sorted(electives, key=lambda item: -item[1].students):
+        augment(idx, set())
+    return room_of
+
+
+def _candidate_starts(block, slot_count):
+    """Fixed start of the group first, then the nearest other starts"""
+    starts = range(slot_count - block.duration + 1)
+    return sorted(starts, key=lambda start: (abs(start - block.start), start))
+
+
+def plan_basket_block(block, grids, professor_schedule, rooms, is_break, day_count, slot_count,
+                      default_room='DEFAULT_ROOM'):
+    """Pick meeting days and rooms for a block and reserve them everywhere"""
+    used_days = set()
+    for meeting in range(block.sessions):
+        active = [(idx, elective) for idx, elective in enumerate(block.electives) if elective.sessions > meeting]
+        best = None
+
+        for start in _candidate_starts(block, slot_count):
+            slots = range(start, start + block.duration)
+            for day in range(day_count):
+                if day in used_days:
+                    continue
+
+                # Every participating section must be free and outside its breaks
+                rejection = None
+                for section_key in block.sections:
+                    if any(is_break(section_key, slot) for slot in slots):
+                        rejection = 'break'
+                        break
+                    if any(grids[section_key][day][slot]['type'] for slot in slots):
+                        rejection = 'section_busy'
+                        break
+                if rejection:
+                    for _, elective in active:
+                        elective.reject(rejection)
+                    continue
+
+                available = []
+                for idx, elective in active:
+                    if any(slot in professor_schedule.get(name, {}).get(day, ())
+                           for name in elective.calendars for slot in slots):
+                        elective.reject('faculty_busy')
+                    else:
+                        available.append((idx, elective))
+                if not available:
+                    continue
+
+                assigned = (match_rooms(available, rooms, day, start, block.duration) if rooms
+                            else {idx: default_room for idx, _ in available})
+                for idx, elective in available:
+                    if idx not in assigned:
+                        elective.reject('no_room')
+
+                load = sum(1 for section_key in block.sections
+                           for cell in grids[section_key][day].values() if cell['type'])
+                score = (-len(assigned), start != block.start, load, day)
+                if assigned and (best is None or score < best[0]):
+                    best = (score, day, start, assigned)
+
+            # Stay on the fixed start whenever it can seat every active elective
+            if best is not None and best[0][0] == -len(active) and not best[0][1]:
+                break
+
+        if best is None:
+            break
+        _, day, start, assigned = best
+        used_days.add(day)
+        reserve_meeting(block, day, start, assigned, grids, professor_schedule, rooms, day_count)
+
+    return block
+
+
+def reserve_meeting(block, day, start, assigned, grids, professor_schedule, rooms, day_count):
+    """Book one meeting of a block in the section grids, faculty and room calendars"""
+    slots = range(start, start + block.duration)
+    block.meetings.append((day, start, dict(assigned)))
+
+    for idx, room_id in assigned.items():
+        elective = block.electives[idx]
+        elective.placed += 1
+        for name in elective.calendars:
+            calendar = professor_schedule.setdefault(name, {d: set() for d in range(day_count)})
+            calendar[day].update(slots)
+        if rooms and room_id in rooms:
+            rooms[room_id]['schedule'][day].update(slots)
+
+    for department, semester, section in block.sections:
+        members = []
+        for idx, room_id in sorted(assigned.items()):
+            for row_department, code, name, _ in block.electives[idx].courses:
+                if row_department == department:
+                    members.append({'code': code, 'name': name,
+                                    'faculty': block.electives[idx].faculty, 'room': room_id})
+        grid = grids[(department, semester, section)]
+        for i, slot in enumerate(slots):
+            cell = grid[day][slot]
+            cell['type'] = 'LEC'
+            cell['code'] = block.group if i == 0 else ''
+            cell['name'] = '\n'.join(f"{m['code']}: {m['name']}" for m in members) if i == 0 else ''
+            cell['faculty'] = ''
+            cell['classroom'] = '+'.join(sorted({m['room'] for m in members})) if i == 0 else ''
+            if i == 0:
+                cell['basket'] = members
+
+
+def plan_basket_blocks(blocks, grids, professor_schedule, rooms, is_break, day_count, slot_count,
+                       default_room='DEFAULT_ROOM'):
+    """Plan every block in turn, returns the blocks with their meetings filled in"""
+    for block in blocks:
+        plan_basket_block(block, grids, professor_schedule, rooms, is_break, day_count, slot_count,
+                          default_room)
+    return blocks
+
+
+def placed_counts(blocks):
+    """Lecture meetings placed per (department, semester, code, raw faculty)"""
+    counts = {}
+    for block in blocks:
+        for elective in block.electives:
+            for department, code, _, faculty in elective.courses:
+                key = (department, block.semester, code, faculty)
+                counts[key] = max(counts.get(key, 0), elective.placed)
+    return counts
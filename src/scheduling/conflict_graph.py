@@ -0,0 +1,175 @@
+"""
+Conflict graph over timetable sessions and DSatur-style placement ordering.
+
+Every session (one lecture, tutorial or lab occurrence of a course in a
+section) is a node. Two sessions are joined when they can never share a
+time slot: same faculty, same section, or both need a scarce room type.
+Placing sessions in DSatur order (highest saturation first) puts the most
+contended sessions into an empty calendar before the easy ones fill it up.
+"""
+
+import heapq
+from collections import defaultdict
+
+from scheduling.solution import lab_room_type, lecture_room_type, required_sessions
+
+# Room types that are treated as scarce when no room data is available
+DEFAULT_SCARCE_ROOM_TYPES = {'HARDWARE_LAB', 'SEATER_240'}
+
+# A room type with this many rooms or fewer counts as scarce
+SCARCE_ROOM_THRESHOLD = 4
+
+
+class SessionNode:
+    """A single schedulable session used as a conflict graph node"""
+
+    __slots__ = ('id', 'department', 'semester', 'section', 'code',
+                 'faculty', 'kind', 'room_type', 'duration')
+
+    def __init__(self, node_id, department, semester, section, code, faculty, kind, room_type, duration):
+        self.id = node_id
+        self.department = department
+        self.semester = semester
+        self.section = section
+        self.code = code
+        self.faculty = faculty
+        self.kind = kind
+        self.room_type = room_type
+        self.duration = duration
+
+    @property
+    def course_key(self):
+        return (self.department, self.semester, self.code)
+
+    @property
+    def section_key(self):
+        return (self.department, self.semester, self.section)
+
+    def __repr__(self):
+        return f"SessionNode({self.id}, {self.code} {self.kind}, section={self.section_key})"
+
+
+def scarce_room_types(rooms, threshold=SCARCE_ROOM_THRESHOLD):
+    """Return the room types that have at most `threshold` rooms"""
+    if not rooms:
+        return set(DEFAULT_SCARCE_ROOM_TYPES)
+
+    counts = defaultdict(int)
+    for room in rooms.values():
+        counts[room['type'].upper()] += 1
+
+    return {room_type for room_type, count in counts.items()
+            if count <= threshold and room_type != 'LIBRARY'}
+
+
+def build_conflict_graph(sessions, scarce_types=None):
+    """Build an adjacency map {node_id: set(node_id)} for the given sessions"""
+    if scarce_types is None:
+        scarce_types = DEFAULT_SCARCE_ROOM_TYPES
+
+    # Bucket sessions by every shared resource, then connect each bucket as a clique
+    buckets = defaultdict(list)
+    for node in sessions:
+        if node.faculty:
+            buckets[('faculty', node.faculty)].append(node.id)
+        buckets[('section', node.section_key)].append(node.id)
+        if node.room_type in scarce_types:
+            buckets[('room', node.room_type)].append(node.id)
+
+    graph = {node.id: set() for node in sessions}
+    for members in buckets.values():
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                if a != b:
+                    graph[a].add(b)
+                    graph[b].add(a)
+
+    return graph
+
+
+def dsatur_order(graph):
+    """Return node ids in DSatur order (saturation, then degree, then input order)"""
+    position = {node: idx for idx, node in enumerate(graph)}
+    degree = {node: len(neighbours) for node, neighbours in graph.items()}
+    neighbour_colors = {node: set() for node in graph}
+    colors = {}
+    order = []
+
+    heap = [(0, -degree[node], position[node], node) for node in graph]
+    heapq.heapify(heap)
+
+    while heap:
+        neg_saturation, _, _, node = heapq.heappop(heap)
+        # Skip stale heap entries left behind by saturation updates
+        if node in colors or -neg_saturation != len(neighbour_colors[node]):
+            continue
+
+        # Smallest color not used by any coloured neighbour
+        color = 0
+        while color in neighbour_colors[node]:
+            color += 1
+        colors[node] = color
+        order.append(node)
+
+        for neighbour in graph[node]:
+            if neighbour in colors or color in neighbour_colors[neighbour]:
+                continue
+            neighbour_colors[neighbour].add(color)
+            heapq.heappush(heap, (-len(neighbour_colors[neighbour]), -degree[neighbour],
+                                  position[neighbour], neighbour))
+
+    return order
+
+
+def course_ranks(sessions, scarce_types=None):
+    """Rank each (department, semester, code) by its first session in DSatur order"""
+    by_id = {node.id: node for node in sessions}
+    order = dsatur_order(build_conflict_graph(sessions, scarce_types))
+
+    ranks = {}
+    for rank, node_id in enumerate(order):
+        ranks.setdefault(by_id[node_id].course_key, rank)
+    return ranks
+
+
+def get_course_students(course, batch_info):
+    """Students attending a course, falling back to the section size"""
+    students = str(course.get('total_students', ''))
+    if students.isdigit():
+        return int(students)
+    dept_info = batch_info.get((course['Department'], course['Semester']))
+    return dept_info['section_size'] if dept_info else 0
+
+
+def get_session_room_type(course, batch_info, component_type):
+    """Room type a session of this course will compete for"""
+    if component_type == 'LAB':
+        return lab_room_type(course['Course Code'])
+    return lecture_room_type(get_course_students(course, batch_info))
+
+
+def build_course_ranks(df, rooms, batch_info, durations):
+    """Rank the schedulable courses of a combined.csv frame by DSatur order
+
+    durations maps 'LEC', 'TUT' and 'LAB' to the generator's session lengths in slots.
+    """
+    schedulable = df[(df['Schedule'].fillna('Yes').str.upper() == 'YES') | (df['Schedule'].isna())]
+    sessions = []
+
+    for _, course in schedulable.iterrows():
+        department = course['Department']
+        semester = course['Semester']
+        code = str(course['Course Code'])
+        faculty = str(course['Faculty']).split('/')[0].strip()
+        dept_info = batch_info.get((department, semester))
+        num_sections = dept_info['num_sections'] if dept_info else 1
+        counts = required_sessions(course)
+
+        for section in range(num_sections):
+            for component_type in ('LEC', 'TUT', 'LAB'):
+                room_type = get_session_room_type(course, batch_info, component_type)
+                for _ in range(counts[component_type]):
+                    sessions.append(SessionNode(len(sessions), department, semester, section, code,
+                                                faculty, component_type, room_type, durations[component_type]))
+
+    return course_ranks(sessions, scarce_room_types(rooms))
@@ -0,0 +1,185 @@
+"""
+Coverage audit of a timetable solution.
+
+For every course and section, this compares the sessions the L-T-P-S
+values call for (the same rules as scheduling.solution.required_sessions)
+with the sessions the solution actually placed. It works on the solution's
+catalog and session records as two pandas tables joined once, so nothing
+is read back from the workbooks and a full catalog is audited in a few
+milliseconds.
+
+Short courses are written to unscheduled_courses.xlsx, one row per course
+and section, together with the reasons the generator recorded for the
+sessions it could not place. A JSON summary goes alongside it.
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from scheduling.solution import SESSION_KINDS, SOLUTION_FILE, Solution
+
+AUDIT_FILE = 'unscheduled_courses.xlsx'
+SUMMARY_FILE = 'coverage_summary.json'
+
+# Slots are 30 minutes long
+SLOT_HOURS = 0.5
+
+KEY = ['department', 'semester', 'section', 'code']
+
+
+def required_session_table(courses):
+    """Sessions per kind for each catalog row, vectorised required_sessions"""
+    hours = courses[['L', 'T', 'P', 'S']].apply(pd.to_numeric, errors='coerce').fillna(0)
+    l, t = hours['L'].to_numpy(), hours['T'].to_numpy().astype(int)
+    p, s = hours['P'].to_numpy().astype(int), hours['S'].to_numpy().astype(int)
+    taught = (l > 0) | (t > 0) | (p > 0)
+    return pd.DataFrame({
+        'LEC': np.where(l > 0, np.maximum(1, np.round(l * 2 / 3)), 0).astype(int),
+        'TUT': t,
+        'LAB': p // 2,
+        'SS': np.where(taught, s // 4, 0),
+    }, index=courses.index)
+
+
+def _catalog(solution):
+    """Scheduled catalog rows, one per (department, semester, code)"""
+    courses = pd.DataFrame(solution.meta['courses'],
+                           columns=['department', 'semester', 'code', 'name', 'faculty',
+                                    'L', 'T', 'P', 'S', 'schedule'])
+    courses = courses[courses['schedule'].fillna('Yes').astype(str).str.strip().str.upper() != 'NO']
+    courses = courses.assign(department=courses['department'].astype(str),
+                             semester=courses['semester'].astype(str), code=courses['code'].astype(str))
+    courses = pd.concat([courses, required_session_table(courses)], axis=1)
+    # Electives that share a placeholder code (B2-NEW) are placed under that code together
+    return courses.groupby(['department', 'semester', 'code'], as_index=False, sort=False).agg(
+        name=('name', lambda names: ' / '.join(dict.fromkeys(map(str, names)))),
+        faculty=('faculty', lambda names: ' / '.join(dict.fromkeys(map(str, names)))),
+        **{kind: (kind, 'sum') for kind in SESSION_KINDS})
+
+
+def _sections(solution):
+    sections = pd.DataFrame(solution.meta['sections'], columns=['department', 'semester', 'section', 'title'])
+    return sections.assign(department=sections['department'].astype(str),
+                           semester=sections['semester'].astype(str))
+
+
+def _placed(solution):
+    """Placed session counts per course, section and kind"""
+    records = [(s.department, str(s.semester), s.section, s.code, s.kind)
+               for s in solution.sessions if s.placed]
+    placed = pd.DataFrame(records, columns=KEY + ['kind'])
+    counts = placed.groupby(KEY + ['kind']).size().unstack('kind', fill_value=0)
+    return counts.reindex(columns=list(SESSION_KINDS), fill_value=0).add_prefix('placed_').reset_index()
+
+
+def _reasons(solution):
+    """Reasons the generator recorded for unplaced sessions, per course and section"""
+    unscheduled = pd.DataFrame(solution.meta['unscheduled'], columns=KEY + ['reason'])
+    if unscheduled.empty:
+        return pd.DataFrame(columns=KEY + ['reason'])
+    unscheduled = unscheduled.assign(
+        department=unscheduled['department'].astype(str), semester=unscheduled['semester'].astype(str),
+        section=pd.to_numeric(unscheduled['section'], errors='coerce').fillna(0).astype(int),
+        code=unscheduled['code'].astype(str), reason=unscheduled['reason'].fillna('').astype(str))
+    return unscheduled.groupby(KEY, as_index=False)['reason'].agg(
+        lambda reasons: '; '.join(reason for reason in dict.fromkeys(reasons) if reason))
+
+
+class CoverageReport:
+    """Courses short of their required sessions, one row per course and section"""
+
+    def __init__(self, table, audited, elapsed):
+        self.table = table
+        self.audited = audited
+        self.elapsed = elapsed
+
+    @property
+    def ok(self):
+        return self.table.empty
+
+    def summary(self):
+        status = "all fully scheduled" if self.ok else f"{len(self.table)} short"
+        return (f"Coverage audit: {self.audited} course sections, {status} "
+                f"in {self.elapsed * 1000:.1f} ms")
+
+    def lines(self):
+        return [f"{row['Sheet']} {row['Code']}: missing {row['Missing Sessions']} "
+                f"({row['Missing Hours']} h) - {row['Reasons']}"
+                for row in self.table.to_dict('records')]
+
+    def to_dict(self):
+        missing = {kind: int(self.table[f'Missing {kind}'].sum()) for kind in SESSION_KINDS}
+        return {
+            'audited': self.audited,
+            'short': len(self.table),
+            'missing_sessions': missing,
+            'missing_hours': float(self.table['Missing Hours'].sum()),
+            'elapsed_ms': round(self.elapsed * 1000, 2),
+            'courses': [{'department': row['Department'], 'semester': row['Semester'],
+                         'section': row['Sheet'], 'code': row['Code'],
+                         'missing': {kind: int(row[f'Missing {kind}']) for kind in SESSION_KINDS}}
+                        for row in self.table.to_dict('records')],
+        }
+
+    def save(self, path=AUDIT_FILE, summary_path=SUMMARY_FILE):
+        self.table.to_excel(path, index=False)
+        with open(summary_path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path, summary_path
+
+
+def audit_coverage(solution):
+    """Compare required sessions with placed sessions for every course and section"""
+    started = time.perf_counter()
+    audit = _catalog(solution).merge(_sections(solution), on=['department', 'semester'], how='left')
+    audit['section'] = audit['section'].fillna(0).astype(int)
+    audit['title'] = audit['title'].fillna(audit['department'] + '_' + audit['semester'])
+    audit = audit.merge(_placed(solution), on=KEY, how='left').merge(_reasons(solution), on=KEY, how='left')
+
+    placed = audit[[f'placed_{kind}' for kind in SESSION_KINDS]].fillna(0).astype(int).to_numpy()
+    required = audit[list(SESSION_KINDS)].to_numpy()
+    missing = np.clip(required - placed, 0, None)
+    slot_hours = np.array([solution.duration(kind) * SLOT_HOURS for kind in SESSION_KINDS])
+    short = missing.sum(axis=1) > 0
+
+    def counts(values):
+        return ['-'.join(map(str, row)) for row in values[short]]
+
+    audit = audit[short]
+    table = pd.DataFrame({
+        'Code': audit['code'],
+        'Name': audit['name'],
+        'Faculty': audit['faculty'],
+        'Department': audit['department'],
+        'Semester': audit['semester'],
+        'Sheet': audit['title'],
+        'Required Sessions': counts(required),
+        'Placed Sessions': counts(placed),
+        'Missing Sessions': counts(missing),
+        **{f'Missing {kind}': missing[short][:, idx] for idx, kind in enumerate(SESSION_KINDS)},
+        'Missing Hours': missing[short] @ slot_hours,
+        'Found In Timetable': placed[short].sum(axis=1) > 0,
+        'Reasons': audit['reason'].fillna('').replace('', 'No reason recorded'),
+    }).reset_index(drop=True)
+    return CoverageReport(table, len(required), time.perf_counter() - started)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='run.py audit',
+                                     description='Check a saved solution for courses short of their L-T-P-S sessions')
+    parser.add_argument('solution', nargs='?', default=SOLUTION_FILE,
+                        help=f'solution JSON written by a generator (default: {SOLUTION_FILE})')
+    parser.add_argument('--output', default=AUDIT_FILE, help=f'workbook to write (default: {AUDIT_FILE})')
+    parser.add_argument('--summary', default=SUMMARY_FILE, help=f'JSON summary to write (default: {SUMMARY_FILE})')
+    args = parser.parse_args(argv)
+
+    report = audit_coverage(Solution.load(args.solution))
+    report.save(args.output, args.summary)
+    print(report.summary())
+    for line in report.lines():
+        print(f"  {line}")
+    return report
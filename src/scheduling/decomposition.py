@@ -0,0 +1,54 @@
+"""
+Split a timetable workload into independent components.
+
+A workload unit (usually one department-semester) lists the resources it
+can compete for: faculty names, room pools and basket groups. Units that
+share any resource, directly or through a chain of other units, end up in
+the same component. Different components never touch the same faculty or
+rooms, so they can be solved in separate processes and merged afterwards.
+"""
+
+
+class Component:
+    """A group of workload units that must be solved together"""
+
+    __slots__ = ('keys', 'resources')
+
+    def __init__(self):
+        self.keys = []
+        self.resources = set()
+
+    def __repr__(self):
+        return f"Component({len(self.keys)} units, {len(self.resources)} resources)"
+
+
+def find_components(units):
+    """Group (key, resources) units into components, keeping the input order"""
+    units = list(units)
+    parent = list(range(len(units)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # Union every unit with the first unit that used the same resource
+    owner = {}
+    for idx, (_, resources) in enumerate(units):
+        for resource in resources:
+            if resource in owner:
+                a, b = find(idx), find(owner[resource])
+                if a != b:
+                    parent[max(a, b)] = min(a, b)
+            else:
+                owner[resource] = idx
+
+    components = {}
+    for idx, (key, resources) in enumerate(units):
+        component = components.setdefault(find(idx), Component())
+        component.keys.append(key)
+        component.resources.update(resources)
+
+    # Roots are the smallest index of each group, so this follows input order
+    return [components[root] for root in sorted(components)]
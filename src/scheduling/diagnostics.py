@@ -0,0 +1,206 @@
+"""
+Deferred diagnostics for unscheduled timetable components.
+
+While searching, the scheduler only counts why each candidate slot was
+rejected. These counts go into a FailureRecord, which is cheap enough to
+keep for every failed component. The DiagnosticsEngine turns failure
+records into structured reasons once a report is actually needed. It
+builds per-faculty and per-room-type utilisation once, from the final
+calendars, and reuses them for every record.
+"""
+
+from scheduling.placement import Occupancy
+
+# Messages for each rejection kind, filled in by DiagnosticsEngine.reasons()
+REJECTION_MESSAGES = {
+    'faculty_busy': "Faculty '{faculty}' was busy in {count} of {attempts} tried slots "
+                    "({load:.1f} hours already scheduled this week)",
+    'section_busy': "Section timetable was already occupied in {count} of {attempts} tried slots",
+    'break': "{count} of {attempts} tried slots overlapped a break",
+    'reserved': "{count} of {attempts} tried slots were reserved for this semester",
+    'faculty_gap': "{count} tried slots were too close to another session of {code} "
+                   "(3 hour gap required)",
+    'daily_limit': "Faculty '{faculty}' reached the daily component limit on {count} tried days",
+    'lecture_spacing': "{count} tried slots would run lectures back to back without a break",
+    'no_free_slot': "No common free slot for faculty and section on {count} days",
+    'no_room': "No free {room_type} room in {count} otherwise feasible slots "
+               "({utilisation:.0%} of {pool} room time already booked)",
+}
+
+LECTURE_POOL = ('LECTURE_ROOM', 'SEATER_120', 'SEATER_240')
+
+
+class FailureRecord:
+    """Constraint rejection counts observed while trying to place one component"""
+
+    __slots__ = ('department', 'semester', 'section', 'code', 'name', 'faculty',
+                 'component_type', 'room_type', 'students', 'rejections')
+
+    def __init__(self, department, semester, section, code, name, faculty, component_type,
+                 room_type='LECTURE_ROOM', students=0):
+        self.department = department
+        self.semester = semester
+        self.section = section
+        self.code = code
+        self.name = name
+        self.faculty = faculty
+        self.component_type = component_type
+        self.room_type = room_type
+        self.students = students
+        self.rejections = {}
+
+    def reject(self, kind):
+        self.rejections[kind] = self.rejections.get(kind, 0) + 1
+
+    @property
+    def attempts(self):
+        return sum(self.rejections.values())
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    @property
+    def course_key(self):
+        return (str(self.department), str(self.semester), self.section, self.code)
+
+    @classmethod
+    def combined(cls, records):
+        """One record over the rejections of several failed sessions of a course in one section
+
+        Different instructors (electives of one basket code) are listed as 'A / B'.
+        """
+        first = records[0]
+        faculty = ' / '.join(dict.fromkeys(record.faculty for record in records if record.faculty))
+        merged = cls(first.department, first.semester, first.section, first.code, first.name, faculty,
+                     first.component_type, first.room_type, first.students)
+        for record in records:
+            for kind, count in record.rejections.items():
+                merged.rejections[kind] = merged.rejections.get(kind, 0) + count
+        return merged
+
+    def __repr__(self):
+        return f"FailureRecord({self.code} {self.component_type}, {self.rejections})"
+
+
+class DiagnosticsEngine:
+    """Turn failure records into structured reasons using cached utilisation"""
+
+    def __init__(self, professor_schedule, rooms, day_count, slot_count):
+        self.professor_schedule = professor_schedule or {}
+        self.rooms = rooms or {}
+        self.day_count = day_count
+        self.slot_count = slot_count
+        self._faculty_load = None
+        self._room_types = None
+
+    @classmethod
+    def from_solution(cls, solution):
+        """Engine over the calendars of a solution's placed sessions, e.g. after a search changed them"""
+        occupancy = Occupancy(solution.sessions)
+        rooms = {room_id: dict(room, schedule=occupancy.rooms.get(room_id, {}))
+                 for room_id, room in solution.meta['rooms'].items()}
+        return cls(occupancy.faculty, rooms, len(solution.days), solution.slot_count)
+
+    def faculty_load(self, faculty):
+        """Scheduled slots for a faculty member, from a cache built on first use"""
+        if self._faculty_load is None:
+            self._faculty_load = {name: sum(len(slots) for slots in days.values())
+                                  for name, days in self.professor_schedule.items()}
+        return self._faculty_load.get(faculty, 0)
+
+    def room_type_usage(self, room_type):
+        """(booked slots, available slots, room count, largest capacity) for a room type"""
+        if self._room_types is None:
+            self._room_types = {}
+            for room in self.rooms.values():
+                used, total, count, largest = self._room_types.get(room['type'].upper(), (0, 0, 0, 0))
+                self._room_types[room['type'].upper()] = (
+                    used + sum(len(slots) for slots in room['schedule'].values()),
+                    total + self.day_count * self.slot_count,
+                    count + 1,
+                    max(largest, room['capacity']))
+
+        types = LECTURE_POOL if room_type in LECTURE_POOL else (room_type,)
+        usage = [self._room_types.get(t, (0, 0, 0, 0)) for t in types]
+        return (sum(u[0] for u in usage), sum(u[1] for u in usage),
+                sum(u[2] for u in usage), max(u[3] for u in usage))
+
+    def reasons(self, failure):
+        """Structured reasons for a failure, most frequent rejection first"""
+        used, total, count, largest = self.room_type_usage(failure.room_type)
+        reasons = []
+
+        # Structural problems no amount of searching can fix
+        if self.rooms and count == 0:
+            reasons.append({'kind': 'missing_room_type', 'count': 0, 'share': 1.0,
+                            'message': f"No {failure.room_type} rooms available in the system"})
+        elif (self.rooms and failure.component_type != 'LAB' and failure.room_type in LECTURE_POOL
+              and failure.students > largest):
+            reasons.append({'kind': 'capacity', 'count': 0, 'share': 1.0,
+                            'message': f"No rooms available with capacity for {failure.students} students"})
+
+        attempts = failure.attempts or 1
+        values = {
+            'faculty': failure.faculty,
+            'code': failure.code,
+            'room_type': failure.room_type,
+            'pool': 'lecture and seater' if failure.room_type in LECTURE_POOL else failure.room_type,
+            'attempts': failure.attempts,
+            'load': sum(self.faculty_load(name) for name in failure.faculty.split(' / ')) / 2,
+            'utilisation': used / total if total else 0.0,
+        }
+        for kind, rejected in sorted(failure.rejections.items(), key=lambda item: (-item[1], item[0])):
+            template = REJECTION_MESSAGES.get(kind, "{count} tried slots rejected by " + kind)
+            reasons.append({'kind': kind, 'count': rejected, 'share': rejected / attempts,
+                            'message': template.format(count=rejected, **values)})
+
+        if not reasons:
+            reasons.append({'kind': 'unknown', 'count': 0, 'share': 0.0,
+                            'message': "No candidate slot was tried"})
+        return reasons
+
+    def reason_text(self, failure, limit=2):
+        """Short text of the top reasons for sheets and reports, each message once"""
+        messages = [reason['message'] for reason in self.reasons(failure)[:limit]]
+        return '; '.join(dict.fromkeys(messages))
+
+    def annotate(self, components):
+        """Fill in the reason of every component that carries a failure record
+
+        Sessions of one course and section that failed separately share one
+        reason over their combined rejections, so reports do not repeat it.
+        """
+        failures = {}
+        for component in components:
+            failure = getattr(component, 'failure', None)
+            if failure is not None:
+                failures.setdefault(failure.course_key, []).append(failure)
+        texts = {key: self.reason_text(FailureRecord.combined(records)) for key, records in failures.items()}
+        for component in components:
+            failure = getattr(component, 'failure', None)
+            if failure is not None:
+                component.reason = texts[failure.course_key]
+        return components
+
+    def report(self, components):
+        """Structured report rows for every component that carries a failure record"""
+        rows = []
+        for component in components:
+            failure = getattr(component, 'failure', None)
+            if failure is None:
+                continue
+            rows.append({
+                'department': str(failure.department),
+                'semester': failure.semester,
+                'section': failure.section,
+                'code': failure.code,
+                'component_type': failure.component_type,
+                'faculty': failure.faculty,
+                'rejections': dict(failure.rejections),
+                'reasons': self.reasons(failure),
+            })
+        return rows
@@ -0,0 +1,140 @@
+"""
+Load-balanced instructor assignment for multi-instructor courses.
+
+A faculty cell such as "Prof. A/Dr. B" lists the instructors who can take
+a section of the course. Taking the first free name for every section can
+pile the work onto one calendar while the other instructor stays idle.
+Before any session is placed, this stage assigns every such section to
+one of its instructors with a min-cost flow:
+
+    source -> section task (capacity 1) -> listed instructor -> sink
+
+Each instructor-to-sink link is split into unit arcs. Their costs are the
+marginal increase of load squared, starting from the load the instructor
+already carries from single-instructor courses. Because the costs are
+convex, the cheapest flow is the most even spread of load. Loads are slots
+per week. For each instructor, one task counts as the average load of the
+tasks that instructor can take.
+"""
+
+INFINITY = float('inf')
+
+
+def instructor_options(faculty):
+    """Instructors listed in a faculty cell, in listed order"""
+    return [name.strip() for name in str(faculty).split('/') if name.strip()]
+
+
+class SectionTask:
+    """One section of a course that needs one of several instructors"""
+
+    __slots__ = ('key', 'options', 'load')
+
+    def __init__(self, key, options, load):
+        self.key = key
+        self.options = list(options)
+        self.load = load
+
+    def __repr__(self):
+        return f"SectionTask({self.key}, {self.options}, {self.load})"
+
+
+class _FlowGraph:
+    """Residual graph for successive shortest path min-cost flow"""
+
+    def __init__(self, size):
+        self.edges = [[] for _ in range(size)]  # [to, capacity, cost, reverse index]
+
+    def add(self, u, v, capacity, cost):
+        self.edges[u].append([v, capacity, cost, len(self.edges[v])])
+        self.edges[v].append([u, 0, -cost, len(self.edges[u]) - 1])
+
+    def _shortest_path(self, source):
+        """Bellman-Ford queue variant, residual arcs can have negative costs"""
+        dist = [INFINITY] * len(self.edges)
+        previous = [None] * len(self.edges)
+        dist[source] = 0
+        queue, queued = [source], {source}
+        while queue:
+            u = queue.pop(0)
+            queued.discard(u)
+            for i, (v, capacity, cost, _) in enumerate(self.edges[u]):
+                if capacity > 0 and dist[u] + cost < dist[v]:
+                    dist[v] = dist[u] + cost
+                    previous[v] = (u, i)
+                    if v not in queued:
+                        queue.append(v)
+                        queued.add(v)
+        return dist, previous
+
+    def min_cost_flow(self, source, sink, limit):
+        flow = 0
+        while flow < limit:
+            dist, previous = self._shortest_path(source)
+            if dist[sink] == INFINITY:
+                break
+            # Task arcs have capacity 1, so every augmenting path carries one unit
+            v = sink
+            while v != source:
+                u, i = previous[v]
+                edge = self.edges[u][i]
+                edge[1] -= 1
+                self.edges[v][edge[3]][1] += 1
+                v = u
+            flow += 1
+        return flow
+
+
+def assign_instructors(tasks, base_load=None):
+    """Pick one instructor per task, {task key: instructor}
+
+    base_load maps instructor -> slots already fixed by other courses.
+    Ties go to the instructor listed first.
+    """
+    base_load = base_load or {}
+    tasks = [task for task in tasks if task.options]
+    instructors = sorted({name for task in tasks for name in task.options})
+    if not tasks:
+        return {}
+
+    source, sink = 0, 1
+    task_node = {id(task): 2 + i for i, task in enumerate(tasks)}
+    instructor_node = {name: 2 + len(tasks) + i for i, name in enumerate(instructors)}
+    graph = _FlowGraph(2 + len(tasks) + len(instructors))
+
+    candidates = {name: [] for name in instructors}
+    for task in tasks:
+        graph.add(source, task_node[id(task)], 1, 0)
+        for position, name in enumerate(task.options):
+            graph.add(task_node[id(task)], instructor_node[name], 1, position)
+            candidates[name].append(task.load)
+
+    # Convex unit arcs: the k-th task costs the growth of load squared
+    for name, loads in candidates.items():
+        unit = max(1, round(sum(loads) / len(loads)))
+        base = base_load.get(name, 0)
+        for k in range(1, len(loads) + 1):
+            before, after = base + (k - 1) * unit, base + k * unit
+            # Scaled so the listed-order tie-break never outweighs a real load difference
+            graph.add(instructor_node[name], sink, 1, (after * after - before * before) * len(instructors))
+
+    graph.min_cost_flow(source, sink, len(tasks))
+
+    nodes = {node: name for name, node in instructor_node.items()}
+    assignment = {}
+    for task in tasks:
+        for v, capacity, _, _ in graph.edges[task_node[id(task)]]:
+            if v in nodes and capacity == 0:
+                assignment[task.key] = nodes[v]
+                break
+    return assignment
+
+
+def instructor_loads(assignment, tasks, base_load=None):
+    """Weekly slots per instructor once the tasks are assigned"""
+    loads = dict(base_load or {})
+    for task in tasks:
+        name = assignment.get(task.key)
+        if name is not None:
+            loads[name] = loads.get(name, 0) + task.load
+    return loads
@@ -0,0 +1,250 @@
+"""
+Supply and demand pre-check for timetable inputs.
+
+Some inputs can never fit, whatever the search does: more hardware-lab
+hours than the labs offer in a week, a 200-student lecture with no room
+that large, or an instructor with more teaching than the week allows. The
+pre-check finds these cases in milliseconds, from the course rows and
+rooms alone, before any generator runs. It compares weekly demand with
+weekly supply, in slots, for:
+
+- room types: lab sessions (some need two adjacent labs) against the labs
+  of that type
+- capacity classes: lecture and tutorial sessions of at least N students
+  against the lecture and seater rooms that seat N
+- faculty: teaching slots against the slots of a week, plus the daily
+  limit of components per section and the gap between sessions of one
+  course
+- sections: slots to sit in against the section's slots outside breaks
+
+Every check is a necessary condition only. Passing them all does not
+guarantee a complete timetable, but failing one means there cannot be one.
+"""
+
+import math
+import time
+
+from scheduling.placement import COURSE_GAP_SLOTS, DAILY_COMPONENT_LIMIT
+from scheduling.solution import DEFAULT_DURATIONS, basket_group, int_value, lab_room_type, required_sessions
+
+
+def _is_lecture_room(room_type):
+    room_type = room_type.upper()
+    return 'LECTURE_ROOM' in room_type or 'SEATER' in room_type
+
+
+class Demand:
+    """Sessions one section needs of one course component"""
+
+    __slots__ = ('section', 'code', 'faculty', 'kind', 'sessions', 'duration', 'students', 'room_type', 'group')
+
+    def __init__(self, section, code, faculty, kind, sessions, duration, students, room_type, group=None):
+        self.section = section      # (department, semester, section)
+        self.code = code
+        self.faculty = faculty
+        self.kind = kind
+        self.sessions = sessions
+        self.duration = duration
+        self.students = students
+        self.room_type = room_type
+        self.group = group          # basket group, its courses run side by side
+
+    @property
+    def slots(self):
+        return self.sessions * self.duration
+
+    def __repr__(self):
+        return f"Demand({self.section}, {self.code} {self.kind} x{self.sessions})"
+
+
+class FeasibilityReport:
+    """Issues found by the pre-check, most severe shortfall first"""
+
+    def __init__(self, issues, checks, elapsed):
+        self.issues = issues
+        self.checks = checks
+        self.elapsed = elapsed
+
+    @property
+    def ok(self):
+        return not self.issues
+
+    def summary(self):
+        status = "feasible" if self.ok else f"{len(self.issues)} infeasible"
+        return f"Pre-check: {self.checks} checks, {status} in {self.elapsed * 1000:.1f} ms"
+
+    def lines(self):
+        return [issue['message'] for issue in self.issues]
+
+
+def build_demands(rows, durations=None, max_batch_size=70):
+    """Demands per section from combined.csv style rows (dicts)
+
+    Cohorts are split into sections of at most max_batch_size students,
+    like TT_gen does, or kept whole when it is None. A row's own total_students, when given, is
+    the group size of its sessions.
+    """
+    durations = dict(DEFAULT_DURATIONS, **(durations or {}))
+    rows = [row for row in rows if str(row.get('Schedule', 'Yes') or 'Yes').strip().upper() != 'NO']
+
+    cohort = {}
+    for row in rows:
+        key = (str(row.get('Department', '')), str(row.get('Semester', '')))
+        cohort[key] = max(cohort.get(key, 0), int_value(row.get('total_students')))
+
+    demands = []
+    for row in rows:
+        key = (str(row.get('Department', '')), str(row.get('Semester', '')))
+        total = cohort[key]
+        sections = max(1, math.ceil(total / max_batch_size)) if total and max_batch_size else 1
+        code = str(row.get('Course Code', ''))
+        faculty = str(row.get('Faculty', '')).strip()
+        students = int_value(row.get('total_students')) or math.ceil(total / sections)
+        counts = required_sessions(row)
+        for section in range(sections):
+            for kind, sessions in counts.items():
+                if sessions <= 0:
+                    continue
+                room_type = lab_room_type(code) if kind == 'LAB' else 'LECTURE_ROOM'
+                demands.append(Demand(key + (section,), code, faculty, kind, sessions, durations[kind],
+                                      students, room_type, basket_group(code)))
+    return demands
+
+
+def check_feasibility(demands, rooms, day_count, slot_count, break_slots=None,
+                      daily_limit=DAILY_COMPONENT_LIMIT, course_gap=COURSE_GAP_SLOTS):
+    """Compare weekly demand with supply, returns a FeasibilityReport
+
+    rooms maps room id -> {'type', 'capacity'}. break_slots(semester)
+    gives the slots a semester is on a break, none by default.
+    """
+    started = time.perf_counter()
+    break_slots = break_slots or (lambda semester: ())
+    issues, checks = [], 0
+
+    def issue(kind, name, demand, supply, message):
+        issues.append({'kind': kind, 'name': name, 'demand': demand, 'supply': supply,
+                       'message': message, 'shortfall': demand - supply})
+
+    # Slots every section is on a break are lost to rooms and faculty too
+    semesters = {demand.section[1] for demand in demands}
+    common_breaks = set(range(slot_count))
+    for semester in semesters:
+        common_breaks &= set(break_slots(semester))
+    if not semesters:
+        common_breaks = set()
+    week = day_count * (slot_count - len(common_breaks))
+
+    # A basket course is taught once for every section and department taking it
+    distinct, taught = [], set()
+    for demand in demands:
+        if demand.group is not None:
+            key = (demand.code, demand.faculty, demand.kind, demand.students)
+            if key in taught:
+                continue
+            taught.add(key)
+        distinct.append(demand)
+
+    # Room types: labs, some sessions need several adjacent labs
+    largest = {}
+    count = {}
+    for room in rooms.values():
+        room_type = room['type'].upper()
+        largest[room_type] = max(largest.get(room_type, 0), room['capacity'])
+        count[room_type] = count.get(room_type, 0) + 1
+    lab_demand = {}
+    for demand in distinct:
+        if demand.kind == 'LAB':
+            capacity = largest.get(demand.room_type, 0)
+            rooms_needed = max(1, math.ceil(demand.students / capacity)) if capacity else 1
+            lab_demand[demand.room_type] = lab_demand.get(demand.room_type, 0) + demand.slots * rooms_needed
+    for room_type, needed in sorted(lab_demand.items()):
+        checks += 1
+        supply = count.get(room_type, 0) * week
+        if needed > supply:
+            issue('room_type', room_type, needed, supply,
+                  f"{room_type}: {needed / 2:g} room-hours of labs needed, "
+                  f"{count.get(room_type, 0)} rooms offer {supply / 2:g} a week")
+
+    # Capacity classes: sessions of at least N students against rooms seating N
+    pool = sorted((room['capacity'] for room in rooms.values() if _is_lecture_room(room['type'])), reverse=True)
+    by_size = {}
+    for demand in distinct:
+        if demand.kind not in ('LEC', 'TUT'):
+            continue
+        by_size[demand.students] = by_size.get(demand.students, 0) + demand.slots
+    for size in sorted(by_size, reverse=True):
+        if size <= 0:
+            continue
+        checks += 1
+        needed = sum(slots for students, slots in by_size.items() if students >= size)
+        seats = sum(1 for capacity in pool if capacity >= size)
+        supply = seats * week
+        if needed > supply:
+            issue('capacity', f">={size}", needed, supply,
+                  f"Rooms seating {size}+: {needed / 2:g} hours of lectures and tutorials needed, "
+                  f"{seats} rooms offer {supply / 2:g} a week")
+            break  # smaller classes include this shortfall
+
+    # Faculty: weekly slots, daily component limit per section and the same-course gap
+    # Multi-instructor cells are left out, their load depends on the assignment
+    faculty_slots, faculty_section = {}, {}
+    for demand in demands:
+        name = demand.faculty
+        if not name or '/' in name or demand.kind == 'SS':
+            continue
+        faculty_section[(name, demand.section)] = faculty_section.get((name, demand.section), 0) + demand.sessions
+    for demand in distinct:
+        name = demand.faculty
+        if name and '/' not in name and demand.kind != 'SS':
+            faculty_slots[name] = faculty_slots.get(name, 0) + demand.slots
+    for name, needed in sorted(faculty_slots.items()):
+        checks += 1
+        if needed > week:
+            issue('faculty', name, needed, week,
+                  f"Faculty '{name}': {needed / 2:g} teaching hours, the week has {week / 2:g}")
+    for (name, section), components in sorted(faculty_section.items()):
+        checks += 1
+        limit = daily_limit * day_count
+        if components > limit:
+            issue('faculty', name, components, limit,
+                  f"Faculty '{name}': {components} components for {'_'.join(map(str, section))}, "
+                  f"at most {daily_limit} a day fit ({limit} a week)")
+
+    course_sessions = {}
+    for demand in demands:
+        if demand.kind not in ('LEC', 'TUT'):
+            continue
+        key = (demand.section, demand.code)
+        course_sessions.setdefault(key, []).append(demand)
+    for (section, code), parts in sorted(course_sessions.items()):
+        checks += 1
+        free = slot_count - len(set(break_slots(section[1])))
+        duration = max(part.duration for part in parts)
+        per_day = 1 + max(0, free - duration) // course_gap
+        sessions = sum(part.sessions for part in parts)
+        if sessions > per_day * day_count:
+            issue('faculty', code, sessions, per_day * day_count,
+                  f"{code} in {'_'.join(map(str, section))}: {sessions} lectures and tutorials, "
+                  f"the {course_gap / 2:g} hour gap allows {per_day * day_count} a week")
+
+    # Sections: slots to sit in, a basket group needs only its longest course per kind
+    section_slots, basket_slots = {}, {}
+    for demand in demands:
+        if demand.group is not None:
+            block = (demand.section, demand.group, demand.kind)
+            basket_slots[block] = max(basket_slots.get(block, 0), demand.slots)
+        else:
+            section_slots[demand.section] = section_slots.get(demand.section, 0) + demand.slots
+    for (section, _, _), slots in basket_slots.items():
+        section_slots[section] = section_slots.get(section, 0) + slots
+    for section, needed in sorted(section_slots.items()):
+        checks += 1
+        supply = day_count * (slot_count - len(set(break_slots(section[1]))))
+        if needed > supply:
+            issue('section', '_'.join(map(str, section)), needed, supply,
+                  f"Section {'_'.join(map(str, section))}: {needed / 2:g} hours of sessions, "
+                  f"{supply / 2:g} hours outside breaks")
+
+    issues.sort(key=lambda item: -item['shortfall'])
+    return FeasibilityReport(issues, checks, time.perf_counter() - started)
@@ -0,0 +1,388 @@
+"""
+Incremental re-solve of a saved timetable solution.
+
+A delta describes one change to the inputs: an edited course row, a room
+taken out of service, or a faculty member unavailable on a given day. Only
+the sessions the delta touches are unplaced. Each one is put back at its
+old slot if that still works, otherwise at the first free candidate. If no
+candidate is free, up to MAX_EJECTIONS of its direct conflicts (sessions in
+the same section or taught by the same faculty) are moved out of the way
+and placed again. Basket block lectures are never ejected; when one of them
+is affected its whole meeting (every section and every elective) moves to a
+common slot. Every other session record is left exactly as it was.
+"""
+
+import argparse
+import copy
+import csv
+import time
+
+from scheduling.placement import Placer, is_block_lecture
+from scheduling.solution import (Session, Solution, basket_group, catalog_row, int_value, lab_room_type,
+                                 lecture_room_type, required_sessions)
+
+# Most direct conflicts moved to make room for one affected session
+MAX_EJECTIONS = 2
+UNPLACED_REASON = 'No free slot for section, faculty and room after incremental re-solve'
+
+
+class CourseChange:
+    """A course row was added or edited (L-T-P-S, faculty, students or Schedule flag)"""
+
+    def __init__(self, department, semester, row):
+        self.department = str(department)
+        self.semester = semester
+        self.row = catalog_row(department, semester, row)
+
+    def apply(self, solution):
+        code = self.row['code']
+        key = (self.department, str(self.semester), code)
+
+        # Replace the catalog entry
+        solution.meta['courses'] = [c for c in solution.meta['courses']
+                                    if (c['department'], str(c['semester']), c['code']) != key]
+        solution.meta['courses'].append(self.row)
+        # The course's sessions are rebuilt below, sessions still unplaced are reported again
+        solution.meta['unscheduled'] = [e for e in solution.meta['unscheduled']
+                                        if (str(e['department']), str(e['semester']), str(e['code'])) != key]
+
+        counts = required_sessions(self.row)
+        if self.row['schedule'].strip().upper() == 'NO':
+            counts = {kind: 0 for kind in counts}
+
+        options = [f.strip() for f in self.row['faculty'].split('/')]
+        sections = [entry for entry in solution.meta['sections']
+                    if entry['department'] == self.department and str(entry['semester']) == str(self.semester)]
+        if not sections:
+            sections = [{'section': 0, 'students': 0}]
+
+        keep, affected, new_sessions = set(), set(), []
+        for entry in sections:
+            section = entry['section']
+            students = int_value(self.row['students']) or int_value(entry.get('students'))
+            existing = [idx for idx, s in enumerate(solution.sessions)
+                        if (s.department, str(s.semester), s.code, s.section) == (*key, section)]
+
+            # Keep the section's current instructor if they are still listed
+            current = next((solution.sessions[idx].faculty for idx in existing
+                            if solution.sessions[idx].kind != 'SS'), None)
+            faculty = current if current in options else options[section % len(options)]
+
+            for kind, count in counts.items():
+                session_faculty = self.row['faculty'] if kind == 'SS' else faculty
+                room_type = lab_room_type(code) if kind == 'LAB' else lecture_room_type(students)
+                same_kind = [idx for idx in existing if solution.sessions[idx].kind == kind]
+                for idx in same_kind[:count]:
+                    session = solution.sessions[idx]
+                    keep.add(idx)
+                    changed = (session.faculty != session_faculty or session.room_type != room_type
+                               or session.students != students or not session.placed)
+                    session.name = self.row['name']
+                    if changed:
+                        session.faculty, session.room_type, session.students = session_faculty, room_type, students
+                        affected.add(idx)
+                for _ in range(count - len(same_kind)):
+                    new_sessions.append(Session(self.department, self.semester, section, code, self.row['name'],
+                                                session_faculty, kind, None, None, solution.duration(kind),
+                                                students=students, room_type=room_type))
+
+        # Drop surplus sessions, keeping every other record in its position
+        dropped = {idx for idx, s in enumerate(solution.sessions)
+                   if (s.department, str(s.semester), s.code) == key and idx not in keep}
+        remap, kept = {}, []
+        for idx, session in enumerate(solution.sessions):
+            if idx not in dropped:
+                remap[idx] = len(kept)
+                kept.append(session)
+        solution.sessions = kept + new_sessions
+        return sorted(remap[idx] for idx in affected) + list(range(len(kept), len(solution.sessions)))
+
+
+class RoomRemoved:
+    """A room can no longer be used"""
+
+    def __init__(self, room):
+        self.room = str(room)
+
+    def apply(self, solution):
+        solution.meta['rooms'].pop(self.room, None)
+        return [idx for idx, s in enumerate(solution.sessions) if self.room in s.rooms]
+
+
+class FacultyUnavailable:
+    """A faculty member cannot teach on a given day"""
+
+    def __init__(self, faculty, day):
+        self.faculty = str(faculty)
+        self.day = day
+
+    def apply(self, solution):
+        day = self.day if isinstance(self.day, int) else (
+            solution.days.index(self.day) if self.day in solution.days else None)
+        if day is None or not 0 <= day < len(solution.days):
+            raise ValueError(f"Unknown day {self.day!r}, expected one of {', '.join(solution.days)} "
+                             f"or an index below {len(solution.days)}")
+        if [self.faculty, day] not in solution.meta['unavailable']:
+            solution.meta['unavailable'].append([self.faculty, day])
+        return [idx for idx, s in enumerate(solution.sessions)
+                if s.placed and s.faculty == self.faculty and s.day == day]
+
+
+class ResolveResult:
+    """Outcome of an incremental re-solve"""
+
+    def __init__(self, solution, affected, moved, unplaced, elapsed):
+        self.solution = solution
+        self.affected = affected
+        self.moved = moved
+        self.unplaced = unplaced
+        self.elapsed = elapsed
+
+    def summary(self):
+        return (f"{len(self.affected)} affected sessions, {len(self.moved)} neighbours moved, "
+                f"{len(self.unplaced)} left unplaced in {self.elapsed * 1000:.1f} ms")
+
+
+def _repair(placer, idx, pinned):
+    """Move up to MAX_EJECTIONS direct conflicts so sessions[idx] fits, True on success"""
+    sessions = placer.solution.sessions
+    session = sessions[idx]
+
+    options = []
+    for day, start in placer.candidates(idx, session):
+        blockers = placer.occupancy.blockers(session, day, start) - {idx}
+        if not blockers or len(blockers) > MAX_EJECTIONS or blockers & pinned:
+            continue
+        # Moving one lecture of a block would split the block
+        if any(is_block_lecture(sessions[b].kind, sessions[b].code) for b in blockers):
+            continue
+        if placer.fits(idx, session, day, start, ignore=blockers):
+            options.append((len(blockers), day, start, blockers))
+    options.sort(key=lambda option: option[:3])
+
+    for _, day, start, blockers in options:
+        previous = {b: (sessions[b].day, sessions[b].start, sessions[b].rooms) for b in blockers}
+        for b in blockers:
+            placer.unplace(b)
+        rooms = placer.find_rooms(session, day, start)
+        if rooms is not None:
+            placer.assign(idx, day, start, rooms)
+            replaced = []
+            for b in sorted(blockers):
+                if not placer.place(b):
+                    break
+                replaced.append(b)
+            else:
+                pinned.update(blockers)
+                return True
+            # Undo and try the next candidate
+            for b in replaced:
+                placer.unplace(b)
+            placer.unplace(idx)
+        for b, (day_b, start_b, rooms_b) in previous.items():
+            placer.assign(b, day_b, start_b, rooms_b)
+    return False
+
+
+def _meetings(solution, session):
+    """(day, start) -> indexes of the placed lectures of each meeting of the session's block"""
+    group = basket_group(session.code)
+    meetings = {}
+    for idx, other in enumerate(solution.sessions):
+        if (other.placed and is_block_lecture(other.kind, other.code) and basket_group(other.code) == group
+                and str(other.semester) == str(session.semester)):
+            meetings.setdefault((other.day, other.start), []).append(idx)
+    return meetings
+
+
+def _shared_rooms(sessions, session, members):
+    """Rooms of a meeting lecture by the same faculty, who teaches all its sections as one class"""
+    return next((sessions[m].rooms for m in members
+                 if session.faculty and sessions[m].placed and sessions[m].faculty == session.faculty), None)
+
+
+def _place_block(placer, members, preferred=None, kept_rooms=None):
+    """Place the lectures of one block meeting at a common (day, start), True on success
+
+    At the preferred slot every lecture keeps its old rooms while they are still free.
+    """
+    sessions = placer.solution.sessions
+    kept_rooms = kept_rooms or {}
+    for day, start in placer.candidates(members[0], sessions[members[0]], preferred):
+        if not all(placer.fits(idx, sessions[idx], day, start, ignore=members) for idx in members):
+            continue
+        booked = []
+        for idx in members:
+            session = sessions[idx]
+            rooms = _shared_rooms(sessions, session, booked)
+            kept = kept_rooms.get(idx)
+            if (rooms is None and kept and (day, start) == preferred
+                    and all(room in placer.rooms and placer.occupancy.room_free(room, day, start, session.duration)
+                            for room in kept)):
+                rooms = kept
+            if rooms is None:
+                rooms = placer.find_rooms(session, day, start)
+            if rooms is None:
+                break
+            placer.assign(idx, day, start, rooms)
+            booked.append(idx)
+        else:
+            return True
+        for idx in booked:
+            placer.unplace(idx)
+    return False
+
+
+def _join_block(placer, idx, meetings):
+    """Place a basket lecture into one of its block's existing meetings, True on success"""
+    sessions = placer.solution.sessions
+    session = sessions[idx]
+    for (day, start), members in sorted(meetings.items()):
+        if not placer.fits(idx, session, day, start, ignore=members):
+            continue
+        rooms = _shared_rooms(sessions, session, members) or placer.find_rooms(session, day, start)
+        if rooms is not None:
+            placer.assign(idx, day, start, rooms)
+            return True
+    return False
+
+
+def _entry_key(entry):
+    return (str(entry['department']), str(entry['semester']), int_value(entry.get('section')),
+            str(entry.get('code', '')), entry.get('component_type'))
+
+
+def _session_key(session):
+    return str(session.department), str(session.semester), int_value(session.section), session.code, session.kind
+
+
+def _update_unscheduled(solution, placed, unplaced):
+    """Take placed sessions off the unscheduled entries and count the ones still unplaced"""
+    entries = solution.meta['unscheduled']
+    for session in placed:
+        entry = next((e for e in entries if _entry_key(e) == _session_key(session)), None)
+        if entry is not None:
+            entry['sessions'] = int_value(entry.get('sessions', 1)) - 1
+            if entry['sessions'] <= 0:
+                entries.remove(entry)
+
+    for s in unplaced:
+        entry = next((e for e in entries
+                      if _entry_key(e) == _session_key(s) and e.get('reason') == UNPLACED_REASON), None)
+        if entry is None:
+            entry = {'department': s.department, 'semester': s.semester, 'section': s.section,
+                     'code': s.code, 'name': s.name, 'faculty': s.faculty, 'component_type': s.kind,
+                     'sessions': 0, 'reason': UNPLACED_REASON}
+            entries.append(entry)
+        entry['sessions'] += 1
+
+
+def apply_delta(solution, delta):
+    """Apply a delta to a copy of the solution and re-solve its neighbourhood"""
+    started = time.perf_counter()
+    solution = Solution([s.copy() for s in solution.sessions], copy.deepcopy(solution.meta))
+    affected = delta.apply(solution)
+
+    placer = Placer(solution, blocked_faculty_days={tuple(entry) for entry in solution.meta['unavailable']})
+    sessions = solution.sessions
+    # An affected block lecture takes its whole meeting along
+    blocks, singles, grouped = [], [], set()
+    for idx in affected:
+        session = sessions[idx]
+        if idx in grouped:
+            continue
+        if session.placed and is_block_lecture(session.kind, session.code):
+            members = _meetings(solution, session)[(session.day, session.start)]
+            grouped.update(members)
+            blocks.append(members)
+        else:
+            singles.append(idx)
+
+    previous = {}
+    for idx in sorted(grouped) + singles:
+        session = sessions[idx]
+        if session.placed:
+            previous[idx] = (session.day, session.start, session.rooms)
+        placer.unplace(idx)
+
+    pinned = set(affected) | grouped
+    unplaced = []
+    for members in blocks:
+        kept_rooms = {idx: previous[idx][2] for idx in members}
+        if _place_block(placer, members, preferred=previous[members[0]][:2], kept_rooms=kept_rooms):
+            continue
+        # The rest of the meeting stays where it was, the affected lectures are reported
+        for idx in members:
+            if idx in affected:
+                unplaced.append(idx)
+            else:
+                placer.assign(idx, *previous[idx])
+
+    for idx in singles:
+        session = sessions[idx]
+        meetings = _meetings(solution, session) if is_block_lecture(session.kind, session.code) else {}
+        if meetings:
+            if not _join_block(placer, idx, meetings):
+                unplaced.append(idx)
+            continue
+        if placer.place(idx, preferred=previous[idx][:2] if idx in previous else None):
+            continue
+        if not _repair(placer, idx, pinned):
+            unplaced.append(idx)
+
+    moved = sorted(idx for idx in pinned - set(affected)
+                   if idx not in grouped or (sessions[idx].day, sessions[idx].start) != previous[idx][:2])
+    _update_unscheduled(solution, [sessions[idx] for idx in affected if sessions[idx].placed],
+                        [sessions[idx] for idx in unplaced])
+
+    return ResolveResult(solution, affected, moved, unplaced, time.perf_counter() - started)
+
+
+def read_course_changes(path):
+    """CourseChange deltas for every row of a combined.csv style file"""
+    with open(path, 'r') as f:
+        return [CourseChange(row['Department'], int_value(row['Semester']) or row['Semester'], row)
+                for row in csv.DictReader(f)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='run.py resolve',
+                                     description='Apply changes to a saved timetable solution')
+    parser.add_argument('solution', help='solution JSON written by a generator')
+    parser.add_argument('--course-change', metavar='CSV',
+                        help='course rows (combined.csv columns) that were added or edited')
+    parser.add_argument('--remove-room', metavar='ROOM', action='append', default=[],
+                        help='room id that can no longer be used')
+    parser.add_argument('--faculty-unavailable', nargs=2, metavar=('FACULTY', 'DAY'), action='append',
+                        default=[], help='faculty name and day name (or index) to keep free')
+    parser.add_argument('--output', help='where to write the updated solution (default: overwrite)')
+    parser.add_argument('--render', action='store_true',
+                        help='also update the section and faculty workbooks, rewriting only changed sheets')
+    args = parser.parse_args(argv)
+
+    deltas = []
+    if args.course_change:
+        deltas.extend(read_course_changes(args.course_change))
+    deltas.extend(RoomRemoved(room) for room in args.remove_room)
+    deltas.extend(FacultyUnavailable(faculty, int(day) if day.isdigit() else day)
+                  for faculty, day in args.faculty_unavailable)
+    if not deltas:
+        parser.error('no changes given')
+
+    solution = Solution.load(args.solution)
+    for delta in deltas:
+        try:
+            result = apply_delta(solution, delta)
+        except ValueError as e:
+            parser.error(str(e))
+        solution = result.solution
+        print(f"{type(delta).__name__}: {result.summary()}")
+
+    path = solution.save(args.output or args.solution)
+    print(f"Updated solution saved as {path}")
+    if args.render:
+        from utils.faculty_render import OUTPUT_FILE as FACULTY_FILE, render_faculty_workbook
+        from utils.solution_render import OUTPUT_FILE, render_workbook
+        render_workbook(solution, OUTPUT_FILE, incremental=True)
+        render_faculty_workbook(solution, FACULTY_FILE, incremental=True)
+    return solution
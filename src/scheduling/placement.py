@@ -0,0 +1,250 @@
+"""
+Candidate-enumeration placement over occupancy indexes.
+
+Instead of drawing random (day, slot) pairs and re-scanning the whole grid,
+the placer keeps one index per section, faculty and room that maps
+day -> slot -> set of session indexes (parallel basket electives share a
+section's slots). Checking a candidate only looks at the
+session's own slots, and the same indexes tell which sessions block a
+candidate when a neighbourhood has to be reshuffled.
+"""
+
+from scheduling.solution import basket_group
+
+LECTURE_KINDS = ('LEC', 'TUT', 'SS')
+COMPONENT_KINDS = ('LEC', 'TUT', 'LAB')
+# Free slots kept between a lecture and the section's other classes
+LECTURE_SPACING_SLOTS = 1
+# Slots (3 hours) between a faculty member's sessions of one course
+COURSE_GAP_SLOTS = 6
+# Sessions a faculty member may teach one section on a day, basket courses count once per code
+DAILY_COMPONENT_LIMIT = 2
+
+
+def lecture_spacing_ok(day_slots, start, duration, spacing=LECTURE_SPACING_SLOTS):
+    """True if no class of the section sits within spacing slots of the lecture
+
+    day_slots maps each busy slot of one section and day to its (kind, code, faculty)
+    entries, with code and faculty only on a session's first slot like the generator's grid.
+    """
+    return not any(kind in COMPONENT_KINDS
+                   for slot in range(start - spacing, start + duration + spacing)
+                   for kind, _, _ in day_slots.get(slot, ()))
+
+
+def course_gap_ok(day_slots, faculty, code, start, gap=COURSE_GAP_SLOTS):
+    """True if the faculty has no lecture or tutorial of the course within gap slots of start"""
+    for slot in range(start - gap, start + gap):
+        if slot == start:
+            continue
+        for kind, slot_code, slot_faculty in day_slots.get(slot, ()):
+            if kind in ('LEC', 'TUT') and slot_code == code and slot_faculty == faculty:
+                return False
+    return True
+
+
+def daily_limit_ok(day_slots, faculty, code=None):
+    """True if the faculty can teach the section once more that day
+
+    Basket courses run in parallel with their group, so they get one extra session.
+    """
+    count = 0
+    baskets = set()
+    entries = [entry for slot_entries in day_slots.values() for entry in slot_entries]
+    for kind, slot_code, slot_faculty in entries:
+        if slot_faculty != faculty or kind not in COMPONENT_KINDS or not slot_code:
+            continue
+        if basket_group(slot_code) is None:
+            count += 1
+        elif slot_code not in baskets:
+            count += 1
+            baskets.add(slot_code)
+    group = basket_group(code) if code else None
+    if group and any(basket_group(slot_code) == group for _, slot_code, _ in entries):
+        return count < DAILY_COMPONENT_LIMIT + 1
+    return count < DAILY_COMPONENT_LIMIT
+
+
+def is_block_lecture(kind, code):
+    """Basket lectures meet in synchronised blocks across sections and electives"""
+    return kind == 'LEC' and basket_group(code) is not None
+
+
+def room_number(room):
+    """Numeric part of a room number, None when it has no digits"""
+    digits = ''.join(filter(str.isdigit, str(room.get('roomNumber', ''))))
+    return int(digits) if digits else None
+
+
+def adjacent_rooms(first, second):
+    """True for rooms on the same floor with consecutive numbers, like 106 and 107"""
+    a, b = room_number(first), room_number(second)
+    return a is not None and b is not None and a // 100 == b // 100 and abs(a - b) == 1
+
+
+class Occupancy:
+    """Section, faculty and room calendars built from a solution's sessions"""
+
+    def __init__(self, sessions=()):
+        self.sections = {}
+        self.faculty = {}
+        self.rooms = {}
+        for idx, session in enumerate(sessions):
+            if session.placed:
+                self.add(idx, session)
+
+    def _calendars(self, session):
+        yield self.sections.setdefault(session.section_key, {})
+        if session.faculty:
+            yield self.faculty.setdefault(session.faculty, {})
+        for room in session.rooms:
+            yield self.rooms.setdefault(room, {})
+
+    def add(self, idx, session):
+        for calendar in self._calendars(session):
+            day = calendar.setdefault(session.day, {})
+            for slot in session.slots:
+                day.setdefault(slot, set()).add(idx)
+
+    def remove(self, idx, session):
+        for calendar in self._calendars(session):
+            day = calendar.get(session.day, {})
+            for slot in session.slots:
+                # Parallel electives keep the slot until the last one leaves
+                day.get(slot, set()).discard(idx)
+                if slot in day and not day[slot]:
+                    del day[slot]
+
+    def room_free(self, room, day, start, duration):
+        calendar = self.rooms.get(room, {}).get(day, {})
+        return all(slot not in calendar for slot in range(start, start + duration))
+
+    def blockers(self, session, day, start):
+        """Indexes of sessions sharing the section or faculty in these slots"""
+        found = set()
+        calendars = [self.sections.get(session.section_key, {})]
+        if session.faculty:
+            calendars.append(self.faculty.get(session.faculty, {}))
+        for calendar in calendars:
+            day_slots = calendar.get(day, {})
+            for slot in range(start, start + session.duration):
+                found |= day_slots.get(slot, set())
+        return found
+
+
+class Placer:
+    """Place sessions of a solution one at a time, checking the hard constraints"""
+
+    def __init__(self, solution, occupancy=None, blocked_faculty_days=(), removed_rooms=()):
+        self.solution = solution
+        self.occupancy = occupancy if occupancy is not None else Occupancy(solution.sessions)
+        self.blocked = set(blocked_faculty_days)
+        self.rooms = {room_id: room for room_id, room in solution.meta['rooms'].items()
+                      if room_id not in set(removed_rooms)}
+
+    def _same_course_on_day(self, idx, session, day):
+        day_slots = self.occupancy.sections.get(session.section_key, {}).get(day, {})
+        for other_idx in set().union(*day_slots.values()):
+            if other_idx != idx and self.solution.sessions[other_idx].code == session.code:
+                return True
+        return False
+
+    def _section_day(self, session, day, skip):
+        """The section's other sessions on a day in the shape the shared rules take"""
+        day_slots = {}
+        for slot, indexes in self.occupancy.sections.get(session.section_key, {}).get(day, {}).items():
+            for other_idx in sorted(indexes - skip):
+                other = self.solution.sessions[other_idx]
+                first = slot == other.start
+                day_slots.setdefault(slot, []).append(
+                    (other.kind, other.code if first else '', other.faculty if first else ''))
+        return day_slots
+
+    def fits(self, idx, session, day, start, ignore=()):
+        """True if the session can take (day, start) apart from its room
+
+        Lectures and tutorials follow the generator's spacing, course gap and daily limit rules.
+        """
+        if start < 0 or start + session.duration > self.solution.slot_count:
+            return False
+        if (session.faculty, day) in self.blocked:
+            return False
+        if self.solution.break_slots(session.semester) & set(range(start, start + session.duration)):
+            return False
+        if self.occupancy.blockers(session, day, start) - set(ignore) - {idx}:
+            return False
+        # Spread a course over the week, one session per section per day
+        if self._same_course_on_day(idx, session, day):
+            return False
+        if session.kind not in ('LEC', 'TUT'):
+            return True
+        day_slots = self._section_day(session, day, set(ignore) | {idx})
+        if not course_gap_ok(day_slots, session.faculty, session.code, start):
+            return False
+        if not daily_limit_ok(day_slots, session.faculty, session.code):
+            return False
+        return session.kind != 'LEC' or lecture_spacing_ok(day_slots, start, session.duration)
+
+    def find_rooms(self, session, day, start):
+        """Free room ids for the session, or None"""
+        if not self.rooms:
+            return ('DEFAULT_ROOM',)
+
+        free = [(room_id, room) for room_id, room in sorted(self.rooms.items())
+                if room['type'].upper() != 'LIBRARY'
+                and self.occupancy.room_free(room_id, day, start, session.duration)]
+
+        if session.kind in LECTURE_KINDS:
+            # Smallest lecture or seater room that holds everyone, preferred type first
+            fitting = [(room['type'].upper() != session.room_type, room['capacity'], room_id)
+                       for room_id, room in free
+                       if ('LECTURE_ROOM' in room['type'].upper() or 'SEATER' in room['type'].upper())
+                       and room['capacity'] >= session.students]
+            return (min(fitting)[2],) if fitting else None
+
+        labs = [(room_id, room) for room_id, room in free if room['type'].upper() == session.room_type]
+        for room_id, room in labs:
+            if room['capacity'] >= session.students:
+                return (room_id,)
+        # Large groups take two labs side by side when a single lab is too small
+        for first_id, first in labs:
+            for second_id, second in labs:
+                if (adjacent_rooms(first, second) and room_number(first) < room_number(second)
+                        and first['capacity'] + second['capacity'] >= session.students):
+                    return (first_id, second_id)
+        return None
+
+    def candidates(self, idx, session, preferred=None):
+        """(day, start) pairs to try, preferred first, then least loaded days"""
+        if preferred is not None:
+            yield preferred
+        section = self.occupancy.sections.get(session.section_key, {})
+        days = sorted(range(len(self.solution.days)), key=lambda d: (len(section.get(d, {})), d))
+        for day in days:
+            for start in range(self.solution.slot_count - session.duration + 1):
+                if (day, start) != preferred:
+                    yield day, start
+
+    def place(self, idx, preferred=None):
+        """Place sessions[idx] at the first feasible candidate, True on success"""
+        session = self.solution.sessions[idx]
+        for day, start in self.candidates(idx, session, preferred):
+            if not self.fits(idx, session, day, start):
+                continue
+            rooms = self.find_rooms(session, day, start)
+            if rooms is None:
+                continue
+            self.assign(idx, day, start, rooms)
+            return True
+        return False
+
+    def assign(self, idx, day, start, rooms):
+        session = self.solution.sessions[idx]
+        session.day, session.start, session.rooms = day, start, tuple(rooms)
+        self.occupancy.add(idx, session)
+
+    def unplace(self, idx):
+        session = self.solution.sessions[idx]
+        if session.placed:
+            self.occupancy.remove(idx, session)
+        session.day, session.start, session.rooms = None, None, ()
@@ -0,0 +1,50 @@
+"""
+Shared candidate orders for sibling sections of a department-semester.
+
+Sections A and B of a cohort need the same sessions, and every slot
+outside the semester's breaks is as good for one as for the other. A
+section batch therefore builds the break-free (day, start) candidates for
+each session length once and shuffles one order per course and session
+kind. Every sibling section reuses that order instead of drawing up to a
+thousand random pairs.
+
+Siblings are interchangeable, so A at (Mon, 9:00) with B at (Tue, 9:00)
+is the same timetable as the swap. Each section k starts scanning the
+shared order at its own offset, k / sections of the way in. Siblings then
+spread over the week instead of retrying each other's slots, and no
+equivalent assignment is explored twice.
+"""
+
+import random
+
+
+class SectionBatch:
+    """Candidate (day, start) orders shared by the sections of one cohort"""
+
+    def __init__(self, section_count, day_count, slot_count, is_break, rng=None):
+        self.section_count = max(1, section_count)
+        self.day_count = day_count
+        self.slot_count = slot_count
+        self.is_break = is_break  # slot -> True if the cohort is on a break
+        self.rng = rng or random
+        self._candidates = {}
+        self._orders = {}
+
+    def candidates(self, duration):
+        """Break-free (day, start) pairs for a session length, computed once"""
+        if duration not in self._candidates:
+            starts = [start for start in range(self.slot_count - duration + 1)
+                      if not any(self.is_break(slot) for slot in range(start, start + duration))]
+            self._candidates[duration] = [(day, start) for day in range(self.day_count) for start in starts]
+        return self._candidates[duration]
+
+    def order(self, code, kind, duration, section):
+        """Shuffled candidates for a course and session kind, rotated to the section's offset"""
+        key = (code, kind, duration)
+        if key not in self._orders:
+            order = list(self.candidates(duration))
+            self.rng.shuffle(order)
+            self._orders[key] = order
+        order = self._orders[key]
+        offset = (section % self.section_count) * len(order) // self.section_count
+        return order[offset:] + order[:offset]
@@ -0,0 +1,370 @@
+"""
+Saved timetable solutions.
+
+A solution is a flat list of placed sessions (one record per lecture,
+tutorial, lab or self-study occurrence of a course in a section) plus the
+metadata needed to check or re-place them later: day names, slot labels,
+break slots per semester, the course catalog, the rooms and whatever could
+not be scheduled. Generators write it next to their Excel output so later
+runs can work from the solution instead of re-parsing workbooks, and the
+renderers can rebuild every output from it without solving again.
+
+Version 2 stores sessions as rows of a column table. Repeated strings
+(departments, codes, names, faculty, rooms) are stored once in a string
+table and referenced by index, which keeps large solutions small and quick
+to load. Version 1 files (one dict per session) can still be read.
+"""
+
+import json
+
+SOLUTION_VERSION = 2
+SOLUTION_FILE = 'timetable_solution.json'
+
+# Column order of a version 2 session row; string columns hold string table indexes
+SESSION_COLUMNS = ('department', 'semester', 'section', 'code', 'name', 'faculty', 'kind',
+                   'day', 'start', 'duration', 'rooms', 'students', 'room_type')
+STRING_COLUMNS = ('department', 'code', 'name', 'faculty', 'kind', 'room_type')
+
+# Session kinds in the order generators place them
+SESSION_KINDS = ('LEC', 'TUT', 'LAB', 'SS')
+
+# Session lengths in 30 minute slots, used when a solution does not list its own
+DEFAULT_DURATIONS = {'LEC': 3, 'TUT': 2, 'LAB': 4, 'SS': 2}
+
+
+def int_value(value):
+    """Whole number from a CSV or JSON cell, 0 when it is empty or not a number"""
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def plain_value(value):
+    """numpy/pandas scalars as the plain Python values they load back as from JSON"""
+    return value.item() if hasattr(value, 'item') else value
+
+
+def basket_group(code):
+    """B1 for basket codes like B1-CS401, None otherwise (same rule as the generators)"""
+    code = str(code)
+    return code.split('-')[0] if code.startswith('B') and '-' in code else None
+
+
+def required_sessions(row):
+    """Session counts per kind for a course row (same rules as the generators)"""
+    l = float(row.get('L') or 0)
+    t = int_value(row.get('T'))
+    p = int_value(row.get('P'))
+    s = int_value(row.get('S'))
+
+    # Self-study only courses are listed on the sheet, not placed
+    if s > 0 and l == 0 and t == 0 and p == 0:
+        return {'LEC': 0, 'TUT': 0, 'LAB': 0, 'SS': 0}
+
+    return {
+        'LEC': max(1, round(l * 2 / 3)) if l > 0 else 0,
+        'TUT': t,
+        'LAB': p // 2,
+        'SS': s // 4,
+    }
+
+
+def lab_room_type(code):
+    code = str(code).upper()
+    if 'CS' in code or 'DS' in code:
+        return 'COMPUTER_LAB'
+    if 'EC' in code:
+        return 'HARDWARE_LAB'
+    return 'COMPUTER_LAB'
+
+
+def lecture_room_type(students):
+    if students > 120:
+        return 'SEATER_240'
+    if students > 70:
+        return 'SEATER_120'
+    return 'LECTURE_ROOM'
+
+
+def catalog_row(department, semester, row):
+    """Convert a combined.csv style row into a solution catalog entry"""
+    return {
+        'department': str(department),
+        'semester': semester,
+        'code': str(row.get('Course Code', row.get('code', ''))),
+        'name': str(row.get('Course Name', row.get('name', ''))),
+        'faculty': str(row.get('Faculty', row.get('faculty', ''))),
+        'L': row.get('L', 0), 'T': row.get('T', 0), 'P': row.get('P', 0),
+        'S': row.get('S', 0), 'C': row.get('C', 0),
+        'students': str(row.get('total_students', row.get('students', ''))),
+        'schedule': str(row.get('Schedule', row.get('schedule', 'Yes')) or 'Yes'),
+    }
+
+
+class Session:
+    """A single placed (or still unplaced) session"""
+
+    __slots__ = ('department', 'semester', 'section', 'code', 'name', 'faculty', 'kind',
+                 'day', 'start', 'duration', 'rooms', 'students', 'room_type')
+
+    def __init__(self, department, semester, section, code, name, faculty, kind,
+                 day, start, duration, rooms=(), students=0, room_type='LECTURE_ROOM'):
+        self.department = str(department)
+        self.semester = plain_value(semester)
+        self.section = int(section)
+        self.code = str(code)
+        self.name = str(name)
+        self.faculty = str(faculty)
+        self.kind = kind
+        self.day = day
+        self.start = start
+        self.duration = int(duration)
+        self.rooms = tuple(rooms)
+        self.students = int(students or 0)
+        self.room_type = room_type
+
+    @property
+    def section_key(self):
+        return (self.department, self.semester, self.section)
+
+    @property
+    def course_key(self):
+        return (self.department, self.semester, self.code)
+
+    @property
+    def placed(self):
+        return self.day is not None and self.start is not None
+
+    @property
+    def slots(self):
+        return range(self.start, self.start + self.duration) if self.placed else range(0)
+
+    def copy(self):
+        return Session.from_dict(self.to_dict())
+
+    def to_dict(self):
+        return {
+            'department': self.department,
+            'semester': self.semester,
+            'section': self.section,
+            'code': self.code,
+            'name': self.name,
+            'faculty': self.faculty,
+            'kind': self.kind,
+            'day': self.day,
+            'start': self.start,
+            'duration': self.duration,
+            'rooms': list(self.rooms),
+            'students': self.students,
+            'room_type': self.room_type,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['department'], data['semester'], data['section'], data['code'],
+                   data.get('name', ''), data.get('faculty', ''), data['kind'],
+                   data.get('day'), data.get('start'), data['duration'],
+                   data.get('rooms', ()), data.get('students', 0),
+                   data.get('room_type', 'LECTURE_ROOM'))
+
+    def __repr__(self):
+        return (f"Session({self.code} {self.kind}, {self.department}-{self.semester}"
+                f"/{self.section}, day={self.day}, start={self.start})")
+
+
+class BasketCell:
+    """Basket electives of one group that a section has starting in the same slot"""
+
+    __slots__ = ('group', 'day', 'start', 'sessions')
+
+    def __init__(self, group, day, start):
+        self.group = group
+        self.day = day
+        self.start = start
+        self.sessions = []
+
+    @property
+    def codes(self):
+        return list(dict.fromkeys(session.code for session in self.sessions))
+
+    @property
+    def duration(self):
+        return max(session.duration for session in self.sessions)
+
+    def __repr__(self):
+        return f"BasketCell({self.group}, day={self.day}, start={self.start}, {self.codes})"
+
+
+class Solution:
+    """Placed sessions plus the metadata needed to reload or re-solve them"""
+
+    def __init__(self, sessions=None, meta=None):
+        self.sessions = list(sessions or [])
+        self.meta = meta if meta is not None else {}
+        self.meta.setdefault('days', [])
+        self.meta.setdefault('slots', [])
+        self.meta.setdefault('breaks', {})
+        self.meta.setdefault('sections', [])
+        self.meta.setdefault('courses', [])
+        self.meta.setdefault('rooms', {})
+        self.meta.setdefault('unscheduled', [])
+        self.meta.setdefault('durations', dict(DEFAULT_DURATIONS))
+        self.meta.setdefault('unavailable', [])
+
+    @property
+    def days(self):
+        return self.meta['days']
+
+    @property
+    def slot_count(self):
+        return len(self.meta['slots'])
+
+    def duration(self, kind):
+        return self.meta['durations'].get(kind, DEFAULT_DURATIONS[kind])
+
+    def break_slots(self, semester):
+        """Break slot indexes for a semester (lunch breaks are staggered per semester)"""
+        breaks = self.meta['breaks']
+        return set(breaks.get(str(semester), breaks.get(str(semester)[:1], [])))
+
+    def course(self, department, semester, code):
+        """Catalog row for a course, or None"""
+        for row in self.meta['courses']:
+            if (row['department'] == str(department) and str(row['semester']) == str(semester)
+                    and row['code'] == str(code)):
+                return row
+        return None
+
+    def section_title(self, department, semester, section):
+        for entry in self.meta['sections']:
+            if (entry['department'] == str(department) and str(entry['semester']) == str(semester)
+                    and entry['section'] == section):
+                return entry['title']
+        return f"{department}_{semester}"
+
+    def faculty_index(self):
+        """Map faculty name -> indexes of their placed sessions"""
+        index = {}
+        for idx, session in enumerate(self.sessions):
+            if session.placed:
+                index.setdefault(session.faculty, []).append(idx)
+        return index
+
+    def section_index(self):
+        """Map (department, semester, section) -> indexes of placed sessions"""
+        index = {}
+        for idx, session in enumerate(self.sessions):
+            if session.placed:
+                index.setdefault(session.section_key, []).append(idx)
+        return index
+
+    def room_index(self):
+        """Map room id -> indexes of placed sessions using it"""
+        index = {}
+        for idx, session in enumerate(self.sessions):
+            if session.placed:
+                for room in session.rooms:
+                    index.setdefault(room, []).append(idx)
+        return index
+
+    def basket_index(self):
+        """Map (department, semester, section, day, start) -> BasketCell
+
+        Built in one pass, so renderers and exporters look basket cells up
+        instead of scanning a day's sessions for every elective.
+        """
+        index = {}
+        for session in self.sessions:
+            group = basket_group(session.code)
+            if group is None or not session.placed:
+                continue
+            key = session.section_key + (session.day, session.start)
+            if key not in index:
+                index[key] = BasketCell(group, session.day, session.start)
+            index[key].sessions.append(session)
+        return index
+
+    def to_dict(self):
+        """Version 2 layout: column table of sessions plus a shared string table"""
+        strings, index = [], {}
+
+        def ref(value):
+            if value not in index:
+                index[value] = len(strings)
+                strings.append(value)
+            return index[value]
+
+        rows = []
+        for session in self.sessions:
+            data = session.to_dict()
+            for column in STRING_COLUMNS:
+                data[column] = ref(data[column])
+            data['rooms'] = [ref(room) for room in data['rooms']]
+            rows.append([data[column] for column in SESSION_COLUMNS])
+        return {
+            'version': SOLUTION_VERSION,
+            'meta': self.meta,
+            'strings': strings,
+            'columns': list(SESSION_COLUMNS),
+            'sessions': rows,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        version = data.get('version', SOLUTION_VERSION)
+        if version == 1:
+            return cls([Session.from_dict(s) for s in data.get('sessions', [])], data.get('meta', {}))
+        if version != SOLUTION_VERSION:
+            raise ValueError(f"Unsupported solution version: {version}")
+
+        strings = data.get('strings', [])
+        columns = data.get('columns', SESSION_COLUMNS)
+        sessions = []
+        for row in data.get('sessions', []):
+            values = dict(zip(columns, row))
+            for column in STRING_COLUMNS:
+                values[column] = strings[values[column]]
+            values['rooms'] = [strings[room] for room in values['rooms']]
+            sessions.append(Session.from_dict(values))
+        return cls(sessions, data.get('meta', {}))
+
+    def save(self, path=SOLUTION_FILE):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, separators=(',', ':'), default=plain_value)
+        return path
+
+    @classmethod
+    def load(cls, path=SOLUTION_FILE):
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+
+def grid_sessions(timetable):
+    """Yield (day, start, duration, cell) for every session in a section grid
+
+    Grids use the generators' layout: timetable[day][slot] holds a cell dict
+    whose 'type' is set on every slot of a session, while code, name, faculty
+    and classroom are only filled in on its first slot.
+    """
+    for day in sorted(timetable):
+        slots = timetable[day]
+        slot_ids = sorted(slots)
+        for pos, slot in enumerate(slot_ids):
+            cell = slots[slot]
+            if cell.get('type') is None or not cell.get('code'):
+                continue
+            duration = 1
+            for next_slot in slot_ids[pos + 1:]:
+                nxt = slots[next_slot]
+                if nxt.get('type') != cell['type'] or nxt.get('code'):
+                    break
+                duration += 1
+            yield day, slot, duration, cell
+
+
+def split_rooms(classroom):
+    """Room ids from a classroom label ('C101', 'L105+L106' or 'L105,L106')"""
+    if not classroom:
+        return ()
+    return tuple(part.strip() for part in str(classroom).replace(',', '+').split('+') if part.strip())
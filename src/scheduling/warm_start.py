@@ -0,0 +1,218 @@
+"""
+Warm-start timetable generation from a previous solution.
+
+The prior solution can be a saved solution JSON or a generated timetable
+workbook. Before searching, a generator hands each section's prior
+sessions to preplace_sessions(). Every session that is still valid under
+the current inputs goes straight into the empty grid, faculty calendar and
+room calendar, and the generator only searches for what is left.
+
+A session is still valid when all of these hold:
+- its course is still listed, and that kind of session is still needed
+- its faculty is still one of the listed instructors
+- its slots are free and are not breaks
+- its rooms still exist, fit the session and are free
+
+Basket cells in a workbook list every course of the group, so they cannot
+be tied to one course. Workbook warm starts therefore re-search basket
+courses.
+"""
+
+import os
+import re
+
+from scheduling.solution import DEFAULT_DURATIONS, Session, Solution, split_rooms
+
+CELL_PATTERN = re.compile(r'^(\S+)\s+(LEC|TUT|LAB|SS)$')
+
+WEEKDAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+
+def load_prior_solution(source):
+    """Load a prior solution from a Solution, a solution JSON or timetable workbook(s)"""
+    if source is None or isinstance(source, Solution):
+        return source
+    try:
+        if isinstance(source, (list, tuple)) or str(source).lower().endswith('.xlsx'):
+            return parse_timetable_workbook(source)
+        return Solution.load(source)
+    except FileNotFoundError:
+        print(f"Warning: prior solution {source} not found, starting from an empty timetable")
+    except Exception as e:
+        print(f"Warning: could not read prior solution {source}: {e}")
+    return None
+
+
+def parse_sheet_title(title):
+    """(department, semester, section) from a section sheet title like CSE_4 or CSE_4_B"""
+    parts = title.split('_')
+    if len(parts) < 2:
+        return None
+    section = 0
+    if len(parts) >= 3 and len(parts[-1]) == 1 and parts[-1].isalpha():
+        section = ord(parts[-1].upper()) - 65
+        parts = parts[:-1]
+    department, semester = '_'.join(parts[:-1]), parts[-1]
+    if not semester.isdigit():
+        return None
+    return department, int(semester), section
+
+
+def parse_timetable_workbook(path):
+    """Rebuild a Solution from a generated timetable workbook (non-basket sessions)"""
+    from openpyxl import load_workbook
+
+    paths = path if isinstance(path, (list, tuple)) else [path]
+    sessions, meta = [], {'days': [], 'slots': []}
+
+    for workbook_path in paths:
+        wb = load_workbook(workbook_path)
+        for ws in wb.worksheets:
+            key = parse_sheet_title(ws.title)
+            if key is None:
+                continue
+            department, semester, section = key
+
+            header = [cell.value for cell in ws[1]]
+            if not header or header[0] != 'Day':
+                continue
+            meta['slots'] = meta['slots'] or [str(label) for label in header[1:] if label]
+
+            # Session length comes from the merged range that starts at a cell
+            widths = {(r.min_row, r.min_col): r.max_col - r.min_col + 1 for r in ws.merged_cells.ranges}
+
+            # Day rows come straight after the header, the legend tables follow
+            for row in ws.iter_rows(min_row=2, max_row=ws.max_row):
+                day_name = row[0].value
+                if day_name not in WEEKDAYS:
+                    break
+                if day_name not in meta['days']:
+                    meta['days'].append(day_name)
+                day = meta['days'].index(day_name)
+
+                for cell in row[1:]:
+                    if not isinstance(cell.value, str):
+                        continue
+                    lines = cell.value.split('\n')
+                    match = CELL_PATTERN.match(lines[0].strip())
+                    if not match:
+                        continue
+                    code, kind = match.groups()
+                    room = lines[1].split(':', 1)[-1].strip() if len(lines) > 1 else ''
+                    faculty = lines[2].strip() if len(lines) > 2 else ''
+                    duration = widths.get((cell.row, cell.column), DEFAULT_DURATIONS[kind])
+                    sessions.append(Session(department, semester, section, code, '', faculty, kind,
+                                            day, cell.column - 2, duration, split_rooms(room)))
+
+    print(f"Parsed {len(sessions)} sessions from {', '.join(os.path.basename(p) for p in paths)}")
+    return Solution(sessions, meta)
+
+
+def prior_sessions_by_section(solution):
+    """Group placed prior sessions by (department, semester, section), semester as text"""
+    prior = {}
+    if solution is None:
+        return prior
+    for session in solution.sessions:
+        if session.placed:
+            key = (session.department, str(session.semester), session.section)
+            prior.setdefault(key, []).append(session)
+    return prior
+
+
+def course_spec(name, faculty, counts, lab_room_type, students):
+    """What a generator currently needs for one course of a section"""
+    return {
+        'name': name,
+        'faculty': faculty,
+        'options': {f.strip() for f in faculty.split('/')},
+        'counts': counts,
+        'lab_room_type': lab_room_type,
+        'students': students,
+    }
+
+
+def _room_fits(room, kind, spec, room_count):
+    room_type = room['type'].upper()
+    if room_type == 'LIBRARY':
+        return False
+    if kind == 'LAB':
+        return room_type == spec['lab_room_type']
+    if not ('LECTURE_ROOM' in room_type or 'SEATER' in room_type):
+        return False
+    return room_count > 1 or room['capacity'] >= spec['students']
+
+
+def preplace_sessions(prior, timetable, professor_schedule, rooms, specs, is_break, durations=None):
+    """Copy still-valid prior sessions into an empty section grid
+
+    specs maps (code, raw faculty) -> course_spec(), since a code can appear
+    on several rows with different instructors. Returns the number of
+    sessions placed per (code, raw faculty, kind) and the instructor used per
+    (code, raw faculty). The generator can then skip what is already placed
+    and keep the same instructor.
+    """
+    durations = durations or DEFAULT_DURATIONS
+    placed, faculty_used = {}, {}
+    slot_count = len(timetable[0]) if timetable else 0
+
+    by_code = {}
+    for key, spec in specs.items():
+        by_code.setdefault(key[0], []).append((key, spec))
+
+    for session in sorted(prior, key=lambda s: (s.day, s.start)):
+        kind, faculty = session.kind, session.faculty
+        if session.day not in timetable or session.duration != durations.get(kind):
+            continue
+
+        # Course row this session still belongs to: same code, instructor still listed, count not used up
+        match = None
+        for key, spec in by_code.get(session.code, []):
+            if placed.get(key + (kind,), 0) >= spec['counts'].get(kind, 0):
+                continue
+            # Self-study keeps the raw faculty string, everything else one instructor
+            if kind == 'SS':
+                if faculty != spec['faculty']:
+                    continue
+            elif faculty.strip() not in spec['options'] or faculty_used.get(key, faculty) != faculty:
+                continue
+            match = (key, spec)
+            break
+        if match is None:
+            continue
+        key, spec = match
+
+        slots = range(session.start, session.start + session.duration)
+        if session.start < 0 or slots.stop > slot_count:
+            continue
+        calendar = professor_schedule.setdefault(faculty, {day: set() for day in timetable})
+        if any(is_break(slot) or timetable[session.day][slot]['type'] is not None
+               or slot in calendar[session.day] for slot in slots):
+            continue
+
+        if rooms:
+            room_ids = [room_id for room_id in session.rooms if room_id in rooms]
+            if not room_ids or len(room_ids) != len(session.rooms):
+                continue
+            if not all(_room_fits(rooms[room_id], kind, spec, len(room_ids)) for room_id in room_ids):
+                continue
+            if any(slot in rooms[room_id]['schedule'][session.day] for room_id in room_ids for slot in slots):
+                continue
+            for room_id in room_ids:
+                rooms[room_id]['schedule'][session.day].update(slots)
+        classroom = '+'.join(session.rooms) if session.rooms else 'DEFAULT_ROOM'
+
+        for i, slot in enumerate(slots):
+            calendar[session.day].add(slot)
+            cell = timetable[session.day][slot]
+            cell['type'] = kind
+            cell['code'] = session.code if i == 0 else ''
+            cell['name'] = spec['name'] if i == 0 else ''
+            cell['faculty'] = faculty if i == 0 else ''
+            cell['classroom'] = classroom if i == 0 else ''
+
+        placed[key + (kind,)] = placed.get(key + (kind,), 0) + 1
+        if kind != 'SS':
+            faculty_used[key] = faculty
+
+    return placed, faculty_used
@@ -0,0 +1,39 @@
+"""
+Shared cell styles for the Excel renderers.
+
+The renderers used to build a new PatternFill, Alignment, Font or Border
+for nearly every cell. openpyxl then hashes each one again to find the
+style it already stored. These factories return one object per distinct
+style instead, so a timetable with thousands of cells builds only a few
+dozen style objects. Style objects are never changed after they are
+assigned, so it is safe to share them between cells, sheets and workbooks.
+"""
+
+from functools import lru_cache
+
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+
+
+@lru_cache(maxsize=None)
+def solid_fill(color):
+    """Solid background fill of one RGB colour, e.g. '4F8A8B'"""
+    return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+
+@lru_cache(maxsize=None)
+def font(**kwargs):
+    """Font(**kwargs), built once per distinct set of arguments"""
+    return Font(**kwargs)
+
+
+@lru_cache(maxsize=None)
+def alignment(**kwargs):
+    """Alignment(**kwargs), built once per distinct set of arguments"""
+    return Alignment(**kwargs)
+
+
+@lru_cache(maxsize=None)
+def thin_border(color=None):
+    """Thin border on all four sides, in the default colour unless one is given"""
+    side = Side(style='thin', color=color) if color else Side(style='thin')
+    return Border(left=side, right=side, top=side, bottom=side)
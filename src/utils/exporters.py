@@ -0,0 +1,266 @@
+"""
+Plain-text exports of a saved solution: CSV, JSON and iCalendar feeds.
+
+The xlsx workbooks are for people. Calendar systems and room-booking tools
+need flat data instead, so these exporters write it straight from the
+solution's session records in one pass, with no styling and no workbook
+in between:
+
+- sessions.csv: one row per placed session
+- sessions.json: the same rows as a JSON array
+- ics/faculty/<name>.ics, ics/sections/<title>.ics, ics/rooms/<room>.ics:
+  one weekly recurring event per session. Each event is formatted once
+  and shared by every feed it belongs to.
+
+    python run.py export timetable_solution.json --format ics --term-start 2025-01-06 --weeks 16
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+from datetime import date, datetime, timedelta, timezone
+
+from scheduling.solution import SOLUTION_FILE, Solution, basket_group
+from utils.faculty_render import extract_faculty_names
+
+OUTPUT_DIR = 'exports'
+FORMATS = ('csv', 'json', 'ics')
+
+COLUMNS = ['department', 'semester', 'section', 'section_title', 'code', 'name', 'faculty', 'kind',
+           'basket', 'day', 'day_name', 'start_slot', 'end_slot', 'start_time', 'end_time',
+           'rooms', 'students', 'room_type']
+
+# Used when the solution's slot labels are not 'HH:MM-HH:MM'
+DAY_START = '09:00'
+SLOT_MINUTES = 30
+
+DEFAULT_WEEKS = 16
+
+
+def slot_times(solution):
+    """(start, end) 'HH:MM' strings per slot, from the slot labels when they are times"""
+    times = []
+    for label in solution.meta['slots']:
+        match = re.fullmatch(r'\s*(\d{1,2}:\d{2})\s*-\s*(\d{1,2}:\d{2})\s*', str(label))
+        if not match:
+            break
+        times.append((match.group(1).zfill(5), match.group(2).zfill(5)))
+    else:
+        return times
+
+    first = datetime.strptime(DAY_START, '%H:%M')
+    return [((first + timedelta(minutes=slot * SLOT_MINUTES)).strftime('%H:%M'),
+             (first + timedelta(minutes=(slot + 1) * SLOT_MINUTES)).strftime('%H:%M'))
+            for slot in range(solution.slot_count)]
+
+
+def session_rows(solution):
+    """Yield one flat dict per placed session, in solution order"""
+    times = slot_times(solution)
+    titles = {(entry['department'], str(entry['semester']), entry['section']): entry['title']
+              for entry in solution.meta['sections']}
+    for session in solution.sessions:
+        if not session.placed:
+            continue
+        end = session.start + session.duration
+        yield {
+            'department': session.department,
+            'semester': session.semester,
+            'section': session.section,
+            'section_title': titles.get((session.department, str(session.semester), session.section),
+                                        f"{session.department}_{session.semester}"),
+            'code': session.code,
+            'name': session.name,
+            'faculty': session.faculty,
+            'kind': session.kind,
+            'basket': basket_group(session.code) or '',
+            'day': session.day,
+            'day_name': solution.days[session.day],
+            'start_slot': session.start,
+            'end_slot': end,
+            'start_time': times[session.start][0],
+            'end_time': times[end - 1][1],
+            'rooms': list(session.rooms),
+            'students': session.students,
+            'room_type': session.room_type,
+        }
+
+
+def export_csv(solution, path):
+    """sessions.csv style export, rooms separated by ';'. Returns the row count"""
+    count = 0
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS)
+        writer.writeheader()
+        for row in session_rows(solution):
+            row['rooms'] = ';'.join(row['rooms'])
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def export_json(solution, path):
+    """JSON array of session rows, written one row at a time. Returns the row count"""
+    count = 0
+    with open(path, 'w') as f:
+        f.write('[')
+        for row in session_rows(solution):
+            f.write(',\n' if count else '\n')
+            f.write(json.dumps(row, default=str))
+            count += 1
+        f.write('\n]\n')
+    return count
+
+
+def _escape(text):
+    """iCalendar TEXT value escaping"""
+    return (str(text).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def _fold(line):
+    """Fold a content line at 75 octets, as iCalendar requires"""
+    data = line.encode('utf-8')
+    if len(data) <= 75:
+        return line
+    parts, start, limit = [], 0, 75
+    while start < len(data):
+        end = min(start + limit, len(data))
+        while end < len(data) and (data[end] & 0xC0) == 0x80:  # never split a UTF-8 sequence
+            end -= 1
+        parts.append(data[start:end].decode('utf-8'))
+        start, limit = end, 74  # continuation lines start with a space
+    return '\r\n '.join(parts)
+
+
+def file_name(name):
+    """Safe file name for a faculty member, section or room"""
+    return re.sub(r'_+', '_', re.sub(r'[^A-Za-z0-9.-]', '_', str(name))).strip('_')[:100] or 'unnamed'
+
+
+def unique_file_names(names):
+    """{name: file name} with a _2, _3, ... suffix where names would share a file
+
+    Names differing only in punctuation or case ("Dr. X, Y" and "Dr. X Y")
+    sanitise alike; without the suffix one feed would overwrite the other.
+    """
+    taken, files = set(), {}
+    for name in names:
+        base = candidate = file_name(name)
+        number = 1
+        while candidate.lower() in taken:
+            number += 1
+            candidate = f"{base}_{number}"
+        taken.add(candidate.lower())
+        files[name] = candidate
+    return files
+
+
+def _uid(row):
+    """Event id from what the session is and when, stable across re-exports of the same solution"""
+    return file_name(f"{row['department']}-{row['semester']}-{row['section']}-{row['code']}-"
+                     f"{row['kind']}-{row['day']}-{row['start_slot']}")
+
+
+def _event(row, uid, term_start, weeks, stamp):
+    """VEVENT lines of a session, repeating weekly from its first day in the term"""
+    first_day = term_start + timedelta(days=(row['day'] - term_start.weekday()) % 7)
+    day = first_day.strftime('%Y%m%d')
+    summary = f"{row['code']} {row['kind']} ({row['section_title']})"
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:{uid}@sdtt-timetable',
+        f'DTSTAMP:{stamp}',
+        f"DTSTART:{day}T{row['start_time'].replace(':', '')}00",
+        f"DTEND:{day}T{row['end_time'].replace(':', '')}00",
+        f'RRULE:FREQ=WEEKLY;COUNT={weeks}',
+        f'SUMMARY:{_escape(summary)}',
+        f"LOCATION:{_escape(', '.join(row['rooms']))}",
+        f"DESCRIPTION:{_escape(row['name'])}\\n{_escape(row['faculty'])}",
+        'END:VEVENT',
+    ]
+    return '\r\n'.join(_fold(line) for line in lines)
+
+
+def _write_calendar(path, name, events):
+    with open(path, 'w', newline='') as f:
+        f.write('BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//sdtt_timetable//EN\r\n'
+                f'{_fold("X-WR-CALNAME:" + _escape(name))}\r\n')
+        for event in events:
+            f.write(event)
+            f.write('\r\n')
+        f.write('END:VCALENDAR\r\n')
+
+
+def export_ics(solution, directory, term_start=None, weeks=DEFAULT_WEEKS):
+    """Per-faculty, per-section and per-room .ics feeds under directory
+
+    term_start is the first day of teaching (default: this week's Monday).
+    Returns {'faculty': n, 'sections': n, 'rooms': n}, the files written.
+    """
+    term_start = term_start or date.today() - timedelta(days=date.today().weekday())
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    feeds = {'faculty': {}, 'sections': {}, 'rooms': {}}
+    names, uids = {}, {}
+
+    for row in session_rows(solution):
+        uid = _uid(row)
+        # Electives sharing a placeholder code (B2-NEW) in one slot need distinct ids
+        uids[uid] = uids.get(uid, 0) + 1
+        if uids[uid] > 1:
+            uid = f"{uid}-{uids[uid]}"
+        event = _event(row, uid, term_start, weeks, stamp)
+        if row['faculty'] not in names:
+            names[row['faculty']] = extract_faculty_names(row['faculty'])
+        for faculty in names[row['faculty']]:
+            feeds['faculty'].setdefault(faculty, []).append(event)
+        feeds['sections'].setdefault(row['section_title'], []).append(event)
+        for room in row['rooms']:
+            feeds['rooms'].setdefault(room, []).append(event)
+
+    written = {}
+    for kind, calendars in feeds.items():
+        os.makedirs(os.path.join(directory, kind), exist_ok=True)
+        files = unique_file_names(calendars)
+        for name, events in calendars.items():
+            _write_calendar(os.path.join(directory, kind, f"{files[name]}.ics"), name, events)
+        written[kind] = len(set(files.values()))
+    return written
+
+
+def export_all(solution, directory=OUTPUT_DIR, formats=FORMATS, term_start=None, weeks=DEFAULT_WEEKS):
+    """Write the chosen formats under directory, returns a line per export"""
+    os.makedirs(directory, exist_ok=True)
+    done = []
+    if 'csv' in formats:
+        path = os.path.join(directory, 'sessions.csv')
+        done.append(f"{export_csv(solution, path)} sessions written to {path}")
+    if 'json' in formats:
+        path = os.path.join(directory, 'sessions.json')
+        done.append(f"{export_json(solution, path)} sessions written to {path}")
+    if 'ics' in formats:
+        path = os.path.join(directory, 'ics')
+        counts = export_ics(solution, path, term_start, weeks)
+        done.append(f"{counts['faculty']} faculty, {counts['sections']} section and "
+                    f"{counts['rooms']} room calendars written to {path}")
+    return done
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='run.py export',
+                                     description='Export a saved solution as CSV, JSON and iCalendar feeds')
+    parser.add_argument('solution', nargs='?', default=SOLUTION_FILE,
+                        help=f'solution JSON written by a generator (default: {SOLUTION_FILE})')
+    parser.add_argument('--format', choices=FORMATS + ('all',), default='all', help='what to export (default: all)')
+    parser.add_argument('--output', default=OUTPUT_DIR, help=f'directory to write to (default: {OUTPUT_DIR})')
+    parser.add_argument('--term-start', type=date.fromisoformat, metavar='YYYY-MM-DD',
+                        help="first day of teaching for the calendars (default: this week's Monday)")
+    parser.add_argument('--weeks', type=int, default=DEFAULT_WEEKS,
+                        help=f'weeks each calendar event repeats (default: {DEFAULT_WEEKS})')
+    args = parser.parse_args(argv)
+
+    formats = FORMATS if args.format == 'all' else (args.format,)
+    for line in export_all(Solution.load(args.solution), args.output, formats, args.term_start, args.weeks):
+        print(line)
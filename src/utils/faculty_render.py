@@ -0,0 +1,243 @@
+"""
+Faculty timetables rendered from a saved solution.
+
+all_faculty_timetables.xlsx used to be rebuilt by reading the combined
+section workbook back with pandas and parsing the text of every cell
+('room no.' lines, basket detail lines), with a catalog lookup per cell.
+Here it comes straight from the solution's faculty index instead: every
+placed session already carries its course, kind, rooms and section, so no
+workbook is read back and a change to the cell layout cannot break it.
+With --incremental only the sheets of faculty whose classes changed are
+written again (utils/workbook_cache.py).
+"""
+
+import argparse
+import sys
+from datetime import datetime
+
+import pandas as pd
+
+from scheduling.solution import SOLUTION_FILE, Solution
+from utils import excel_styles, workbook_writer
+from utils.excel_styles import alignment, font, solid_fill, thin_border
+from utils.solution_render import room_label
+from utils.workbook_cache import SheetCache, content_hash, renderer_version
+from utils.workbook_writer import BACKENDS, DEFAULT_BACKEND, create_workbook
+
+OUTPUT_FILE = 'all_faculty_timetables.xlsx'
+
+HEADER = ['Day', 'Time Slot', 'Course Code', 'Course Name', 'Class Type', 'Room', 'Department-Semester']
+COLUMN_WIDTHS = {'A': 15, 'B': 20, 'C': 15, 'D': 40, 'E': 12, 'F': 25, 'G': 30}
+
+# Row fill per class type
+CLASS_COLORS = {'LEC': "B8CCE4", 'TUT': "E4B8CC", 'LAB': "CCE4B8"}
+OTHER_COLOR = "F2F2F2"
+
+
+def extract_faculty_names(faculty_string):
+    """Extract individual faculty names from a combined string"""
+    if not faculty_string or pd.isna(faculty_string):
+        return []
+
+    faculty_string = str(faculty_string).strip()
+    if faculty_string.lower() in ['nan', 'none', '']:
+        return []
+
+    faculty_names = []
+
+    # Split by common separators and handle various formats
+    if '&' in faculty_string:
+        faculty_names = faculty_string.split('&')
+    elif ' and ' in faculty_string.lower():
+        # Split by "and" but keep the original case of each name
+        for part in faculty_string.lower().split(' and '):
+            start_idx = faculty_string.lower().find(part)
+            if start_idx >= 0:
+                faculty_names.append(faculty_string[start_idx:start_idx + len(part)])
+    elif ',' in faculty_string and faculty_string.count(',') > 1:
+        # Multiple commas likely indicate a list of names
+        faculty_names = faculty_string.split(',')
+    elif '/' in faculty_string:
+        faculty_names = faculty_string.split('/')
+    elif ';' in faculty_string:
+        faculty_names = faculty_string.split(';')
+    else:
+        faculty_names = [faculty_string]  # Single faculty
+
+    # Remove any empty strings and normalize
+    return [name.strip() for name in faculty_names if name.strip()]
+
+
+def sanitize_sheet_name(name):
+    """Create a valid Excel sheet name from a faculty name"""
+    sanitized = name
+    for char in ['/', '\\', '?', '*', ':', '[', ']', "'", '"']:
+        sanitized = sanitized.replace(char, '_')
+
+    # Excel has 31 character limit for sheet names
+    if len(sanitized) > 31:
+        sanitized = sanitized[:28] + "..."
+    return sanitized
+
+
+def faculty_schedules(solution):
+    """{faculty: {day: {slot label: class info}}} from the solution's faculty index
+
+    Sessions listing several instructors appear in each instructor's
+    schedule. An elective that several sections take together (one basket
+    cell each, Solution.basket_index) is one class listing all of them.
+    """
+    slots = solution.meta['slots']
+    titles = {(entry['department'], str(entry['semester']), entry['section']): entry['title']
+              for entry in solution.meta['sections']}
+
+    def title(session):
+        return titles.get((session.department, str(session.semester), session.section),
+                          f"{session.department}_{session.semester}")
+
+    shared = {}
+    for cell in solution.basket_index().values():
+        for session in cell.sessions:
+            shared.setdefault((session.faculty, session.code, cell.day, cell.start), []).append(title(session))
+
+    schedules = {}
+    for faculty_string, indexes in solution.faculty_index().items():
+        faculty_names = extract_faculty_names(faculty_string)
+        for idx in indexes:
+            session = solution.sessions[idx]
+            names = faculty_names
+            if not names:
+                course = solution.course(session.department, session.semester, session.code) or {}
+                names = extract_faculty_names(course.get('faculty', ''))
+            sections = shared.get((session.faculty, session.code, session.day, session.start), [title(session)])
+            info = {
+                'Course Code': session.code,
+                'Course Name': session.name,
+                'Class Type': session.kind,
+                'Room': room_label(session),
+                'Department-Semester': ', '.join(dict.fromkeys(sections)),
+            }
+            for name in names:
+                schedule = schedules.setdefault(name, {day: {} for day in solution.days})
+                schedule[solution.days[session.day]][slots[session.start]] = info
+    return schedules
+
+
+def write_faculty_sheet(ws, faculty, schedule, days):
+    """One faculty member's classes, a row per class in day and time order"""
+    ws.merge_cells('A1:G1')
+    title_cell = ws['A1']
+    title_cell.value = f"Schedule for: {faculty}"
+    title_cell.font = font(bold=True, size=14)
+    title_cell.alignment = alignment(horizontal='center', vertical='center')
+    title_cell.fill = solid_fill("E0E0E0")
+
+    ws.append(HEADER)
+    for cell in ws[2]:
+        cell.fill = solid_fill("4F81BD")
+        cell.font = font(bold=True, color="FFFFFF")
+        cell.alignment = alignment(horizontal='center', vertical='center')
+
+    row_idx = 3
+    for day in days:
+        time_slots = sorted(schedule[day])
+        if not time_slots:  # No classes on this day
+            ws.append([day, "No classes scheduled", "", "", "", "", ""])
+            row_idx += 1
+            continue
+
+        for time_slot in time_slots:
+            class_info = schedule[day][time_slot]
+            ws.append([day, time_slot] + [class_info[column] for column in HEADER[2:]])
+            fill = solid_fill(CLASS_COLORS.get(class_info['Class Type'], OTHER_COLOR))
+            for cell in ws[row_idx]:
+                cell.alignment = alignment(horizontal='center', vertical='center')
+                cell.border = thin_border()
+                cell.fill = fill
+            row_idx += 1
+
+    for col_letter, width in COLUMN_WIDTHS.items():
+        ws.column_dimensions[col_letter].width = width
+
+
+def write_faculty_overview(ws, schedules):
+    """Index sheet: every faculty member, their class count and a link to their sheet"""
+    ws.column_dimensions['A'].width = 40
+    ws.column_dimensions['B'].width = 15
+    ws.append(["Faculty Timetable - All Faculty"])
+    ws.append(["Generated on:", datetime.now().strftime("%Y-%m-%d %H:%M:%S")])
+    ws.append([])
+    ws.append(["Faculty Name", "Total Classes"])
+
+    for row in range(1, 5):
+        for cell in ws[row]:
+            cell.font = font(bold=True)
+    for cell in ws[4]:
+        cell.fill = solid_fill("4F81BD")
+        cell.font = font(bold=True, color="FFFFFF")
+        cell.border = thin_border()
+        cell.alignment = alignment(horizontal='center', vertical='center')
+
+    for row_idx, faculty in enumerate(sorted(schedules), 5):
+        total_classes = sum(len(slots) for slots in schedules[faculty].values())
+        name_cell = ws.cell(row=row_idx, column=1, value=faculty)
+        ws.cell(row=row_idx, column=2, value=total_classes)
+        name_cell.hyperlink = f"#{sanitize_sheet_name(faculty)}!A1"
+        name_cell.style = "Hyperlink"
+        for col in range(1, 3):
+            ws.cell(row=row_idx, column=col).border = thin_border()
+
+
+def render_faculty_workbook(solution, path=OUTPUT_FILE, incremental=False, backend=DEFAULT_BACKEND):
+    """Write every faculty member's timetable into one workbook, returns the faculty count
+
+    incremental reuses the sheets of faculty whose classes are unchanged
+    since the last incremental render of path. backend is the Excel writer
+    (utils.workbook_writer.BACKENDS).
+    """
+    cache = SheetCache(path, renderer_version(sys.modules[__name__], excel_styles, workbook_writer)) \
+        if incremental else None
+    schedules = faculty_schedules(solution)
+    wb = create_workbook(backend)
+    overview = wb.create_sheet("Overview")
+    write_faculty_overview(overview, schedules)
+    wb.flush(overview)
+    for faculty in sorted(schedules):
+        ws = wb.create_sheet(sanitize_sheet_name(faculty))
+        if cache and cache.unchanged(ws.title, content_hash(faculty, schedules[faculty], solution.days)):
+            wb.flush(ws)  # left empty, the previous sheet is spliced in on save
+            continue
+        write_faculty_sheet(ws, faculty, schedules[faculty], solution.days)
+        wb.flush(ws)
+    if cache:
+        cache.unchanged("Overview", None)
+        cache.save(wb)
+        print(cache.summary())
+    else:
+        wb.save(path)
+    return len(schedules)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='run.py faculty',
+                                     description='Render the faculty timetables of a saved solution')
+    parser.add_argument('solution', nargs='?', default=SOLUTION_FILE,
+                        help=f'solution JSON written by a generator (default: {SOLUTION_FILE})')
+    parser.add_argument('--output', default=OUTPUT_FILE, help=f'workbook to write (default: {OUTPUT_FILE})')
+    parser.add_argument('--incremental', action='store_true',
+                        help='only rewrite the sheets of faculty whose classes changed since the last incremental render')
+    parser.add_argument('--backend', choices=BACKENDS, default=DEFAULT_BACKEND,
+                        help=f'Excel writer, auto uses xlsxwriter when installed (default: {DEFAULT_BACKEND})')
+    parser.add_argument('--individual', metavar='DIR',
+                        help='also write one workbook per faculty member into DIR')
+    parser.add_argument('--zip', metavar='PATH', help='with --individual, also pack those workbooks into PATH')
+    args = parser.parse_args(argv)
+
+    solution = Solution.load(args.solution)
+    count = render_faculty_workbook(solution, args.output, args.incremental, args.backend)
+    print(f"All {count} faculty timetables saved in '{args.output}'")
+    if args.individual:
+        from utils.faculty_workbooks import render_faculty_files
+        paths = render_faculty_files(solution, args.individual, args.zip, backend=args.backend)
+        print(f"{len(paths)} individual faculty timetables saved in '{args.individual}'")
+    return args.output
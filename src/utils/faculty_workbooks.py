@@ -0,0 +1,91 @@
+"""
+One workbook per faculty member, rendered in batches across processes.
+
+With a few hundred instructors, writing faculty_timetables/ one file at a
+time was the slowest output step. This module splits the files into a few
+batches per worker process. Each worker renders its batch with the same
+sheet writer as all_faculty_timetables.xlsx (faculty_render.write_faculty_sheet)
+and the memoised styles of utils.excel_styles, which every process builds
+only once, through the configured Excel backend (utils.workbook_writer).
+Without a pool (one CPU, or a failed worker start) the same batches run in
+this process. The files can also be packed into one zip archive for
+distribution.
+"""
+
+import math
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.faculty_render import faculty_schedules, write_faculty_sheet
+from utils.workbook_writer import DEFAULT_BACKEND, create_workbook
+
+OUTPUT_DIR = 'faculty_timetables'
+
+# Batches per worker process, enough to even out uneven schedules
+BATCHES_PER_WORKER = 4
+
+
+def sanitize_filename(name):
+    """Create a valid file name from a faculty name"""
+    sanitized = name
+    for char in ['/', '\\', '?', '*', ':', '[', ']', "'", '"', '<', '>', '|', ' ']:
+        sanitized = sanitized.replace(char, '_')
+
+    # Remove consecutive underscores
+    while '__' in sanitized:
+        sanitized = sanitized.replace('__', '_')
+
+    # Limit length to avoid overly long filenames
+    return sanitized[:50].rstrip('_')
+
+
+def faculty_file_path(directory, faculty):
+    return os.path.join(directory, f"timetable_{sanitize_filename(faculty)}.xlsx")
+
+
+def render_faculty_file(faculty, schedule, days, path, backend=DEFAULT_BACKEND):
+    """Write one faculty member's timetable as a single-sheet workbook"""
+    wb = create_workbook(backend)
+    write_faculty_sheet(wb.create_sheet("Schedule"), faculty, schedule, days)
+    wb.save(path)
+    return path
+
+
+def _render_batch(batch):
+    """Worker entry point: render a list of (faculty, schedule, days, path, backend)"""
+    return [render_faculty_file(*item) for item in batch]
+
+
+def render_faculty_files(solution, directory=OUTPUT_DIR, zip_path=None, parallel=True, workers=None,
+                         backend=DEFAULT_BACKEND):
+    """Write faculty_timetables/timetable_<name>.xlsx for every faculty member
+
+    Returns the paths written. With zip_path the files are also packed into
+    one archive.
+    """
+    os.makedirs(directory, exist_ok=True)
+    schedules = faculty_schedules(solution)
+    items = [(faculty, schedules[faculty], list(solution.days), faculty_file_path(directory, faculty), backend)
+             for faculty in sorted(schedules)]
+
+    workers = min(workers or os.cpu_count() or 1, len(items))
+    size = max(1, math.ceil(len(items) / max(1, workers * BATCHES_PER_WORKER)))
+    batches = [items[i:i + size] for i in range(0, len(items), size)]
+
+    paths = None
+    if parallel and workers > 1 and len(batches) > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                paths = [path for batch in executor.map(_render_batch, batches) for path in batch]
+        except Exception as e:
+            print(f"Warning: Parallel faculty rendering failed ({e}), rendering sequentially")
+    if paths is None:
+        paths = [path for batch in batches for path in _render_batch(batch)]
+
+    if zip_path:
+        # Workbooks are already deflated, storing them keeps packing quick
+        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_STORED) as archive:
+            for path in paths:
+                archive.write(path, os.path.basename(path))
+    return paths
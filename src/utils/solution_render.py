@@ -0,0 +1,319 @@
+"""
+Excel rendering of a saved timetable solution.
+
+Solving and rendering are separate steps. Generators save a Solution
+(scheduling/solution.py), and this module turns one into the combined
+workbook layout: an overview sheet, then one sheet per section with the
+week grid, self-study courses, unscheduled components and a colour legend.
+Re-styling or re-exporting a finished timetable therefore takes a fraction
+of a second and never reruns the random search:
+
+    python run.py render timetable_solution.json --output timetable_all_departments.xlsx
+
+With --incremental only the section sheets whose data changed since the
+last render are written again (utils/workbook_cache.py).
+"""
+
+import argparse
+import sys
+from datetime import datetime
+
+from openpyxl.utils import get_column_letter
+
+from scheduling.solution import SOLUTION_FILE, Solution, basket_group
+from utils import excel_styles, workbook_writer
+from utils.excel_styles import alignment, font, solid_fill, thin_border
+from utils.workbook_cache import SheetCache, content_hash, renderer_version
+from utils.workbook_writer import BACKENDS, DEFAULT_BACKEND, create_workbook
+
+OUTPUT_FILE = 'timetable_all_departments.xlsx'
+
+# Subject colours, assigned in catalog order
+SUBJECT_COLORS = [
+    "FF6B6B", "4ECDC4", "FF9F1C", "5D5FEF", "45B7D1",
+    "F72585", "7209B7", "3A0CA3", "4361EE", "4CC9F0",
+    "06D6A0", "FFD166", "EF476F", "118AB2", "073B4C"
+]
+
+BASKET_COLORS = {
+    'B1': "FFA07A", 'B2': "98FB98", 'B3': "87CEFA", 'B4': "FFD700", 'B5': "DA70D6",
+    'B6': "20B2AA", 'B7': "FF6347", 'B8': "8A2BE2", 'B9': "32CD32"
+}
+
+# Fills for sessions of courses missing from the catalog
+KIND_COLORS = {'LEC': "4F8A8B", 'LAB': "A1E887", 'TUT': "FBD46D", 'SS': "A8D8EA"}
+BREAK_COLOR = "F8E9A1"
+HEADER_COLOR = "374785"
+GRID_BORDER = "B0B0B0"
+
+
+def _hours(value):
+    """Catalog L/T/P/S value as a whole number string, '0' when missing"""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return "0"
+    return "0" if value != value else str(int(value))
+
+
+def room_label(session):
+    """Rooms of a session as shown in a cell, L105+L106 for a lab pair"""
+    return ('+' if session.kind == 'LAB' else ',').join(session.rooms)
+
+
+def section_courses(solution, department, semester):
+    """Catalog rows of one department-semester, in catalog order"""
+    return [row for row in solution.meta['courses']
+            if row['department'] == str(department) and str(row['semester']) == str(semester)]
+
+
+def subject_colors(courses):
+    """Colour per course code, basket courses take their group's colour"""
+    colors = {}
+    for row in courses:
+        code = row['code']
+        if code in colors or not code or code == 'nan':
+            continue
+        default = SUBJECT_COLORS[len(colors) % len(SUBJECT_COLORS)]
+        colors[code] = BASKET_COLORS.get(basket_group(code), default)
+    return colors
+
+
+def self_study_only(courses):
+    """Courses with only self-study hours, listed on the sheet but never placed"""
+    return [row for row in courses
+            if _hours(row.get('S')) != "0" and all(_hours(row.get(k)) == "0" for k in ('L', 'T', 'P'))]
+
+
+def basket_text(cell):
+    """Text of a basket cell: group, elective codes, then each elective's faculty and rooms"""
+    details = [f"{session.code}: {session.faculty} ({room_label(session)})"
+               for session in cell.sessions if session.faculty and session.rooms]
+    return f"{cell.group} Courses\n" + ', '.join(cell.codes) + "\n" + "\n".join(details)
+
+
+def section_cells(sessions, colors, baskets):
+    """{(day, start): (text, colour, duration)} for a section's placed sessions
+
+    baskets maps (day, start) to the section's BasketCells (Solution.basket_index),
+    electives of one basket group that start together share that cell.
+    """
+    cells = {}
+    for session in sessions:
+        if basket_group(session.code) is not None:
+            continue
+        text = f"{session.code} {session.kind}\nroom no. :{room_label(session)}\n{session.faculty}"
+        color = colors.get(session.code, KIND_COLORS.get(session.kind, KIND_COLORS['LEC']))
+        cells[(session.day, session.start)] = (text, color, session.duration)
+
+    for key, cell in baskets.items():
+        color = BASKET_COLORS.get(cell.group, colors.get(cell.sessions[0].code, KIND_COLORS['LEC']))
+        cells[key] = (basket_text(cell), color, cell.duration)
+    return cells
+
+
+def write_solution_sheet(ws, solution, section, sessions, baskets=None):
+    """Render one section of a solution: grid, self-study list, unscheduled components and legend
+
+    baskets is the section's {(day, start): BasketCell}, looked up from the
+    solution's basket index when not given.
+    """
+    department, semester = section['department'], section['semester']
+    courses = section_courses(solution, department, semester)
+    colors = subject_colors(courses)
+    breaks = solution.break_slots(semester)
+    border = thin_border(GRID_BORDER)
+
+    ws.append(['Day'] + list(solution.meta['slots']))
+    for cell in ws[1]:
+        cell.fill = solid_fill(HEADER_COLOR)
+        cell.font = font(bold=True, color="FFFFFF", name="Calibri", size=12)
+        cell.alignment = alignment(horizontal='center', vertical='center')
+
+    if baskets is None:
+        key = (department, semester, section['section'])
+        baskets = {cell_key[3:]: cell for cell_key, cell in solution.basket_index().items()
+                   if cell_key[:3] == key}
+    cells = section_cells(sessions, colors, baskets)
+    for day_idx, day in enumerate(solution.days):
+        row_num = day_idx + 2
+        ws.append([day])
+        for slot in range(solution.slot_count):
+            value, fill = '', None
+            if slot in breaks:
+                value, fill = "BREAK", solid_fill(BREAK_COLOR)
+            elif (day_idx, slot) in cells:
+                value, color, duration = cells[(day_idx, slot)]
+                fill = solid_fill(color)
+                if duration > 1:
+                    ws.merge_cells(f"{get_column_letter(slot + 2)}{row_num}:"
+                                   f"{get_column_letter(slot + duration + 1)}{row_num}")
+            cell = ws.cell(row=row_num, column=slot + 2, value=value)
+            if fill:
+                cell.fill = fill
+            cell.border = border
+            cell.alignment = alignment(wrap_text=True, vertical='center', horizontal='center',
+                                       indent=2 if (day_idx, slot) in cells else 1)
+
+    for col_idx in range(1, solution.slot_count + 2):
+        ws.column_dimensions[get_column_letter(col_idx)].width = 15
+    for row in range(2, len(solution.days) + 2):
+        ws.row_dimensions[row].height = 40
+
+    current_row = len(solution.days) + 4
+
+    self_study = self_study_only(courses)
+    if self_study:
+        ws.cell(row=current_row, column=1, value="Self-Study Only Courses").font = font(bold=True)
+        current_row += 1
+        for col, header in enumerate(['Course Code', 'Course Name', 'Faculty'], 1):
+            ws.cell(row=current_row, column=col, value=header).font = font(bold=True)
+        current_row += 1
+        for row in self_study:
+            ws.cell(row=current_row, column=1, value=row['code'])
+            ws.cell(row=current_row, column=2, value=row['name'])
+            ws.cell(row=current_row, column=3, value=row['faculty'])
+            current_row += 1
+        current_row += 2
+
+    sections = [entry for entry in solution.meta['sections']
+                if entry['department'] == department and str(entry['semester']) == str(semester)]
+    unscheduled = [entry for entry in solution.meta['unscheduled']
+                   if str(entry['department']) == department and str(entry['semester']) == str(semester)
+                   and (entry.get('section') == section['section'] if len(sections) > 1 else True)]
+    if unscheduled:
+        current_row += 2
+        ws.cell(row=current_row, column=1, value="Unscheduled Components").font = font(bold=True, size=12, color="FF0000")
+        current_row += 2
+        for col, header in enumerate(['Course Code', 'Course Name', 'Faculty', 'Component', 'Sessions', 'Reason'], 1):
+            cell = ws.cell(row=current_row, column=col, value=header)
+            cell.font = font(bold=True)
+            cell.border = border
+            cell.fill = solid_fill("FFE0E0")
+            cell.alignment = alignment(horizontal='center', vertical='center')
+            ws.column_dimensions[get_column_letter(col)].width = 20
+        current_row += 1
+        for entry in unscheduled:
+            values = [entry['code'], entry['name'], entry['faculty'], entry['component_type'],
+                      entry.get('sessions'), entry.get('reason') or "Could not find suitable slot"]
+            for col, value in enumerate(values, 1):
+                cell = ws.cell(row=current_row, column=col, value=value)
+                cell.border = border
+                cell.alignment = alignment(horizontal='left', vertical='center', wrap_text=True)
+            current_row += 1
+        current_row += 2
+
+    ws.cell(row=current_row, column=1, value="Legend").font = font(bold=True, size=12)
+    current_row += 2
+    for letter, width in zip('ABCDE', (20, 10, 40, 30, 15)):
+        ws.column_dimensions[letter].width = width
+    for col, header in enumerate(['Subject Code', 'Color', 'Subject Name', 'Faculty', 'LTPS'], 1):
+        cell = ws.cell(row=current_row, column=col, value=header)
+        cell.font = font(bold=True)
+        cell.border = border
+        cell.fill = solid_fill("F0F0F0")
+        cell.alignment = alignment(horizontal='center', vertical='center', wrap_text=True)
+    current_row += 1
+
+    first_rows = {}
+    for row in courses:
+        first_rows.setdefault(row['code'], row)
+    for code, color in colors.items():
+        row = first_rows[code]
+        ws.row_dimensions[current_row].height = 30
+        ltps = '-'.join(_hours(row.get(key)) for key in ('L', 'T', 'P', 'S'))
+        for col, value in enumerate([code, '', row['name'], row['faculty'], ltps], 1):
+            cell = ws.cell(row=current_row, column=col, value=value)
+            cell.border = border
+            if col == 2:
+                cell.fill = solid_fill(color)
+            cell.alignment = alignment(horizontal='left', vertical='center', wrap_text=True, indent=2)
+        current_row += 1
+
+
+def section_hash(solution, section, sessions):
+    """Content hash of everything write_solution_sheet shows for one section"""
+    department, semester = section['department'], section['semester']
+    same_semester = [entry for entry in solution.meta['sections']
+                     if entry['department'] == department and str(entry['semester']) == str(semester)]
+    unscheduled = [entry for entry in solution.meta['unscheduled']
+                   if str(entry['department']) == department and str(entry['semester']) == str(semester)]
+    return content_hash(section, [session.to_dict() for session in sessions],
+                        section_courses(solution, department, semester), solution.days,
+                        solution.meta['slots'], sorted(solution.break_slots(semester)),
+                        len(same_semester), unscheduled)
+
+
+def write_overview(ws, titles):
+    """Overview sheet listing every section sheet"""
+    ws.append(["Combined Timetable for All Departments and Semesters"])
+    ws.append(["Generated on:", datetime.now().strftime("%Y-%m-%d %H:%M:%S")])
+    ws.append([])
+    ws.append(["Department", "Semester", "Sheet Name"])
+    for department, semester, title in titles:
+        ws.append([department, str(semester), title])
+
+    for col in range(1, 4):
+        ws.column_dimensions[get_column_letter(col)].width = 20
+    for row in ws.iter_rows(min_row=1, max_row=4):
+        for cell in row:
+            cell.font = font(bold=True)
+    for cell in ws[4]:
+        cell.fill = solid_fill("FFD700")
+        cell.border = thin_border()
+    for row in ws.iter_rows(min_row=5, max_row=4 + len(titles)):
+        for cell in row:
+            cell.border = thin_border()
+
+
+def render_workbook(solution, path=OUTPUT_FILE, incremental=False, backend=DEFAULT_BACKEND):
+    """Write the combined section workbook of a solution, returns the path
+
+    incremental reuses the sheets of sections unchanged since the last
+    incremental render of path. backend is the Excel writer
+    (utils.workbook_writer.BACKENDS).
+    """
+    cache = SheetCache(path, renderer_version(sys.modules[__name__], excel_styles, workbook_writer)) \
+        if incremental else None
+    wb = create_workbook(backend)
+    overview = wb.create_sheet("Overview")
+    index = solution.section_index()
+    baskets = {}
+    for (department, semester, section, day, start), cell in solution.basket_index().items():
+        baskets.setdefault((department, semester, section), {})[(day, start)] = cell
+    titles = []
+    for section in solution.meta['sections']:
+        key = (section['department'], section['semester'], section['section'])
+        sessions = [solution.sessions[idx] for idx in index.get(key, [])]
+        ws = wb.create_sheet(section['title'])
+        titles.append((section['department'], section['semester'], section['title']))
+        if cache and cache.unchanged(ws.title, section_hash(solution, section, sessions)):
+            wb.flush(ws)  # left empty, the previous sheet is spliced in on save
+            continue
+        write_solution_sheet(ws, solution, section, sessions, baskets.get(key, {}))
+        wb.flush(ws)
+    write_overview(overview, titles)
+    if cache:
+        cache.unchanged(overview.title, None)
+        cache.save(wb)
+        print(cache.summary())
+    else:
+        wb.save(path)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='run.py render',
+                                     description='Render a saved solution as the combined timetable workbook')
+    parser.add_argument('solution', nargs='?', default=SOLUTION_FILE,
+                        help=f'solution JSON written by a generator (default: {SOLUTION_FILE})')
+    parser.add_argument('--output', default=OUTPUT_FILE, help=f'workbook to write (default: {OUTPUT_FILE})')
+    parser.add_argument('--incremental', action='store_true',
+                        help='only rewrite the sheets whose sections changed since the last incremental render')
+    parser.add_argument('--backend', choices=BACKENDS, default=DEFAULT_BACKEND,
+                        help=f'Excel writer, auto uses xlsxwriter when installed (default: {DEFAULT_BACKEND})')
+    args = parser.parse_args(argv)
+
+    path = render_workbook(Solution.load(args.solution), args.output, args.incremental, args.backend)
+    print(f"Timetable workbook saved as {path}")
+    return path
@@ -0,0 +1,294 @@
+"""
+Incremental workbook output: rewrite only the sheets whose data changed.
+
+Each sheet the renderers write is tagged with a content hash of the part of
+the solution it shows (a section's sessions, a faculty member's schedule).
+The hashes are kept next to the workbook in <workbook>.sheets.json. On the
+next run a sheet whose hash is unchanged is not rendered again: it is
+written as an empty placeholder, and its XML from the previous workbook is
+spliced into the new package in its place.
+
+Spliced sheets are made independent of their old package first. Shared
+string references become inline strings, and the cell styles they use are
+copied into the new styles.xml (reusing identical entries, so the style
+table does not grow from run to run) with their indexes remapped.
+
+The cache is only trusted while the workbook is exactly the file that was
+written with it (same size and modification time) and the renderer modules
+are unchanged. Otherwise every sheet is rendered again.
+"""
+
+import copy
+import hashlib
+import io
+import json
+import os
+import re
+import xml.etree.ElementTree as ET
+import zipfile
+from xml.sax.saxutils import escape, quoteattr
+
+from scheduling.solution import plain_value
+
+MANIFEST_SUFFIX = '.sheets.json'
+MANIFEST_VERSION = 1
+
+MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+PKG_REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+STYLES_PART = 'xl/styles.xml'
+STRINGS_PART = 'xl/sharedStrings.xml'
+
+_SHARED_STRING_CELL = re.compile(r'<c\b([^>]*?)\st="s"([^>]*)>\s*<v>(\d+)</v>\s*</c>')
+_CELL_STYLE = re.compile(r'(<(?:c|row)\b[^>]*?\ss=")(\d+)(")')
+_COLUMN_STYLE = re.compile(r'(<col\b[^>]*?\sstyle=")(\d+)(")')
+
+
+def _json_default(value):
+    """numpy scalars as the Python values they load back as from a saved solution, others as text"""
+    plain = plain_value(value)
+    return str(plain) if plain is value else plain
+
+
+def content_hash(*parts):
+    """Stable hash of JSON-like data, the key a sheet is reused by"""
+    data = json.dumps(parts, sort_keys=True, default=_json_default, separators=(',', ':'))
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+
+def manifest_path(path):
+    return f"{path}{MANIFEST_SUFFIX}"
+
+
+def renderer_version(*modules):
+    """Hash of the renderer modules' source, so a code change invalidates the cache"""
+    digest = hashlib.sha1()
+    for module in modules:
+        with open(module.__file__, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _q(tag, ns=MAIN_NS):
+    return f'{{{ns}}}{tag}'
+
+
+def _xml(element):
+    """SpreadsheetML element as text, in the default namespace like openpyxl writes it
+
+    ElementTree would prefix every tag, and elements from other namespaces
+    (extension lists) are dropped.
+    """
+    if not element.tag.startswith(f'{{{MAIN_NS}}}'):
+        return ''
+    tag = element.tag.split('}', 1)[1]
+    attributes = ''.join(f' {name}={quoteattr(value)}' for name, value in element.attrib.items() if '}' not in name)
+    inner = escape(element.text or '') + ''.join(_xml(child) for child in element)
+    return f'<{tag}{attributes}>{inner}</{tag}>' if inner else f'<{tag}{attributes}/>'
+
+
+def sheet_parts(package):
+    """{sheet title: worksheet part name} of an open xlsx package"""
+    targets = {}
+    for rel in ET.fromstring(package.read('xl/_rels/workbook.xml.rels')).iter(_q('Relationship', PKG_REL_NS)):
+        target = rel.get('Target')
+        targets[rel.get('Id')] = target.lstrip('/') if target.startswith('/') else f"xl/{target}"
+    sheets = ET.fromstring(package.read('xl/workbook.xml')).find(_q('sheets'))
+    return {sheet.get('name'): targets[sheet.get(_q('id', REL_NS))] for sheet in sheets}
+
+
+def _rels_part(part):
+    folder, name = part.rsplit('/', 1)
+    return f"{folder}/_rels/{name}.rels"
+
+
+def _shared_strings(package):
+    if STRINGS_PART not in package.namelist():
+        return []
+    root = ET.fromstring(package.read(STRINGS_PART))
+    return [''.join(t.text or '' for t in item.iter(_q('t'))) for item in root.iter(_q('si'))]
+
+
+class _StyleMerger:
+    """Copies cell formats of an old styles.xml into a new one, reusing identical entries"""
+
+    def __init__(self, new_xml, old_xml):
+        self.new = ET.fromstring(new_xml)
+        self.old = ET.fromstring(old_xml)
+        self.changed = False
+        self._maps = {}
+        self._formats = self._number_formats()
+
+    def _list(self, root, tag):
+        return root.find(_q(tag))
+
+    def _number_formats(self):
+        """Old custom number format id -> new id"""
+        old, new = self._list(self.old, 'numFmts'), self._list(self.new, 'numFmts')
+        if old is None or not len(old):
+            return {}
+        if new is None:
+            new = ET.Element(_q('numFmts'))
+            self.new.insert(0, new)
+        codes = {fmt.get('formatCode'): fmt.get('numFmtId') for fmt in new}
+        next_id = max([163] + [int(fmt.get('numFmtId')) for fmt in new]) + 1
+        formats = {}
+        for fmt in old:
+            code = fmt.get('formatCode')
+            if code not in codes:
+                ET.SubElement(new, _q('numFmt'), numFmtId=str(next_id), formatCode=code)
+                codes[code] = str(next_id)
+                next_id += 1
+                self.changed = True
+            formats[fmt.get('numFmtId')] = codes[code]
+        new.set('count', str(len(new)))
+        return formats
+
+    def _index(self, tag, old_index):
+        """Index in the new list of entry old_index of the old list, appended when missing"""
+        cache = self._maps.setdefault(tag, {})
+        if old_index not in cache:
+            cache[old_index] = self._find_or_add(tag, copy.deepcopy(self._list(self.old, tag)[old_index]))
+        return cache[old_index]
+
+    def _find_or_add(self, tag, element):
+        target = self._list(self.new, tag)
+        key = _xml(element)
+        for index, existing in enumerate(target):
+            if _xml(existing) == key:
+                return index
+        target.append(element)
+        target.set('count', str(len(target)))
+        self.changed = True
+        return len(target) - 1
+
+    def cell_format(self, old_index):
+        """New cellXfs index for cellXfs entry old_index of the old workbook"""
+        cache = self._maps.setdefault('cellXfs', {})
+        if old_index in cache:
+            return cache[old_index]
+        xf = copy.deepcopy(self._list(self.old, 'cellXfs')[old_index])
+        for attribute, tag in (('fontId', 'fonts'), ('fillId', 'fills'), ('borderId', 'borders')):
+            if xf.get(attribute) is not None:
+                xf.set(attribute, str(self._index(tag, int(xf.get(attribute)))))
+        if xf.get('numFmtId') in self._formats:
+            xf.set('numFmtId', self._formats[xf.get('numFmtId')])
+        # Named styles are not carried over, cells fall back to Normal
+        if xf.get('xfId') not in (None, '0'):
+            base = _xml(self._list(self.old, 'cellStyleXfs')[int(xf.get('xfId'))])
+            matches = [i for i, e in enumerate(self._list(self.new, 'cellStyleXfs')) if _xml(e) == base]
+            xf.set('xfId', str(matches[0] if matches else 0))
+        cache[old_index] = self._find_or_add('cellXfs', xf)
+        return cache[old_index]
+
+    def to_xml(self):
+        text = _xml(self.new).replace('<styleSheet', f'<styleSheet xmlns="{MAIN_NS}"', 1)
+        return text.encode('utf-8')
+
+
+def portable_sheet_xml(sheet_xml, strings, styles):
+    """Sheet XML that no longer depends on its old package's string and style tables"""
+    text = sheet_xml.decode('utf-8')
+    text = _SHARED_STRING_CELL.sub(
+        lambda m: (f'<c{m.group(1)} t="inlineStr"{m.group(2)}><is><t xml:space="preserve">'
+                   f'{escape(strings[int(m.group(3))])}</t></is></c>'), text)
+
+    def restyle(match):
+        return f"{match.group(1)}{styles.cell_format(int(match.group(2)))}{match.group(3)}"
+    text = _CELL_STYLE.sub(restyle, text)
+    text = _COLUMN_STYLE.sub(restyle, text)
+    return text.encode('utf-8')
+
+
+def splice_sheets(package, previous, titles):
+    """Copy of package (xlsx bytes) with the sheets named in titles taken from previous"""
+    new_zip = zipfile.ZipFile(io.BytesIO(package))
+    old_zip = zipfile.ZipFile(io.BytesIO(previous))
+    new_parts, old_parts = sheet_parts(new_zip), sheet_parts(old_zip)
+    strings = _shared_strings(old_zip)
+    styles = _StyleMerger(new_zip.read(STYLES_PART), old_zip.read(STYLES_PART))
+    replaced = {new_parts[title]: portable_sheet_xml(old_zip.read(old_parts[title]), strings, styles)
+                for title in titles}
+    if styles.changed:
+        replaced[STYLES_PART] = styles.to_xml()
+
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as out:
+        for item in new_zip.infolist():
+            out.writestr(item, replaced.get(item.filename) or new_zip.read(item.filename))
+    return output.getvalue()
+
+
+class SheetCache:
+    """Hashes and sheets of the last run of one workbook
+
+    Ask unchanged(title, digest) for every sheet while rendering; leave the
+    sheet empty when it says True. save(workbook) then writes the workbook
+    with those sheets spliced back in, and records the new hashes.
+    """
+
+    def __init__(self, path, renderer=''):
+        self.path = path
+        self.renderer = renderer
+        self.hashes = {}
+        self.reused = []
+        self.rendered = 0
+        self._previous = None
+        self._parts = {}
+        try:
+            self._load()
+        except Exception as e:
+            print(f"Warning: Ignoring sheet cache of {path} ({e})")
+            self.hashes, self._previous, self._parts = {}, None, {}
+        self._current = {}
+
+    def _load(self):
+        if not (os.path.exists(self.path) and os.path.exists(manifest_path(self.path))):
+            return
+        with open(manifest_path(self.path)) as f:
+            manifest = json.load(f)
+        stat = os.stat(self.path)
+        if (manifest.get('version') != MANIFEST_VERSION or manifest.get('renderer') != self.renderer
+                or manifest.get('size') != stat.st_size or manifest.get('mtime_ns') != stat.st_mtime_ns):
+            return
+        with open(self.path, 'rb') as f:
+            self._previous = f.read()
+        package = zipfile.ZipFile(io.BytesIO(self._previous))
+        names = set(package.namelist())
+        # Sheets with their own relationships (hyperlinks, comments) are always rendered
+        self._parts = {title: part for title, part in sheet_parts(package).items()
+                       if _rels_part(part) not in names}
+        self.hashes = manifest.get('sheets', {})
+
+    def unchanged(self, title, digest):
+        """Record a sheet's hash, True when its previous XML can be reused"""
+        if digest is not None:
+            self._current[title] = digest
+        if digest is not None and self.hashes.get(title) == digest and title in self._parts:
+            self.reused.append(title)
+            return True
+        self.rendered += 1
+        return False
+
+    def save(self, workbook):
+        """Save workbook (anything with save(file)) to the cache's path with reused sheets spliced in"""
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        package = buffer.getvalue()
+        if self.reused:
+            package = splice_sheets(package, self._previous, self.reused)
+
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(package)
+        os.replace(temp_path, self.path)
+
+        stat = os.stat(self.path)
+        with open(manifest_path(self.path), 'w') as f:
+            json.dump({'version': MANIFEST_VERSION, 'renderer': self.renderer, 'size': stat.st_size,
+                       'mtime_ns': stat.st_mtime_ns, 'sheets': self._current}, f, indent=1)
+        return self.path
+
+    def summary(self):
+        return (f"{self.path}: {self.rendered} sheets rendered, "
+                f"{len(self.reused)} unchanged sheets reused")
@@ -0,0 +1,376 @@
+"""
+Streaming workbook output for large timetable exports.
+
+A normal openpyxl Workbook keeps every cell of every sheet in memory until
+save, so memory grows with every section sheet. In write-only mode, openpyxl
+streams each sheet's rows to a temporary file instead. The catch is that
+rows must be written top to bottom, while the sheet writers fill cells,
+merges and widths in any order.
+
+A SheetBuffer sits in between. It looks like a worksheet to the code that
+fills it (append, cell, merge_cells, column and row dimensions,
+iter_rows), but it only holds one sheet. Once the sheet is finished, flush
+writes it to the write-only sheet in row order and closes it, so at most
+one sheet is in memory at a time.
+
+Because the sheet writers only ever see SheetBuffers, the library that
+writes the file is a backend choice (create_workbook). XlsxWriterWorkbook
+writes the same buffers with xlsxwriter in constant_memory mode, which is
+several times faster than openpyxl for large styled workbooks. xlsxwriter
+is listed in requirements.txt; where it is missing, 'auto' and 'xlsxwriter'
+fall back to openpyxl. xlsxwriter writes rows strictly in order, so merges
+must lie within one row, and SheetBuffer enforces that for both backends.
+"""
+
+import os
+import shutil
+import tempfile
+from functools import lru_cache
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.cell import coordinate_from_string, column_index_from_string, range_boundaries
+
+from scheduling.solution import plain_value
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+# 'auto' uses xlsxwriter when it is installed
+BACKENDS = ('auto', 'xlsxwriter', 'openpyxl')
+DEFAULT_BACKEND = 'auto'
+
+# openpyxl border styles that xlsxwriter numbers differently (thin is 1)
+BORDER_STYLES = {'thin': 1, 'medium': 2, 'dashed': 3, 'dotted': 4, 'thick': 5, 'double': 6, 'hair': 7,
+                 'mediumDashed': 8, 'dashDot': 9, 'mediumDashDot': 10, 'dashDotDot': 11,
+                 'mediumDashDotDot': 12, 'slantDashDot': 13}
+
+
+class BufferedCell:
+    """Value and style of one cell until its sheet is flushed"""
+
+    __slots__ = ('row', 'column', 'value', 'font', 'fill', 'border', 'alignment', 'style', 'hyperlink')
+
+    def __init__(self, row, column, value=None):
+        self.row = row
+        self.column = column
+        self.value = value
+        self.font = None
+        self.fill = None
+        self.border = None
+        self.alignment = None
+        self.style = None      # named style, e.g. "Hyperlink"
+        self.hyperlink = None
+
+    @property
+    def coordinate(self):
+        return f"{get_column_letter(self.column)}{self.row}"
+
+    def write_only(self, ws):
+        cell = WriteOnlyCell(ws, value=self.value)
+        for style in ('style', 'font', 'fill', 'border', 'alignment', 'hyperlink'):
+            value = getattr(self, style)
+            if value is not None:
+                setattr(cell, style, value)
+        return cell
+
+
+class _Dimension:
+    __slots__ = ('width', 'height')
+
+    def __init__(self):
+        self.width = None
+        self.height = None
+
+
+class _Dimensions(dict):
+    def __missing__(self, key):
+        self[key] = _Dimension()
+        return self[key]
+
+
+class SheetBuffer:
+    """The worksheet calls the sheet writers use, buffered for one sheet"""
+
+    def __init__(self, title):
+        self.title = title
+        self._cells = {}  # row -> {column: BufferedCell}
+        self._current_row = 0
+        self.merged = []
+        self.column_dimensions = _Dimensions()
+        self.row_dimensions = _Dimensions()
+
+    @property
+    def max_row(self):
+        return max(self._current_row, 1)
+
+    @property
+    def max_column(self):
+        return max((max(row) for row in self._cells.values() if row), default=1)
+
+    def cell(self, row, column, value=None):
+        cells = self._cells.setdefault(row, {})
+        if column not in cells:
+            cells[column] = BufferedCell(row, column)
+        if value is not None:
+            cells[column].value = value
+        self._current_row = max(self._current_row, row)
+        return cells[column]
+
+    def append(self, values):
+        row = self._current_row + 1
+        for column, value in enumerate(values, 1):
+            self.cell(row, column, value)
+        self._current_row = row
+
+    def merge_cells(self, cell_range):
+        _, min_row, _, max_row = range_boundaries(cell_range)
+        if max_row != min_row:
+            raise ValueError(f"Cannot merge {cell_range}, merges must lie within one row")
+        self.merged.append(cell_range)
+
+    def __getitem__(self, key):
+        """ws[row] gives that row's cells, ws['B3'] one cell"""
+        if isinstance(key, int):
+            return [self.cell(key, column) for column in range(1, self.max_column + 1)]
+        column, row = coordinate_from_string(key)
+        return self.cell(row, column_index_from_string(column))
+
+    def iter_rows(self, min_row=1, max_row=None):
+        for row in range(min_row, (max_row or self.max_row) + 1):
+            yield self[row]
+
+    def rows(self):
+        """(row number, {column: BufferedCell}) for every row in order, then forget them"""
+        for row in range(1, self.max_row + 1):
+            yield row, self._cells.get(row, {})
+        self._cells.clear()
+
+    def write_to(self, ws):
+        """Write the buffered sheet to a write-only worksheet, in row order"""
+        for letter, dimension in self.column_dimensions.items():
+            if dimension.width is not None:
+                ws.column_dimensions[letter].width = dimension.width
+        for row, dimension in self.row_dimensions.items():
+            if dimension.height is not None:
+                ws.row_dimensions[row].height = dimension.height
+        for cell_range in self.merged:
+            ws.merged_cells.add(cell_range)
+            # Covered cells keep their borders but not their values, as in a normal merge
+            min_col, min_row, max_col, max_row = range_boundaries(cell_range)
+            for row in range(min_row, max_row + 1):
+                for column in range(min_col, max_col + 1):
+                    covered = self._cells.get(row, {}).get(column)
+                    if covered is not None and (row, column) != (min_row, min_col):
+                        covered.value = None
+
+        for row, cells in self.rows():
+            if not cells:
+                ws.append([])
+                continue
+            ws.append([cells[column].write_only(ws) if column in cells else None
+                       for column in range(1, max(cells) + 1)])
+
+
+class StreamingWorkbook:
+    """Write-only workbook whose sheets are filled through SheetBuffers
+
+    Sheets appear in the order they were created. Flush each one as soon as
+    it is finished, save flushes whatever is left.
+    """
+
+    def __init__(self):
+        self.workbook = Workbook(write_only=True)
+        self._pending = {}  # id(SheetBuffer) -> (SheetBuffer, write-only worksheet)
+
+    def create_sheet(self, title):
+        ws = self.workbook.create_sheet(title=title)
+        sheet = SheetBuffer(ws.title)  # openpyxl renames duplicate titles
+        self._pending[id(sheet)] = (sheet, ws)
+        return sheet
+
+    def flush(self, sheet):
+        sheet, ws = self._pending.pop(id(sheet))
+        sheet.write_to(ws)
+        ws.close()
+
+    def save(self, filename):
+        for sheet, _ in list(self._pending.values()):
+            self.flush(sheet)
+        self.workbook.save(filename)
+
+
+def _rgb(color):
+    """'#RRGGBB' of an openpyxl Color, None for theme and indexed colours"""
+    if color is None or color.type != 'rgb' or not isinstance(color.rgb, str):
+        return None
+    return f"#{color.rgb[-6:]}"
+
+
+def _column_width(width):
+    """xlsxwriter width that is stored as the given openpyxl width
+
+    xlsxwriter adds the cell padding (5 px of a 7 px digit) to the width it
+    is given, openpyxl stores the width as is.
+    """
+    return max(width - 5 / 7, 1)
+
+
+def _url(link):
+    """xlsxwriter URL of an openpyxl hyperlink, '#Sheet!A1' links within the workbook"""
+    if link.startswith('#'):
+        sheet, _, cell = link[1:].rpartition('!')
+        return f"internal:'{sheet}'!{cell}" if sheet else f"internal:{cell}"
+    return link
+
+
+def cell_format(font=None, fill=None, border=None, alignment=None, style=None):
+    """xlsxwriter format properties for the openpyxl styles of a cell"""
+    props = {}
+    if style == 'Hyperlink':
+        props['hyperlink'] = True
+    if font is not None:
+        for key, value in (('font_name', font.name), ('font_size', font.sz), ('bold', font.b),
+                           ('italic', font.i), ('font_color', _rgb(font.color))):
+            if value:
+                props[key] = value
+        if font.u:
+            props['underline'] = 2 if font.u == 'double' else 1
+    if fill is not None and fill.fill_type == 'solid' and _rgb(fill.fgColor):
+        props.update(pattern=1, bg_color=_rgb(fill.fgColor))
+    if border is not None:
+        for side in ('left', 'right', 'top', 'bottom'):
+            edge = getattr(border, side)
+            if edge is not None and edge.style:
+                props[side] = BORDER_STYLES.get(edge.style, 1)
+                if _rgb(edge.color):
+                    props[f'{side}_color'] = _rgb(edge.color)
+    if alignment is not None:
+        if alignment.horizontal and alignment.horizontal != 'general':
+            props['align'] = alignment.horizontal
+        if alignment.vertical:
+            props['valign'] = 'vcenter' if alignment.vertical == 'center' else alignment.vertical
+        if alignment.wrap_text:
+            props['text_wrap'] = True
+        # Excel only indents left, right and distributed text; xlsxwriter would turn the rest left
+        if alignment.indent and props.get('align') in ('left', 'right', 'distributed'):
+            props['indent'] = int(alignment.indent)
+    return props
+
+
+class XlsxWriterWorkbook:
+    """StreamingWorkbook's interface, written by xlsxwriter in constant_memory mode
+
+    Flushed sheets go row by row to xlsxwriter's temporary files. The
+    openpyxl styles of the buffered cells become one xlsxwriter format per
+    distinct combination. Merges must lie within one row, which is all the
+    renderers use and what constant_memory mode can write.
+    """
+
+    def __init__(self):
+        # A file of our own in a private directory, so it gets the usual permissions
+        self._dir = tempfile.mkdtemp()
+        self._path = os.path.join(self._dir, 'workbook.xlsx')
+        # Values are stored like openpyxl stores them: '=...' is a formula, URLs stay text
+        self.workbook = xlsxwriter.Workbook(self._path, {'constant_memory': True, 'strings_to_urls': False,
+                                                         'nan_inf_to_errors': True})
+        self._pending = {}
+        self._formats = {}
+        self._titles = set()
+
+    def create_sheet(self, title):
+        # Rename duplicate titles the way openpyxl does (Excel ignores case)
+        base, number = title, 0
+        while title.lower() in self._titles:
+            number += 1
+            title = f"{base}{number}"
+        self._titles.add(title.lower())
+        sheet = SheetBuffer(title)
+        self._pending[id(sheet)] = (sheet, self.workbook.add_worksheet(title))
+        return sheet
+
+    def _format(self, cell):
+        if cell is None:
+            return None
+        styles = (cell.font, cell.fill, cell.border, cell.alignment, cell.style)
+        # Keyed by identity: the renderers share style objects (utils.excel_styles),
+        # and hashing openpyxl styles costs more than writing the cell
+        key = tuple(map(id, styles))
+        if key not in self._formats:
+            props = cell_format(*styles)
+            # The styles are kept so that their ids are not reused
+            self._formats[key] = (styles, self.workbook.add_format(props) if props else None)
+        return self._formats[key][1]
+
+    def _write(self, ws, cell):
+        row, column, value, fmt = cell.row - 1, cell.column - 1, plain_value(cell.value), self._format(cell)
+        if cell.hyperlink:
+            ws.write_url(row, column, _url(cell.hyperlink), fmt, None if value is None else str(value))
+        elif value is None:
+            if fmt is not None:
+                ws.write_blank(row, column, None, fmt)
+        else:
+            ws.write(row, column, value, fmt)
+
+    def flush(self, sheet):
+        sheet, ws = self._pending.pop(id(sheet))
+        for letter, dimension in sheet.column_dimensions.items():
+            if dimension.width is not None:
+                column = column_index_from_string(letter) - 1
+                ws.set_column(column, column, _column_width(dimension.width))
+
+        merges = {}
+        for cell_range in sheet.merged:
+            min_col, min_row, max_col, _ = range_boundaries(cell_range)
+            merges.setdefault(min_row, []).append((min_col, max_col))
+
+        heights = sheet.row_dimensions
+        for row, cells in sheet.rows():
+            if row in heights and heights[row].height is not None:
+                ws.set_row(row - 1, heights[row].height)
+            covered = {column for min_col, max_col in merges.get(row, [])
+                       for column in range(min_col, max_col + 1)}
+            for column in sorted(cells):
+                if column not in covered:
+                    self._write(ws, cells[column])
+            # Like a normal merge, the range shows its first cell's value and style
+            for min_col, max_col in merges.get(row, []):
+                first = cells.get(min_col)
+                value = '' if first is None or first.value is None else plain_value(first.value)
+                ws.merge_range(row - 1, min_col - 1, row - 1, max_col - 1, value, self._format(first))
+
+    def save(self, filename):
+        """Close the workbook and move it to filename (a path or a writable file object)"""
+        for sheet, _ in list(self._pending.values()):
+            self.flush(sheet)
+        self.workbook.close()
+        if isinstance(filename, (str, os.PathLike)):
+            shutil.move(self._path, filename)
+        else:
+            with open(self._path, 'rb') as f:
+                shutil.copyfileobj(f, filename)
+        shutil.rmtree(self._dir, ignore_errors=True)
+
+
+@lru_cache(maxsize=None)
+def _fallback_warning(backend):
+    print(f"Warning: Excel backend '{backend}' needs xlsxwriter, which is not installed; writing with openpyxl")
+
+
+def create_workbook(backend=DEFAULT_BACKEND):
+    """Empty buffered workbook for an Excel backend: 'xlsxwriter', 'openpyxl' or 'auto'
+
+    'auto' picks xlsxwriter when it is installed. Both workbooks take
+    SheetBuffers from create_sheet, then flush and save them.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown Excel backend '{backend}', expected one of {', '.join(BACKENDS)}")
+    if backend != 'openpyxl':
+        if xlsxwriter is not None:
+            return XlsxWriterWorkbook()
+        if backend == 'xlsxwriter':
+            _fallback_warning(backend)
+    return StreamingWorkbook()
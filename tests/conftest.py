@@ -0,0 +1,33 @@
+import os
+import sys
+
+# Tests import the generator modules directly (``import main``) and the shared
+# packages under src/ (``from scheduling import ...``)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (os.path.join(ROOT, "src"), os.path.join(ROOT, "src", "core")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import pytest
+
+from scheduling.solution import Session, Solution
+
+
+@pytest.fixture
+def make_solution():
+    """Factory for the small hand-built solutions the tests work on
+
+    sessions are Session objects or Session argument tuples. slots is a
+    count (labels s0, s1, ...) or the labels themselves, sections a count of
+    CSE semester 2 sections or the section entries. Other meta keys
+    (breaks, rooms, courses, unscheduled, ...) are passed through.
+    """
+    def make(sessions=(), slots=8, sections=1, days=("Monday", "Tuesday"), **meta):
+        if isinstance(sections, int):
+            sections = [{"department": "CSE", "semester": 2, "section": section, "students": 60,
+                         "title": "CSE_2" if sections == 1 else f"CSE_2_{chr(65 + section)}"}
+                        for section in range(sections)]
+        meta.update(days=list(days), sections=sections,
+                    slots=[f"s{i}" for i in range(slots)] if isinstance(slots, int) else list(slots))
+        return Solution([s if isinstance(s, Session) else Session(*s) for s in sessions], meta)
+    return make
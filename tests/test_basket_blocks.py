@@ -0,0 +1,43 @@
+from scheduling.basket_blocks import collect_basket_blocks, match_rooms, plan_basket_blocks
+
+
+def _grid(days=2, slots=6):
+    return {d: {s: {"type": None, "code": "", "name": "", "faculty": "", "classroom": ""}
+                for s in range(slots)} for d in range(days)}
+
+
+def _room(capacity):
+    return {"capacity": capacity, "type": "LECTURE_ROOM", "schedule": {0: set(), 1: set()}}
+
+
+def test_matching_keeps_the_large_room_for_the_large_elective():
+    rows = [("X", 30), ("Y", 90)]
+    electives = list(enumerate(collect_basket_blocks(
+        [{"department": "CSE", "semester": 6, "sections": 1, "group": "B1", "code": code,
+          "name": code, "faculty": code, "students": students, "sessions": 1}
+         for code, students in rows], {"B1": 0}, 3)[0].electives))
+    assignment = match_rooms(electives, {"big": _room(120), "small": _room(40)}, 0, 0, 3)
+    assert assignment == {0: "small", 1: "big"}
+
+
+def test_block_is_shared_by_every_section_and_merges_faculty():
+    rows = [
+        {"department": "CSE", "semester": 6, "sections": 2, "group": "B1", "code": "B1-CS1",
+         "name": "ML", "faculty": "Dr A", "students": 30, "sessions": 1},
+        {"department": "ECE", "semester": 6, "sections": 1, "group": "B1", "code": "B1-NEW",
+         "name": "ML", "faculty": "Dr A ", "students": 25, "sessions": 1},
+        {"department": "ECE", "semester": 6, "sections": 1, "group": "B1", "code": "B1-EC2",
+         "name": "RF", "faculty": "Dr B", "students": 20, "sessions": 1},
+    ]
+    blocks = collect_basket_blocks(rows, {"B1": 0}, 3)
+    assert len(blocks) == 1 and len(blocks[0].electives) == 2  # Dr A teaches one combined class
+
+    grids = {("CSE", 6, 0): _grid(), ("CSE", 6, 1): _grid(), ("ECE", 6, 0): _grid()}
+    grids[("CSE", 6, 1)][0][1]["type"] = "LEC"  # day 0 is taken in one section
+    rooms = {"R1": _room(60), "R2": _room(40)}
+    plan_basket_blocks(blocks, grids, {}, rooms, lambda key, slot: False, 2, 6)
+
+    assert [(day, start) for day, start, _ in blocks[0].meetings] == [(1, 0)]
+    assert all(grids[key][1][0]["code"] == "B1" for key in grids)
+    assert [m["code"] for m in grids[("ECE", 6, 0)][1][0]["basket"]] == ["B1-NEW", "B1-EC2"]
+    assert rooms["R1"]["schedule"][1] == {0, 1, 2}  # 55 students of Dr A need the larger room
@@ -0,0 +1,69 @@
+import pandas as pd
+
+from scheduling.conflict_graph import (
+    SessionNode,
+    build_conflict_graph,
+    build_course_ranks,
+    course_ranks,
+    dsatur_order,
+    get_course_students,
+    get_session_room_type,
+    scarce_room_types,
+)
+
+
+def _node(node_id, section, code, faculty, kind="LEC", room_type="LECTURE_ROOM", dept="CSE"):
+    return SessionNode(node_id, dept, 2, section, code, faculty, kind, room_type, 3)
+
+
+def test_edges_for_shared_faculty_section_and_scarce_room():
+    sessions = [
+        _node(0, 0, "CS1", "A"),
+        _node(1, 1, "CS2", "A"),                       # same faculty as 0
+        _node(2, 0, "CS3", "B"),                       # same section as 0
+        _node(3, 0, "EC1", "C", "LAB", "HARDWARE_LAB", dept="ECE"),
+        _node(4, 1, "EC2", "D", "LAB", "HARDWARE_LAB", dept="ECE"),
+    ]
+    graph = build_conflict_graph(sessions, {"HARDWARE_LAB"})
+    assert graph[0] == {1, 2}
+    assert graph[3] == {4}
+    assert 3 not in graph[0]
+
+
+def test_dsatur_places_most_constrained_first():
+    # Triangle 0-1-2 plus a pendant node 3 attached to 2
+    graph = {0: {1, 2}, 1: {0, 2}, 2: {0, 1, 3}, 3: {2}}
+    order = dsatur_order(graph)
+    assert order[0] == 2
+    assert sorted(order) == [0, 1, 2, 3]
+
+
+def test_course_ranks_cover_every_course():
+    sessions = [_node(i, i % 2, f"CS{i % 3}", f"F{i % 2}") for i in range(6)]
+    ranks = course_ranks(sessions)
+    assert set(ranks) == {("CSE", 2, "CS0"), ("CSE", 2, "CS1"), ("CSE", 2, "CS2")}
+    assert sorted(ranks.values())[0] == 0
+
+
+def test_scarce_room_types_threshold():
+    rooms = {f"L{i}": {"type": "LECTURE_ROOM"} for i in range(10)}
+    rooms["H1"] = {"type": "HARDWARE_LAB"}
+    assert scarce_room_types(rooms) == {"HARDWARE_LAB"}
+    assert scarce_room_types(None) == {"HARDWARE_LAB", "SEATER_240"}
+
+
+def test_course_ranks_from_a_combined_frame():
+    df = pd.DataFrame([
+        {"Department": "CSE", "Semester": 2, "Course Code": "CS101", "Faculty": "A / B", "L": 3, "T": 1,
+         "P": 0, "S": 0, "Schedule": "Yes", "total_students": "150"},
+        {"Department": "ECE", "Semester": 2, "Course Code": "EC101", "Faculty": "A", "L": 0, "T": 0,
+         "P": 2, "S": 0, "Schedule": None, "total_students": ""},
+        {"Department": "CSE", "Semester": 2, "Course Code": "CS199", "Faculty": "C", "L": 3, "T": 0,
+         "P": 0, "S": 0, "Schedule": "No", "total_students": "60"},
+    ])
+    batch_info = {("ECE", 2): {"num_sections": 2, "section_size": 40}}
+    assert get_session_room_type(df.iloc[0], batch_info, "LEC") == "SEATER_240"
+    assert get_session_room_type(df.iloc[1], batch_info, "LAB") == "HARDWARE_LAB"
+    assert get_course_students(df.iloc[1], batch_info) == 40
+    ranks = build_course_ranks(df, None, batch_info, {"LEC": 3, "TUT": 2, "LAB": 4})
+    assert set(ranks) == {("CSE", 2, "CS101"), ("ECE", 2, "EC101")}
@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+from optimization.conflict_resolver import AlternativeSlotFinder
+from optimization.scoring import Placement
+
+
+def _config():
+    return {
+        "timetable_settings": {"days": ["Monday", "Tuesday", "Wednesday"], "start_time": "09:00",
+                               "end_time": "15:00", "slot_duration_minutes": 30},
+        "course_durations": {"lecture_duration_slots": 3, "lab_duration_slots": 4,
+                             "tutorial_duration_slots": 2},
+        "scheduling": {"conflict_resolution": {"max_alternative_suggestions": 5}},
+        "scoring": {"morning_end": "11:00",
+                    "faculty_preferences": {"A": {"avoid_days": ["Monday"], "avoid_after": "13:00"}}},
+    }
+
+
+def _free(day, start, duration, timetable, faculty, rooms):
+    """The slot-by-slot rule the masks replace"""
+    return all(slot not in timetable.get(day, {}) and slot not in faculty.get(day, set())
+               and rooms.get(day, {}).get(slot, True) for slot in range(start, start + duration))
+
+
+def test_masks_match_the_slot_by_slot_rule():
+    finder = AlternativeSlotFinder(_config())
+    assert finder.slot_count == 12
+    rng = random.Random(3)
+    for _ in range(20):
+        timetable = {d: {s: "X" for s in rng.sample(range(12), 2)} for d in range(3)}
+        faculty = {d: set(rng.sample(range(12), 2)) for d in range(2)}
+        rooms = {2: {s: rng.random() < 0.7 for s in range(12)}, 7: {0: False}}
+        for duration in (1, 2, 4):
+            expected = [(d, s) for d in range(3) for s in range(12 - duration + 1)
+                        if _free(d, s, duration, timetable, faculty, rooms)]
+            assert finder.find_available_slots(timetable, duration, faculty, rooms) == expected
+
+
+def test_suggestions_are_ranked_over_all_free_starts():
+    finder = AlternativeSlotFinder(_config())
+    timetable = {1: {0: "X"}}
+    suggestions = finder.suggest_alternative_times({"type": "LAB", "faculty": "A"}, timetable, {}, {})
+    # Monday is avoided and slots before 11:00 are morning lab slots
+    assert [(s["day"], s["start_time"], s["end_time"]) for s in suggestions] == [
+        ("Tuesday", "11:00", "13:00"), ("Wednesday", "11:00", "13:00"), ("Tuesday", "10:30", "12:30"),
+        ("Wednesday", "10:30", "12:30"), ("Tuesday", "10:00", "12:00")]
+    for s in suggestions:
+        lone = Placement(None, "A", "LAB", s["day_index"], s["slot_index"], s["duration_slots"])
+        assert s["priority_score"] == pytest.approx(-finder.scoring.delta_place(lone))
+    assert finder.suggest_alternative_times({"type": "LEC"}, {d: {0: 1} for d in range(3)},
+                                            {d: set(range(1, 12)) for d in range(3)}, {}) == []
@@ -0,0 +1,46 @@
+import json
+
+import pandas as pd
+import pytest
+
+from scheduling.coverage import audit_coverage, required_session_table
+from scheduling.solution import required_sessions
+
+
+@pytest.fixture
+def solution(make_solution):
+    sessions = []
+    for section in (0, 1):
+        sessions += [("CSE", 2, section, "CS1", "One", "A", "LEC", 0, 0, 3),
+                     ("CSE", 2, section, "CS1", "One", "A", "LEC", 1, 0, 3),
+                     ("CSE", 2, section, "CS1", "One", "A", "TUT", 0, 4, 2)]
+    sessions.append(("CSE", 2, 0, "CS2", "Two", "B", "LAB", 1, 4, 4))
+    return make_solution(sessions, slots=10, sections=2, courses=[
+        {"department": "CSE", "semester": 2, "code": "CS1", "name": "One", "faculty": "A",
+         "L": 3, "T": 1, "P": 0, "S": 0, "schedule": "Yes"},
+        {"department": "CSE", "semester": 2, "code": "CS2", "name": "Two", "faculty": "B",
+         "L": 0, "T": 0, "P": 2, "S": 0, "schedule": "Yes"},
+        {"department": "CSE", "semester": 2, "code": "CS3", "name": "Three", "faculty": "C",
+         "L": 0, "T": 0, "P": 0, "S": 4, "schedule": "Yes"},
+    ], unscheduled=[{"department": "CSE", "semester": 2, "section": 1, "code": "CS2",
+                     "component_type": "LAB", "reason": "no lab free"}])
+
+
+def test_required_table_matches_row_rules():
+    rows = pd.DataFrame([{"L": 3, "T": 1, "P": 4, "S": 8}, {"L": 1, "T": 0, "P": 0, "S": 0},
+                         {"L": 0, "T": 0, "P": 0, "S": 4}, {"L": None, "T": None, "P": 2, "S": None}])
+    table = required_session_table(rows)
+    assert table.to_dict('records') == [required_sessions(row) for row in rows.fillna(0).to_dict('records')]
+
+
+def test_audit_reports_only_the_short_section(tmp_path, solution):
+    report = audit_coverage(solution)
+    assert report.audited == 6 and not report.ok
+    row = report.table.iloc[0]
+    assert len(report.table) == 1
+    assert (row['Sheet'], row['Code'], row['Missing Sessions'], row['Missing Hours']) == ("CSE_2_B", "CS2", "0-0-1-0", 2.0)
+    assert row['Reasons'] == "no lab free" and not row['Found In Timetable']
+
+    xlsx, summary = report.save(str(tmp_path / "audit.xlsx"), str(tmp_path / "audit.json"))
+    assert pd.read_excel(xlsx)['Code'].tolist() == ["CS2"]
+    assert json.load(open(summary))['missing_sessions'] == {"LEC": 0, "TUT": 0, "LAB": 1, "SS": 0}
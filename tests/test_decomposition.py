@@ -0,0 +1,98 @@
+import copy
+import importlib
+import os
+import shutil
+from concurrent.futures import Future
+
+import pandas as pd
+
+from scheduling.decomposition import find_components
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _import_tt_gen(tmp_path, monkeypatch):
+    # The generator reads combined.csv from the working directory on import
+    shutil.copy(os.path.join(ROOT, "data", "Combined.csv"), tmp_path / "combined.csv")
+    monkeypatch.chdir(tmp_path)
+    return importlib.import_module("TT_gen")
+
+
+def test_units_sharing_resources_are_grouped_in_input_order():
+    units = [
+        (("CSE", 2), {("faculty", "A"), ("rooms", "", "LECTURE")}),
+        (("ECE", 2), {("faculty", "B"), ("rooms", "N", "LECTURE")}),
+        (("CSE", 4), {("faculty", "C"), ("rooms", "", "LECTURE")}),   # shares lecture rooms with CSE 2
+        (("DSAI", 2), {("faculty", "D"), ("rooms", "S", "LECTURE")}),
+        (("ECE", 4), {("faculty", "D"), ("basket", "B1")}),           # joined to DSAI 2 via faculty D
+    ]
+    components = find_components(units)
+    assert [c.keys for c in components] == [
+        [("CSE", 2), ("CSE", 4)],
+        [("ECE", 2)],
+        [("DSAI", 2), ("ECE", 4)],
+    ]
+    assert ("basket", "B1") in components[2].resources
+
+
+def _rooms(campuses):
+    return {room_id: {"type": "LECTURE_ROOM", "campus": campus, "schedule": {day: set() for day in range(5)}}
+            for room_id, campus in campuses.items()}
+
+
+class _CopyingExecutor:
+    """Runs workers in process, on copies of their arguments like a process pool would"""
+
+    def __init__(self, max_workers=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*copy.deepcopy(args)))
+        return future
+
+
+def test_rooms_without_campus_serve_every_component(tmp_path, monkeypatch):
+    tt = _import_tt_gen(tmp_path, monkeypatch)
+    courses = pd.DataFrame([{"Course Code": "CS101", "Faculty": "A", "Campus": "N", "P": 0}])
+    rooms = _rooms({"C101": "", "C102": ""})
+    assert not tt.rooms_have_campus(rooms)
+    [component] = find_components([(("CSE", 2), tt.get_unit_resources("CSE", courses, False))])
+    assert tt.get_component_rooms(rooms, component) == rooms
+    rooms["C102"]["campus"] = "S"
+    [component] = find_components([(("CSE", 2), tt.get_unit_resources("CSE", courses))])
+    assert tt.get_component_rooms(rooms, component) == {}
+
+
+def test_component_calendars_are_merged(tmp_path, monkeypatch):
+    tt = _import_tt_gen(tmp_path, monkeypatch)
+    def solve(units, rooms, batch_info, prior=None, faculty_assignment=None):
+        (department, semester), _ = units[0]
+        for room in rooms.values():
+            room["schedule"][0].add(semester)
+        return {"timetables": {(department, semester): "grid"},
+                "professor_schedule": {"A": {0: {semester}}, department: {1: {semester}}},
+                "unscheduled_components": [department]}
+
+    monkeypatch.setattr(tt, "solve_component", solve)
+    monkeypatch.setattr(tt, "ProcessPoolExecutor", _CopyingExecutor)
+    monkeypatch.setattr(tt, "PARALLEL_COMPONENTS", True)
+    rooms = _rooms({"N1": "N", "S1": "S"})
+    semester_courses = {("CSE", 2): None, ("ECE", 4): None}
+    components = find_components([(("CSE", 2), {("rooms", "N", "LECTURE")}),
+                                  (("ECE", 4), {("rooms", "S", "LECTURE")})])
+    timetables, professor_schedule, unscheduled = tt.solve_all_components(
+        components, semester_courses, rooms, {}, [2, 4])
+
+    assert timetables == {("CSE", 2): "grid", ("ECE", 4): "grid"}
+    assert unscheduled == ["CSE", "ECE"]
+    assert professor_schedule["A"][0] == {2, 4} and professor_schedule["A"][1] == set()
+    assert professor_schedule["CSE"][1] == {2} and professor_schedule["ECE"][1] == {4}
+    # Each worker booked its own campus's room, on a copy that is merged back
+    assert rooms["N1"]["schedule"][0] == {2} and rooms["S1"]["schedule"][0] == {4}
@@ -0,0 +1,67 @@
+from scheduling.diagnostics import DiagnosticsEngine, FailureRecord
+from scheduling.solution import Session, Solution
+
+
+def test_reasons_follow_observed_rejections():
+    professor_schedule = {"A": {0: {0, 1, 2, 3}, 1: set()}}
+    rooms = {
+        "L1": {"type": "COMPUTER_LAB", "capacity": 35, "schedule": {0: {0, 1}, 1: set()}},
+        "C1": {"type": "LECTURE_ROOM", "capacity": 70, "schedule": {0: set(), 1: set()}},
+    }
+    failure = FailureRecord("CSE", 2, 0, "CS1", "One", "A", "LAB", "COMPUTER_LAB", 60)
+    for _ in range(3):
+        failure.reject("no_room")
+    failure.reject("faculty_busy")
+
+    engine = DiagnosticsEngine(professor_schedule, rooms, day_count=2, slot_count=4)
+    reasons = engine.reasons(failure)
+    assert [r["kind"] for r in reasons] == ["no_room", "faculty_busy"]
+    assert reasons[0]["share"] == 0.75
+    assert "25%" in reasons[0]["message"]          # 2 of 8 lab slots booked
+    assert "2.0 hours" in reasons[1]["message"]    # 4 half-hour slots
+
+
+def test_capacity_and_missing_room_type_come_first():
+    rooms = {"C1": {"type": "LECTURE_ROOM", "capacity": 70, "schedule": {0: set()}}}
+    engine = DiagnosticsEngine({}, rooms, day_count=1, slot_count=4)
+    big = FailureRecord("CSE", 2, 0, "CS1", "One", "A", "LEC", "SEATER_240", 200)
+    lab = FailureRecord("ECE", 2, 0, "EC1", "Two", "B", "LAB", "HARDWARE_LAB", 30)
+    assert engine.reasons(big)[0]["kind"] == "capacity"
+    assert engine.reasons(lab)[0]["kind"] == "missing_room_type"
+
+
+def test_engine_from_a_solution_uses_its_placed_sessions():
+    meta = {"days": ["Monday", "Tuesday"], "slots": [f"s{i}" for i in range(4)],
+            "rooms": {"L1": {"type": "COMPUTER_LAB", "capacity": 35}}}
+    solution = Solution([Session("CSE", 2, 0, "CS1", "One", "A", "LAB", 0, 0, 2, ["L1"], 30),
+                         Session("CSE", 2, 0, "CS1", "One", "A", "LAB", None, None, 2)], meta)
+    engine = DiagnosticsEngine.from_solution(solution)
+    failure = FailureRecord("CSE", 2, 0, "CS1", "One", "A", "LAB", "COMPUTER_LAB", 30)
+    failure.reject("faculty_busy")
+    assert engine.faculty_load("A") == 2
+    assert engine.room_type_usage("COMPUTER_LAB")[:2] == (2, 8)
+    assert "1.0 hours" in engine.reason_text(failure)
+
+
+class _Component:
+    def __init__(self, failure):
+        self.failure = failure
+        self.reason = ""
+
+
+def test_repeated_sessions_share_one_reason():
+    engine = DiagnosticsEngine({"X": {0: {0, 1}}, "Y": {0: {2, 3}}}, {}, day_count=1, slot_count=4)
+    failures = [FailureRecord("ECE", 6, 0, "B2", "Basket", faculty, kind)
+                for faculty, kind in (("X", "LEC"), ("X", "LEC"), ("Y", "LEC"), ("X", "SS"))]
+    for busy, failure in zip((601, 613, 597, 589), failures):
+        failure.rejections = {"section_busy": busy, "faculty_busy": 1000 - busy}
+    other = FailureRecord("ECE", 6, 0, "CS3", "Three", "A", "LEC")
+    other.reject("daily_limit")
+    components = engine.annotate([_Component(f) for f in failures + [other]])
+
+    # One reason over the whole course, each message once
+    assert {c.reason for c in components[:4]} == {
+        "Section timetable was already occupied in 2400 of 4000 tried slots; "
+        "Faculty 'X / Y' was busy in 1600 of 4000 tried slots (2.0 hours already scheduled this week)"}
+    assert components[4].reason.count("daily component limit") == 1
+    assert failures[0].rejections["section_busy"] == 601   # records themselves are left alone
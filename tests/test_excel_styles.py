@@ -0,0 +1,12 @@
+from openpyxl.styles import Alignment, PatternFill
+
+from utils.excel_styles import alignment, solid_fill, thin_border
+
+
+def test_styles_are_built_once_and_match_openpyxl():
+    assert solid_fill("4F8A8B") is solid_fill("4F8A8B")
+    assert solid_fill("4F8A8B") == PatternFill(start_color="4F8A8B", end_color="4F8A8B", fill_type="solid")
+    assert alignment(horizontal='center', wrap_text=True) is alignment(horizontal='center', wrap_text=True)
+    assert alignment(horizontal='center') == Alignment(horizontal='center')
+    assert thin_border("B0B0B0").left.color.rgb.endswith("B0B0B0")
+    assert thin_border() is not thin_border("B0B0B0")
@@ -0,0 +1,46 @@
+import csv
+import json
+from datetime import date
+
+import pytest
+
+from utils.exporters import export_all
+
+
+@pytest.fixture
+def solution(make_solution):
+    return make_solution([
+        ("CSE", 2, 0, "CS1", "One, Part I", "A & B", "LEC", 0, 0, 3, ["C101"], 60),
+        ("CSE", 2, 0, "CS2", "Two", "B", "LAB", 1, 2, 4, ["L105", "L106"], 60),
+        ("CSE", 2, 0, "CS3", "Three", "C", "TUT", None, None, 2),
+    ], slots=["09:00-09:30", "09:30-10:00", "10:00-10:30", "10:30-11:00", "11:00-11:30", "11:30-12:00"])
+
+
+def test_csv_and_json_have_one_row_per_placed_session(tmp_path, solution):
+    export_all(solution, str(tmp_path), ("csv", "json"))
+    rows = list(csv.DictReader(open(tmp_path / "sessions.csv")))
+    assert [row["code"] for row in rows] == ["CS1", "CS2"]
+    assert (rows[1]["start_time"], rows[1]["end_time"], rows[1]["rooms"]) == ("10:00", "12:00", "L105;L106")
+    assert json.load(open(tmp_path / "sessions.json"))[0]["rooms"] == ["C101"]
+
+
+def test_ics_feeds_per_faculty_section_and_room(tmp_path, solution):
+    export_all(solution, str(tmp_path), ("ics",), term_start=date(2025, 1, 8), weeks=12)
+    feed = (tmp_path / "ics" / "faculty" / "B.ics").read_text()
+    assert feed.count("BEGIN:VEVENT") == 2
+    assert "DTSTART:20250113T090000" in feed and "DTEND:20250114T120000" in feed   # first Monday, Tuesday
+    assert "RRULE:FREQ=WEEKLY;COUNT=12" in feed and "SUMMARY:CS1 LEC (CSE_2)" in feed
+    assert "DESCRIPTION:One\\, Part I\\nA & B" in feed
+    assert (tmp_path / "ics" / "faculty" / "A.ics").exists()
+    assert (tmp_path / "ics" / "sections" / "CSE_2.ics").read_text().count("BEGIN:VEVENT") == 2
+    assert sorted(p.name for p in (tmp_path / "ics" / "rooms").iterdir()) == ["C101.ics", "L105.ics", "L106.ics"]
+
+
+def test_feed_names_that_sanitise_alike_get_their_own_files(tmp_path, solution):
+    solution.sessions[0].faculty = "Dr. X, Y"
+    solution.sessions[1].faculty = "Dr. X Y"
+    counts = export_all(solution, str(tmp_path), ("ics",))
+    files = sorted(p.name for p in (tmp_path / "ics" / "faculty").iterdir())
+    assert files == ["Dr._X_Y.ics", "Dr._X_Y_2.ics"]
+    assert counts[0].startswith("2 faculty")
+    assert "SUMMARY:CS2 LAB" in (tmp_path / "ics" / "faculty" / "Dr._X_Y_2.ics").read_text()
@@ -0,0 +1,24 @@
+from scheduling.faculty_assignment import SectionTask, assign_instructors, instructor_loads, instructor_options
+
+
+def test_options_are_split_and_stripped():
+    assert instructor_options("Dr. Rajib Sharma/ Rajesh Kumar ") == ["Dr. Rajib Sharma", "Rajesh Kumar"]
+
+
+def test_sections_go_to_the_less_loaded_instructor():
+    # A already teaches 10 slots elsewhere; first-listed picking would give A all four sections
+    tasks = [SectionTask(("CSE", "2", section, "CS1", "A/B"), ["A", "B"], 7) for section in range(4)]
+    assignment = assign_instructors(tasks, {"A": 10})
+    assert sorted(assignment.values()) == ["A", "B", "B", "B"]
+    assert instructor_loads(assignment, tasks, {"A": 10}) == {"A": 17, "B": 21}
+
+
+def test_flow_reassigns_across_courses_and_keeps_listed_order_on_ties():
+    tasks = [
+        SectionTask("x", ["A", "B"], 5),
+        SectionTask("y", ["A"], 5),
+        SectionTask("z", ["B", "C"], 5),
+    ]
+    assignment = assign_instructors(tasks)
+    assert assignment == {"x": "B", "y": "A", "z": "C"}
+    assert assign_instructors([SectionTask("t", ["B", "A"], 5)]) == {"t": "B"}
@@ -0,0 +1,32 @@
+import pytest
+from openpyxl import load_workbook
+
+from utils.faculty_render import extract_faculty_names, faculty_schedules, render_faculty_workbook
+
+
+@pytest.fixture
+def solution(make_solution):
+    return make_solution([
+        ("CSE", 2, 0, "CS1", "One", "A", "LEC", 0, 0, 3, ["C101"], 60),
+        ("CSE", 2, 1, "CS2", "Two", "A & B", "LAB", 1, 2, 4, ["L105", "L106"], 60),
+        ("CSE", 2, 1, "CS3", "Three", "B", "TUT", None, None, 2),
+    ], slots=[f"{9 + i // 2:02d}:{30 * (i % 2):02d}" for i in range(8)], sections=2)
+
+
+def test_schedules_come_from_placed_sessions(solution):
+    schedules = faculty_schedules(solution)
+    assert sorted(schedules) == ["A", "B"]
+    assert schedules["A"]["Monday"]["09:00"]["Department-Semester"] == "CSE_2_A"
+    lab = schedules["B"]["Tuesday"]["10:00"]
+    assert (lab["Course Name"], lab["Class Type"], lab["Room"]) == ("Two", "LAB", "L105+L106")
+    assert schedules["B"]["Monday"] == {}   # the unplaced tutorial is left out
+    assert extract_faculty_names("X and Y") == ["X", "Y"]
+
+
+def test_workbook_lists_every_faculty(tmp_path, solution):
+    path = str(tmp_path / "faculty.xlsx")
+    assert render_faculty_workbook(solution, path) == 2
+    wb = load_workbook(path)
+    assert wb.sheetnames == ["Overview", "A", "B"]
+    assert [row[1].value for row in wb["Overview"].iter_rows(min_row=5)] == [2, 1]
+    assert wb["B"]["C4"].value == "CS2" and wb["B"]["B3"].value == "No classes scheduled"
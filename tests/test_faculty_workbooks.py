@@ -0,0 +1,31 @@
+import zipfile
+
+from openpyxl import load_workbook
+
+import pytest
+
+from utils.faculty_workbooks import render_faculty_files, sanitize_filename
+
+
+@pytest.fixture
+def solution(make_solution):
+    sessions = [("CSE", 2, 0, f"CS{i}", f"Course {i}", f"Dr. F{i}", "LEC", i % 2, 0, 3, ["C101"], 60)
+                for i in range(5)]
+    return make_solution(sessions, slots=[f"{9 + i // 2:02d}:{30 * (i % 2):02d}" for i in range(8)])
+
+
+def test_files_list_each_class_and_pack_into_a_zip(tmp_path, solution):
+    paths = render_faculty_files(solution, str(tmp_path / "faculty"), str(tmp_path / "faculty.zip"),
+                                 parallel=False)
+    assert len(paths) == 5
+    ws = load_workbook(paths[0])["Schedule"]
+    assert [cell.value for cell in ws[3]][:3] == ["Monday", "09:00", "CS0"]   # class rows are written
+    assert ws["B4"].value == "No classes scheduled"
+    assert sorted(zipfile.ZipFile(tmp_path / "faculty.zip").namelist()) == [
+        f"timetable_{sanitize_filename(f'Dr. F{i}')}.xlsx" for i in range(5)]
+
+
+def test_process_pool_writes_the_same_files(tmp_path, solution):
+    paths = render_faculty_files(solution, str(tmp_path / "faculty"), workers=2)
+    codes = [[cell.value for cell in load_workbook(path)["Schedule"]["C"] if cell.value] for path in paths]
+    assert codes == [["Course Code", f"CS{i}"] for i in range(5)]
@@ -0,0 +1,43 @@
+from scheduling.feasibility import build_demands, check_feasibility
+
+
+def _row(code, faculty, L=3, T=0, P=0, students=60, dept="CSE", sem=3):
+    return {"Department": dept, "Semester": sem, "Course Code": code, "Faculty": faculty,
+            "L": L, "T": T, "P": P, "S": 0, "total_students": students, "Schedule": "Yes"}
+
+
+ROOMS = {
+    "C1": {"type": "LECTURE_ROOM", "capacity": 70},
+    "L1": {"type": "COMPUTER_LAB", "capacity": 40},
+}
+
+
+def test_small_course_list_is_feasible():
+    demands = build_demands([_row("CS101", "Dr A", T=1, P=2), _row("CS102", "Dr B")])
+    report = check_feasibility(demands, ROOMS, 5, 19)
+    assert report.ok and report.checks > 0
+
+
+def test_missing_lab_type_and_capacity_class_are_reported():
+    demands = build_demands([_row("EC201", "Dr A", P=2, students=60), _row("CS301", "Dr B", students=200)])
+    report = check_feasibility(demands, ROOMS, 5, 19)
+    kinds = {(issue["kind"], issue["name"]) for issue in report.issues}
+    assert ("room_type", "HARDWARE_LAB") in kinds
+    assert ("capacity", ">=200") in kinds
+
+
+def test_faculty_and_section_limits():
+    rows = [_row(f"CS{i}", "Dr A", L=6, T=2) for i in range(4)]
+    report = check_feasibility(build_demands(rows), ROOMS, 1, 19, break_slots=lambda sem: [3])
+    kinds = {issue["kind"] for issue in report.issues}
+    # 4 lectures and 2 tutorials per course on one day: daily limit, gap and section time all break
+    assert kinds == {"faculty", "section", "capacity"}
+    assert any("components" in line for line in report.lines())
+
+
+def test_basket_courses_share_section_time():
+    basket = [_row(f"B1-CS{i}", f"Dr {i}", students=30) for i in range(5)]
+    core = [_row(f"CS{i}", f"Dr {i}", students=30) for i in range(5)]
+    # Five courses of 6 slots each: one block for the basket, 30 slots without it
+    assert not [i for i in check_feasibility(build_demands(basket), ROOMS, 1, 19).issues if i["kind"] == "section"]
+    assert [i for i in check_feasibility(build_demands(core), ROOMS, 1, 19).issues if i["kind"] == "section"]
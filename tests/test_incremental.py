@@ -0,0 +1,134 @@
+import pytest
+
+from scheduling.incremental import CourseChange, FacultyUnavailable, RoomRemoved, apply_delta
+from scheduling.placement import Occupancy, Placer, course_gap_ok, daily_limit_ok
+from scheduling.solution import Session
+
+
+@pytest.fixture
+def solution(make_solution):
+    return make_solution([
+        ("CSE", 2, 0, "CS1", "One", "A", "LEC", 0, 0, 3, ["C101"], 60),
+        ("CSE", 2, 0, "CS2", "Two", "B", "LEC", 0, 5, 3, ["C102"], 60),
+        ("CSE", 2, 0, "CS3", "Three", "A", "LEC", 1, 0, 3, ["C101"], 60),
+    ], breaks={"2": [4]}, rooms={"C101": {"type": "LECTURE_ROOM", "capacity": 70},
+                                 "C102": {"type": "LECTURE_ROOM", "capacity": 70}})
+
+
+def test_faculty_unavailable_moves_only_affected_sessions(solution):
+    result = apply_delta(solution, FacultyUnavailable("A", "Monday"))
+    moved = result.solution.sessions
+    assert result.affected == [0]
+    assert not result.unplaced
+    assert moved[0].day == 1 and moved[0].start == 5   # avoids Tuesday's CS3 and the break
+    assert [s.to_dict() for s in moved[1:]] == [s.to_dict() for s in solution.sessions[1:]]
+    assert solution.sessions[0].day == 0   # input solution is untouched
+
+
+def test_removed_room_keeps_slot_and_swaps_room(solution):
+    result = apply_delta(solution, RoomRemoved("C101"))
+    sessions = result.solution.sessions
+    assert result.affected == [0, 2]
+    assert (sessions[0].day, sessions[0].start, sessions[0].rooms) == (0, 0, ("C102",))
+    assert (sessions[2].day, sessions[2].start, sessions[2].rooms) == (1, 0, ("C102",))
+
+
+def test_unknown_day_is_reported_by_name(solution):
+    with pytest.raises(ValueError, match="Unknown day 'Mon'"):
+        apply_delta(solution, FacultyUnavailable("A", "Mon"))
+    with pytest.raises(ValueError, match="index below 2"):
+        apply_delta(solution, FacultyUnavailable("A", 5))
+
+
+def test_placer_follows_the_generator_rules(make_solution):
+    solution = make_solution([("CSE", 2, 0, "CS1", "One", "A", "LEC", 0, 0, 3, ["C101"], 60),
+                              ("CSE", 2, 0, "CS2", "Two", "A", "TUT", 0, 10, 2, ["C101"], 60)],
+                             slots=12, days=["Monday"])
+    lecture = Session("CSE", 2, 0, "CS4", "Four", "A", "LEC", None, None, 3, [], 60)
+    solution.sessions.append(lecture)
+    placer = Placer(solution)
+    assert not placer.fits(2, lecture, 0, 5)   # A already teaches the section twice on Monday
+    lecture.faculty = "D"
+    assert not placer.fits(2, lecture, 0, 3)   # no free slot after CS1
+    assert placer.fits(2, lecture, 0, 5)
+    assert not course_gap_ok({2: [("TUT", "CS4", "D")], 3: [("TUT", "", "")]}, "D", "CS4", 7)
+    assert daily_limit_ok({0: [("LEC", "B1-X", "D")], 3: [("LEC", "B1-X", "D")]}, "D", "B1-Y")
+    assert not daily_limit_ok({0: [("LEC", "CS1", "D")], 3: [("TUT", "CS2", "D")]}, "D", "CS4")
+
+
+def test_large_lab_groups_take_an_adjacent_pair(make_solution):
+    rooms = {"L106": {"type": "COMPUTER_LAB", "capacity": 35, "roomNumber": "106"},
+             "L108": {"type": "COMPUTER_LAB", "capacity": 35, "roomNumber": "108"},
+             "L107": {"type": "COMPUTER_LAB", "capacity": 35, "roomNumber": "107"},
+             "L206": {"type": "COMPUTER_LAB", "capacity": 35, "roomNumber": "206"}}
+    solution = make_solution(days=["Monday"], rooms=rooms)
+    lab = Session("CSE", 2, 0, "CS5", "Five", "A", "LAB", None, None, 4, [], 70, room_type="COMPUTER_LAB")
+    assert Placer(solution).find_rooms(lab, 0, 0) == ("L106", "L107")
+    lab.students = 30
+    assert Placer(solution).find_rooms(lab, 0, 0) == ("L106",)
+    lab.students = 80
+    assert Placer(solution).find_rooms(lab, 0, 0) is None
+
+
+def test_parallel_electives_share_their_slots(make_solution):
+    solution = make_solution([("CSE", 2, 0, "B1-X", "Ex", "E", "LEC", 0, 0, 3, ["C101"], 60),
+                              ("CSE", 2, 0, "B1-Y", "Why", "F", "LEC", 0, 0, 3, ["C102"], 60)])
+    occupancy = Occupancy(solution.sessions)
+    lecture = Session("CSE", 2, 0, "CS4", "Four", "A", "LEC", None, None, 3, [], 60)
+    assert occupancy.blockers(lecture, 0, 0) == {0, 1}
+    occupancy.remove(1, solution.sessions[1])
+    assert occupancy.blockers(lecture, 0, 0) == {0}   # B1-X still holds the section's slots
+    occupancy.remove(0, solution.sessions[0])
+    assert occupancy.blockers(lecture, 0, 0) == set()
+
+
+@pytest.fixture
+def block(make_solution):
+    rooms = {"C101": {"type": "LECTURE_ROOM", "capacity": 70}, "C102": {"type": "LECTURE_ROOM", "capacity": 70},
+             "C103": {"type": "LECTURE_ROOM", "capacity": 70}}
+    return make_solution([
+        ("CSE", 2, 0, "B1-X", "Ex", "E", "LEC", 0, 0, 3, ["C101"], 40),
+        ("CSE", 2, 0, "B1-Y", "Why", "F", "LEC", 0, 0, 3, ["C102"], 40),
+        ("CSE", 2, 1, "B1-X", "Ex", "E", "LEC", 0, 0, 3, ["C101"], 40),
+        ("CSE", 2, 1, "B1-Y", "Why", "F", "LEC", 0, 0, 3, ["C102"], 40),
+        ("CSE", 2, 1, "CS1", "One", "A", "LEC", 1, 0, 3, ["C103"], 60),
+    ], sections=2, rooms=rooms)
+
+
+def test_block_lectures_move_as_one_meeting(block):
+    result = apply_delta(block, FacultyUnavailable("E", "Monday"))
+    sessions = result.solution.sessions
+    assert result.affected == [0, 2] and not result.unplaced
+    assert result.moved == [1, 3]
+    assert {(s.day, s.start) for s in sessions[:4]} == {(1, 4)}   # past CS1 and its spacing
+    assert sessions[0].rooms == sessions[2].rooms != sessions[1].rooms == sessions[3].rooms
+    assert sessions[4].to_dict() == block.sessions[4].to_dict()   # never ejected for the block
+
+
+def test_new_block_lecture_joins_its_meeting(block):
+    result = apply_delta(block, CourseChange("CSE", 2, {"Course Code": "B1-Z", "Course Name": "Zed",
+                                                        "Faculty": "G", "L": 1, "total_students": 40}))
+    assert [(s.code, s.section, s.day, s.start) for s in result.solution.sessions[5:]] == [
+        ("B1-Z", 0, 0, 0), ("B1-Z", 1, 0, 0)]
+    assert result.solution.sessions[5].rooms == result.solution.sessions[6].rooms == ("C103",)
+
+
+def test_unscheduled_entries_follow_the_resolve(solution):
+    solution.meta["unscheduled"] = [
+        {"department": "CSE", "semester": 2, "section": "0", "code": "CS1", "component_type": "LEC",
+         "sessions": 2, "reason": "No common free slot"},
+        {"department": "CSE", "semester": 2, "section": 0, "code": "CS9", "component_type": "LEC",
+         "sessions": 1, "reason": "No common free slot"}]
+    big = {"Course Code": "CS9", "Course Name": "Nine", "Faculty": "A", "L": 3, "total_students": 500}
+    for _ in range(2):
+        solution = apply_delta(solution, CourseChange("CSE", 2, big)).solution
+    unscheduled = solution.meta["unscheduled"]
+    # No room seats 500: one entry with a count, however often the change is re-solved
+    assert [(e["code"], e["sessions"]) for e in unscheduled] == [("CS1", 2), ("CS9", 2)]
+
+    # A single lecture that fits now replaces the entry, Schedule=No drops it
+    result = apply_delta(solution, CourseChange("CSE", 2, dict(big, L=1.5, total_students=60)))
+    assert result.solution.sessions[-1].placed
+    assert [(e["code"], e["sessions"]) for e in result.solution.meta["unscheduled"]] == [("CS1", 2)]
+    result = apply_delta(solution, CourseChange("CSE", 2, dict(big, Schedule="No")))
+    assert [(e["code"], e["sessions"]) for e in result.solution.meta["unscheduled"]] == [("CS1", 2)]
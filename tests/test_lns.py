@@ -0,0 +1,35 @@
+import pytest
+
+from optimization.lns import improve_solution
+
+
+@pytest.fixture
+def solution(make_solution):
+    sessions = [
+        ("CSE", 2, 0, "CS1", "One", "A", "LEC", 0, 0, 3, ["C101"], 40),
+        ("CSE", 2, 0, "CS3", "Three", "A", "LEC", 1, 0, 3, ["C101"], 40),
+        ("CSE", 2, 0, "CS4", "Four", "C", "LEC", 1, 3, 3, ["C101"], 40),
+        ("CSE", 2, 0, "CS5", "Five", "D", "TUT", 1, 6, 2, ["C101"], 40),
+        ("ECE", 2, 0, "CS9", "Nine", "E", "LAB", 0, 2, 4, ["L1"], 40, "COMPUTER_LAB"),
+    ]
+    sections = [{"department": department, "semester": 2, "section": 0, "title": f"{department}_2",
+                 "students": 40} for department in ("CSE", "ECE")]
+    rooms = {"C101": {"type": "LECTURE_ROOM", "capacity": 70}, "L1": {"type": "COMPUTER_LAB", "capacity": 40}}
+    # The CSE lab only fits on Monday afternoon, where the ECE lab holds the only lab room
+    unscheduled = [{"department": "CSE", "semester": 2, "section": 0, "code": "CS2", "name": "Two",
+                    "faculty": "B", "component_type": "LAB", "reason": "No free lab"}]
+    return make_solution(sessions, sections=sections, rooms=rooms, unscheduled=unscheduled)
+
+
+def test_ruin_and_recreate_moves_blocking_lab_to_place_pending_one(solution):
+    result = improve_solution(solution, time_budget=5, seed=1, max_iterations=200)
+    sessions = result.solution.sessions
+    assert (result.unplaced_before, result.unplaced_after) == (1, 0)
+    assert result.solution.meta["unscheduled"] == []
+
+    lab = next(s for s in sessions if s.code == "CS2")
+    blocker = next(s for s in sessions if s.code == "CS9")
+    assert lab.day == 0 and lab.start >= 3 and lab.rooms == ("L1",)
+    assert blocker.day == 1   # moved out of the way
+    assert [s.to_dict() for s in sessions[:4]] == [s.to_dict() for s in solution.sessions[:4]]
+    assert solution.sessions[4].day == 0   # input solution is untouched
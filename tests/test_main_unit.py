@@ -4,6 +4,7 @@ from datetime import time
 import pytest
 
 import main as m
+from scheduling.solution import Solution
 
 
 def test_generate_time_slots_count_and_bounds():
@@ -108,5 +109,9 @@ def test_generate_timetable_smoke(tmp_path, monkeypatch):
     # Ensure no courses.csv, so default dataset path is taken
     m.generate_timetable()
     assert os.path.exists("timetable.xlsx")
+    solution = Solution.load()
+    basket = [s for s in solution.sessions if s.code.startswith("B1-")]
+    assert {s.code for s in basket} == {"B1-001", "B1-002"}   # one lecture per elective of the block
+    assert {s.code for s in solution.sessions} >= {"CS101", "EC101"}
 
 
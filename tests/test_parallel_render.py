@@ -0,0 +1,37 @@
+import importlib
+import os
+import shutil
+
+from openpyxl import load_workbook
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _import_comprehensive(tmp_path, monkeypatch):
+    # The generator reads combined.csv from the working directory on import
+    shutil.copy(os.path.join(ROOT, "data", "Combined.csv"), tmp_path / "combined.csv")
+    monkeypatch.chdir(tmp_path)
+    return importlib.import_module("comprehensive_timetable")
+
+
+def test_department_workbook_renders_from_plain_payload(tmp_path, monkeypatch):
+    ct = _import_comprehensive(tmp_path, monkeypatch)
+    ct.initialize_time_slots()
+    ct.lunch_breaks = ct.calculate_lunch_breaks([3])
+    timetable = {day: {slot: {'type': None, 'code': '', 'name': '', 'faculty': '', 'classroom': ''}
+                       for slot in range(len(ct.TIME_SLOTS))} for day in range(len(ct.DAYS))}
+    for i in range(ct.LECTURE_DURATION):
+        timetable[0][i].update(type='LEC', code='CS301' if i == 0 else '', faculty='Dr A' if i == 0 else '',
+                               classroom='C101' if i == 0 else '')
+    sheets = {'CSE': [{'title': 'CSE_3', 'semester': 3, 'section': 0, 'num_sections': 1,
+                       'timetable': timetable, 'subject_color_map': {'CS301': 'FFB6C1'},
+                       'course_faculty_map': {'CS301': {'name': 'Compilers', 'faculty': 'Dr A'}}}]}
+    component = ct.UnscheduledComponent('CSE', 3, 'CS302', 'Networks', 'Dr B', 'LAB', 1, 0, 'No lab free')
+
+    monkeypatch.setattr(ct, "PARALLEL_RENDERING", False)
+    assert ct.render_department_workbooks(sheets, [], {component}) == ["timetable_CSE.xlsx"]
+
+    ws = load_workbook(tmp_path / "timetable_CSE.xlsx")["CSE_3"]
+    assert ws["B2"].value.startswith("CS301 LEC")
+    assert "B2:D2" in [str(r) for r in ws.merged_cells.ranges]
+    assert "CS302" in [cell.value for cell in ws["A"]]
@@ -0,0 +1,56 @@
+import random
+
+from optimization.scoring import Placement, ScoreEngine
+
+
+def _engine():
+    return ScoreEngine(12, morning_end=4, breaks={"2": [7]}, avoid={"A": {(1, 0), (1, 1)}})
+
+
+def _fresh_total(placements):
+    engine = _engine()
+    for key, placement in placements.items():
+        engine.place(key, placement)
+    return engine.total
+
+
+def test_terms_count_gaps_morning_labs_preferences_and_waste():
+    engine = _engine()
+    section = ("CSE", 2, 0)
+    engine.place(1, Placement(section, "A", "LEC", 1, 0, 2, students=60, seats=70))
+    engine.place(2, Placement(section, "B", "LAB", 1, 3, 4, students=30, seats=30))
+    engine.place(3, Placement(section, "A", "TUT", 1, 9, 2))
+    terms = engine.terms
+    assert terms["faculty_preferences"] == 2      # A asked to keep day 1 slots 0-1 free
+    assert terms["morning_labs"] == 1             # only slot 3 of the lab is before slot 4
+    assert terms["idle_gaps"] == 2                # slots 2 and 8, the break at 7 is not a gap
+    assert terms["faculty_spread"] == 7           # A is idle from slot 2 to 8
+    assert terms["room_waste"] == 10
+
+
+def test_deltas_match_rescoring_from_scratch():
+    rng = random.Random(3)
+    engine = _engine()
+    placements = {}
+    for key in range(12):
+        placement = Placement(("CSE", 2, key % 2), rng.choice("ABC"), rng.choice(["LEC", "LAB"]),
+                              rng.randrange(2), rng.randrange(9), 3, 40, rng.choice([40, 70]))
+        assert engine.delta_place(placement) == engine.place(key, placement)
+        placements[key] = placement
+    assert engine.total == _fresh_total(placements)
+
+    for _ in range(30):
+        a, b = rng.sample(sorted(placements), 2)
+        before = engine.total
+        if rng.random() < 0.5:
+            day, start = rng.randrange(2), rng.randrange(9)
+            delta = engine.delta_move(a, day, start)
+            placements[a] = placements[a].moved(day, start)
+            assert engine.move(a, day, start) == delta
+        else:
+            delta = engine.delta_swap(a, b)
+            placements[a], placements[b] = (placements[a].moved(placements[b].day, placements[b].start),
+                                            placements[b].moved(placements[a].day, placements[a].start))
+            assert engine.swap(a, b) == delta
+        assert abs(engine.total - (before + delta)) < 1e-9
+        assert abs(engine.total - _fresh_total(placements)) < 1e-9
@@ -0,0 +1,19 @@
+import random
+
+from scheduling.section_batching import SectionBatch
+
+
+def test_candidates_skip_breaks_and_are_shared():
+    batch = SectionBatch(2, 2, 8, lambda slot: slot == 4, random.Random(0))
+    candidates = batch.candidates(3)
+    assert {start for _, start in candidates} == {0, 1, 5}
+    assert batch.candidates(3) is candidates
+
+
+def test_sibling_orders_are_rotations_of_one_shuffle():
+    batch = SectionBatch(2, 2, 8, lambda slot: False, random.Random(0))
+    first = batch.order("CS1", "LEC", 2, 0)
+    second = batch.order("CS1", "LEC", 2, 1)
+    assert sorted(first) == sorted(second) == sorted(batch.candidates(2))
+    assert second == first[len(first) // 2:] + first[:len(first) // 2]
+    assert batch.order("CS1", "LEC", 2, 0) == first
@@ -0,0 +1,65 @@
+import json
+
+import pytest
+from openpyxl import load_workbook
+
+from scheduling.solution import Session, Solution
+from utils.faculty_render import faculty_schedules
+from utils.solution_render import basket_group, render_workbook
+
+
+@pytest.fixture
+def solution(make_solution):
+    return make_solution([
+        ("CSE", 2, 0, "CS1", "One", "A", "LEC", 0, 0, 3, ["C101"], 60),
+        ("CSE", 2, 0, "B1-CS2", "Two", "B", "LEC", 1, 5, 3, ["C102"], 40),
+        ("CSE", 2, 0, "B1-CS3", "Three", "C", "LEC", 1, 5, 3, ["C103"], 20),
+    ], breaks={"2": [4]}, courses=[
+        {"department": "CSE", "semester": 2, "code": "CS1", "name": "One", "faculty": "A",
+         "L": 3, "T": 0, "P": 0, "S": 0},
+        {"department": "CSE", "semester": 2, "code": "B1-CS2", "name": "Two", "faculty": "B",
+         "L": 3, "T": 0, "P": 0, "S": 0},
+        {"department": "CSE", "semester": 2, "code": "B1-CS3", "name": "Three", "faculty": "C",
+         "L": 3, "T": 0, "P": 0, "S": 0},
+    ], unscheduled=[{"department": "CSE", "semester": 2, "section": 0, "code": "CS1", "name": "One",
+                     "faculty": "A", "component_type": "TUT", "sessions": 1, "reason": "no room"}])
+
+
+def test_compact_format_round_trips(tmp_path, solution):
+    path = solution.save(str(tmp_path / "solution.json"))
+    data = json.load(open(path))
+    assert data["version"] == 2 and data["strings"].count("CSE") == 1
+    loaded = Solution.load(path)
+    assert [s.to_dict() for s in loaded.sessions] == [s.to_dict() for s in solution.sessions]
+
+
+def test_version_1_files_still_load(solution):
+    data = {"version": 1, "meta": solution.meta, "sessions": [s.to_dict() for s in solution.sessions]}
+    loaded = Solution.from_dict(data)
+    assert [s.to_dict() for s in loaded.sessions] == [s.to_dict() for s in solution.sessions]
+
+
+def test_render_merges_sessions_and_shares_basket_cells(tmp_path, solution):
+    path = render_workbook(solution, str(tmp_path / "all.xlsx"))
+    wb = load_workbook(path)
+    assert wb.sheetnames == ["Overview", "CSE_2"]
+    ws = wb["CSE_2"]
+    assert ws["B2"].value.startswith("CS1 LEC") and "B2:D2" in ws.merged_cells
+    assert ws["F2"].value == "BREAK"
+    basket = ws["G3"].value
+    assert basket.startswith("B1 Courses\nB1-CS2, B1-CS3") and "G3:I3" in ws.merged_cells
+    assert any(row[5].value == "no room" for row in ws.iter_rows(min_row=5))
+    assert basket_group("B1-CS2") == "B1" and basket_group("CS1") is None
+
+
+def test_basket_index_groups_electives_once_for_renderers(solution):
+    solution.meta["sections"].append({"department": "CSE", "semester": 2, "section": 1, "title": "CSE_2_B"})
+    solution.sessions.append(Session("CSE", 2, 1, "B1-CS2", "Two", "B", "LEC", 1, 5, 3, ["C102"], 40))
+    index = solution.basket_index()
+    cell = index[("CSE", 2, 0, 1, 5)]
+    assert (cell.group, cell.codes, cell.duration) == ("B1", ["B1-CS2", "B1-CS3"], 3)
+    assert [s.code for s in index[("CSE", 2, 1, 1, 5)].sessions] == ["B1-CS2"]
+    assert ("CSE", 2, 0, 0, 0) not in index   # CS1 is not a basket course
+
+    shared = faculty_schedules(solution)["B"]["Tuesday"]["s5"]
+    assert shared["Department-Semester"] == "CSE_2, CSE_2_B"
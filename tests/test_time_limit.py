@@ -0,0 +1,64 @@
+import time
+
+import pandas as pd
+import pytest
+
+from optimization.enhanced_main import OptimizedScheduler, TimetableConfig, main
+
+
+def _scheduler():
+    config = TimetableConfig.from_dict({}).get_default_config()
+    config["scheduling"]["max_retry_attempts"] = 5
+    config["optimization"]["enable_parallel_processing"] = False
+    return OptimizedScheduler(TimetableConfig.from_dict(config))
+
+
+def _inputs():
+    # Two courses with one faculty member and one room: something always stays unscheduled
+    df = pd.DataFrame([
+        {"Department": "CSE", "Semester": 2, "Course Code": "CS101", "Course Name": "One",
+         "Faculty": "Prof A", "L": 3, "T": 0, "P": 0, "S": 0, "total_students": 60},
+        {"Department": "CSE", "Semester": 2, "Course Code": "CS102", "Course Name": "Two",
+         "Faculty": "Prof A", "L": 60, "T": 0, "P": 0, "S": 0, "total_students": 60},
+    ])
+    rooms = {"R1": {"capacity": 70, "type": "LECTURE_ROOM", "roomNumber": "R1",
+                    "schedule": {day: set() for day in range(5)}}}
+    return df, rooms
+
+
+def test_deadline_stops_retries_and_keeps_best_attempt():
+    scheduler = _scheduler()
+    result = scheduler.generate_timetable_optimized(*_inputs(), deadline=time.time())
+    assert result["timetable"]
+    assert result["unscheduled_components"]
+    assert scheduler.performance_stats["retry_attempts"] == 1
+
+
+def test_without_deadline_all_retries_run():
+    scheduler = _scheduler()
+    scheduler.generate_timetable_optimized(*_inputs())
+    assert scheduler.performance_stats["retry_attempts"] == 5
+
+
+def test_failures_of_one_course_are_counted_separately():
+    result = _scheduler().generate_timetable_optimized(*_inputs())
+    unscheduled = result["unscheduled_components"]
+    assert len(unscheduled) > len(set(unscheduled))   # CS102's lectures fail alike, each one counts
+
+
+def test_portfolio_picks_the_sequential_seed():
+    df, rooms = _inputs()
+    df = df.iloc[:1]   # always fits, so the first seed already has nothing unscheduled
+    config = TimetableConfig.from_dict({}).get_default_config()
+    config["scheduling"]["max_retry_attempts"] = 6
+    config["optimization"].update(enable_parallel_processing=True, max_workers=3)
+    parallel = OptimizedScheduler(TimetableConfig.from_dict(config)).generate_timetable_optimized(df, rooms)
+    sequential = _scheduler().generate_timetable_optimized(df, rooms)
+    assert parallel["seed"] == sequential["seed"] == 42
+
+
+def test_time_limit_must_be_a_number(capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        main(["--time-limit", "soon"])
+    assert exit_info.value.code == 2
+    assert "--time-limit: invalid float value: 'soon'" in capsys.readouterr().err
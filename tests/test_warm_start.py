@@ -0,0 +1,31 @@
+from scheduling.solution import Session
+from scheduling.warm_start import course_spec, parse_sheet_title, preplace_sessions
+
+
+def _grid(days=2, slots=8):
+    return {d: {s: {"type": None, "code": "", "name": "", "faculty": "", "classroom": ""}
+                for s in range(slots)} for d in range(days)}
+
+
+def test_parse_sheet_title():
+    assert parse_sheet_title("CSE_4") == ("CSE", 4, 0)
+    assert parse_sheet_title("CSE_4_B") == ("CSE", 4, 1)
+    assert parse_sheet_title("Overview") is None
+
+
+def test_preplace_keeps_only_still_valid_sessions():
+    rooms = {"C101": {"type": "LECTURE_ROOM", "capacity": 70, "schedule": {0: set(), 1: set()}}}
+    specs = {("CS1", "A/B"): course_spec("One", "A/B", {"LEC": 1, "TUT": 0, "LAB": 0, "SS": 0}, None, 60)}
+    prior = [
+        Session("CSE", 2, 0, "CS1", "One", "B", "LEC", 0, 0, 3, ["C101"]),
+        Session("CSE", 2, 0, "CS1", "One", "B", "LEC", 1, 0, 3, ["C101"]),   # only one lecture needed now
+        Session("CSE", 2, 0, "CS9", "Gone", "C", "LEC", 1, 3, 3, ["C101"]),  # course no longer listed
+    ]
+    timetable, professor_schedule = _grid(), {}
+    placed, faculty = preplace_sessions(prior, timetable, professor_schedule, rooms, specs, lambda slot: slot == 4)
+
+    assert placed == {("CS1", "A/B", "LEC"): 1}
+    assert faculty == {("CS1", "A/B"): "B"}
+    assert timetable[0][0]["code"] == "CS1" and timetable[0][2]["type"] == "LEC"
+    assert rooms["C101"]["schedule"][0] == {0, 1, 2}
+    assert professor_schedule["B"][0] == {0, 1, 2}
@@ -0,0 +1,62 @@
+import pytest
+from openpyxl import Workbook, load_workbook
+
+from utils.faculty_render import render_faculty_workbook
+from utils.solution_render import render_workbook
+from utils.workbook_cache import SheetCache
+
+
+@pytest.fixture
+def solution(make_solution):
+    return make_solution([
+        ("CSE", 2, 0, "CS1", "One", "A", "LEC", 0, 0, 3, ["C101"], 60),
+        ("CSE", 2, 1, "CS2", "Two", "B", "LAB", 1, 5, 2, ["L105", "L106"], 60),
+    ], sections=2, breaks={"2": [4]}, courses=[
+        {"department": "CSE", "semester": 2, "code": "CS1", "name": "One", "faculty": "A",
+         "L": 3, "T": 0, "P": 0, "S": 0},
+        {"department": "CSE", "semester": 2, "code": "CS2", "name": "Two", "faculty": "B",
+         "L": 0, "T": 0, "P": 2, "S": 0},
+    ])
+
+
+def _cells(path, title):
+    ws = load_workbook(path)[title]
+    values = [(cell.coordinate, cell.value, cell.fill.fgColor.rgb, cell.font.b)
+              for row in ws.iter_rows() for cell in row]
+    return values, sorted(map(str, ws.merged_cells.ranges))
+
+
+def test_only_changed_sheets_are_rendered_again(tmp_path, capsys, solution):
+    sections, faculty = str(tmp_path / "all.xlsx"), str(tmp_path / "faculty.xlsx")
+    render_workbook(solution, sections, incremental=True)
+    render_faculty_workbook(solution, faculty, incremental=True)
+    capsys.readouterr()
+
+    solution.sessions[0].start = 1   # only CSE_2_A and faculty A change
+    render_workbook(solution, sections, incremental=True)
+    render_faculty_workbook(solution, faculty, incremental=True)
+    assert capsys.readouterr().out.splitlines() == [
+        f"{sections}: 2 sheets rendered, 1 unchanged sheets reused",
+        f"{faculty}: 2 sheets rendered, 1 unchanged sheets reused"]
+
+    render_workbook(solution, str(tmp_path / "full.xlsx"))
+    render_faculty_workbook(solution, str(tmp_path / "full_faculty.xlsx"))
+    for title in ("CSE_2_A", "CSE_2_B"):
+        assert _cells(sections, title) == _cells(str(tmp_path / "full.xlsx"), title)
+    assert _cells(sections, "CSE_2_B")[1] == ["G3:H3"]
+    for title in ("A", "B"):
+        assert _cells(faculty, title) == _cells(str(tmp_path / "full_faculty.xlsx"), title)
+
+
+def test_cache_is_ignored_when_the_workbook_changed(tmp_path):
+    path = str(tmp_path / "book.xlsx")
+    cache = SheetCache(path, "v1")
+    wb = Workbook()
+    wb.active.title = "S"
+    cache.unchanged("S", "hash")
+    cache.save(wb)
+    assert SheetCache(path, "v1").unchanged("S", "hash")
+    assert not SheetCache(path, "v2").unchanged("S", "hash")   # renderer changed
+    with open(path, "ab") as f:
+        f.write(b"\0")
+    assert not SheetCache(path, "v1").unchanged("S", "hash")   # workbook edited since
@@ -0,0 +1,105 @@
+import pytest
+from openpyxl import load_workbook
+from openpyxl.styles import Font, PatternFill
+
+from utils import workbook_writer
+from utils.excel_styles import alignment, font, solid_fill, thin_border
+from utils.workbook_writer import StreamingWorkbook, create_workbook
+
+
+def test_buffered_sheets_keep_order_merges_and_styles(tmp_path):
+    wb = StreamingWorkbook()
+    overview = wb.create_sheet("Overview")
+    overview.append(["Title"])
+    sheet = wb.create_sheet("CSE_3")
+    sheet.append(["Day", "09:00", "09:30"])
+    sheet.cell(row=2, column=2, value="CS101 LEC")
+    sheet.cell(row=2, column=3, value="")
+    sheet.merge_cells("B2:C2")
+    sheet["B2"].fill = PatternFill(start_color="4F8A8B", end_color="4F8A8B", fill_type="solid")
+    sheet.column_dimensions["B"].width = 15
+    wb.flush(sheet)
+    # The overview is filled in after the section sheets, but stays first
+    overview.cell(row=3, column=1, value="CSE_3")
+    for cell in overview[1]:
+        cell.font = Font(bold=True)
+    path = tmp_path / "out.xlsx"
+    wb.save(path)
+
+    book = load_workbook(path)
+    assert book.sheetnames == ["Overview", "CSE_3"]
+    assert book["Overview"]["A1"].font.b and book["Overview"]["A3"].value == "CSE_3"
+    ws = book["CSE_3"]
+    assert [str(r) for r in ws.merged_cells.ranges] == ["B2:C2"]
+    assert ws["B2"].value == "CS101 LEC" and ws["B2"].fill.fgColor.rgb.endswith("4F8A8B")
+    assert ws.column_dimensions["B"].width == 15
+
+
+def _fill_sheets(wb):
+    overview = wb.create_sheet("Overview")
+    overview.append(["Faculty"])
+    link = overview.cell(row=2, column=1, value="Dr. X")
+    link.hyperlink = "#Dr. X!A1"
+    link.style = "Hyperlink"
+    wb.flush(overview)
+    for _ in range(2):   # the second sheet is renamed 'Dr. X1'
+        ws = wb.create_sheet("Dr. X")
+        ws.append(["Day", "09:00", "09:30", "10:00"])
+        for cell in ws[1]:
+            cell.font = font(bold=True, color="FFFFFF", size=12)
+            cell.fill = solid_fill("374785")
+        ws.cell(row=2, column=1, value="Monday")
+        ws.cell(row=2, column=2, value="CS101 LEC").alignment = alignment(horizontal='center', wrap_text=True, indent=2)
+        ws.merge_cells("B2:C2")
+        ws["B2"].fill = solid_fill("4F8A8B")
+        ws["D2"].border = thin_border("B0B0B0")
+        ws.cell(row=3, column=2, value=3)
+        ws.column_dimensions["B"].width = 15
+        ws.row_dimensions[2].height = 40
+        wb.flush(ws)
+
+
+def test_xlsxwriter_backend_writes_the_same_workbook(tmp_path):
+    pytest.importorskip("xlsxwriter")
+    books = {}
+    for backend in ("openpyxl", "xlsxwriter"):
+        wb = create_workbook(backend)
+        _fill_sheets(wb)
+        wb.save(tmp_path / f"{backend}.xlsx")
+        books[backend] = load_workbook(tmp_path / f"{backend}.xlsx")
+    expected, book = books["openpyxl"], books["xlsxwriter"]
+
+    assert book.sheetnames == expected.sheetnames == ["Overview", "Dr. X", "Dr. X1"]
+    assert book["Overview"]["A2"].value == "Dr. X" and book["Overview"]["A2"].font.u == "single"
+    ws, ref = book["Dr. X1"], expected["Dr. X1"]
+    assert [str(r) for r in ws.merged_cells.ranges] == ["B2:C2"]
+    for coordinate in ("A1", "D1", "B2", "D2", "B3"):
+        cell, want = ws[coordinate], ref[coordinate]
+        assert cell.value == want.value
+        assert (cell.font.b, cell.font.sz, cell.fill.fill_type) == (want.font.b, want.font.sz, want.fill.fill_type)
+        assert cell.fill.fgColor.rgb[-6:] == want.fill.fgColor.rgb[-6:]
+        assert cell.border.left.style == want.border.left.style
+    assert ws["B2"].alignment.horizontal == "center" and ws["B2"].alignment.wrap_text
+    assert ws.column_dimensions["B"].width == 15 and ws.row_dimensions[2].height == 40
+
+
+def test_backend_falls_back_to_openpyxl_without_xlsxwriter(monkeypatch, capsys):
+    monkeypatch.setattr(workbook_writer, "xlsxwriter", None)
+    workbook_writer._fallback_warning.cache_clear()
+    assert isinstance(create_workbook("auto"), StreamingWorkbook)
+    assert capsys.readouterr().out == ""
+    assert isinstance(create_workbook("xlsxwriter"), StreamingWorkbook)
+    assert "not installed" in capsys.readouterr().out
+    with pytest.raises(ValueError):
+        create_workbook("xlwt")
+
+
+@pytest.mark.parametrize("backend", ["openpyxl", "xlsxwriter"])
+def test_merges_across_rows_fail_the_same_way_on_both_backends(backend):
+    if backend == "xlsxwriter":
+        pytest.importorskip("xlsxwriter")
+    ws = create_workbook(backend).create_sheet("Sheet")
+    with pytest.raises(ValueError, match="within one row"):
+        ws.merge_cells("B2:C3")
+    ws.merge_cells("B2:C2")
+    assert ws.merged == ["B2:C2"]